@@ -1,7 +1,11 @@
 import streamlit as st
 import bcrypt
 from data.users import get_user_by_username, insert_user
+from data.login_throttle import check_login, record_login_result, throttled_message
 from services.user_service import register_user
+from data.db import get_database
+from services.resources import get_scheduler
+from services.session_guard import SESSION_NOTICE, restore_session, start_session
 
 st.set_page_config(page_title="Login / Register", page_icon="🔑", layout="centered")
 
@@ -14,14 +18,23 @@ if "logged_in" not in st.session_state:
 if "username" not in st.session_state:
     st.session_state.username = ""
 
+if "role" not in st.session_state:
+    st.session_state.role = ""
+
 st.title("🔐 Welcome")
 
+# A signed session token in the URL restores the login without a password check
+db = get_database()
+restore_session(db)
+get_scheduler()
+
 # If already logged in, go straight to dashboard (optional)
 if st.session_state.logged_in:
     st.success(f"Already logged in as **{st.session_state.username}**.")
+    st.caption(SESSION_NOTICE)
     if st.button("Go to dashboard"):
         # Use the official navigation API to switch pages
-        st.switch_page("pages/1_Incidents_Dashboard.py")  # path is relative to Home.py :contentReference[oaicite:1]{index=1}
+        st.switch_page("pages/1_Incidents_Dashboard.py", query_params=st.query_params.to_dict())  # path is relative to Home.py :contentReference[oaicite:1]{index=1}
     st.stop()  # Don’t show login/register again
 
 
@@ -34,22 +47,30 @@ with tab_login:
 
     login_username = st.text_input("Username", key="login_username")
     login_password = st.text_input("Password", type="password", key="login_password")
+    st.caption(SESSION_NOTICE)
 
     if st.button("Log in", type="primary"):
-        user = get_user_by_username(login_username)
-        if user:
-            stored_hash = user["password_hash"].encode("utf-8")
-            password_bytes = login_password.encode("utf-8")
-
-            if bcrypt.checkpw(password_bytes, stored_hash):
-                st.session_state.logged_in = True
-                st.session_state.username = login_username
-                st.success(f"Welcome back, {login_username}!")
-                st.switch_page("pages/1_Incidents_Dashboard.py")
+        # throttled attempts are rejected before any password hashing
+        wait = check_login(db, login_username, st.context.ip_address)
+        if wait:
+            st.error(throttled_message(wait))
+        else:
+            user = get_user_by_username(login_username)
+            if user:
+                stored_hash = user["password_hash"].encode("utf-8")
+                password_bytes = login_password.encode("utf-8")
+
+                if bcrypt.checkpw(password_bytes, stored_hash):
+                    record_login_result(db, login_username, True)
+                    token = start_session(db, login_username, user["role"])
+                    st.success(f"Welcome back, {login_username}!")
+                    st.switch_page("pages/1_Incidents_Dashboard.py", query_params={"session": token})
+                else:
+                    record_login_result(db, login_username, False)
+                    st.error("Invalid username or password.")
             else:
+                record_login_result(db, login_username, False)
                 st.error("Invalid username or password.")
-        else:
-            st.error("Invalid username or password.")
 
 
 # ----- REGISTER TAB -----
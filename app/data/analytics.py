@@ -0,0 +1,140 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from data.db import DB_PATH, get_database
+from data.arrow_fetch import read_sql_frame, fetch_arrow_table
+from data.filters import DOMAIN_TABLES, where_clause
+from services.profiling import profiled
+
+try:
+    import duckdb
+except ImportError:  # DuckDB is optional; the sqlite engine needs nothing extra
+    duckdb = None
+
+# Config switch: ANALYTICS_ENGINE=sqlite (default) or duckdb.
+# With duckdb, ANALYTICS_DUCKDB_SOURCE=attach reads the SQLite file through DuckDB's
+# sqlite extension; =parquet (or attach failing, e.g. offline) uses a Parquet mirror.
+ANALYTICS_ENGINE = os.environ.get("ANALYTICS_ENGINE", "sqlite").lower()
+ANALYTICS_DUCKDB_SOURCE = os.environ.get("ANALYTICS_DUCKDB_SOURCE", "attach").lower()
+PARQUET_MIRROR_DIR = Path("DATA") / "parquet"
+
+# Date bucket expressions per engine (weeks start on Monday)
+GRAIN_SQL = {
+    "sqlite": {
+        "day": "date({col})",
+        "week": "date({col}, '-6 days', 'weekday 1')",
+        "month": "strftime('%Y-%m-01', {col})",
+    },
+    "duckdb": {
+        "day": "CAST(CAST({col} AS DATE) AS VARCHAR)",
+        "week": "CAST(date_trunc('week', CAST({col} AS DATE)) AS DATE)::VARCHAR",
+        "month": "CAST(date_trunc('month', CAST({col} AS DATE)) AS DATE)::VARCHAR",
+    },
+}
+
+# engine state kept for the life of the process: {(engine, db_path): state}
+_engines = {}
+_engines_lock = threading.Lock()
+
+def _sqlite_state(db_path):
+    # the process's pooled Database: each query borrows its own connection
+    return {"conn": get_database(db_path)}
+
+def export_parquet_mirror(conn, directory=PARQUET_MIRROR_DIR):
+    """Write every domain table to <directory>/<table>.parquet (zstd compressed)."""
+    import pyarrow.parquet as pq
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for table, _ in DOMAIN_TABLES.values():
+        pq.write_table(fetch_arrow_table(conn, f"SELECT * FROM {table}"), directory / f"{table}.parquet",
+                       compression="zstd")
+    return directory
+
+def _refresh_parquet_views(state):
+    export_parquet_mirror(state["watch"], state["mirror_dir"])
+    for table, _ in DOMAIN_TABLES.values():
+        path = (Path(state["mirror_dir"]) / f"{table}.parquet").as_posix()
+        state["conn"].execute(f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM read_parquet('{path}')")
+
+def _duckdb_state(db_path):
+    if duckdb is None:
+        raise ImportError("ANALYTICS_ENGINE=duckdb needs the duckdb package (pip install duckdb)")
+    state = {"conn": duckdb.connect(), "source": ANALYTICS_DUCKDB_SOURCE}
+    if state["source"] == "attach":
+        try:
+            state["conn"].execute(f"ATTACH '{Path(db_path).as_posix()}' AS platform (TYPE SQLITE, READ_ONLY)")
+            state["conn"].execute("USE platform")
+        except duckdb.Error:
+            state["source"] = "parquet"
+    if state["source"] == "parquet":
+        # A long-lived SQLite connection notices other writers through PRAGMA data_version,
+        # so the mirror is only rebuilt after OLTP writes.
+        state["watch"] = sqlite3.connect(str(db_path), check_same_thread=False)
+        state["mirror_dir"] = Path(db_path).parent / PARQUET_MIRROR_DIR.name
+        state["version"] = None
+    return state
+
+def _engine_state(engine, db_path):
+    key = (engine, str(db_path))
+    with _engines_lock:
+        if key not in _engines:
+            _engines[key] = _duckdb_state(db_path) if engine == "duckdb" else _sqlite_state(db_path)
+        state = _engines[key]
+        if engine == "duckdb" and state["source"] == "parquet":
+            version = state["watch"].execute("PRAGMA data_version").fetchone()[0]
+            if version != state["version"]:
+                _refresh_parquet_views(state)
+                state["version"] = version
+    return state
+
+def run_query(sql, params=(), engine=None, db_path=DB_PATH):
+    """Run a read-only analytical query on the configured engine and return a DataFrame."""
+    engine = (engine or ANALYTICS_ENGINE).lower()
+    state = _engine_state(engine, db_path)
+    if engine == "duckdb":
+        # a DuckDB cursor is an independent handle, safe to use from this session's thread
+        return state["conn"].cursor().execute(sql, list(params)).df()
+    return read_sql_frame(state["conn"], sql, params)
+
+def close_engines():
+    """Close every engine connection opened by this module (the sqlite engine uses data.db's pooled Database)."""
+    for (engine, _), state in _engines.items():
+        if engine == "duckdb":
+            state["conn"].close()
+        if "watch" in state:
+            state["watch"].close()
+    _engines.clear()
+
+# ---------------------------
+# Chart queries used by the dashboards
+# ---------------------------
+@profiled("db")
+def count_by(domain, column, filters=None, engine=None, db_path=DB_PATH):
+    """Row counts per value of `column` for the filtered domain, largest first."""
+    table, _ = DOMAIN_TABLES[domain]
+    where_sql, params = where_clause(domain, filters)
+    sql = f"""
+        SELECT {column}, COUNT(*) AS count
+        FROM {table}
+        {where_sql}
+        GROUP BY {column}
+        ORDER BY count DESC
+    """
+    return run_query(sql, params, engine, db_path)
+
+@profiled("db")
+def trend_counts(domain, grain="day", filters=None, engine=None, db_path=DB_PATH):
+    """Row counts per date bucket (day/week/month) for the filtered domain."""
+    engine = (engine or ANALYTICS_ENGINE).lower()
+    table, date_column = DOMAIN_TABLES[domain]
+    bucket = GRAIN_SQL[engine][grain].format(col=date_column)
+    where_sql, params = where_clause(domain, filters)
+    sql = f"""
+        SELECT {bucket} AS date, COUNT(*) AS count
+        FROM {table}
+        {where_sql}
+        GROUP BY 1
+        ORDER BY 1
+    """
+    return run_query(sql, params, engine, db_path)
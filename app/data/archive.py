@@ -0,0 +1,166 @@
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+import pandas as pd
+from data.arrow_fetch import fetch_arrow_table, concat_tables, to_frame
+from data.filters import DOMAIN_TABLES, OWNER_COLUMNS, where_clause
+from data.rollups import ensure_rollup_tables, record_archived_rollups
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; archiving needs it
+    pa = pc = pq = None
+
+ARCHIVE_DIR = Path("DATA") / "archive"
+DEFAULT_RETENTION_DAYS = 180
+
+# Domains with a terminal status that can be moved to cold storage.
+# `date_expr` decides both the retention cut-off and the month partition.
+ARCHIVE_SOURCES = {
+    "incidents": {
+        "table": "cyber_incidents",
+        "date_expr": "date",
+        "statuses": ("Closed", "Resolved"),
+    },
+    "tickets": {
+        "table": "it_tickets",
+        "date_expr": "COALESCE(resolved_date, created_date)",
+        "statuses": ("Closed", "Resolved"),
+    },
+}
+
+def _require_pyarrow():
+    if pq is None:
+        raise ImportError("pyarrow is required for the Parquet archive (pip install pyarrow)")
+
+def _partition_dir(archive_dir, domain, month):
+    return Path(archive_dir) / domain / f"month={month}"
+
+def archive_closed_records(conn, retention_days=DEFAULT_RETENTION_DAYS, archive_dir=ARCHIVE_DIR, domains=None, today=None):
+    """
+    Move Closed/Resolved rows older than `retention_days` out of the hot tables
+    into zstd-compressed Parquet files partitioned by domain and month:
+        DATA/archive/<domain>/month=YYYY-MM/part-<batch>.parquet
+    Each domain is selected, written and deleted under one write lock (BEGIN
+    IMMEDIATE), so a row reopened meanwhile can neither be archived stale nor
+    deleted. Batch names are unique per run and files are created exclusively,
+    so concurrent or back-to-back runs never overwrite each other's parts.
+    Files are written before the rows are deleted, so a crash can at worst leave
+    a row in both places; reads de-duplicate on id. Summary tables follow the
+    hot tables, as the DELETE triggers fire; the trend counts of archived rows
+    move to archived_rollups in the same transaction, so trends keep them.
+    Returns {domain: rows archived}.
+    """
+    _require_pyarrow()
+    ensure_rollup_tables(conn)
+    cutoff = str((today or date.today()) - timedelta(days=retention_days))
+    batch = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    archived = {}
+    for domain in (domains or ARCHIVE_SOURCES):
+        source = ARCHIVE_SOURCES[domain]
+        statuses = ", ".join("?" for _ in source["statuses"])
+        predicate = f"status IN ({statuses}) AND {source['date_expr']} < ?"
+        params = list(source["statuses"]) + [cutoff]
+        written = []
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                table = fetch_arrow_table(conn, f"""
+                    SELECT *, {source['date_expr']} AS archive_date
+                    FROM {source['table']}
+                    WHERE {predicate}
+                """, params)
+                ids = table["id"].to_pylist() if table.num_rows else []
+                months = pc.utf8_slice_codeunits(table["archive_date"], 0, 7) if ids else None
+                for month in (pc.unique(months).to_pylist() if ids else []):
+                    out_dir = _partition_dir(archive_dir, domain, month)
+                    out_dir.mkdir(parents=True, exist_ok=True)
+                    path = out_dir / f"part-{batch}.parquet"
+                    with open(path, "xb") as sink:
+                        written.append(path)
+                        pq.write_table(table.filter(pc.equal(months, month)), sink, compression="zstd")
+                record_archived_rollups(conn, domain, predicate, params)
+                # the predicate again, so only rows still closed and old are removed
+                conn.executemany(f"DELETE FROM {source['table']} WHERE id = ? AND {predicate}",
+                                 [(i, *params) for i in ids])
+        except Exception:
+            # nothing was deleted; drop this run's partial batch so it is not read twice
+            for path in written:
+                path.unlink(missing_ok=True)
+            raise
+        archived[domain] = len(ids)
+    return archived
+
+def archived_months(domain, archive_dir=ARCHIVE_DIR):
+    """Sorted 'YYYY-MM' partitions present in the archive for a domain."""
+    root = Path(archive_dir) / domain
+    if not root.exists():
+        return []
+    return sorted(p.name.split("=", 1)[1] for p in root.glob("month=*") if p.is_dir())
+
+def _archive_paths(domain, start=None, end=None, archive_dir=ARCHIVE_DIR):
+    """Archived part files of `domain` that can hold rows dated (by the Analytics date column) from `start` to `end`."""
+    _, date_column = DOMAIN_TABLES[domain]
+    months = archived_months(domain, archive_dir)
+    # partitions are by archive date; they only bound the range when that is the row's own date
+    if ARCHIVE_SOURCES[domain]["date_expr"] == date_column:
+        months = [m for m in months if (start is None or m >= start[:7]) and (end is None or m <= end[:7])]
+    return [path for month in months for path in sorted(_partition_dir(archive_dir, domain, month).glob("*.parquet"))]
+
+def _filter_mask(table, domain, filters):
+    """Arrow version of data.filters.where_clause for archived rows."""
+    _, date_column = DOMAIN_TABLES[domain]
+    mask = pc.is_valid(table["id"])
+    for key, value in (filters or {}).items():
+        if value is None:
+            continue
+        if key == "owner":
+            if domain in OWNER_COLUMNS:
+                owners = pc.utf8_lower(table[OWNER_COLUMNS[domain]].cast(pa.string()))
+                mask = pc.and_(mask, pc.equal(owners, str(value).lower()))
+        elif key == "date_range":
+            start, end = (str(pd.Timestamp(v).date()) for v in value)
+            dates = table[date_column].cast(pa.string())
+            mask = pc.and_(mask, pc.and_(pc.greater_equal(dates, start), pc.less_equal(dates, end)))
+        else:
+            values = pa.array([str(v) for v in value], type=pa.string())
+            mask = pc.and_(mask, pc.is_in(table[key].cast(pa.string()), value_set=values))
+    return mask
+
+def archived_rows(domain, filters=None, archive_dir=ARCHIVE_DIR):
+    """
+    Archived rows of `domain` matching an Analytics filters dict (see
+    data.filters.where_clause) as an Arrow table with the hot table's columns,
+    or None when the archive holds nothing for them. Only the month partitions
+    the date range can reach are opened.
+    """
+    if domain not in ARCHIVE_SOURCES or pq is None:
+        return None
+    start, end = (filters or {}).get("date_range") or (None, None)
+    start = str(pd.Timestamp(start).date()) if start is not None else None
+    end = str(pd.Timestamp(end).date()) if end is not None else None
+    paths = _archive_paths(domain, start, end, archive_dir)
+    if not paths:
+        return None
+    table = concat_tables([pq.read_table(path) for path in paths]).drop_columns(["archive_date"])
+    table = table.filter(_filter_mask(table, domain, filters))
+    return table if table.num_rows else None
+
+def read_with_archive(conn, domain, filters=None, archive_dir=ARCHIVE_DIR):
+    """
+    Return the domain's rows matching an Analytics filters dict as a DataFrame,
+    combining the hot table with the archived month partitions the date range
+    touches. Parquet files are only opened when the range reaches archived months.
+    """
+    table, _ = DOMAIN_TABLES[domain]
+    where_sql, params = where_clause(domain, filters)
+    hot = fetch_arrow_table(conn, f"SELECT * FROM {table} {where_sql}", params)
+    archived = archived_rows(domain, filters, archive_dir)
+    if archived is None:
+        return to_frame(hot)
+    frame = to_frame(concat_tables([hot, archived]))
+    # hot rows come first, so a row caught in both places keeps its live version
+    return frame.drop_duplicates(subset="id", keep="first").reset_index(drop=True)
@@ -0,0 +1,107 @@
+import pandas as pd
+from platform_data.database import connection
+from services.profiling import profiled
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional; fall back to pandas' own reader
+    pa = None
+
+# Low-cardinality columns that are dictionary-encoded (pandas: categorical)
+DICTIONARY_COLUMNS = {
+    "severity", "status", "priority", "category", "assigned_to",
+    "incident_type", "reported_by", "source", "role",
+}
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+def _column_array(values, name, dictionary_columns):
+    try:
+        arr = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # SQLite columns can mix types; keep them readable as text
+        arr = pa.array([None if v is None else str(v) for v in values], type=pa.string())
+    if name in dictionary_columns and (pa.types.is_string(arr.type) or pa.types.is_null(arr.type)):
+        arr = arr.cast(pa.string()).dictionary_encode()
+    return arr
+
+def _batches_from_cursor(cursor, chunk_size, dictionary_columns):
+    names = [d[0] for d in cursor.description]
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        columns = list(zip(*rows))
+        arrays = [_column_array(list(col), name, dictionary_columns) for name, col in zip(names, columns)]
+        yield pa.RecordBatch.from_arrays(arrays, names=names)
+
+def iter_record_batches(conn, sql, params=(), chunk_size=DEFAULT_CHUNK_SIZE, dictionary_columns=DICTIONARY_COLUMNS):
+    """Yield Arrow record batches built straight from the cursor, `chunk_size` rows at a time."""
+    if pa is None:
+        raise ImportError("pyarrow is required for Arrow fetches (pip install pyarrow)")
+    with connection(conn) as borrowed:
+        cursor = borrowed.cursor()
+        cursor.execute(sql, tuple(params))
+        yield from _batches_from_cursor(cursor, chunk_size, dictionary_columns)
+
+@profiled("db")
+def fetch_arrow_table(conn, sql, params=(), chunk_size=DEFAULT_CHUNK_SIZE, dictionary_columns=DICTIONARY_COLUMNS):
+    """Run a query and return a pyarrow Table (an empty result keeps the column names)."""
+    if pa is None:
+        raise ImportError("pyarrow is required for Arrow fetches (pip install pyarrow)")
+    with connection(conn) as borrowed:
+        cursor = borrowed.cursor()
+        cursor.execute(sql, tuple(params))
+        tables = [pa.Table.from_batches([batch])
+                  for batch in _batches_from_cursor(cursor, chunk_size, dictionary_columns)]
+    if not tables:
+        return pa.table({d[0]: pa.array([], type=pa.string()) for d in cursor.description})
+    return concat_tables(tables)
+
+def concat_tables(tables):
+    """Concatenate Arrow tables whose inferred types may differ (e.g. an all-NULL chunk)."""
+    try:
+        table = pa.concat_tables(tables, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        table = pa.concat_tables(_text_for_mixed_columns(tables), promote_options="permissive")
+    return table.unify_dictionaries()
+
+def _text_for_mixed_columns(tables):
+    """Cast columns whose type differs between chunks (int in one, text in another) to text."""
+    mixed = set()
+    for name in tables[0].column_names:
+        kinds = {t.schema.field(name).type for t in tables} - {pa.null()}
+        if len(kinds) > 1:
+            mixed.add(name)
+    fixed = []
+    for t in tables:
+        for name in mixed:
+            i = t.schema.get_field_index(name)
+            column = pa.array([None if v is None else str(v) for v in t.column(i).to_pylist()], type=pa.string())
+            t = t.set_column(i, name, column)
+        fixed.append(t)
+    return fixed
+
+def _types_mapper(arrow_type):
+    # dictionary columns become pandas categoricals; everything else keeps its Arrow type
+    if pa.types.is_dictionary(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+def read_sql_frame(conn, sql, params=(), chunk_size=DEFAULT_CHUNK_SIZE, dictionary_columns=DICTIONARY_COLUMNS):
+    """
+    Drop-in replacement for pd.read_sql_query that builds the frame from Arrow.
+    Columns keep Arrow dtypes (no object-string copies) and low-cardinality
+    columns are categorical, so Streamlit can hand them to st.dataframe
+    without another conversion. Falls back to pandas when pyarrow is missing.
+    """
+    if pa is None:
+        with connection(conn) as borrowed:
+            return pd.read_sql_query(sql, borrowed, params=tuple(params))
+    table = fetch_arrow_table(conn, sql, params, chunk_size, dictionary_columns)
+    return to_frame(table)
+
+@profiled("transform")
+def to_frame(table):
+    """Convert an Arrow table to pandas, keeping Arrow dtypes and categoricals."""
+    return table.to_pandas(types_mapper=_types_mapper, self_destruct=True)
@@ -0,0 +1,108 @@
+import pandas as pd
+from platform_data import change_feed
+from platform_data.database import fetch_all
+from platform_data.change_feed import (
+    DEFAULT_FEED_RETENTION,
+    FEED_SOURCES,
+    ensure_change_feed,
+    feed_reaches,
+    latest_seq,
+    prune_change_feed,
+)
+from data.arrow_fetch import read_sql_frame
+from data.filters import owner_clause, ensure_owner_indexes
+from services.profiling import profiled
+
+# The change_feed table and its triggers are shared with multi_domain_platform
+# (see platform_data.change_feed); the DataFrame views of it below are the app's
+
+def create_change_feed(conn):
+    """Create the change_feed table and the triggers that append to it."""
+    change_feed.create_change_feed(conn)
+    print("✅ Change feed table and triggers created successfully!")
+
+@profiled("db")
+def poll_changes(conn, domain, since_seq, owner=None):
+    """
+    Fetch what changed in a domain after `since_seq`.
+    Returns (seq, upserts, deleted_ids): the new high-water mark, a DataFrame of the
+    current version of every inserted/updated row, and the ids of deleted rows.
+    With `owner`, rows outside that user's scope count as deleted, so a row
+    reassigned to someone else drops out of the caller's frame.
+    Returns None when the feed no longer reaches back to `since_seq` (pruned) and
+    the caller has to reload in full.
+    """
+    ensure_change_feed(conn)
+    if not feed_reaches(conn, since_seq):
+        # rows after since_seq were pruned, so the deltas are incomplete
+        return None
+    last = latest_seq(conn, domain)
+    if last <= since_seq:
+        return since_seq, None, []
+
+    table = FEED_SOURCES[domain]
+    owner_sql, owner_params = owner_clause(domain, owner)
+    visible = f"SELECT id FROM {table}" + (f" WHERE {owner_sql}" if owner_sql else "")
+    changed = """
+        SELECT DISTINCT row_id FROM change_feed
+        WHERE domain = ? AND seq > ? AND seq <= ?
+    """
+    upserts = read_sql_frame(
+        conn, f"SELECT * FROM {table} WHERE id IN ({changed}) AND id IN ({visible})",
+        [domain, since_seq, last] + owner_params
+    )
+    deleted = fetch_all(conn, f"{changed} AND row_id NOT IN ({visible})", [domain, since_seq, last] + owner_params)
+    return last, upserts, [row[0] for row in deleted]
+
+def merge_changes(frame, upserts, deleted_ids, descending=False):
+    """Apply polled changes to a cached frame: drop deleted/replaced ids, add the new versions."""
+    if (upserts is None or upserts.empty) and not deleted_ids:
+        return frame
+    drop = set(deleted_ids)
+    if upserts is not None:
+        drop.update(upserts["id"].tolist())
+    kept = frame[~frame["id"].isin(drop)]
+    if upserts is None or upserts.empty:
+        return kept
+    merged = pd.concat([kept, upserts], ignore_index=True)
+    # concat of categoricals with different categories falls back to object; restore them
+    for column in frame.columns:
+        if isinstance(frame[column].dtype, pd.CategoricalDtype) and column in merged:
+            merged[column] = merged[column].astype("category")
+    return merged.sort_values("id", ascending=not descending, ignore_index=True)
+
+def live_frame(conn, domain, store, descending=False, owner=None):
+    """
+    Return the domain table as a DataFrame cached in `store` (e.g. st.session_state),
+    loading it in full once and afterwards only merging rows changed since the
+    last poll. The work per call is proportional to the number of changes.
+    With `owner` (see data.filters.row_owner) only that user's rows are loaded.
+    """
+    key = f"live_{domain}"
+    state = store.get(key)
+    if state is not None and state.get("owner") == owner:
+        polled = poll_changes(conn, domain, state["seq"], owner)
+        if polled is not None:
+            seq, upserts, deleted_ids = polled
+            if seq != state["seq"]:
+                state["frame"] = merge_changes(state["frame"], upserts, deleted_ids, descending)
+                state["seq"] = seq
+                state["changes"] += (0 if upserts is None else len(upserts)) + len(deleted_ids)
+            return state["frame"]
+
+    ensure_change_feed(conn)
+    # read the high-water mark first: a change racing the load is applied again next poll
+    seq = latest_seq(conn, domain)
+    order = "DESC" if descending else "ASC"
+    owner_sql, owner_params = owner_clause(domain, owner)
+    if owner_sql:
+        ensure_owner_indexes(conn)
+    where_sql = f"WHERE {owner_sql}" if owner_sql else ""
+    frame = read_sql_frame(conn, f"SELECT * FROM {FEED_SOURCES[domain]} {where_sql} ORDER BY id {order}", owner_params)
+    store[key] = {"seq": seq, "frame": frame, "changes": 0, "owner": owner}
+    return frame
+
+def has_changes(conn, domain, store):
+    """Cheap check used by auto-refresh: has anything changed since this session's frame?"""
+    state = store.get(f"live_{domain}")
+    return state is None or latest_seq(conn, domain) > state["seq"]
@@ -1,87 +1,57 @@
-import sqlite3
 import pandas as pd
 from datetime import datetime
+from platform_data import aggregates, datasets
+from data.db import get_database
+from data.arrow_fetch import read_sql_frame
+from services.profiling import profiled
 
+@profiled("db")
 def insert_dataset(dataset_name, category, source, last_updated=None, record_count=None, file_size_mb=None):
     """Insert a new dataset metadata record."""
-    conn = sqlite3.connect("DATA/intelligence_platform.db")
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO datasets_metadata 
-        (dataset_name, category, source, last_updated, record_count, file_size_mb)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (dataset_name, category, source, last_updated, record_count, file_size_mb))
-    conn.commit()
-    dataset_id = cursor.lastrowid
-    conn.close()
-    return dataset_id
+    return datasets.insert_dataset(get_database(), dataset_name, category, source, last_updated, record_count,
+                                   file_size_mb)
 
+@profiled("db")
 def get_all_datasets():
     """Get all datasets as a DataFrame."""
-    conn = sqlite3.connect("DATA/intelligence_platform.db")
-    df = pd.read_sql_query("SELECT * FROM datasets_metadata ORDER BY id DESC", conn)
-    conn.close()
-    return df
+    sql, params = datasets.datasets_query()
+    with get_database().connection() as conn:
+        return read_sql_frame(conn, sql, params)
 
+@profiled("db")
 def get_dataset_by_name(dataset_name):
     """Get a single dataset by ID."""
-    conn = sqlite3.connect("DATA/intelligence_platform.db")
-    df = pd.read_sql_query("SELECT * FROM datasets_metadata WHERE id = ?", conn, params=(dataset_name,))
-    conn.close()
-    return df
+    row = datasets.get_dataset(get_database(), dataset_name)
+    return pd.DataFrame([row] if row else [], columns=list(datasets.DATASET_COLUMNS))
 
+@profiled("db")
+def search_datasets(query):
+    """Datasets whose name, category or source contains `query` (or whose id it is), as a DataFrame."""
+    return pd.DataFrame(datasets.search_datasets(get_database(), query), columns=list(datasets.DATASET_COLUMNS))
+
+@profiled("db")
 def update_dataset_last_updated(dataset_name, new_date=None):
     """Update the last_updated field for a dataset."""
     if new_date is None:
         new_date = datetime.now().strftime("%Y-%m-%d")
-    conn = sqlite3.connect("DATA/intelligence_platform.db")
-    cursor = conn.cursor()
-    cursor.execute("UPDATE datasets_metadata SET last_updated = ? WHERE id = ?", (new_date, dataset_name))
-    conn.commit()
-    rowcount = cursor.rowcount
-    conn.close()
-    return rowcount
+    return datasets.update_dataset(get_database(), dataset_name, last_updated=new_date)
 
+@profiled("db")
 def update_dataset_record_count(dataset_name, new_count):
     """Update the record_count for a dataset."""
-    conn = sqlite3.connect("DATA/intelligence_platform.db")
-    cursor = conn.cursor()
-    cursor.execute("UPDATE datasets_metadata SET record_count = ? WHERE id = ?", (new_count, dataset_name))
-    conn.commit()
-    rowcount = cursor.rowcount
-    conn.close()
-    return rowcount
+    return datasets.update_dataset(get_database(), dataset_name, record_count=new_count)
 
+@profiled("db")
 def delete_dataset(dataset_name):
     """Delete a dataset by ID."""
-    conn = sqlite3.connect("DATA/intelligence_platform.db")
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM datasets_metadata WHERE id = ?", (dataset_name,))
-    conn.commit()
-    rowcount = cursor.rowcount
-    conn.close()
-    return rowcount
+    return datasets.delete_dataset(get_database(), dataset_name)
 
+@profiled("db")
 def get_datasets_by_category():
     """Return count of datasets grouped by category."""
-    conn = sqlite3.connect("DATA/intelligence_platform.db")
-    df = pd.read_sql_query("""
-        SELECT category, COUNT(*) as count
-        FROM datasets_metadata
-        GROUP BY category
-        ORDER BY count DESC
-    """, conn)
-    conn.close()
-    return df
+    return pd.DataFrame(aggregates.count_by(get_database(), "datasets", "category"), columns=["category", "count"])
 
+@profiled("db")
 def get_large_datasets(min_size_mb=100):
     """Return datasets larger than a given size in MB."""
-    conn = sqlite3.connect("DATA/intelligence_platform.db")
-    df = pd.read_sql_query("""
-        SELECT dataset_name, file_size_mb
-        FROM datasets_metadata
-        WHERE file_size_mb > ?
-        ORDER BY file_size_mb DESC
-    """, conn, params=(min_size_mb,))
-    conn.close()
-    return df
\ No newline at end of file
+    return pd.DataFrame(datasets.large_datasets(get_database(), min_size_mb), columns=["dataset_name", "file_size_mb"])
@@ -1,6 +1,32 @@
+import atexit
+import os
 import sqlite3
+import threading
 from pathlib import Path
+from platform_data import Database
 
 DB_PATH = Path("DATA") / "intelligence_platform.db"
 def connect_database(db_path=DB_PATH):
     return sqlite3.connect(str(db_path))
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+def get_database(db_path=DB_PATH):
+    """
+    The process-wide pooled, cached Database for a file (see platform_data.Database).
+    Prefer it over connect_database() for anything that would open a connection per call.
+    """
+    key = os.path.abspath(str(db_path))
+    with _databases_lock:
+        db = _databases.get(key)
+        if db is None:
+            db = _databases[key] = Database(str(db_path))
+        return db
+
+@atexit.register
+def close_databases():
+    with _databases_lock:
+        for db in _databases.values():
+            db.close()
+        _databases.clear()
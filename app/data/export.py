@@ -0,0 +1,185 @@
+import csv
+import io
+import itertools
+import tempfile
+import zlib
+from data.db import DB_PATH, connect_database
+from data.filters import DOMAIN_TABLES, where_clause
+from data.arrow_fetch import iter_record_batches
+from data.archive import archived_rows
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; CSV exports work without it
+    pa = pq = None
+
+EXPORT_CHUNK_SIZE = 10_000
+
+# Format name -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "csv.gz": (".csv.gz", "application/gzip"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+def _export_query(domain, filters):
+    table, _ = DOMAIN_TABLES[domain]
+    where_sql, params = where_clause(domain, filters)
+    return f"SELECT * FROM {table} {where_sql} ORDER BY id", params
+
+def _archived_only(conn, domain, filters):
+    """Archived rows matching `filters` that are not also still in the hot table (a crash mid-archive)."""
+    archived = archived_rows(domain, filters)
+    if archived is None:
+        return None
+    table, _ = DOMAIN_TABLES[domain]
+    ids = archived["id"].to_pylist()
+    live = set()
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        live.update(row[0] for row in conn.execute(
+            f"SELECT id FROM {table} WHERE id IN ({', '.join('?' for _ in chunk)})", chunk))
+    if live:
+        archived = archived.filter(pa.array([i not in live for i in ids]))
+    return archived if archived.num_rows else None
+
+def _iter_csv(conn, sql, params, chunk_size, archived=None):
+    cursor = conn.cursor()
+    cursor.execute(sql, tuple(params))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    names = [d[0] for d in cursor.description]
+    writer.writerow(names)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    for batch in (archived.select(names).to_batches(chunk_size) if archived is not None else []):
+        writer.writerows(zip(*(column.to_pylist() for column in batch.columns)))
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # header only: the result was empty
+        yield buffer.getvalue().encode("utf-8")
+
+def _iter_gzip(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the generator."""
+
+    def __init__(self):
+        super().__init__()
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+def _writer_schema(batch):
+    # an all-NULL first chunk has no type yet; later chunks are cast to this schema
+    fields = [pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in batch.schema]
+    return pa.schema(fields)
+
+def _iter_parquet(conn, sql, params, chunk_size, archived=None):
+    if pq is None:
+        raise ImportError("pyarrow is required for Parquet exports (pip install pyarrow)")
+    sink = _ChunkSink()
+    writer = None
+    batches = iter_record_batches(conn, sql, params, chunk_size)
+    if archived is not None:
+        batches = itertools.chain(batches, archived.to_batches(chunk_size))
+    for batch in batches:
+        table = pa.Table.from_batches([batch])
+        if writer is None:
+            schema = _writer_schema(batch)
+            writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        # one row group per chunk, handed out as soon as it is written
+        writer.write_table(table.cast(schema))
+        yield sink.drain()
+    if writer is None:
+        cursor = conn.execute(sql, tuple(params))
+        schema = pa.schema([pa.field(d[0], pa.string()) for d in cursor.description])
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    writer.close()
+    yield sink.drain()
+
+def iter_export(conn, domain, filters=None, fmt="csv", chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Stream the filtered rows of a domain ("incidents", "tickets", "datasets") as
+    bytes chunks in the given format ("csv", "csv.gz" or "parquet").
+    `filters` takes the same dict as the Analytics charts (see data.filters), and
+    at most `chunk_size` live rows are held in memory at once. Matching rows
+    moved to the Parquet archive (see data.archive) follow the live ones.
+    """
+    sql, params = _export_query(domain, filters)
+    archived = _archived_only(conn, domain, filters) if fmt in EXPORT_FORMATS else None
+    if fmt == "parquet":
+        yield from _iter_parquet(conn, sql, params, chunk_size, archived)
+    elif fmt == "csv.gz":
+        yield from _iter_gzip(_iter_csv(conn, sql, params, chunk_size, archived))
+    elif fmt == "csv":
+        yield from _iter_csv(conn, sql, params, chunk_size, archived)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+def spool_export(domain, filters=None, fmt="csv", db_path=DB_PATH, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Write an export to a temporary file on disk and return it rewound for reading.
+    Opens its own connection, so it can run on the thread Streamlit uses for
+    deferred downloads. The file is deleted when closed.
+    """
+    conn = connect_database(db_path)
+    out = tempfile.TemporaryFile()
+    try:
+        for chunk in iter_export(conn, domain, filters, fmt, chunk_size):
+            out.write(chunk)
+    except Exception:
+        out.close()
+        raise
+    finally:
+        conn.close()
+    out.seek(0)
+    return out
+
+def export_file_name(domain, fmt):
+    return f"{domain}{EXPORT_FORMATS[fmt][0]}"
+
+def describe_filters(filters):
+    """Short human-readable summary of an Analytics filters dict."""
+    parts = []
+    for key, value in (filters or {}).items():
+        if value is None:
+            continue
+        if key == "date_range":
+            parts.append(f"{value[0]:%Y-%m-%d} to {value[1]:%Y-%m-%d}")
+        elif key == "owner":
+            parts.append(f"owner: {value}")
+        else:
+            parts.append(f"{key}: {', '.join(map(str, value)) or 'none'}")
+    return "; ".join(parts) or "none (all rows)"
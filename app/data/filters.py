@@ -0,0 +1,50 @@
+import pandas as pd
+# Row ownership lives in the shared data-access package (see platform_data.schema)
+from platform_data.schema import (
+    OWNER_COLUMNS,
+    UNRESTRICTED_ROLES,
+    OWNER_INDEXES,
+    row_owner,
+    owner_clause,
+    create_owner_indexes,
+    ensure_owner_indexes,
+)
+
+# Domain name -> (table, date column used by the Analytics date slider)
+DOMAIN_TABLES = {
+    "incidents": ("cyber_incidents", "date"),
+    "tickets": ("it_tickets", "created_date"),
+    "datasets": ("datasets_metadata", "last_updated"),
+}
+
+def where_clause(domain, filters=None):
+    """
+    Compile Analytics sidebar filters into a SQL WHERE clause and parameters.
+    `filters` maps "date_range" to a (start, end) pair, or None for all dates,
+    and column names to the list of allowed values, e.g.
+    {"date_range": (start, end), "severity": ["High"], "status": ["Open"]}.
+    An "owner" key (see row_owner) keeps only that user's rows.
+    Returns ("WHERE ...", params), or ("", []) when nothing is filtered.
+    """
+    _, date_column = DOMAIN_TABLES[domain]
+    clauses, params = [], []
+    for key, value in (filters or {}).items():
+        if value is None:
+            continue
+        if key == "owner":
+            clause, owner_params = owner_clause(domain, value)
+            if clause:
+                clauses.append(clause)
+                params += owner_params
+        elif key == "date_range":
+            start, end = value
+            clauses.append(f"{date_column} >= ? AND {date_column} <= ?")
+            params += [str(pd.Timestamp(start).date()), str(pd.Timestamp(end).date())]
+        else:
+            values = list(value)
+            if not values:
+                clauses.append("0 = 1")
+            else:
+                clauses.append(f"{key} IN ({', '.join('?' for _ in values)})")
+                params += values
+    return ("WHERE " + " AND ".join(clauses), params) if clauses else ("", [])
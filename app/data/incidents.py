@@ -1,105 +1,86 @@
 import pandas as pd
-from data.db import connect_database
+from platform_data import incidents
+from platform_data.database import connection
+from data.db import get_database
+from data.arrow_fetch import read_sql_frame
+from data.filters import where_clause, owner_clause, ensure_owner_indexes
+from services.profiling import profiled
 
+@profiled("db")
 def insert_incident(date, incident_type, severity, status, description, reported_by=None):
     """Insert new incident."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO cyber_incidents 
-        (date, incident_type, severity, status, description, reported_by)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (date, incident_type, severity, status, description, reported_by))
-    conn.commit()
-    incident_id = cursor.lastrowid
-    conn.close()
-    return incident_id
+    return incidents.insert_incident(get_database(), date, incident_type, severity, status, description, reported_by)
 
-def get_all_incidents():
-    """Get all incidents as DataFrame."""
-    conn = connect_database()
-    df = pd.read_sql_query(
-        "SELECT * FROM cyber_incidents ORDER BY id DESC",
-        conn
-    )
-    conn.close()
-    return df
+@profiled("db")
+def get_all_incidents(owner=None):
+    """Get all incidents as DataFrame; with `owner`, only that user's rows (see data.filters.row_owner)."""
+    sql, params = incidents.incidents_query(owner)
+    with get_database().connection() as conn:
+        if owner is not None:
+            ensure_owner_indexes(conn)
+        return read_sql_frame(conn, sql, params)
 
-def update_incident_status(conn, incident_id, new_status):
-    cursor = conn.cursor()
-    sql = "UPDATE cyber_incidents SET status = ? WHERE id = ?"
-    cursor.execute(sql, (new_status, incident_id))
-    conn.commit()
-    return cursor.rowcount
+@profiled("db")
+def update_incident_status(conn, incident_id, new_status, owner=None):
+    """Returns the number updated: 0 when no incident has that id or `owner` cannot see it."""
+    return incidents.update_incident_status(conn, incident_id, new_status, owner)
 
-def delete_incident(conn, incident_id):
-    cursor = conn.cursor()
-    sql = "DELETE FROM cyber_incidents WHERE id = ?"
-    cursor.execute(sql, (incident_id,))
-    conn.commit()
-    return cursor.rowcount
+@profiled("db")
+def delete_incident(conn, incident_id, owner=None):
+    """Returns the number deleted: 0 when no incident has that id or `owner` cannot see it."""
+    return incidents.delete_incident(conn, incident_id, owner)
 
-def get_incidents_by_type_count(conn):
-    query = """
+@profiled("db")
+def get_incidents_by_type_count(conn, owner=None):
+    where_sql, params = where_clause("incidents", {"owner": owner})
+    query = f"""
     SELECT incident_type, COUNT(*) as count
     FROM cyber_incidents
+    {where_sql}
     GROUP BY incident_type
     ORDER BY count DESC
     """
-    df = pd.read_sql_query(query, conn)
-    return df
+    with connection(conn) as borrowed:
+        return pd.read_sql_query(query, borrowed, params=params)
 
-def get_high_severity_by_status(conn):
-    query = """
+@profiled("db")
+def get_high_severity_by_status(conn, owner=None):
+    owner_sql, params = owner_clause("incidents", owner)
+    query = f"""
     SELECT status, COUNT(*) as count
     FROM cyber_incidents
-    WHERE severity = 'High'
+    WHERE severity = 'High'{" AND " + owner_sql if owner_sql else ""}
     GROUP BY status
     ORDER BY count DESC
     """
-    df = pd.read_sql_query(query, conn)
-    return df
+    with connection(conn) as borrowed:
+        return pd.read_sql_query(query, borrowed, params=params)
 
-def get_incident_types_with_many_cases(conn, min_count=5):
-    query = """
+@profiled("db")
+def get_incident_types_with_many_cases(conn, min_count=5, owner=None):
+    where_sql, params = where_clause("incidents", {"owner": owner})
+    query = f"""
     SELECT incident_type, COUNT(*) as count
     FROM cyber_incidents
+    {where_sql}
     GROUP BY incident_type
     HAVING COUNT(*) > ?
     ORDER BY count DESC
     """
-    df = pd.read_sql_query(query, conn, params=(min_count,))
-    return df
+    with connection(conn) as borrowed:
+        return pd.read_sql_query(query, borrowed, params=params + [min_count])
 
-def search_incident(conn, incident_id):
+@profiled("db")
+def search_incident(conn, query, owner=None):
     """
-    Search for an incident by its incident_id (e.g. "INC-0001").
-    Returns a dict suitable for streamlit.table (values as single-item lists) or None if not found.
+    Incidents matching an identifier (e.g. "INC-0001" or 1) or whose type, reporter
+    or description contains `query`, limited to `owner`'s rows when given.
+    Returns a dict suitable for streamlit.table (a list of values per column) or None if not found.
     """
-    cursor = conn.cursor()
-    try:
-        # Try the most likely table name first
-        cursor.execute("SELECT * FROM incidents WHERE incident_id = ?", (incident_id,))
-        row = cursor.fetchone()
-        if row:
-            cols = [d[0] for d in cursor.description]
-            return {c: [v] for c, v in zip(cols, row)}
-
-        # fallback: find any table that contains an incident_id column
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [r[0] for r in cursor.fetchall()]
-        for tbl in tables:
-            cursor.execute(f"PRAGMA table_info('{tbl}')")
-            columns = [r[1] for r in cursor.fetchall()]
-            if "incident_id" in columns:
-                cursor.execute(f"SELECT * FROM {tbl} WHERE incident_id = ?", (incident_id,))
-                row = cursor.fetchone()
-                if row:
-                    cols = [d[0] for d in cursor.description]
-                    return {c: [v] for c, v in zip(cols, row)}
-
-    except Exception:
-        # silent fallback to None on error (caller will display warning)
+    q = query.strip()
+    if q.upper().startswith("INC-") and q[4:].isdigit():
+        q = str(int(q[4:]))
+    rows = incidents.search_incidents(conn, q, owner)
+    if not rows:
         return None
-
-    return None
\ No newline at end of file
+    return {c: [row[i] for row in rows] for i, c in enumerate(incidents.INCIDENT_COLUMNS)}
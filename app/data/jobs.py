@@ -0,0 +1,138 @@
+import time
+import pandas as pd
+from platform_data.database import connection, fetch_all, fetch_one, transaction
+from data.arrow_fetch import read_sql_frame
+
+JOB_STATES = ("queued", "running", "ok", "skipped", "failed")
+
+def create_job_tables(conn):
+    """Create the background job history and the lease table that keeps each job single-flight."""
+    with connection(conn) as borrowed:
+        borrowed.executescript("""
+    CREATE TABLE IF NOT EXISTS job_runs (
+        run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job TEXT NOT NULL,
+        state TEXT CHECK(state IN ('queued', 'running', 'ok', 'skipped', 'failed')) NOT NULL,
+        trigger TEXT CHECK(trigger IN ('schedule', 'manual')) NOT NULL DEFAULT 'schedule',
+        worker TEXT,
+        queued_at REAL,
+        started_at REAL,
+        finished_at REAL,
+        duration_s REAL,
+        detail TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_job_runs_job ON job_runs (job, run_id);
+
+    CREATE TABLE IF NOT EXISTS job_locks (
+        job TEXT PRIMARY KEY,
+        worker TEXT NOT NULL,
+        lease_until REAL NOT NULL
+    );
+    """)
+        borrowed.commit()
+
+def ensure_job_tables(conn):
+    if fetch_one(conn, "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_locks'") is None:
+        create_job_tables(conn)
+
+def acquire_job_lock(conn, job, worker, lease_s, now=None):
+    """
+    Take or renew `job`'s lease for `worker`; True if it now holds it. A lease
+    held by another worker is only taken over once it has expired (its process
+    died mid-run), so a job never runs twice at once across processes.
+    """
+    now = time.time() if now is None else now
+    with conn:
+        cursor = conn.execute("""
+            INSERT INTO job_locks (job, worker, lease_until) VALUES (?, ?, ?)
+            ON CONFLICT (job) DO UPDATE SET worker = excluded.worker, lease_until = excluded.lease_until
+            WHERE job_locks.worker = excluded.worker OR job_locks.lease_until < ?
+        """, (job, worker, now + lease_s, now))
+    return cursor.rowcount > 0
+
+def release_job_lock(conn, job, worker):
+    with conn:
+        conn.execute("DELETE FROM job_locks WHERE job = ? AND worker = ?", (job, worker))
+
+def queue_job_run(conn, job):
+    """Ask the scheduler to run `job` as soon as it can; returns the queued run id (an existing one if queued already)."""
+    ensure_job_tables(conn)
+    with transaction(conn) as cursor:
+        row = cursor.execute("SELECT run_id FROM job_runs WHERE job = ? AND state = 'queued'", (job,)).fetchone()
+        if row:
+            return row[0]
+        cursor.execute(
+            "INSERT INTO job_runs (job, state, trigger, queued_at) VALUES (?, 'queued', 'manual', ?)",
+            (job, time.time()),
+        )
+        return cursor.lastrowid
+
+def queued_jobs(conn):
+    """{job: run id} of runs asked for by hand and not started yet."""
+    return dict(conn.execute("SELECT job, MIN(run_id) FROM job_runs WHERE state = 'queued' GROUP BY job").fetchall())
+
+def start_job_run(conn, job, worker, run_id=None, trigger="schedule"):
+    """
+    Mark a queued run as started, or record a new one. Returns the run id, or
+    None when the queued run is no longer queued (another worker claimed it).
+    """
+    now = time.time()
+    with conn:
+        if run_id is not None:
+            cursor = conn.execute(
+                "UPDATE job_runs SET state = 'running', worker = ?, started_at = ? WHERE run_id = ? AND state = 'queued'",
+                (worker, now, run_id),
+            )
+            return run_id if cursor.rowcount else None
+        cursor = conn.execute(
+            "INSERT INTO job_runs (job, state, trigger, worker, started_at) VALUES (?, 'running', ?, ?, ?)",
+            (job, trigger, worker, now),
+        )
+        return cursor.lastrowid
+
+def finish_job_run(conn, run_id, state, detail=None):
+    now = time.time()
+    with conn:
+        conn.execute("""
+            UPDATE job_runs SET state = ?, finished_at = ?, duration_s = ? - started_at, detail = ?
+            WHERE run_id = ?
+        """, (state, now, now, None if detail is None else str(detail)[:2000], run_id))
+
+def fail_abandoned_runs(conn, job, worker):
+    """Close out runs of `job` left 'running' by a worker that no longer holds its lease."""
+    with conn:
+        conn.execute("""
+            UPDATE job_runs SET state = 'failed', finished_at = ?, detail = 'worker stopped before the run finished'
+            WHERE job = ? AND state = 'running' AND COALESCE(worker, '') != ?
+        """, (time.time(), job, worker))
+
+def last_job_starts(conn):
+    """{job: started_at} of each job's latest started run."""
+    return dict(fetch_all(conn, "SELECT job, MAX(started_at) FROM job_runs WHERE started_at IS NOT NULL GROUP BY job"))
+
+def get_job_runs(conn, job=None, limit=50):
+    ensure_job_tables(conn)
+    where_sql, params = ("WHERE job = ?", [job]) if job else ("", [])
+    frame = read_sql_frame(conn, f"SELECT * FROM job_runs {where_sql} ORDER BY run_id DESC LIMIT ?",
+                           params + [int(limit)])
+    for column in ("queued_at", "started_at", "finished_at"):
+        frame[column] = pd.to_datetime(frame[column], unit="s")
+    return frame
+
+def get_job_summary(conn):
+    """Per job: runs, failures, the last run's state, and average/max duration of successful runs."""
+    ensure_job_tables(conn)
+    frame = read_sql_frame(conn, """
+        SELECT job,
+               COUNT(*) AS runs,
+               SUM(state = 'failed') AS failed,
+               (SELECT state FROM job_runs r WHERE r.job = j.job ORDER BY run_id DESC LIMIT 1) AS last_state,
+               MAX(started_at) AS last_started,
+               AVG(CASE WHEN state = 'ok' THEN duration_s END) AS avg_duration_s,
+               MAX(CASE WHEN state = 'ok' THEN duration_s END) AS max_duration_s
+        FROM job_runs j
+        GROUP BY job
+        ORDER BY job
+    """)
+    frame["last_started"] = pd.to_datetime(frame["last_started"], unit="s")
+    return frame
@@ -0,0 +1,34 @@
+import os
+from platform_data.login_throttle import LoginThrottle, create_login_throttle_table, throttled_message
+
+# Every login attempt takes a token from the username's bucket and the client's
+# bucket before the password hash is checked; an empty bucket or an active
+# lockout rejects the attempt without hashing. Limits, lockout and persistence
+# are shared with multi_domain_platform (see platform_data.login_throttle).
+LOGIN_THROTTLE_ENABLED = os.environ.get("LOGIN_THROTTLE", "1") != "0"
+
+# One set of counters per process
+_throttle = LoginThrottle()
+
+def persist_throttle(conn, force=False):
+    """Write changed counters to login_throttle (at most every LOGIN_PERSIST_INTERVAL_S unless `force`)."""
+    return _throttle.persist(conn, force)
+
+def check_login(conn, username, client=None):
+    """
+    Call before verifying a password. Returns 0 when the attempt may go ahead
+    (a token is taken from each bucket), otherwise the seconds to wait.
+    """
+    if not LOGIN_THROTTLE_ENABLED:
+        return 0
+    return _throttle.check(conn, username, client)
+
+def record_login_result(conn, username, success):
+    """Call after the password check: failures build up to an exponential lockout, success clears them."""
+    if not LOGIN_THROTTLE_ENABLED:
+        return
+    _throttle.record(conn, username, success)
+
+def reset_throttle():
+    """Forget all in-memory counters (tests and benchmarks)."""
+    _throttle.reset()
@@ -0,0 +1,35 @@
+from platform_data import response_cache
+from platform_data.response_cache import (
+    CACHE_EVENTS,
+    CACHE_MAX_ENTRIES,
+    CACHE_TTL_S,
+    SIMILARITY_THRESHOLD,
+    TEMPERATURE_STEP,
+    cache_stats,
+    clear_response_cache,
+    create_response_cache_tables,
+    ensure_response_cache_tables,
+    normalise_prompt,
+    temperature_bucket,
+)
+from services.profiling import profiled
+
+# The cache tables, keys and similarity fallback are shared with
+# multi_domain_platform (see platform_data.response_cache)
+
+@profiled("db")
+def lookup_response(conn, system_prompt, model, temperature, prompt, semantic=True,
+                    threshold=SIMILARITY_THRESHOLD, ttl=CACHE_TTL_S):
+    """
+    Return a cached reply for this persona/model/temperature and prompt, or None.
+    An exact match on the normalised prompt is tried first; with `semantic` the
+    closest live entry in the same scope is served when its similarity reaches
+    `threshold`.
+    """
+    return response_cache.lookup_response(conn, system_prompt, model, temperature, prompt, semantic, threshold, ttl)
+
+@profiled("db")
+def store_response(conn, system_prompt, model, temperature, prompt, response,
+                   max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_S):
+    """Cache a reply, then evict expired entries and the least recently used beyond `max_entries`."""
+    response_cache.store_response(conn, system_prompt, model, temperature, prompt, response, max_entries, ttl)
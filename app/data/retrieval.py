@@ -0,0 +1,41 @@
+from platform_data import retrieval
+from platform_data.retrieval import (
+    RAG_MAX_CANDIDATES,
+    RAG_TOKEN_BUDGET,
+    RAG_TOP_K,
+    RECORD_TEXT,
+    create_vector_index,
+    ensure_vector_index,
+    rebuild_index,
+    records_prompt,
+)
+from services.profiling import profiled
+
+# The vector index over incidents, tickets and datasets is shared with
+# multi_domain_platform (see platform_data.retrieval)
+
+@profiled("db")
+def sync_index(conn, domains=None):
+    """
+    Bring the index up to date with the domain tables. Only rows logged in the
+    change feed since the last sync are re-embedded; a domain that was never
+    indexed (or whose feed was pruned past the sync position) is rebuilt.
+    Returns {domain: rows embedded}.
+    """
+    return retrieval.sync_index(conn, domains)
+
+@profiled("db")
+def retrieve(conn, query, k=RAG_TOP_K, domains=None, sync=True, max_candidates=RAG_MAX_CANDIDATES, owner=None):
+    """
+    Return up to `k` records most similar to `query` as dicts of domain, row_id,
+    text and score (cosine similarity), best first. With `owner` (see
+    data.filters.row_owner), records of other users are left out.
+    """
+    if sync:
+        sync_index(conn, domains)
+    return retrieval.retrieve(conn, query, k, domains, False, max_candidates, owner)
+
+def ground_prompt(conn, system_prompt, question, domains=None, k=RAG_TOP_K, budget=RAG_TOKEN_BUDGET, owner=None):
+    """`system_prompt` followed by the records most relevant to `question` (unchanged if none match)."""
+    block = records_prompt(retrieve(conn, question, k, domains, owner=owner), budget)
+    return f"{system_prompt}\n\n{block}" if block else system_prompt
@@ -0,0 +1,171 @@
+import pandas as pd
+from platform_data.database import connection, fetch_all
+from services.profiling import profiled
+
+# Domain tables that feed the trend rollups, the date column they are bucketed
+# on, and the columns each bucket is broken down by.
+ROLLUP_SOURCES = {
+    "incidents": {"table": "cyber_incidents", "date_column": "date", "dimensions": ["severity"]},
+    "tickets": {"table": "it_tickets", "date_column": "created_date", "dimensions": ["priority", "category"]},
+    "datasets": {"table": "datasets_metadata", "date_column": "last_updated", "dimensions": ["category"]},
+}
+
+# SQL expressions that map a date to the first day of its bucket (weeks start on Monday)
+GRAINS = {
+    "day": "date({col})",
+    "week": "date({col}, '-6 days', 'weekday 1')",
+    "month": "strftime('%Y-%m-01', {col})",
+}
+
+def _bucket_sql(grain, col):
+    return GRAINS[grain].format(col=col)
+
+def _breakdowns(domain):
+    """(dimension name, value expression) pairs: the overall total plus each dimension."""
+    return [("all", None)] + [(d, d) for d in ROLLUP_SOURCES[domain]["dimensions"]]
+
+def _increment_sql(domain, grain, dimension, column, ref):
+    bucket = _bucket_sql(grain, f"{ref}.{ROLLUP_SOURCES[domain]['date_column']}")
+    value = f"COALESCE({ref}.{column}, '')" if column else "''"
+    return f"""
+        INSERT INTO trend_rollups (domain, grain, dimension, value, bucket, count)
+        SELECT '{domain}', '{grain}', '{dimension}', {value}, {bucket}, 1 WHERE {bucket} IS NOT NULL
+        ON CONFLICT (domain, grain, dimension, value, bucket) DO UPDATE SET count = count + 1;"""
+
+def _decrement_sql(domain, grain, dimension, column, ref):
+    bucket = _bucket_sql(grain, f"{ref}.{ROLLUP_SOURCES[domain]['date_column']}")
+    value = f"COALESCE({ref}.{column}, '')" if column else "''"
+    return f"""
+        UPDATE trend_rollups SET count = count - 1
+        WHERE domain = '{domain}' AND grain = '{grain}' AND dimension = '{dimension}'
+          AND value = {value} AND bucket = {bucket};"""
+
+def _trigger_sql(domain):
+    """Build the INSERT/DELETE/UPDATE triggers that adjust only the touched buckets."""
+    source = ROLLUP_SOURCES[domain]
+    table = source["table"]
+    watched = ", ".join([source["date_column"]] + source["dimensions"])
+    inc = "".join(_increment_sql(domain, g, d, c, "NEW") for g in GRAINS for d, c in _breakdowns(domain))
+    dec = "".join(_decrement_sql(domain, g, d, c, "OLD") for g in GRAINS for d, c in _breakdowns(domain))
+    return f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{domain}_rollup_insert AFTER INSERT ON {table}
+    BEGIN{inc}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_{domain}_rollup_delete AFTER DELETE ON {table}
+    BEGIN{dec}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_{domain}_rollup_update AFTER UPDATE OF {watched} ON {table}
+    BEGIN{dec}{inc}
+    END;
+    """
+
+def _rollup_table_sql(name):
+    return f"""
+    CREATE TABLE IF NOT EXISTS {name} (
+        domain TEXT NOT NULL,
+        grain TEXT NOT NULL,
+        dimension TEXT NOT NULL,
+        value TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (domain, grain, dimension, value, bucket)
+    ) WITHOUT ROWID;
+    """
+
+def create_rollup_tables(conn):
+    """
+    Create the trend_rollups table, its triggers, and backfill it. Rows moved to
+    the Parquet archive are counted in archived_rollups instead (see
+    record_archived_rollups), which rebuilds leave alone.
+    """
+    cursor = conn.cursor()
+    cursor.executescript(
+        _rollup_table_sql("trend_rollups") + _rollup_table_sql("archived_rollups")
+        + "".join(_trigger_sql(domain) for domain in ROLLUP_SOURCES)
+    )
+    conn.commit()
+    rebuild_rollups(conn)
+    print("✅ Trend rollup table and triggers created successfully!")
+
+def rebuild_rollups(conn, domain=None):
+    """Recompute rollups from the domain tables (all domains unless one is given)."""
+    domains = [domain] if domain else list(ROLLUP_SOURCES)
+    cursor = conn.cursor()
+    for name in domains:
+        source = ROLLUP_SOURCES[name]
+        cursor.execute("DELETE FROM trend_rollups WHERE domain = ?", (name,))
+        for grain in GRAINS:
+            bucket = _bucket_sql(grain, source["date_column"])
+            for dimension, column in _breakdowns(name):
+                value = f"COALESCE({column}, '')" if column else "''"
+                cursor.execute(f"""
+                    INSERT INTO trend_rollups (domain, grain, dimension, value, bucket, count)
+                    SELECT ?, ?, ?, {value}, {bucket}, COUNT(*)
+                    FROM {source['table']}
+                    WHERE {bucket} IS NOT NULL
+                    GROUP BY 4, 5
+                """, (name, grain, dimension))
+    conn.commit()
+
+def ensure_rollup_tables(conn):
+    tables = {row[0] for row in fetch_all(
+        conn, "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('trend_rollups', 'archived_rollups')"
+    )}
+    if len(tables) == 2:
+        return
+    with connection(conn) as borrowed:
+        if "trend_rollups" not in tables:
+            create_rollup_tables(borrowed)
+        else:
+            borrowed.executescript(_rollup_table_sql("archived_rollups"))
+
+def record_archived_rollups(conn, domain, where_sql, params=()):
+    """
+    Count the rows of `domain` matching `where_sql` into archived_rollups. Call it
+    in the transaction that moves them to the archive: their delete triggers take
+    them out of trend_rollups, and get_trend adds them back from here.
+    """
+    source = ROLLUP_SOURCES[domain]
+    for grain in GRAINS:
+        bucket = _bucket_sql(grain, source["date_column"])
+        for dimension, column in _breakdowns(domain):
+            value = f"COALESCE({column}, '')" if column else "''"
+            conn.execute(f"""
+                INSERT INTO archived_rollups (domain, grain, dimension, value, bucket, count)
+                SELECT ?, ?, ?, {value}, {bucket}, COUNT(*)
+                FROM {source['table']}
+                WHERE {bucket} IS NOT NULL AND {where_sql}
+                GROUP BY 4, 5
+                ON CONFLICT (domain, grain, dimension, value, bucket) DO UPDATE SET count = count + excluded.count
+            """, (domain, grain, dimension, *params))
+
+@profiled("db")
+def get_trend(conn, domain, grain="day", start=None, end=None, dimension="all", values=None):
+    """
+    Return a DataFrame of (date, count) per bucket for a domain, archived rows included.
+    `dimension`/`values` restrict the count to e.g. severity in ['High', 'Critical'];
+    `start`/`end` (dates or 'YYYY-MM-DD' strings) select the buckets that overlap the range.
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown grain '{grain}', expected one of {list(GRAINS)}")
+    ensure_rollup_tables(conn)
+    sql = """
+        SELECT bucket AS date, SUM(count) AS count
+        FROM (SELECT * FROM trend_rollups UNION ALL SELECT * FROM archived_rollups)
+        WHERE domain = ? AND grain = ? AND dimension = ?
+    """
+    params = [domain, grain, dimension]
+    if values is not None:
+        values = list(values)
+        sql += f" AND value IN ({', '.join('?' for _ in values)})" if values else " AND 0"
+        params += values
+    if start is not None:
+        sql += f" AND bucket >= {_bucket_sql(grain, '?')}"
+        params.append(str(pd.Timestamp(start).date()))
+    if end is not None:
+        sql += " AND bucket <= ?"
+        params.append(str(pd.Timestamp(end).date()))
+    sql += " GROUP BY bucket HAVING SUM(count) > 0 ORDER BY bucket"
+    return pd.DataFrame(fetch_all(conn, sql, params), columns=["date", "count"])
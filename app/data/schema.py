@@ -4,6 +4,15 @@ import pandas as pd
 from pathlib import Path
 from data.db import connect_database
 from data.users import migrate_users_from_file
+from data.rollups import create_rollup_tables
+from data.change_feed import create_change_feed, prune_change_feed
+from data.response_cache import create_response_cache_tables
+from data.retrieval import create_vector_index
+from data.triage import create_triage_tables
+from data.sessions import create_sessions_table
+from data.login_throttle import create_login_throttle_table
+from data.jobs import create_job_tables
+from data.filters import create_owner_indexes
 DB_PATH = Path("DATA") / "intelligence_platform.db"
 
 def create_users_table(conn):
@@ -88,12 +97,159 @@ def create_it_tickets_table(conn):
     conn.commit()
     print("✅ IT Tickets table created successfully!")
 
+def create_summary_tables(conn):
+    """
+    Create the KPI summary tables and the triggers that keep them current.
+    Each table holds one row per group, so dashboard metrics are a lookup
+    over a handful of rows instead of a scan of the domain table.
+    """
+    cursor = conn.cursor()
+
+    cursor.executescript("""
+    CREATE TABLE IF NOT EXISTS incident_summary (
+        severity TEXT NOT NULL,
+        status TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (severity, status)
+    );
+
+    CREATE TABLE IF NOT EXISTS ticket_summary (
+        priority TEXT NOT NULL,
+        status TEXT NOT NULL,
+        category TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (priority, status, category)
+    );
+
+    CREATE TABLE IF NOT EXISTS dataset_summary (
+        category TEXT PRIMARY KEY,
+        dataset_count INTEGER NOT NULL DEFAULT 0,
+        total_records INTEGER NOT NULL DEFAULT 0,
+        total_size_mb REAL NOT NULL DEFAULT 0
+    );
+
+    -- cyber_incidents -> incident_summary
+    CREATE TRIGGER IF NOT EXISTS trg_incident_summary_insert AFTER INSERT ON cyber_incidents
+    BEGIN
+        INSERT INTO incident_summary (severity, status, count) VALUES (NEW.severity, NEW.status, 1)
+        ON CONFLICT (severity, status) DO UPDATE SET count = count + 1;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_incident_summary_delete AFTER DELETE ON cyber_incidents
+    BEGIN
+        UPDATE incident_summary SET count = count - 1
+        WHERE severity = OLD.severity AND status = OLD.status;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_incident_summary_update AFTER UPDATE OF severity, status ON cyber_incidents
+    BEGIN
+        UPDATE incident_summary SET count = count - 1
+        WHERE severity = OLD.severity AND status = OLD.status;
+        INSERT INTO incident_summary (severity, status, count) VALUES (NEW.severity, NEW.status, 1)
+        ON CONFLICT (severity, status) DO UPDATE SET count = count + 1;
+    END;
+
+    -- it_tickets -> ticket_summary (NULLs are stored as '' so they still group)
+    CREATE TRIGGER IF NOT EXISTS trg_ticket_summary_insert AFTER INSERT ON it_tickets
+    BEGIN
+        INSERT INTO ticket_summary (priority, status, category, count)
+        VALUES (COALESCE(NEW.priority, ''), COALESCE(NEW.status, ''), COALESCE(NEW.category, ''), 1)
+        ON CONFLICT (priority, status, category) DO UPDATE SET count = count + 1;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_ticket_summary_delete AFTER DELETE ON it_tickets
+    BEGIN
+        UPDATE ticket_summary SET count = count - 1
+        WHERE priority = COALESCE(OLD.priority, '') AND status = COALESCE(OLD.status, '')
+          AND category = COALESCE(OLD.category, '');
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_ticket_summary_update AFTER UPDATE OF priority, status, category ON it_tickets
+    BEGIN
+        UPDATE ticket_summary SET count = count - 1
+        WHERE priority = COALESCE(OLD.priority, '') AND status = COALESCE(OLD.status, '')
+          AND category = COALESCE(OLD.category, '');
+        INSERT INTO ticket_summary (priority, status, category, count)
+        VALUES (COALESCE(NEW.priority, ''), COALESCE(NEW.status, ''), COALESCE(NEW.category, ''), 1)
+        ON CONFLICT (priority, status, category) DO UPDATE SET count = count + 1;
+    END;
+
+    -- datasets_metadata -> dataset_summary
+    CREATE TRIGGER IF NOT EXISTS trg_dataset_summary_insert AFTER INSERT ON datasets_metadata
+    BEGIN
+        INSERT INTO dataset_summary (category, dataset_count, total_records, total_size_mb)
+        VALUES (NEW.category, 1, COALESCE(NEW.record_count, 0), COALESCE(NEW.file_size_mb, 0))
+        ON CONFLICT (category) DO UPDATE SET
+            dataset_count = dataset_count + 1,
+            total_records = total_records + excluded.total_records,
+            total_size_mb = total_size_mb + excluded.total_size_mb;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_dataset_summary_delete AFTER DELETE ON datasets_metadata
+    BEGIN
+        UPDATE dataset_summary SET
+            dataset_count = dataset_count - 1,
+            total_records = total_records - COALESCE(OLD.record_count, 0),
+            total_size_mb = total_size_mb - COALESCE(OLD.file_size_mb, 0)
+        WHERE category = OLD.category;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_dataset_summary_update AFTER UPDATE OF category, record_count, file_size_mb ON datasets_metadata
+    BEGIN
+        UPDATE dataset_summary SET
+            dataset_count = dataset_count - 1,
+            total_records = total_records - COALESCE(OLD.record_count, 0),
+            total_size_mb = total_size_mb - COALESCE(OLD.file_size_mb, 0)
+        WHERE category = OLD.category;
+        INSERT INTO dataset_summary (category, dataset_count, total_records, total_size_mb)
+        VALUES (NEW.category, 1, COALESCE(NEW.record_count, 0), COALESCE(NEW.file_size_mb, 0))
+        ON CONFLICT (category) DO UPDATE SET
+            dataset_count = dataset_count + 1,
+            total_records = total_records + excluded.total_records,
+            total_size_mb = total_size_mb + excluded.total_size_mb;
+    END;
+    """)
+    conn.commit()
+    rebuild_summary_tables(conn)
+    print("✅ Summary tables and triggers created successfully!")
+
+def rebuild_summary_tables(conn):
+    """Recompute the summary tables from scratch (backfill or repair)."""
+    cursor = conn.cursor()
+    cursor.executescript("""
+    BEGIN;
+    DELETE FROM incident_summary;
+    INSERT INTO incident_summary (severity, status, count)
+        SELECT severity, status, COUNT(*) FROM cyber_incidents GROUP BY severity, status;
+
+    DELETE FROM ticket_summary;
+    INSERT INTO ticket_summary (priority, status, category, count)
+        SELECT COALESCE(priority, ''), COALESCE(status, ''), COALESCE(category, ''), COUNT(*)
+        FROM it_tickets GROUP BY 1, 2, 3;
+
+    DELETE FROM dataset_summary;
+    INSERT INTO dataset_summary (category, dataset_count, total_records, total_size_mb)
+        SELECT category, COUNT(*), COALESCE(SUM(record_count), 0), COALESCE(SUM(file_size_mb), 0)
+        FROM datasets_metadata GROUP BY category;
+    COMMIT;
+    """)
+
 def create_all_tables(conn):
     """Create all tables."""
     create_users_table(conn)
     create_cyber_incidents_table(conn)
     create_datasets_metadata_table(conn)
     create_it_tickets_table(conn)
+    create_owner_indexes(conn)
+    create_summary_tables(conn)
+    create_rollup_tables(conn)
+    create_change_feed(conn)
+    create_response_cache_tables(conn)
+    create_vector_index(conn)
+    create_triage_tables(conn)
+    create_sessions_table(conn)
+    create_login_throttle_table(conn)
+    create_job_tables(conn)
 
 def load_csv_to_table(conn, csv_path, table_name, if_exists='append'):
     if not os.path.exists(csv_path):
@@ -165,6 +321,8 @@ def setup_database_complete():
     # Step 4: Load CSV data
     print("\n[4/5] Loading CSV data...")
     load_all_csv_data(conn, "DATA")
+    # The bulk load is not a change any open dashboard has to replay
+    prune_change_feed(conn, keep=0)
     
     # Step 5: Verify
     print("\n[5/5] Verifying database setup...")
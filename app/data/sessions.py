@@ -0,0 +1,53 @@
+from pathlib import Path
+from platform_data import sessions
+from platform_data.database import fetch_one
+from platform_data.sessions import SESSION_TTL_S, create_sessions_table, ensure_sessions_table
+
+# Signing key: SESSION_SECRET, or a random key kept next to the database so
+# tokens stay valid across restarts and between workers
+SESSION_KEY_PATH = Path("DATA") / "session.key"
+
+# Tokens, the signing key and the LRU cache of validated sessions
+# (see platform_data.sessions.SessionStore); one store per process
+_store = sessions.SessionStore(SESSION_KEY_PATH)
+
+def create_session(conn, username, role=None, ttl=SESSION_TTL_S):
+    """
+    Record a session and return its token, "<session id>.<expiry>.<HMAC>". The
+    role defaults to the user's role in the users table.
+    """
+    if role is None:
+        row = fetch_one(conn, "SELECT role FROM users WHERE username = ?", (username,))
+        role = row[0] if row else None
+    return _store.create(conn, username, role, ttl)
+
+def validate_session(conn, token):
+    """
+    The {"username", "role"} of a live session, or None. Forged and expired
+    tokens are rejected from the token alone; a recently validated session is
+    served from the in-memory LRU cache without touching the database.
+    """
+    return _store.validate(conn, token)
+
+def revoke_session(conn, token):
+    """
+    Log a session out everywhere (other workers drop it within SESSION_CACHE_TTL_S).
+    True only for the call that revoked it, so a token can be rotated once.
+    """
+    return _store.revoke(conn, token)
+
+def rotate_session(conn, token, ttl=SESSION_TTL_S):
+    """
+    Swap a live token for a new one with the same user and role, revoking the old.
+    Returns (new token, {"username", "role"}), or None when the token is not live
+    or another request rotated it first.
+    """
+    return _store.rotate(conn, token, ttl)
+
+def session_expires_at(token):
+    """Expiry (epoch seconds) of a well-formed, signed, unexpired token; else None."""
+    return _store.expires_at(token)
+
+def purge_expired_sessions(conn):
+    """Delete expired and revoked sessions; returns the number removed."""
+    return _store.purge_expired(conn)
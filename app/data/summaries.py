@@ -0,0 +1,80 @@
+from platform_data.database import connection, fetch_one
+from data.schema import create_summary_tables
+from data.filters import owner_clause, ensure_owner_indexes
+from services.profiling import profiled
+
+SUMMARY_TABLES = ("incident_summary", "ticket_summary", "dataset_summary")
+
+def ensure_summary_tables(conn):
+    """Create and backfill the summary tables on databases that predate them."""
+    row = fetch_one(conn, "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN (?, ?, ?)",
+                    SUMMARY_TABLES)
+    if row[0] < len(SUMMARY_TABLES):
+        with connection(conn) as borrowed:
+            create_summary_tables(borrowed)
+
+def _in_clause(column, values):
+    """Build an 'AND column IN (...)' fragment; None means no filter."""
+    if values is None:
+        return "", []
+    values = list(values)
+    if not values:
+        return " AND 0", []
+    return f" AND {column} IN ({', '.join('?' for _ in values)})", values
+
+def _kpi_source(domain, table, summary_table, owner, conn):
+    """
+    FROM/WHERE source and params for a KPI query. The summary tables hold
+    counts for everyone, so a scoped read (see data.filters.row_owner) counts
+    the owner's rows in the domain table instead, through the owner index.
+    """
+    owner_sql, owner_params = owner_clause(domain, owner)
+    if not owner_sql:
+        return f"{summary_table} WHERE 1 = 1", "count", []
+    ensure_owner_indexes(conn)
+    return f"{table} WHERE {owner_sql}", "1", owner_params
+
+@profiled("db")
+def get_incident_kpis(conn, severities=None, statuses=None, owner=None):
+    """Return Total / Critical-High / Open-Investigating incident counts (only `owner`'s when given)."""
+    ensure_summary_tables(conn)
+    source, count, params = _kpi_source("incidents", "cyber_incidents", "incident_summary", owner, conn)
+    sev_sql, sev_params = _in_clause("severity", severities)
+    status_sql, status_params = _in_clause("status", statuses)
+    total, critical_high, open_investigating = fetch_one(conn, f"""
+        SELECT
+            COALESCE(SUM({count}), 0),
+            COALESCE(SUM(CASE WHEN severity IN ('Critical', 'High') THEN {count} END), 0),
+            COALESCE(SUM(CASE WHEN status IN ('Open', 'Investigating') THEN {count} END), 0)
+        FROM {source}{sev_sql}{status_sql}
+    """, params + sev_params + status_params)
+    return {"total": total, "critical_high": critical_high, "open_investigating": open_investigating}
+
+@profiled("db")
+def get_ticket_kpis(conn, priorities=None, statuses=None, categories=None, owner=None):
+    """Return Total / High Priority / Open ticket counts (only `owner`'s when given)."""
+    ensure_summary_tables(conn)
+    source, count, params = _kpi_source("tickets", "it_tickets", "ticket_summary", owner, conn)
+    prio_sql, prio_params = _in_clause("priority", priorities)
+    status_sql, status_params = _in_clause("status", statuses)
+    cat_sql, cat_params = _in_clause("category", categories)
+    total, high_priority, open_count = fetch_one(conn, f"""
+        SELECT
+            COALESCE(SUM({count}), 0),
+            COALESCE(SUM(CASE WHEN priority IN ('High', 'Critical') THEN {count} END), 0),
+            COALESCE(SUM(CASE WHEN status IN ('Open', 'Investigating') THEN {count} END), 0)
+        FROM {source}{prio_sql}{status_sql}{cat_sql}
+    """, params + prio_params + status_params + cat_params)
+    return {"total": total, "high_priority": high_priority, "open": open_count}
+
+@profiled("db")
+def get_dataset_kpis(conn, category=None):
+    """Return Total Datasets / Total Records / Total Size (MB), optionally for one category."""
+    ensure_summary_tables(conn)
+    cat_sql, cat_params = _in_clause("category", None if category is None else [category])
+    total, records, size_mb = fetch_one(conn, f"""
+        SELECT COALESCE(SUM(dataset_count), 0), COALESCE(SUM(total_records), 0), COALESCE(SUM(total_size_mb), 0)
+        FROM dataset_summary
+        WHERE 1 = 1{cat_sql}
+    """, cat_params)
+    return {"total": total, "total_records": int(records), "total_size_mb": float(size_mb)}
@@ -1,77 +1,79 @@
-import sqlite3
 import pandas as pd
-from data.db import connect_database
+from platform_data import tickets
+from platform_data.database import connection, fetch_one
+from data.db import get_database
+from data.arrow_fetch import read_sql_frame
+from data.filters import where_clause, owner_clause, ensure_owner_indexes
+from services.profiling import profiled
 
+@profiled("db")
 def insert_it_ticket(conn, priority, status, category, subject, description, created_date, resolved_date, assigned_to):
-    cursor = conn.cursor()
-    # Auto-generate ticket_id with zero padding
-    cursor.execute("SELECT COUNT(*) FROM it_tickets")
-    count = cursor.fetchone()[0] + 1
-    ticket_id = f"TCK-{count:04d}"
+    """Insert a ticket under the next free reference (e.g. "TCK-0042") and return the reference."""
+    return tickets.insert_ticket(conn, priority, status, category, subject, description, created_date,
+                                 resolved_date, assigned_to)
 
-    cursor.execute("""
-        INSERT INTO it_tickets (ticket_id, priority, status, category, subject, description, created_date, resolved_date, assigned_to)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (ticket_id, priority, status, category, subject, description, created_date, resolved_date or None, assigned_to))
-    conn.commit()
-    return ticket_id
 
+@profiled("db")
+def get_all_tickets(owner=None):
+    """Get all tickets as DataFrame; with `owner`, only that user's rows (see data.filters.row_owner)."""
+    sql, params = tickets.tickets_query(owner)
+    with get_database().connection() as conn:
+        if owner is not None:
+            ensure_owner_indexes(conn)
+        return read_sql_frame(conn, sql, params)
 
-def get_all_tickets():
-    """Get all tickets as DataFrame."""
-    conn = connect_database()
-    df = pd.read_sql_query(
-        "SELECT * FROM it_tickets ORDER BY id DESC",
-        conn
-    )
-    conn.close()
-    return df
+@profiled("db")
+def update_ticket_status(conn, ticket_id, new_status, owner=None):
+    """Returns ticket_id, or None when no ticket has that reference or `owner` cannot see it."""
+    return ticket_id if tickets.update_ticket_status(conn, ticket_id, new_status, owner) else None
 
-def update_ticket_status(conn, ticket_id, new_status):
-    cursor = conn.cursor()
-    cursor.execute("UPDATE it_tickets SET status = ? WHERE ticket_id = ?", (new_status, ticket_id))
-    conn.commit()
-    return ticket_id
+@profiled("db")
+def delete_ticket(conn, ticket_id, owner=None):
+    """Returns the number deleted: 0 when no ticket has that reference or `owner` cannot see it."""
+    return tickets.delete_ticket(conn, ticket_id, owner)
 
-def delete_ticket(conn, ticket_id):
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM it_tickets WHERE ticket_id = ?", (ticket_id,))
-    conn.commit()
-    return cursor.rowcount
-
-def get_tickets_by_category_count(conn):
-    query = """
+@profiled("db")
+def get_tickets_by_category_count(conn, owner=None):
+    where_sql, params = where_clause("tickets", {"owner": owner})
+    query = f"""
     SELECT category, COUNT(*) as count
     FROM it_tickets
+    {where_sql}
     GROUP BY category
     ORDER BY count DESC
     """
-    df = pd.read_sql_query(query, conn)
-    return df
+    with connection(conn) as borrowed:
+        return pd.read_sql_query(query, borrowed, params=params)
 
-def get_high_priority_by_status(conn):
-    query = """
+@profiled("db")
+def get_high_priority_by_status(conn, owner=None):
+    owner_sql, params = owner_clause("tickets", owner)
+    query = f"""
     SELECT status, COUNT(*) as count
     FROM it_tickets
-    WHERE severity = 'High'
+    WHERE severity = 'High'{" AND " + owner_sql if owner_sql else ""}
     GROUP BY status
     ORDER BY count DESC
     """
-    df = pd.read_sql_query(query, conn)
-    return df
+    with connection(conn) as borrowed:
+        return pd.read_sql_query(query, borrowed, params=params)
 
-def get_tickets_category_with_many_cases(conn, min_count=5):
-    query = """
+@profiled("db")
+def get_tickets_category_with_many_cases(conn, min_count=5, owner=None):
+    where_sql, params = where_clause("tickets", {"owner": owner})
+    query = f"""
     SELECT category, COUNT(*) as count
     FROM it_tickets
+    {where_sql}
     GROUP BY category
     HAVING COUNT(*) > ?
     ORDER BY count DESC
     """
-    df = pd.read_sql_query(query, conn, params=(min_count,))
-    return df
+    with connection(conn) as borrowed:
+        return pd.read_sql_query(query, borrowed, params=params + [min_count])
 
-def search_ticket(conn, ticket_id):
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM it_tickets WHERE ticket_id = ?", (ticket_id,))
-    return cursor.fetchone()
\ No newline at end of file
+@profiled("db")
+def search_ticket(conn, ticket_id, owner=None):
+    owner_sql, params = owner_clause("tickets", owner)
+    return fetch_one(conn, f"SELECT * FROM it_tickets WHERE ticket_id = ?{' AND ' + owner_sql if owner_sql else ''}",
+                     [ticket_id] + params)
\ No newline at end of file
@@ -0,0 +1,143 @@
+import time
+import pandas as pd
+from platform_data.database import connection, fetch_one
+from data.arrow_fetch import read_sql_frame
+from data.filters import owner_clause
+
+TRIAGE_STATUSES = ("Open", "Investigating")
+SEVERITIES = ("Critical", "High", "Medium", "Low")
+
+def create_triage_tables(conn):
+    """Create the AI triage results and the run log that doubles as its checkpoint."""
+    cursor = conn.cursor()
+    cursor.executescript("""
+    CREATE TABLE IF NOT EXISTS triage_runs (
+        run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        model TEXT NOT NULL,
+        state TEXT CHECK(state IN ('running', 'finished', 'failed')) NOT NULL DEFAULT 'running',
+        total INTEGER NOT NULL DEFAULT 0,
+        done INTEGER NOT NULL DEFAULT 0,
+        failed INTEGER NOT NULL DEFAULT 0,
+        started_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        finished_at REAL
+    );
+
+    CREATE TABLE IF NOT EXISTS incident_triage (
+        incident_id INTEGER PRIMARY KEY,
+        run_id INTEGER NOT NULL,
+        outcome TEXT CHECK(outcome IN ('done', 'failed')) NOT NULL,
+        suggested_severity TEXT CHECK(suggested_severity IN ('Critical', 'High', 'Medium', 'Low')),
+        summary TEXT,
+        error TEXT,
+        model TEXT NOT NULL,
+        triaged_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_incident_triage_run ON incident_triage (run_id);
+    """)
+    conn.commit()
+
+def ensure_triage_tables(conn):
+    if fetch_one(conn, "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'incident_triage'") is None:
+        with connection(conn) as borrowed:
+            create_triage_tables(borrowed)
+
+def pending_incidents(conn, statuses=TRIAGE_STATUSES, limit=None):
+    """
+    Incidents in `statuses` without a successful triage, oldest id first. Rows
+    written by an interrupted run are skipped, so a restart picks up where the
+    last committed batch ended; failed rows are tried again.
+    """
+    ensure_triage_tables(conn)
+    marks = ", ".join("?" for _ in statuses)
+    sql = f"""
+        SELECT i.id, i.date, i.incident_type, i.severity, i.status, i.description, i.reported_by
+        FROM cyber_incidents i
+        LEFT JOIN incident_triage t ON t.incident_id = i.id AND t.outcome = 'done'
+        WHERE i.status IN ({marks}) AND t.incident_id IS NULL
+        ORDER BY i.id
+    """
+    params = list(statuses)
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return [dict(zip(("id", "date", "incident_type", "severity", "status", "description", "reported_by"), row))
+            for row in conn.execute(sql, params).fetchall()]
+
+def start_triage_run(conn, model, total):
+    """
+    Resume the newest run still marked 'running' (its process died) or start a
+    new one. Returns the run id.
+    """
+    ensure_triage_tables(conn)
+    now = time.time()
+    row = conn.execute(
+        "SELECT run_id FROM triage_runs WHERE state = 'running' ORDER BY run_id DESC LIMIT 1"
+    ).fetchone()
+    with conn:
+        if row:
+            conn.execute(
+                "UPDATE triage_runs SET total = done + failed + ?, model = ?, updated_at = ? WHERE run_id = ?",
+                (total, model, now, row[0]),
+            )
+            return row[0]
+        cursor = conn.execute(
+            "INSERT INTO triage_runs (model, total, started_at, updated_at) VALUES (?, ?, ?, ?)",
+            (model, total, now, now),
+        )
+        return cursor.lastrowid
+
+def save_triage_batch(conn, run_id, results):
+    """
+    Write a batch of results and advance the run's counters in one transaction;
+    each committed batch is a checkpoint. `results` holds dicts with incident_id,
+    outcome, suggested_severity, summary, error and model.
+    """
+    now = time.time()
+    rows = [(r["incident_id"], run_id, r["outcome"], r.get("suggested_severity"), r.get("summary"),
+             r.get("error"), r["model"], now) for r in results]
+    done = sum(r["outcome"] == "done" for r in results)
+    with conn:
+        # a retried incident that failed before is not counted twice
+        conn.executemany("""
+            INSERT INTO incident_triage
+                (incident_id, run_id, outcome, suggested_severity, summary, error, model, triaged_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (incident_id) DO UPDATE SET
+                run_id = excluded.run_id, outcome = excluded.outcome,
+                suggested_severity = excluded.suggested_severity, summary = excluded.summary,
+                error = excluded.error, model = excluded.model, triaged_at = excluded.triaged_at
+        """, rows)
+        conn.execute(
+            "UPDATE triage_runs SET done = done + ?, failed = failed + ?, updated_at = ? WHERE run_id = ?",
+            (done, len(results) - done, now, run_id),
+        )
+
+def finish_triage_run(conn, run_id, state="finished"):
+    now = time.time()
+    with conn:
+        conn.execute(
+            "UPDATE triage_runs SET state = ?, updated_at = ?, finished_at = ? WHERE run_id = ?",
+            (state, now, now, run_id),
+        )
+
+def get_triage_runs(conn, limit=10):
+    ensure_triage_tables(conn)
+    frame = read_sql_frame(conn, "SELECT * FROM triage_runs ORDER BY run_id DESC LIMIT ?", (int(limit),))
+    for column in ("started_at", "updated_at", "finished_at"):
+        frame[column] = pd.to_datetime(frame[column], unit="s")
+    return frame
+
+def get_triage_results(conn, statuses=TRIAGE_STATUSES, owner=None):
+    """Latest triage of each incident still in `statuses` (and reported by `owner`, if given), next to its current severity."""
+    ensure_triage_tables(conn)
+    marks = ", ".join("?" for _ in statuses)
+    owner_sql, owner_params = owner_clause("incidents", owner)
+    return read_sql_frame(conn, f"""
+        SELECT i.id, i.incident_type, i.status, i.severity, t.suggested_severity, t.summary,
+               t.outcome, t.error, t.run_id
+        FROM incident_triage t
+        JOIN cyber_incidents i ON i.id = t.incident_id
+        WHERE i.status IN ({marks}){" AND i." + owner_sql if owner_sql else ""}
+        ORDER BY i.id
+    """, list(statuses) + owner_params)
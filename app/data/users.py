@@ -1,60 +1,36 @@
-from data.db import connect_database
+from platform_data import users
+from data.db import get_database
 from pathlib import Path
 import sqlite3
+from services.profiling import profiled
 DATA_DIR = Path("DATA")
 
+@profiled("db")
 def get_user_by_username(username):
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT username, password_hash, role FROM users WHERE username = ?", (username,))
-    row = cursor.fetchone()
-    conn.close()
+    row = users.get_user(get_database(), username)
     if row:
         return {"username": row[0], "password_hash": row[1], "role": row[2]}
     return None
 
+@profiled("db")
 def insert_user(username, password_hash, role='user'):
     """Insert new user."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-        (username, password_hash, role)
-    )
-    conn.commit()
-    conn.close()
+    users.insert_user(get_database(), username, password_hash, role)
 
 def migrate_users_from_file(conn, filepath=DATA_DIR / "users.txt"):
     if not filepath.exists():
         print(f"⚠️  File not found: {filepath}")
         print("   No users to migrate.")
         return
-    
-    cursor = conn.cursor()
-    migrated_count = 0
-    
+
+    # Parse lines: username,password_hash
     with open(filepath, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Parse line: username,password_hash
-            parts = line.split(',')
-            if len(parts) >= 2:
-                username = parts[0]
-                password_hash = parts[1]
-                
-                # Insert user (ignore if already exists)
-                try:
-                    cursor.execute(
-                        "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-                        (username, password_hash, 'user')
-                    )
-                    if cursor.rowcount > 0:
-                        migrated_count += 1
-                except sqlite3.Error as e:
-                    print(f"Error migrating user {username}: {e}")
-    
-    conn.commit()
+        rows = [parts[:2] for parts in (line.strip().split(',') for line in f) if len(parts) >= 2]
+
+    # Insert users in one commit (existing usernames are skipped)
+    try:
+        migrated_count = users.insert_users(conn, rows)
+    except sqlite3.Error as e:
+        print(f"Error migrating users: {e}")
+        return
     print(f"✅ Migrated {migrated_count} users from {filepath.name}")
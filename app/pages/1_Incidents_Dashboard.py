@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from data.db import connect_database
+from data.db import get_database
+from services.resources import get_chat_client, get_scheduler
+from services.session_guard import restore_session, end_session
 from data.incidents import (
     get_all_incidents,
     insert_incident,
@@ -9,11 +11,28 @@ from data.incidents import (
     delete_incident,
     search_incident
 )
+from data.summaries import get_incident_kpis
+from data.filters import row_owner
+from data.rollups import get_trend
+from data.analytics import count_by, trend_counts
+from data.export import EXPORT_FORMATS, spool_export, export_file_name, describe_filters
+from services.downsampling import downsample_for_chart
+from data.change_feed import live_frame
+from data.response_cache import lookup_response, store_response, cache_stats
+from data.retrieval import ground_prompt
+from data.triage import get_triage_runs, get_triage_results
+from data.jobs import queue_job_run
+from services.profiling import begin_rerun, end_rerun, render_overlay, span
+from services.chat_gateway import complete_chat, stream_chat, uses_stub
+from services.context_window import CHAT_TOKEN_BUDGET, build_messages
+from services.live_refresh import render_auto_refresh
 
 # ---------------------------
 # Session state setup
 # ---------------------------
-conn = connect_database()
+# every read and write borrows a pooled connection for the call (see data.db.get_database)
+db = get_database()
+get_scheduler()
 
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
@@ -25,12 +44,21 @@ if "form" not in st.session_state:
 # ---------------------------
 # Guard: require login
 # ---------------------------
+# restore the login from the session token in the URL (a cache lookup, not a password check)
+restore_session(db)
+
 if not st.session_state.logged_in:
     st.error("You must be logged in to view the dashboard.")
     if st.button("Go to login page"):
         st.switch_page("Home.py")
     st.stop()
 
+# Rows this user may read: their own reports, or everything for managers and admins
+owner = row_owner(st.session_state.username, st.session_state.get("role"))
+
+# Per-rerun timing spans (opt-in, see services/profiling.py)
+begin_rerun("Incidents Dashboard", st.session_state.get("profiling"))
+
 st.success(f"Hello, **{st.session_state.username}**! You are logged in.")
 
 # ---------------------------
@@ -55,28 +83,33 @@ if selection == "Analytics":
         st.markdown("*Analysis and visualization of recent, and past Cybersecurity incidents.*")
     st.divider()
 
-    # Load incidents directly from DB
-    incidents = pd.read_sql("SELECT * FROM cyber_incidents", conn)
+    # Incidents cached in the session; later reruns only merge rows changed since
+    incidents = live_frame(db, "incidents", st.session_state, owner=owner)
+    render_auto_refresh(db, "incidents")
 
     # ---------------------------
     # Sidebar Filters
     # ---------------------------
     st.sidebar.subheader("Filters")
 
-    # Date range slider
+    # Date range slider (only when the rows span more than one date)
+    date_filtered = False
     if not incidents.empty:
         min_date = pd.to_datetime(incidents["date"]).min()
         max_date = pd.to_datetime(incidents["date"]).max()
+    if not incidents.empty and min_date < max_date:
         date_range = st.sidebar.slider(
             "Select Date Range",
             min_value=min_date.to_pydatetime(),
             max_value=max_date.to_pydatetime(),
             value=(min_date.to_pydatetime(), max_date.to_pydatetime())
         )
-        incidents = incidents[
-            (pd.to_datetime(incidents["date"]) >= date_range[0]) &
-            (pd.to_datetime(incidents["date"]) <= date_range[1])
-        ]
+        date_filtered = date_range != (min_date.to_pydatetime(), max_date.to_pydatetime())
+        with span("date range filter", "transform"):
+            incidents = incidents[
+                (pd.to_datetime(incidents["date"]) >= date_range[0]) &
+                (pd.to_datetime(incidents["date"]) <= date_range[1])
+            ]
 
     # Severity filter
     severity_filter = st.sidebar.multiselect(
@@ -94,11 +127,22 @@ if selection == "Analytics":
     )
     incidents = incidents[incidents["status"].isin(status_filter)]
 
+    # Same filters, pushed down to the analytics engine for the charts
+    chart_filters = {
+        "date_range": date_range if date_filtered else None,
+        "severity": severity_filter,
+        "status": status_filter,
+        "owner": owner,
+    }
+    # remembered so the manager's export honours the same filters
+    st.session_state.incident_filters = chart_filters
+
     # ---------------------------
     # Display Filtered Data (inside an expander)
     # ---------------------------
     with st.expander("Filtered Incidents (click to expand)", expanded=False):
-        st.dataframe(incidents, use_container_width=True)
+        with span("incidents table", "render"):
+            st.dataframe(incidents, use_container_width=True)
 
     # ---------------------------
     # Visualizations (inside an expander + dropdown)
@@ -114,69 +158,88 @@ if selection == "Analytics":
 
         # 1. Incidents by Severity
         if chart_choice == "Incidents by Severity" and not incidents.empty:
-            severity_counts = incidents["severity"].value_counts().reset_index()
-            severity_counts.columns = ["severity", "count"]
-            severity_chart = alt.Chart(severity_counts).mark_bar().encode(
-                x="severity",
-                y="count",
-                color=alt.Color("severity",
-                                scale=alt.Scale(
-                                    domain=["Critical", "High", "Medium", "Low"],
-                                    range=["#FFB3B3", "#FFD7A6", "#AFCBFF", "#BFFCC6"]
-                                ))
-            )
-            st.altair_chart(severity_chart, use_container_width=True)
+            severity_counts = count_by("incidents", "severity", chart_filters)
+            with span("severity_chart", "chart"):
+                severity_chart = alt.Chart(severity_counts).mark_bar().encode(
+                    x="severity",
+                    y="count",
+                    color=alt.Color("severity",
+                                    scale=alt.Scale(
+                                        domain=["Critical", "High", "Medium", "Low"],
+                                        range=["#FFB3B3", "#FFD7A6", "#AFCBFF", "#BFFCC6"]
+                                    ))
+                )
+                st.altair_chart(severity_chart, use_container_width=True)
 
         # 2. Incidents by Status
         if chart_choice == "Incidents by Status" and not incidents.empty:
-            status_counts = incidents["status"].value_counts().reset_index()
-            status_counts.columns = ["status", "count"]
-            status_chart = alt.Chart(status_counts).mark_bar().encode(
-                x="status",
-                y="count",
-                color=alt.Color("status",
-                                scale=alt.Scale(
-                                    domain=["Open", "Investigating", "Resolved", "Closed"],
-                                    range=["#B3D9FF", "#FFEBB3", "#C8F7C5", "#E6D5FF"]
-                                ))
-            )
-            st.altair_chart(status_chart, use_container_width=True)
+            status_counts = count_by("incidents", "status", chart_filters)
+            with span("status_chart", "chart"):
+                status_chart = alt.Chart(status_counts).mark_bar().encode(
+                    x="status",
+                    y="count",
+                    color=alt.Color("status",
+                                    scale=alt.Scale(
+                                        domain=["Open", "Investigating", "Resolved", "Closed"],
+                                        range=["#B3D9FF", "#FFEBB3", "#C8F7C5", "#E6D5FF"]
+                                    ))
+                )
+                st.altair_chart(status_chart, use_container_width=True)
 
-        # 3. Incident trend over time
+        # 3. Incident trend over time (served from the rollup store unless a status filter or row scope is active)
         if chart_choice == "Incident Trend Over Time" and not incidents.empty and "date" in incidents.columns:
-            time_series = incidents.groupby("date").size().reset_index(name="count")
-            time_chart = alt.Chart(time_series).mark_line(color="#9BB7D4", point=True).encode(
-                x=alt.X("date:T"),
-                y=alt.Y("count:Q")
-            )
-            st.altair_chart(time_chart, use_container_width=True)
+            grain = st.radio("Granularity", ["day", "week", "month"], horizontal=True)
+            if owner is None and set(status_filter) == {"Open", "Investigating", "Resolved", "Closed"}:
+                time_series = get_trend(
+                    db, "incidents", grain,
+                    start=date_range[0] if date_filtered else None,
+                    end=date_range[1] if date_filtered else None,
+                    dimension="severity", values=severity_filter
+                )
+            else:
+                time_series = trend_counts("incidents", grain, chart_filters)
+            time_series = downsample_for_chart(time_series, "date", "count")
+            with span("time_chart", "chart"):
+                time_chart = alt.Chart(time_series).mark_line(color="#9BB7D4", point=True).encode(
+                    x=alt.X("date:T"),
+                    y=alt.Y("count:Q")
+                )
+                st.altair_chart(time_chart, use_container_width=True)
 
         # 4. Incident type distribution
         if chart_choice == "Incident Types" and not incidents.empty:
-            type_counts = incidents["incident_type"].value_counts().reset_index()
-            type_counts.columns = ["incident_type", "count"]
+            type_counts = count_by("incidents", "incident_type", chart_filters)
             pastel_palette = ["#FAD9E6", "#DDEBF7", "#E8F8E0", "#FFF1D6", "#F3E8FF", "#FFE4F1", "#EAF6FF", "#FBEEDC"]
             domain = type_counts["incident_type"].tolist()
             palette = (pastel_palette * ((len(domain) // len(pastel_palette)) + 1))[:len(domain)]
-            type_chart = alt.Chart(type_counts).mark_bar().encode(
-                x="incident_type",
-                y="count",
-                color=alt.Color("incident_type",
-                                scale=alt.Scale(domain=domain, range=palette))
-            )
-            st.altair_chart(type_chart, use_container_width=True)
+            with span("type_chart", "chart"):
+                type_chart = alt.Chart(type_counts).mark_bar().encode(
+                    x="incident_type",
+                    y="count",
+                    color=alt.Color("incident_type",
+                                    scale=alt.Scale(domain=domain, range=palette))
+                )
+                st.altair_chart(type_chart, use_container_width=True)
 
     # ---------------------------
-    # Metrics (unchanged)
+    # Metrics (summary table lookup unless a date range narrows the data)
     # ---------------------------
+    if date_filtered:
+        kpis = {
+            "total": len(incidents),
+            "critical_high": incidents[incidents["severity"].isin(["Critical", "High"])].shape[0],
+            "open_investigating": incidents[incidents["status"].isin(["Open", "Investigating"])].shape[0],
+        }
+    else:
+        kpis = get_incident_kpis(db, severity_filter, status_filter, owner)
     st.subheader("Key Metrics")
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Incidents", len(incidents))
+        st.metric("Total Incidents", kpis["total"])
     with col2:
-        st.metric("Critical/High", incidents[incidents["severity"].isin(["Critical", "High"])].shape[0])
+        st.metric("Critical/High", kpis["critical_high"])
     with col3:
-        st.metric("Open/Investigating", incidents[incidents["status"].isin(["Open", "Investigating"])].shape[0])
+        st.metric("Open/Investigating", kpis["open_investigating"])
 # ---------------------------
 # Incident Manager Section
 # ---------------------------
@@ -187,13 +250,46 @@ elif selection == "Incidents Manager":
     st.divider()
 
     # Load incidents for manager actions (use provided function signature)
-    incidents = get_all_incidents()
+    incidents = get_all_incidents(owner)
     if incidents is None:
         incidents = pd.DataFrame()
 
-    # Display the full cyber_incidents table for the manager
-    st.subheader("All Incidents")
-    st.dataframe(incidents, use_container_width=True)
+    # Display the cyber_incidents rows this user may read
+    st.subheader("All Incidents" if owner is None else "Your Incidents")
+    with span("incidents table", "render"):
+        st.dataframe(incidents, use_container_width=True)
+
+    # Export the filtered rows, streamed from the database in chunks
+    with st.expander("Export (uses the Analytics filters)", expanded=False):
+        export_filters = {**(st.session_state.get("incident_filters") or {}), "owner": owner}
+        st.caption(f"Filters: {describe_filters(export_filters)}")
+        export_fmt = st.selectbox("Format", list(EXPORT_FORMATS), key="incidents_export_fmt")
+        st.download_button(
+            "Download",
+            data=lambda: spool_export("incidents", export_filters, export_fmt),
+            file_name=export_file_name("incidents", export_fmt),
+            mime=EXPORT_FORMATS[export_fmt][1],
+        )
+
+    # Suggested severity and summary for each open incident (scheduled job, see services/scheduler.py)
+    with st.expander("AI triage of open incidents", expanded=False):
+        runs = get_triage_runs(db, limit=1)
+        if not runs.empty:
+            last = runs.iloc[0]
+            st.caption(
+                f"Last run #{last['run_id']} ({last['state']}): {last['done']} triaged, "
+                f"{last['failed']} failed of {last['total']}"
+            )
+        st.dataframe(get_triage_results(db, owner=owner), use_container_width=True)
+        if st.button("Triage pending incidents", key="incidents_run_triage"):
+            scheduler = get_scheduler()
+            if not scheduler.api_key and not uses_stub():
+                st.error("No API key configured in secrets; cannot call OpenAI.")
+            else:
+                # runs on the background scheduler, not on this rerun (see the Background Jobs page)
+                run_id = queue_job_run(db, "triage")
+                scheduler.wake()
+                st.info(f"Triage queued as job run #{run_id}; results appear here when it finishes.")
     st.divider()
     
     cola, colb, colc, cold = st.columns(4)
@@ -234,7 +330,7 @@ elif selection == "Incidents Manager":
             st.success(f"Incident {incident_id} created successfully!")
             st.rerun()
 
-    # Search (uses numeric id search on dataframe OR search_incident(conn, incident_id) for non-numeric)
+    # Search (uses numeric id search on dataframe OR search_incident(db, query, owner) for non-numeric)
     elif st.session_state.form == "C":
         with st.form("search_incident"):
             query = st.text_input("Search by numeric id or incident identifier (e.g. INC-0001)")
@@ -246,8 +342,8 @@ elif selection == "Incidents Manager":
             try:
                 int_q = int(q)
             except ValueError:
-                # non-numeric -> try search_incident(conn, incident_id)
-                result = search_incident(conn, q)
+                # non-numeric -> try search_incident(db, query, owner)
+                result = search_incident(db, q, owner)
                 if result:
                     # convert dict of lists to DataFrame for display
                     df_result = pd.DataFrame.from_dict(result)
@@ -257,7 +353,7 @@ elif selection == "Incidents Manager":
                     st.warning(f"No incident found matching '{q}'")
             else:
                 # integer id search in incidents dataframe
-                incidents = get_all_incidents() or pd.DataFrame()
+                incidents = get_all_incidents(owner)
                 if "id" in incidents.columns:
                     match = incidents[incidents["id"].astype(str) == str(int_q)]
                 else:
@@ -268,7 +364,7 @@ elif selection == "Incidents Manager":
                 else:
                     st.warning(f"No incident found with ID {int_q}")
 
-    # Delete (delete_incident(conn, incident_id) expects conn + numeric id)
+    # Delete (delete_incident(db, incident_id, owner) only deletes an incident the user can see)
     elif st.session_state.form == "D":
         with st.form("delete_incident"):
             incident_id = st.text_input("Incident ID # (numeric)")
@@ -285,14 +381,14 @@ elif selection == "Incidents Manager":
                 if not confirm:
                     st.warning("Please confirm deletion by checking the box.")
                 else:
-                    deleted = delete_incident(conn, int(formatted_id))
+                    deleted = delete_incident(db, int(formatted_id), owner)
                     if deleted and deleted > 0:
                         st.success(f"Incident {formatted_id} deleted!")
+                        st.rerun()
                     else:
                         st.error(f"No incident found with ID {formatted_id}")
-                    st.rerun()
 
-    # Update (update_incident_status(conn, incident_id, new_status) already matches signature)
+    # Update (update_incident_status(db, incident_id, new_status, owner) only updates an incident the user can see)
     elif st.session_state.form == "B":
         with st.form("update_incident"):
             incident_id = st.text_input("Incident ID # (numeric)")
@@ -306,12 +402,12 @@ elif selection == "Incidents Manager":
             except ValueError:
                 st.warning("Please enter the numeric incident ID (e.g. 500).")
             else:
-                updated = update_incident_status(conn, int_id, new_status)
+                updated = update_incident_status(db, int_id, new_status, owner)
                 if updated:
                     st.success(f"Incident {formatted_id} updated to {new_status} successfully!")
+                    st.rerun()
                 else:
-                    st.error(f"Failed to update incident {formatted_id}.")
-                st.rerun()
+                    st.error(f"No incident found with ID {formatted_id}")
 # ---------------------------
 # AI Chat Bot Section
 # ---------------------------
@@ -326,7 +422,7 @@ elif selection == "AI Chat Bot":
 
     # API key from secrets
     api_key = st.secrets.get("OPENAI_API_KEY", None)
-    if not api_key:
+    if not api_key and not uses_stub():
         st.warning("No API key found in .streamlit/secrets.toml — add OPENAI_API_KEY to enable chat.")
 
     # 👉 Fixed model (always gpt-4o-mini)
@@ -339,6 +435,12 @@ elif selection == "AI Chat Bot":
         # Messages counter (excluding system prompt)
         message_count = len(st.session_state.ai_chat_history)
         st.metric("Messages", message_count)
+        context = st.session_state.get("ai_chat_context", {})
+        if context.get("tokens"):
+            st.caption(
+                f"Last request: {context['tokens']} / {CHAT_TOKEN_BUDGET} tokens, "
+                f"{context['folded']} earlier messages summarised"
+            )
 
         # Temperature slider
         temperature = st.slider(
@@ -350,6 +452,21 @@ elif selection == "AI Chat Bot":
             help="Higher values make output more random"
         )
 
+        # Render replies token by token as they arrive
+        stream_replies = st.toggle("Stream responses", value=True, key="incidents_stream_chat")
+
+        # Add the most relevant incidents/tickets/datasets to each request
+        use_records = st.toggle("Ground answers in platform records", value=True, key="incidents_rag")
+
+        # Answer repeated questions from the local response cache
+        use_cache = st.toggle("Use response cache", value=True, key="incidents_response_cache")
+        cache = cache_stats(db)
+        if cache["lookups"]:
+            st.caption(
+                f"Cache: {cache['hit_rate']:.0%} hit rate over {cache['lookups']} lookups "
+                f"({cache['entries']} entries)"
+            )
+
         # Clear chat button
         if st.button("🗑 Clear Chat", use_container_width=True):
             st.session_state.ai_chat_history = []
@@ -383,24 +500,46 @@ elif selection == "AI Chat Bot":
 
     # Send message
     if send and user_input:
-        if not api_key:
+        if not api_key and not uses_stub():
             st.error("No API key configured in secrets; cannot call OpenAI.")
         else:
             system_prompt = """You are a cybersecurity expert assistant.
             Analyze incidents, threats, and provide technical guidance."""
-            # build messages: system + history + user
-            history_msgs = [{"role": m["role"], "content": m["content"]} for m in st.session_state.ai_chat_history]
-            messages = [{"role": "system", "content": system_prompt}] + history_msgs + [{"role": "user", "content": user_input}]
+            # ground the persona in the platform records most relevant to the question
+            request_prompt = cache_prompt = system_prompt
+            if use_records:
+                request_prompt = ground_prompt(db, system_prompt, user_input, domains=("incidents", "tickets"),
+                                               owner=owner)
+                # grounded replies quote the records this user may read, so they are cached
+                # per row scope and never shared with plain (ungrounded) replies
+                cache_prompt = f"{system_prompt}\n(grounded: {owner or '*'})"
+            # recent turns within the token budget; older ones are folded into a rolling summary
+            messages = build_messages(
+                request_prompt,
+                st.session_state.ai_chat_history,
+                user_input,
+                state=st.session_state.setdefault("ai_chat_context", {}),
+            )
 
+            # a follow-up ("tell me more") depends on the conversation so far, so only a
+            # conversation's first question is answered from or stored in the cache
+            use_cache_now = use_cache and not st.session_state.ai_chat_history
             try:
-                from openai import OpenAI
-                client = OpenAI(api_key=api_key)
-                resp = client.chat.completions.create(
-                    model=model,
-                    messages=messages,
-                    temperature=temperature   # 👈 use slider value here
-                )
-                assistant_text = resp.choices[0].message.content
+                # repeated questions to this persona are answered from the local cache
+                assistant_text = None
+                if use_cache_now:
+                    assistant_text = lookup_response(db, cache_prompt, model, temperature, user_input)
+                if assistant_text is None:
+                    client = get_chat_client(api_key)
+                    if stream_replies:
+                        # show the exchange now and render tokens as they arrive
+                        st.chat_message("user").write(user_input)
+                        with st.chat_message("assistant"):
+                            assistant_text = st.write_stream(stream_chat(client, model, messages, temperature))
+                    else:
+                        assistant_text = complete_chat(client, model, messages, temperature)
+                    if use_cache_now and assistant_text:
+                        store_response(db, cache_prompt, model, temperature, user_input, assistant_text)
             except Exception as e:
                 st.error(f"API request failed: {e}")
                 assistant_text = None
@@ -410,12 +549,16 @@ elif selection == "AI Chat Bot":
             if assistant_text:
                 st.session_state.ai_chat_history.append({"role": "assistant", "content": assistant_text})
             st.rerun()
+# ---------------------------
+# Profiling overlay (admins only)
+# ---------------------------
+render_overlay(end_rerun())
+
 # ---------------------------
 # Logout
 # ---------------------------
 st.sidebar.divider()
 if st.sidebar.button("Log out"):
-    st.session_state.logged_in = False
-    st.session_state.username = ""
+    end_session(db)
     st.info("You have been logged out.")
     st.switch_page("Home.py")
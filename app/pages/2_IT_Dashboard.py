@@ -2,7 +2,9 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 from datetime import datetime
-from data.db import connect_database
+from data.db import get_database
+from services.resources import get_chat_client, get_scheduler
+from services.session_guard import restore_session, end_session
 from data.tickets import (
     get_all_tickets,
     get_tickets_by_category_count,
@@ -13,6 +15,19 @@ from data.tickets import (
     get_high_priority_by_status,
     search_ticket
 )
+from data.summaries import get_ticket_kpis
+from data.filters import row_owner
+from data.rollups import get_trend
+from data.analytics import count_by, trend_counts
+from data.export import EXPORT_FORMATS, spool_export, export_file_name, describe_filters
+from services.downsampling import downsample_for_chart
+from data.change_feed import live_frame
+from data.response_cache import lookup_response, store_response, cache_stats
+from data.retrieval import ground_prompt
+from services.profiling import begin_rerun, end_rerun, render_overlay, span
+from services.chat_gateway import complete_chat, stream_chat, uses_stub
+from services.context_window import CHAT_TOKEN_BUDGET, build_messages
+from services.live_refresh import render_auto_refresh
 
 # Page config (no theme/background CSS)
 st.set_page_config(page_title="IT Tickets", layout="wide")
@@ -20,7 +35,9 @@ st.set_page_config(page_title="IT Tickets", layout="wide")
 # ---------------------------
 # Session state setup
 # ---------------------------
-conn = connect_database('DATA/intelligence_platform.db')
+# every read and write borrows a pooled connection for the call (see data.db.get_database)
+db = get_database()
+get_scheduler()
 
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
@@ -32,12 +49,21 @@ if "form" not in st.session_state:
 # ---------------------------
 # Guard: require login
 # ---------------------------
+# restore the login from the session token in the URL (a cache lookup, not a password check)
+restore_session(db)
+
 if not st.session_state.logged_in:
     st.error("You must be logged in to view the dashboard.")
     if st.button("Go to login page"):
         st.switch_page("Home.py")
     st.stop()
 
+# Rows this user may read: tickets assigned to them, or everything for managers and admins
+owner = row_owner(st.session_state.username, st.session_state.get("role"))
+
+# Per-rerun timing spans (opt-in, see services/profiling.py)
+begin_rerun("IT Dashboard", st.session_state.get("profiling"))
+
 st.success(f"Hello, **{st.session_state.username}**! You are logged in.")
 
 # ---------------------------
@@ -55,11 +81,13 @@ if selection == "Analytics":
     st.markdown("*Visualise ticket trends, priorities and category breakdowns.*")
     st.divider()
 
-    # Load tickets directly from DB for analytics
-    tickets_df = pd.read_sql("SELECT * FROM it_tickets", conn)
+    # Tickets cached in the session; later reruns only merge rows changed since
+    tickets_df = live_frame(db, "tickets", st.session_state, owner=owner)
+    render_auto_refresh(db, "tickets")
 
     # Sidebar filters
     st.sidebar.subheader("Filters")
+    date_filtered = False
     if not tickets_df.empty and "created_date" in tickets_df.columns:
         try:
             min_date = pd.to_datetime(tickets_df["created_date"]).min()
@@ -70,10 +98,12 @@ if selection == "Analytics":
                 max_value=max_date.to_pydatetime(),
                 value=(min_date.to_pydatetime(), max_date.to_pydatetime())
             )
-            tickets_df = tickets_df[
-                (pd.to_datetime(tickets_df["created_date"]) >= date_range[0]) &
-                (pd.to_datetime(tickets_df["created_date"]) <= date_range[1])
-            ]
+            date_filtered = date_range != (min_date.to_pydatetime(), max_date.to_pydatetime())
+            with span("date range filter", "transform"):
+                tickets_df = tickets_df[
+                    (pd.to_datetime(tickets_df["created_date"]) >= date_range[0]) &
+                    (pd.to_datetime(tickets_df["created_date"]) <= date_range[1])
+                ]
         except Exception:
             # ignore date parsing errors
             pass
@@ -96,11 +126,22 @@ if selection == "Analytics":
     if "status" in tickets_df.columns:
         tickets_df = tickets_df[tickets_df["status"].isin(status_filter)]
 
+    # Same filters, pushed down to the analytics engine for the charts
+    chart_filters = {
+        "date_range": date_range if date_filtered else None,
+        "priority": priority_filter,
+        "status": status_filter,
+        "owner": owner,
+    }
+    # remembered so the manager's export honours the same filters
+    st.session_state.ticket_filters = chart_filters
+
     # ---------------------------
     # Display Filtered Data (inside an expander)
     # ---------------------------
     with st.expander("Filtered Tickets (click to expand)", expanded=False):
-        st.dataframe(tickets_df, use_container_width=True)
+        with span("tickets_df table", "render"):
+            st.dataframe(tickets_df, use_container_width=True)
 
     # ---------------------------
     # Visualizations (inside an expander + dropdown)
@@ -116,73 +157,87 @@ if selection == "Analytics":
 
         # Tickets by Priority
         if chart_choice == "Tickets by Priority" and "priority" in tickets_df.columns and not tickets_df.empty:
-            prior_counts = tickets_df["priority"].value_counts().reset_index()
-            prior_counts.columns = ["priority", "count"]
-            prior_chart = alt.Chart(prior_counts).mark_bar().encode(
-                x="priority",
-                y="count",
-                color=alt.Color("priority",
-                                scale=alt.Scale(
-                                    domain=["Critical", "High", "Medium", "Low"],
-                                    range=["#FFD1D1", "#FFE9C9", "#D7E9FF", "#E6F7E9"]
-                                ))
-            )
-            st.altair_chart(prior_chart, use_container_width=True)
+            prior_counts = count_by("tickets", "priority", chart_filters)
+            with span("prior_chart", "chart"):
+                prior_chart = alt.Chart(prior_counts).mark_bar().encode(
+                    x="priority",
+                    y="count",
+                    color=alt.Color("priority",
+                                    scale=alt.Scale(
+                                        domain=["Critical", "High", "Medium", "Low"],
+                                        range=["#FFD1D1", "#FFE9C9", "#D7E9FF", "#E6F7E9"]
+                                    ))
+                )
+                st.altair_chart(prior_chart, use_container_width=True)
 
         # Tickets by Status
         if chart_choice == "Tickets by Status" and "status" in tickets_df.columns and not tickets_df.empty:
-            status_counts = tickets_df["status"].value_counts().reset_index()
-            status_counts.columns = ["status", "count"]
-            status_chart = alt.Chart(status_counts).mark_bar().encode(
-                x="status",
-                y="count",
-                color=alt.Color("status",
-                                scale=alt.Scale(
-                                    domain=["Open", "Investigating", "Resolved", "Closed"],
-                                    range=["#DDEFFC", "#FFF6D6", "#EAF7E9", "#F3EAFB"]
-                                ))
-            )
-            st.altair_chart(status_chart, use_container_width=True)
+            status_counts = count_by("tickets", "status", chart_filters)
+            with span("status_chart", "chart"):
+                status_chart = alt.Chart(status_counts).mark_bar().encode(
+                    x="status",
+                    y="count",
+                    color=alt.Color("status",
+                                    scale=alt.Scale(
+                                        domain=["Open", "Investigating", "Resolved", "Closed"],
+                                        range=["#DDEFFC", "#FFF6D6", "#EAF7E9", "#F3EAFB"]
+                                    ))
+                )
+                st.altair_chart(status_chart, use_container_width=True)
 
         # Tickets by Category
         if chart_choice == "Tickets by Category" and "category" in tickets_df.columns and not tickets_df.empty:
-            cat_counts = tickets_df["category"].value_counts().reset_index()
-            cat_counts.columns = ["category", "count"]
+            cat_counts = count_by("tickets", "category", chart_filters)
             pastel_palette = ["#FAD9E6", "#DDEBF7", "#E8F8E0", "#FFF1D6", "#F3E8FF", "#FFE4F1"]
             domain = cat_counts["category"].tolist()
             palette = (pastel_palette * ((len(domain) // len(pastel_palette)) + 1))[:len(domain)]
-            cat_chart = alt.Chart(cat_counts).mark_bar().encode(
-                x="category",
-                y="count",
-                color=alt.Color("category",
-                                scale=alt.Scale(domain=domain, range=palette))
-            )
-            st.altair_chart(cat_chart, use_container_width=True)
+            with span("cat_chart", "chart"):
+                cat_chart = alt.Chart(cat_counts).mark_bar().encode(
+                    x="category",
+                    y="count",
+                    color=alt.Color("category",
+                                    scale=alt.Scale(domain=domain, range=palette))
+                )
+                st.altair_chart(cat_chart, use_container_width=True)
 
-        # Ticket trend over time
+        # Ticket trend over time (served from the rollup store unless a status filter or row scope is active)
         if chart_choice == "Ticket Trend Over Time" and "created_date" in tickets_df.columns and not tickets_df.empty:
+            grain = st.radio("Granularity", ["day", "week", "month"], horizontal=True)
             try:
-                time_series = pd.to_datetime(tickets_df["created_date"]).dt.date.value_counts().sort_index().reset_index()
-                time_series.columns = ["date", "count"]
-                time_chart = alt.Chart(time_series).mark_line(color="#9BB7D4", point=True).encode(
-                    x=alt.X("date:T"),
-                    y=alt.Y("count:Q")
-                )
-                st.altair_chart(time_chart, use_container_width=True)
+                if owner is None and set(status_filter) == {"Open", "Investigating", "Resolved", "Closed"}:
+                    time_series = get_trend(
+                        db, "tickets", grain,
+                        start=date_range[0] if date_filtered else None,
+                        end=date_range[1] if date_filtered else None,
+                        dimension="priority", values=priority_filter
+                    )
+                else:
+                    time_series = trend_counts("tickets", grain, chart_filters)
+                time_series = downsample_for_chart(time_series, "date", "count")
+                with span("time_chart", "chart"):
+                    time_chart = alt.Chart(time_series).mark_line(color="#9BB7D4", point=True).encode(
+                        x=alt.X("date:T"),
+                        y=alt.Y("count:Q")
+                    )
+                    st.altair_chart(time_chart, use_container_width=True)
             except Exception:
                 st.warning("Unable to render time series for created_date.")
 
-    # Metrics (no deltas shown in analytics)
+    # Metrics (no deltas shown in analytics; summary table lookup unless a date range narrows the data)
+    if date_filtered:
+        high_count = tickets_df[tickets_df["priority"].isin(["High", "Critical"])].shape[0] if "priority" in tickets_df.columns else 0
+        open_count = tickets_df[tickets_df["status"].isin(["Open", "Investigating"])].shape[0] if "status" in tickets_df.columns else 0
+        kpis = {"total": len(tickets_df), "high_priority": high_count, "open": open_count}
+    else:
+        kpis = get_ticket_kpis(db, priority_filter, status_filter, owner=owner)
     st.subheader("Key Metrics")
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Tickets", len(tickets_df))
+        st.metric("Total Tickets", kpis["total"])
     with col2:
-        high_count = tickets_df[tickets_df["priority"].isin(["High", "Critical"])].shape[0] if "priority" in tickets_df.columns else 0
-        st.metric("High Priority", high_count)
+        st.metric("High Priority", kpis["high_priority"])
     with col3:
-        open_count = tickets_df[tickets_df["status"].isin(["Open", "Investigating"])].shape[0] if "status" in tickets_df.columns else 0
-        st.metric("Open Tickets", open_count)
+        st.metric("Open Tickets", kpis["open"])
 
 # ---------------------------
 # Ticket Manager Section (reworked to follow Incidents format)
@@ -193,13 +248,26 @@ elif selection == "Ticket Manager":
     st.divider()
 
     # Load tickets for manager actions
-    tickets = get_all_tickets()
+    tickets = get_all_tickets(owner)
     if tickets is None:
         tickets = pd.DataFrame()
 
-    # Display the full it_tickets table for the manager
-    st.subheader("All Tickets")
-    st.dataframe(tickets, use_container_width=True)
+    # Display the it_tickets rows this user may read
+    st.subheader("All Tickets" if owner is None else "Your Tickets")
+    with span("tickets table", "render"):
+        st.dataframe(tickets, use_container_width=True)
+
+    # Export the filtered rows, streamed from the database in chunks
+    with st.expander("Export (uses the Analytics filters)", expanded=False):
+        export_filters = {**(st.session_state.get("ticket_filters") or {}), "owner": owner}
+        st.caption(f"Filters: {describe_filters(export_filters)}")
+        export_fmt = st.selectbox("Format", list(EXPORT_FORMATS), key="tickets_export_fmt")
+        st.download_button(
+            "Download",
+            data=lambda: spool_export("tickets", export_filters, export_fmt),
+            file_name=export_file_name("tickets", export_fmt),
+            mime=EXPORT_FORMATS[export_fmt][1],
+        )
     st.divider()
 
     cola, colb, colc, cold = st.columns(4)
@@ -216,7 +284,7 @@ elif selection == "Ticket Manager":
         if st.button("Delete Ticket"):
             st.session_state.form = "D"
 
-    # Create (insert_it_ticket(conn, priority, status, category, subject, description, created_date, resolved_date, assigned_to))
+    # Create (insert_it_ticket(db, priority, status, category, subject, description, created_date, resolved_date, assigned_to))
     if st.session_state.form == "A":
         with st.form("new_ticket"):
             subject = st.text_input("Subject")
@@ -231,7 +299,7 @@ elif selection == "Ticket Manager":
 
         if submitted:
             ticket_id = insert_it_ticket(
-                conn,
+                db,
                 priority,
                 status,
                 category,
@@ -269,15 +337,15 @@ elif selection == "Ticket Manager":
                     st.dataframe(matches, use_container_width=True)
                 else:
                     # fallback to DB search function
-                    row = search_ticket(conn, q if not q.isdigit() else f"TCK-{int(q):04d}")
+                    row = search_ticket(db, q if not q.isdigit() else f"TCK-{int(q):04d}", owner)
                     if row:
-                        df = pd.DataFrame([row], columns=[c[0] for c in conn.execute("PRAGMA table_info(it_tickets)").fetchall()])
+                        df = pd.DataFrame([row], columns=[c[1] for c in db.fetch_all("PRAGMA table_info(it_tickets)")])
                         st.dataframe(df, use_container_width=True)
                     else:
                         st.warning(f"No ticket found matching '{q}'")
             else:
                 # no tickets DataFrame -> use DB search
-                row = search_ticket(conn, q if not q.isdigit() else f"TCK-{int(q):04d}")
+                row = search_ticket(db, q if not q.isdigit() else f"TCK-{int(q):04d}", owner)
                 if row:
                     st.write("### Ticket Details")
                     # return row as single-row table (columns unknown -> show tuple)
@@ -302,12 +370,13 @@ elif selection == "Ticket Manager":
                     tid = f"TCK-{int(tid_raw):04d}"
                 else:
                     tid = tid_raw
-                deleted = delete_ticket(conn, tid)
+                # only a ticket the user can see is deleted; anything else is "not found"
+                deleted = delete_ticket(db, tid, owner)
                 if deleted and deleted > 0:
                     st.success(f"Ticket {tid} deleted!")
+                    st.rerun()
                 else:
                     st.error(f"No ticket found with ID {ticket_identifier}")
-                st.rerun()
 
     # Update
     elif st.session_state.form == "B":
@@ -322,28 +391,23 @@ elif selection == "Ticket Manager":
                 tid = f"TCK-{int(tid_raw):04d}"
             else:
                 tid = tid_raw
-            updated = update_ticket_status(conn, tid, new_status)
+            updated = update_ticket_status(db, tid, new_status, owner)
             if updated:
                 st.success(f"Ticket {tid} updated to {new_status} successfully!")
+                st.rerun()
             else:
-                st.error(f"Failed to update ticket {ticket_identifier}.")
-            st.rerun()
+                st.error(f"No ticket found with ID {ticket_identifier}")
 
-    # Show current metrics (refresh live counts)
-    tickets_current = get_all_tickets()
-    if tickets_current is None:
-        tickets_current = pd.DataFrame()
-    total_current = len(tickets_current)
-    high_current = tickets_current[tickets_current["priority"].isin(["High", "Critical"])].shape[0] if "priority" in tickets_current.columns else 0
-    open_current = tickets_current[tickets_current["status"].isin(["Open", "Investigating"])].shape[0] if "status" in tickets_current.columns else 0
+    # Show current metrics (live counts from the summary table)
+    kpis_current = get_ticket_kpis(db, owner=owner)
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Tickets", total_current)
+        st.metric("Total Tickets", kpis_current["total"])
     with col2:
-        st.metric("High Priority", high_current)
+        st.metric("High Priority", kpis_current["high_priority"])
     with col3:
-        st.metric("Open Tickets", open_current)
+        st.metric("Open Tickets", kpis_current["open"])
 
 # ---------------------------
 # AI Chat Bot Section
@@ -359,7 +423,7 @@ elif selection == "AI Chat Bot":
 
     # API key from secrets
     api_key = st.secrets.get("OPENAI_API_KEY", None)
-    if not api_key:
+    if not api_key and not uses_stub():
         st.warning("No API key found in .streamlit/secrets.toml — add OPENAI_API_KEY to enable chat.")
 
     # 👉 Fixed model (always gpt-4o-mini)
@@ -372,6 +436,12 @@ elif selection == "AI Chat Bot":
         # Messages counter
         message_count = len(st.session_state.ai_chat_history)
         st.metric("Messages", message_count)
+        context = st.session_state.get("ai_chat_context", {})
+        if context.get("tokens"):
+            st.caption(
+                f"Last request: {context['tokens']} / {CHAT_TOKEN_BUDGET} tokens, "
+                f"{context['folded']} earlier messages summarised"
+            )
 
         # Temperature slider
         temperature = st.slider(
@@ -383,6 +453,21 @@ elif selection == "AI Chat Bot":
             help="Higher values make output more random"
         )
 
+        # Render replies token by token as they arrive
+        stream_replies = st.toggle("Stream responses", value=True, key="it_stream_chat")
+
+        # Add the most relevant incidents/tickets/datasets to each request
+        use_records = st.toggle("Ground answers in platform records", value=True, key="it_rag")
+
+        # Answer repeated questions from the local response cache
+        use_cache = st.toggle("Use response cache", value=True, key="it_response_cache")
+        cache = cache_stats(db)
+        if cache["lookups"]:
+            st.caption(
+                f"Cache: {cache['hit_rate']:.0%} hit rate over {cache['lookups']} lookups "
+                f"({cache['entries']} entries)"
+            )
+
         # Clear chat button
         if st.button("🗑 Clear Chat", use_container_width=True):
             st.session_state.ai_chat_history = []
@@ -416,7 +501,7 @@ elif selection == "AI Chat Bot":
 
     # Send message
     if send and user_input:
-        if not api_key:
+        if not api_key and not uses_stub():
             st.error("No API key configured in secrets; cannot call OpenAI.")
         else:
             system_prompt = (
@@ -424,19 +509,41 @@ elif selection == "AI Chat Bot":
                 "and pragmatic advice for typical IT issues (networks, servers, user support). Be concise and user-friendly. "
                 "Avoid enabling illegal or unsafe activities."
             )
-            # build messages: system + history + user
-            history_msgs = [{"role": m["role"], "content": m["content"]} for m in st.session_state.ai_chat_history]
-            messages = [{"role": "system", "content": system_prompt}] + history_msgs + [{"role": "user", "content": user_input}]
+            # ground the persona in the platform records most relevant to the question
+            request_prompt = cache_prompt = system_prompt
+            if use_records:
+                request_prompt = ground_prompt(db, system_prompt, user_input, domains=("tickets", "incidents"),
+                                               owner=owner)
+                # grounded replies quote the records this user may read, so they are cached
+                # per row scope and never shared with plain (ungrounded) replies
+                cache_prompt = f"{system_prompt}\n(grounded: {owner or '*'})"
+            # recent turns within the token budget; older ones are folded into a rolling summary
+            messages = build_messages(
+                request_prompt,
+                st.session_state.ai_chat_history,
+                user_input,
+                state=st.session_state.setdefault("ai_chat_context", {}),
+            )
 
+            # a follow-up ("tell me more") depends on the conversation so far, so only a
+            # conversation's first question is answered from or stored in the cache
+            use_cache_now = use_cache and not st.session_state.ai_chat_history
             try:
-                from openai import OpenAI
-                client = OpenAI(api_key=api_key)
-                resp = client.chat.completions.create(
-                    model=model,
-                    messages=messages,
-                    temperature=temperature   # 👈 use slider value here
-                )
-                assistant_text = resp.choices[0].message.content
+                # repeated questions to this persona are answered from the local cache
+                assistant_text = None
+                if use_cache_now:
+                    assistant_text = lookup_response(db, cache_prompt, model, temperature, user_input)
+                if assistant_text is None:
+                    client = get_chat_client(api_key)
+                    if stream_replies:
+                        # show the exchange now and render tokens as they arrive
+                        st.chat_message("user").write(user_input)
+                        with st.chat_message("assistant"):
+                            assistant_text = st.write_stream(stream_chat(client, model, messages, temperature))
+                    else:
+                        assistant_text = complete_chat(client, model, messages, temperature)
+                    if use_cache_now and assistant_text:
+                        store_response(db, cache_prompt, model, temperature, user_input, assistant_text)
             except Exception as e:
                 st.error(f"API request failed: {e}")
                 assistant_text = None
@@ -447,12 +554,16 @@ elif selection == "AI Chat Bot":
                 st.session_state.ai_chat_history.append({"role": "assistant", "content": assistant_text})
             st.rerun()
 
+# ---------------------------
+# Profiling overlay (admins only)
+# ---------------------------
+render_overlay(end_rerun())
+
 # ---------------------------
 # Logout
 # ---------------------------
 st.sidebar.divider()
 if st.sidebar.button("Log out"):
-    st.session_state.logged_in = False
-    st.session_state.username = ""
+    end_session(db)
     st.info("You have been logged out.")
     st.switch_page("Home.py")
\ No newline at end of file
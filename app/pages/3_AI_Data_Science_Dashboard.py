@@ -7,12 +7,26 @@ from data.datasets import (
     insert_dataset,
     get_all_datasets,
     get_dataset_by_name,
+    search_datasets,
     update_dataset_last_updated,
     update_dataset_record_count,
     delete_dataset,
     get_datasets_by_category,
     get_large_datasets
 )
+from data.db import get_database
+from services.resources import get_chat_client, get_scheduler
+from services.session_guard import restore_session, end_session
+from data.summaries import get_dataset_kpis
+from data.analytics import count_by
+from data.export import EXPORT_FORMATS, spool_export, export_file_name, describe_filters
+from data.change_feed import live_frame
+from data.response_cache import lookup_response, store_response, cache_stats
+from data.retrieval import ground_prompt
+from services.profiling import begin_rerun, end_rerun, render_overlay, span
+from services.chat_gateway import complete_chat, stream_chat, uses_stub
+from services.context_window import CHAT_TOKEN_BUDGET, build_messages
+from services.live_refresh import render_auto_refresh
 
 DB_PATH = "DATA/intelligence_platform.db"
 
@@ -28,12 +42,20 @@ if "form" not in st.session_state:
     st.session_state.form = None
 
 # Require login
+# restore the login from the session token in the URL (a cache lookup, not a password check)
+db = get_database()
+restore_session(db)
+get_scheduler()
+
 if not st.session_state.logged_in:
     st.error("You must be logged in to view the dashboard.")
     if st.button("Go to login page"):
         st.switch_page("Home.py")
     st.stop()
 
+# Per-rerun timing spans (opt-in, see services/profiling.py)
+begin_rerun("Datasets Dashboard", st.session_state.get("profiling"))
+
 st.title("🗂️ Datasets Metadata Manager")
 st.success(f"Hello, **{st.session_state.username}**! You are logged in.")
 
@@ -50,12 +72,14 @@ if selection == "Analytics":
     st.markdown("*Overview of datasets metadata, counts and size distribution.*")
     st.divider()
 
-    datasets = get_all_datasets()
-    if datasets is None:
-        datasets = pd.DataFrame()
+    # Datasets cached in the session; later reruns only merge rows changed since
+    datasets = live_frame(db, "datasets", st.session_state, descending=True)
+    render_auto_refresh(db, "datasets")
 
     # Filters
     st.sidebar.subheader("Filters")
+    cat_sel = "All"
+    date_filtered = False
     if not datasets.empty:
         if "category" in datasets.columns:
             cats = ["All"] + sorted(datasets["category"].dropna().unique().tolist())
@@ -73,16 +97,27 @@ if selection == "Analytics":
                     max_value=max_date.to_pydatetime(),
                     value=(min_date.to_pydatetime(), max_date.to_pydatetime())
                 )
-                datasets = datasets[
-                    (pd.to_datetime(datasets["last_updated"]) >= date_range[0]) &
-                    (pd.to_datetime(datasets["last_updated"]) <= date_range[1])
-                ]
+                date_filtered = date_range != (min_date.to_pydatetime(), max_date.to_pydatetime())
+                with span("date range filter", "transform"):
+                    datasets = datasets[
+                        (pd.to_datetime(datasets["last_updated"]) >= date_range[0]) &
+                        (pd.to_datetime(datasets["last_updated"]) <= date_range[1])
+                    ]
             except Exception:
                 pass
 
+    # Same filters, pushed down to the analytics engine for the charts
+    chart_filters = {
+        "date_range": date_range if date_filtered else None,
+        "category": None if cat_sel == "All" else [cat_sel],
+    }
+    # remembered so the manager's export honours the same filters
+    st.session_state.dataset_filters = chart_filters
+
     # Show full filtered table inside an expander (matches Incidents format)
     with st.expander("Filtered Datasets (click to expand)", expanded=False):
-        st.dataframe(datasets, use_container_width=True)
+        with span("datasets table", "render"):
+            st.dataframe(datasets, use_container_width=True)
 
     # Visualizations inside an expander with dropdown
     with st.expander("Visualizations (click to expand)", expanded=False):
@@ -94,44 +129,51 @@ if selection == "Analytics":
         ])
 
         if chart_choice == "Datasets by Category" and not datasets.empty and "category" in datasets.columns:
-            cat_counts = datasets["category"].value_counts().reset_index()
-            cat_counts.columns = ["category", "count"]
+            cat_counts = count_by("datasets", "category", chart_filters)
             pastel_palette = ["#FAD9E6", "#DDEBF7", "#E8F8E0", "#FFF1D6", "#F3E8FF", "#FFE4F1"]
             domain = cat_counts["category"].tolist()
             palette = (pastel_palette * ((len(domain) // len(pastel_palette)) + 1))[:len(domain)]
-            chart = alt.Chart(cat_counts).mark_bar().encode(
-                x="category",
-                y="count",
-                color=alt.Color("category", scale=alt.Scale(domain=domain, range=palette))
-            )
-            st.altair_chart(chart, use_container_width=True)
+            with span("chart", "chart"):
+                chart = alt.Chart(cat_counts).mark_bar().encode(
+                    x="category",
+                    y="count",
+                    color=alt.Color("category", scale=alt.Scale(domain=domain, range=palette))
+                )
+                st.altair_chart(chart, use_container_width=True)
 
         if chart_choice == "Record Count Distribution" and not datasets.empty and "record_count" in datasets.columns:
             rc = datasets[["dataset_name", "record_count"]].dropna()
-            hist = alt.Chart(rc).mark_bar(color="#AFCBFF").encode(
-                alt.X("record_count:Q", bin=alt.Bin(maxbins=40), title="Record Count"),
-                y='count()'
-            )
-            st.altair_chart(hist, use_container_width=True)
+            with span("hist", "chart"):
+                hist = alt.Chart(rc).mark_bar(color="#AFCBFF").encode(
+                    alt.X("record_count:Q", bin=alt.Bin(maxbins=40), title="Record Count"),
+                    y='count()'
+                )
+                st.altair_chart(hist, use_container_width=True)
 
         if chart_choice == "Size (MB) Distribution" and not datasets.empty and "file_size_mb" in datasets.columns:
             sz = datasets[["dataset_name", "file_size_mb"]].dropna()
-            hist = alt.Chart(sz).mark_bar(color="#FFD7A6").encode(
-                alt.X("file_size_mb:Q", bin=alt.Bin(maxbins=40), title="File Size (MB)"),
-                y='count()'
-            )
-            st.altair_chart(hist, use_container_width=True)
+            with span("hist", "chart"):
+                hist = alt.Chart(sz).mark_bar(color="#FFD7A6").encode(
+                    alt.X("file_size_mb:Q", bin=alt.Bin(maxbins=40), title="File Size (MB)"),
+                    y='count()'
+                )
+                st.altair_chart(hist, use_container_width=True)
 
-    # Metrics
+    # Metrics (summary table lookup unless a date range narrows the data)
+    if date_filtered:
+        total_datasets = len(datasets)
+        total_records = int(datasets["record_count"].sum()) if "record_count" in datasets.columns else 0
+        total_size = float(datasets["file_size_mb"].sum()) if "file_size_mb" in datasets.columns else 0.0
+    else:
+        kpis = get_dataset_kpis(db, None if cat_sel == "All" else cat_sel)
+        total_datasets, total_records, total_size = kpis["total"], kpis["total_records"], kpis["total_size_mb"]
     st.subheader("Key Metrics")
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Datasets", len(datasets))
+        st.metric("Total Datasets", total_datasets)
     with col2:
-        total_records = int(datasets["record_count"].sum()) if "record_count" in datasets.columns else 0
         st.metric("Total Records", total_records)
     with col3:
-        total_size = float(datasets["file_size_mb"].sum()) if "file_size_mb" in datasets.columns else 0.0
         st.metric("Total Size (MB)", f"{total_size:.1f}")
 
 # ---------------------------
@@ -148,7 +190,20 @@ elif selection == "Metadata Manager":
 
     # Display full datasets table (like Incidents Manager)
     st.subheader("All Datasets")
-    st.dataframe(datasets, use_container_width=True)
+    with span("datasets table", "render"):
+        st.dataframe(datasets, use_container_width=True)
+
+    # Export the filtered rows, streamed from the database in chunks
+    with st.expander("Export (uses the Analytics filters)", expanded=False):
+        export_filters = st.session_state.get("dataset_filters")
+        st.caption(f"Filters: {describe_filters(export_filters)}")
+        export_fmt = st.selectbox("Format", list(EXPORT_FORMATS), key="datasets_export_fmt")
+        st.download_button(
+            "Download",
+            data=lambda: spool_export("datasets", export_filters, export_fmt),
+            file_name=export_file_name("datasets", export_fmt),
+            mime=EXPORT_FORMATS[export_fmt][1],
+        )
     st.divider()
 
     cola, colb, colc, cold = st.columns(4)
@@ -249,9 +304,7 @@ elif selection == "Metadata Manager":
                 id_val = int(q)
                 df = get_dataset_by_name(id_val)
             except ValueError:
-                conn = sqlite3.connect(DB_PATH)
-                df = pd.read_sql_query("SELECT * FROM datasets_metadata WHERE dataset_name LIKE ? ORDER BY id DESC", conn, params=(f"%{q}%",))
-                conn.close()
+                df = search_datasets(q)
 
             if df is None or df.empty:
                 st.warning("No matching dataset found.")
@@ -289,7 +342,7 @@ elif selection == "AI Chat Bot":
 
     # API key (from secrets)
     api_key = st.secrets.get("OPENAI_API_KEY", None)
-    if not api_key:
+    if not api_key and not uses_stub():
         st.warning("No API key found in .streamlit/secrets.toml — add OPENAI_API_KEY to enable chat.")
 
     # 👉 Fixed model (always gpt-4o-mini)
@@ -302,6 +355,12 @@ elif selection == "AI Chat Bot":
         # Messages counter
         message_count = len(st.session_state.ai_chat_history)
         st.metric("Messages", message_count)
+        context = st.session_state.get("ai_chat_context", {})
+        if context.get("tokens"):
+            st.caption(
+                f"Last request: {context['tokens']} / {CHAT_TOKEN_BUDGET} tokens, "
+                f"{context['folded']} earlier messages summarised"
+            )
 
         # Temperature slider
         temperature = st.slider(
@@ -313,6 +372,21 @@ elif selection == "AI Chat Bot":
             help="Higher values make output more random"
         )
 
+        # Render replies token by token as they arrive
+        stream_replies = st.toggle("Stream responses", value=True, key="ds_stream_chat")
+
+        # Add the most relevant incidents/tickets/datasets to each request
+        use_records = st.toggle("Ground answers in platform records", value=True, key="ds_rag")
+
+        # Answer repeated questions from the local response cache
+        use_cache = st.toggle("Use response cache", value=True, key="ds_response_cache")
+        cache = cache_stats(db)
+        if cache["lookups"]:
+            st.caption(
+                f"Cache: {cache['hit_rate']:.0%} hit rate over {cache['lookups']} lookups "
+                f"({cache['entries']} entries)"
+            )
+
         # Clear chat button
         if st.button("🗑 Clear Chat", use_container_width=True):
             st.session_state.ai_chat_history = []
@@ -346,25 +420,46 @@ elif selection == "AI Chat Bot":
 
     # Send message
     if send and user_input:
-        if not api_key:
+        if not api_key and not uses_stub():
             st.error("No API key configured; cannot call OpenAI.")
         else:
             system_prompt = (
                 "You are an AI & Data Science expert. Provide guidance on data modelling, ML workflow, "
                 "evaluation, tooling, and reproducible experiments. Give clear, actionable suggestions and explain trade-offs."
             )
-            history_msgs = [{"role": m["role"], "content": m["content"]} for m in st.session_state.ai_chat_history]
-            messages = [{"role": "system", "content": system_prompt}] + history_msgs + [{"role": "user", "content": user_input}]
+            # ground the persona in the platform records most relevant to the question
+            request_prompt = cache_prompt = system_prompt
+            if use_records:
+                request_prompt = ground_prompt(db, system_prompt, user_input, domains=("datasets",))
+                # grounded and plain replies are cached apart
+                cache_prompt = f"{system_prompt}\n(grounded)"
+            # recent turns within the token budget; older ones are folded into a rolling summary
+            messages = build_messages(
+                request_prompt,
+                st.session_state.ai_chat_history,
+                user_input,
+                state=st.session_state.setdefault("ai_chat_context", {}),
+            )
 
+            # a follow-up ("tell me more") depends on the conversation so far, so only a
+            # conversation's first question is answered from or stored in the cache
+            use_cache_now = use_cache and not st.session_state.ai_chat_history
             try:
-                from openai import OpenAI
-                client = OpenAI(api_key=api_key)
-                resp = client.chat.completions.create(
-                    model=model,
-                    messages=messages,
-                    temperature=temperature
-                )
-                assistant_text = resp.choices[0].message.content
+                # repeated questions to this persona are answered from the local cache
+                assistant_text = None
+                if use_cache_now:
+                    assistant_text = lookup_response(db, cache_prompt, model, temperature, user_input)
+                if assistant_text is None:
+                    client = get_chat_client(api_key)
+                    if stream_replies:
+                        # show the exchange now and render tokens as they arrive
+                        st.chat_message("user").write(user_input)
+                        with st.chat_message("assistant"):
+                            assistant_text = st.write_stream(stream_chat(client, model, messages, temperature))
+                    else:
+                        assistant_text = complete_chat(client, model, messages, temperature)
+                    if use_cache_now and assistant_text:
+                        store_response(db, cache_prompt, model, temperature, user_input, assistant_text)
             except Exception as e:
                 st.error(f"API request failed: {e}")
                 assistant_text = None
@@ -374,12 +469,16 @@ elif selection == "AI Chat Bot":
                 st.session_state.ai_chat_history.append({"role": "assistant", "content": assistant_text})
             st.rerun()
 
+# ---------------------------
+# Profiling overlay (admins only)
+# ---------------------------
+render_overlay(end_rerun())
+
 # ---------------------------
 # Logout
 # ---------------------------
 st.sidebar.divider()
 if st.sidebar.button("Log out"):
-    st.session_state.logged_in = False
-    st.session_state.username = ""
+    end_session(db)
     st.info("You have been logged out.")
     st.switch_page("Home.py")
\ No newline at end of file
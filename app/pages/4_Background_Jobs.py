@@ -0,0 +1,101 @@
+import streamlit as st
+import pandas as pd
+from data.db import get_database
+from services.resources import get_scheduler
+from services.session_guard import restore_session, end_session
+from services.scheduler import JOBS, job_schedule, next_runs
+from data.jobs import get_job_runs, get_job_summary, queue_job_run
+from data.filters import UNRESTRICTED_ROLES
+
+# Page config
+st.set_page_config(page_title="Background Jobs", layout="wide")
+
+# Ensure session state keys exist
+if "logged_in" not in st.session_state:
+    st.session_state.logged_in = False
+if "username" not in st.session_state:
+    st.session_state.username = ""
+
+# Require login
+# restore the login from the session token in the URL (a cache lookup, not a password check)
+db = get_database()
+restore_session(db)
+scheduler = get_scheduler()
+
+if not st.session_state.logged_in:
+    st.error("You must be logged in to view the dashboard.")
+    if st.button("Go to login page"):
+        st.switch_page("Home.py")
+    st.stop()
+
+st.title("⏱️ Background Jobs")
+if scheduler.running:
+    st.caption("The scheduler is running in this process; jobs are checked every "
+               f"{scheduler.tick_s:.0f} s. Each job runs on one worker at a time.")
+else:
+    st.warning("The scheduler is switched off in this process (SCHEDULER=off). Queued runs wait "
+               "for a sidecar: PYTHONPATH=app python -m services.scheduler")
+
+# ---------------------------
+# Schedules
+# ---------------------------
+st.subheader("Schedules")
+summary = get_job_summary(db).set_index("job")
+upcoming = next_runs(db)
+schedule_rows = []
+for name, (_, _, _, description) in JOBS.items():
+    last = summary.loc[name] if name in summary.index else None
+    schedule_rows.append({
+        "job": name,
+        "description": description,
+        "schedule": job_schedule(name) or "off",
+        "next run": upcoming[name],
+        "last state": None if last is None else last["last_state"],
+        "last started": None if last is None else last["last_started"],
+        "runs": 0 if last is None else int(last["runs"]),
+        "failed": 0 if last is None else int(last["failed"] or 0),
+        "avg s": None if last is None else last["avg_duration_s"],
+        "max s": None if last is None else last["max_duration_s"],
+    })
+st.dataframe(pd.DataFrame(schedule_rows), use_container_width=True, hide_index=True)
+
+# Managers and admins can start a job now instead of waiting for its schedule
+if (st.session_state.get("role") or "").strip().lower() in UNRESTRICTED_ROLES:
+    col_job, col_button = st.columns([3, 1])
+    with col_job:
+        job = st.selectbox("Job", list(JOBS), key="jobs_run_now_job")
+    with col_button:
+        st.write("")
+        if st.button("Run now", key="jobs_run_now"):
+            run_id = queue_job_run(db, job)
+            scheduler.wake()
+            st.success(f"Queued {job} as run #{run_id}.")
+
+# ---------------------------
+# History
+# ---------------------------
+st.subheader("Job runs")
+col_filter, col_limit = st.columns([3, 1])
+with col_filter:
+    job_filter = st.selectbox("Job", ["All"] + list(JOBS), key="jobs_history_filter")
+with col_limit:
+    limit = st.number_input("Rows", min_value=10, max_value=1000, value=50, step=10, key="jobs_history_limit")
+runs = get_job_runs(db, job=None if job_filter == "All" else job_filter, limit=limit)
+if runs.empty:
+    st.info("No job has run yet.")
+else:
+    st.dataframe(runs, use_container_width=True, hide_index=True)
+    durations = runs.dropna(subset=["duration_s"])
+    if not durations.empty:
+        st.bar_chart(durations.groupby("job")["duration_s"].mean(), y_label="average seconds")
+if st.button("Refresh", key="jobs_refresh"):
+    st.rerun()
+
+# ---------------------------
+# Logout
+# ---------------------------
+st.sidebar.divider()
+if st.sidebar.button("Log out"):
+    end_session(db)
+    st.info("You have been logged out.")
+    st.switch_page("Home.py")
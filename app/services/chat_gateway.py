@@ -0,0 +1,73 @@
+import asyncio
+import time
+from platform_data.chat import (
+    CHAT_MAX_RETRIES, CHAT_PROVIDER, CHAT_TIMEOUT_S, openai_acomplete, openai_complete, openai_stream, stub_tokens
+)
+
+# Every chat request from the pages goes through complete_chat/stream_chat.
+# "openai" uses the shared client from services.resources.get_chat_client (one
+# keep-alive connection pool per process); "stub" answers offline with a
+# deterministic reply. The retry policy and the stub are shared with the
+# multi_domain front end (see platform_data.chat).
+
+def uses_stub():
+    return CHAT_PROVIDER == "stub"
+
+def _count_retries(stats):
+    """The on_retry hook that counts retries in stats["retries"], or None without stats."""
+    if stats is None:
+        return None
+    def count():
+        stats["retries"] = stats.get("retries", 0) + 1
+    return count
+
+def complete_chat(client, model, messages, temperature=1.0, stats=None):
+    """The whole assistant reply; `client` None uses the offline stub."""
+    if client is None:
+        return "".join(stub_tokens(messages))
+    return openai_complete(client, messages, model, temperature, on_retry=_count_retries(stats))
+
+def stream_chat(client, model, messages, temperature=1.0, stats=None):
+    """
+    Yield the assistant reply as text deltas while the completion is generated,
+    for st.write_stream. If `stats` is a dict it receives `first_token_s` (time to
+    first token) and `total_s` once the stream ends. Opening the stream is retried
+    until the first chunk arrives; a stream that fails later is not resent.
+    Pointing OPENAI_BASE_URL at benchmarks/mock_openai_server.py runs this offline.
+    """
+    started = time.perf_counter()
+    if client is None:
+        chunks = iter(stub_tokens(messages))
+    else:
+        chunks = openai_stream(client, messages, model, temperature, on_retry=_count_retries(stats))
+    for text in chunks:
+        if text:
+            if stats is not None and "first_token_s" not in stats:
+                stats["first_token_s"] = time.perf_counter() - started
+            yield text
+    if stats is not None:
+        stats["total_s"] = time.perf_counter() - started
+
+def new_async_client(api_key):
+    """
+    An AsyncOpenAI client for batch jobs (None for the offline stub). Its
+    connection pool belongs to the event loop that uses it, so create one per
+    asyncio.run() and close it there instead of sharing it through st.cache_resource.
+    """
+    if uses_stub():
+        return None
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=api_key, timeout=CHAT_TIMEOUT_S, max_retries=0)
+
+async def acomplete_chat(aclient, model, messages, temperature=1.0, stats=None,
+                         max_retries=CHAT_MAX_RETRIES, on_rate_limit=None):
+    """
+    complete_chat for asyncio callers, with the same retry policy. When the
+    server rate-limits a request, `on_rate_limit(seconds)` is called before the
+    retry so the caller can hold back its other requests as well.
+    """
+    if aclient is None:
+        await asyncio.sleep(0)
+        return "".join(stub_tokens(messages))
+    return await openai_acomplete(aclient, messages, model, temperature, max_retries=max_retries,
+                                  on_retry=_count_retries(stats), on_rate_limit=on_rate_limit)
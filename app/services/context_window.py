@@ -0,0 +1,19 @@
+from platform_data.context_window import CHAT_TOKEN_BUDGET, ContextWindow, count_tokens
+
+def build_messages(system_prompt, history, user_input, budget=CHAT_TOKEN_BUDGET, state=None):
+    """
+    Build the request messages within `budget` tokens: the system prompt, a rolling
+    summary of older turns, as many recent turns as fit, and the new message.
+    `state` (a dict kept in st.session_state) holds the conversation's
+    ContextWindow, so each turn is summarised once, when it leaves the window;
+    clearing the history resets it. After the call state["tokens"] and
+    state["folded"] describe the request.
+    """
+    state = {} if state is None else state
+    window = state.get("window")
+    if window is None or window.budget != budget:
+        window = state["window"] = ContextWindow(budget)
+    messages = window.build(system_prompt, history, user_input)
+    state["tokens"] = window.last_tokens
+    state["folded"] = window.folded
+    return messages
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from services.profiling import profiled
+
+# Assumed plot width when Streamlit stretches a chart to the container
+DEFAULT_CHART_WIDTH_PX = 800
+
+def _numeric_x(series):
+    """Return x values as float64 so distances/areas can be computed for dates too."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype="float64")
+    return pd.to_datetime(series).astype("int64").to_numpy(dtype="float64")
+
+def lttb(df, x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Keeps the first and last points and, from each of `threshold - 2` buckets,
+    the point forming the largest triangle with its neighbours. Preserves the
+    visual shape of a line with `threshold` points. `df` must be sorted by `x`.
+    """
+    n = len(df)
+    if threshold >= n or threshold < 3:
+        return df
+    xs = _numeric_x(df[x])
+    ys = df[y].to_numpy(dtype="float64")
+
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # average of the next bucket (the last point for the final bucket)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xs[next_start:next_end].mean()
+        avg_y = ys[next_start:next_end].mean()
+        bx, by = xs[start:end], ys[start:end]
+        area = np.abs((xs[a] - avg_x) * (by - ys[a]) - (xs[a] - bx) * (avg_y - ys[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return df.iloc[keep]
+
+def minmax_decimate(df, x, y, n_buckets):
+    """
+    Min/max bucket decimation: split the x range into `n_buckets` equal slices
+    and keep the lowest and highest point of each, so spikes are never lost.
+    Returns at most `2 * n_buckets` rows. `df` must be sorted by `x`.
+    """
+    if len(df) <= 2 * n_buckets:
+        return df
+    xs = _numeric_x(df[x])
+    bucket = np.minimum(((xs - xs[0]) / (xs[-1] - xs[0] or 1) * n_buckets).astype(np.int64), n_buckets - 1)
+    grouped = pd.Series(df[y].to_numpy(), index=np.arange(len(df))).groupby(bucket)
+    keep = np.union1d(grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy())
+    return df.iloc[keep]
+
+@profiled("transform")
+def downsample_for_chart(df, x, y, width_px=DEFAULT_CHART_WIDTH_PX, method="lttb"):
+    """
+    Bound a line chart's payload to roughly one point per horizontal pixel.
+    `method` is "lttb" (shape preserving) or "minmax" (extremes preserving).
+    """
+    if df is None or df.empty:
+        return df
+    df = df.sort_values(x)
+    if method == "minmax":
+        return minmax_decimate(df, x, y, max(width_px // 2, 1))
+    if method == "lttb":
+        return lttb(df, x, y, max(width_px, 3))
+    raise ValueError(f"Unknown downsampling method '{method}'")
@@ -0,0 +1,2 @@
+# Local hashed text embeddings, shared with multi_domain_platform (see platform_data.embeddings)
+from platform_data.embeddings import EMBEDDING_DIM, STOPWORDS, embed, from_blob, to_blob, tokenize
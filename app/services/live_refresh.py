@@ -0,0 +1,27 @@
+import streamlit as st
+from data.change_feed import has_changes
+
+# Seconds between change polls offered in the sidebar
+REFRESH_INTERVALS = [5, 10, 30, 60]
+
+def render_auto_refresh(conn, domain):
+    """
+    Sidebar toggle for wall displays. While on, a fragment polls the change feed
+    every few seconds (one indexed MAX(seq) lookup) and reruns the page only when
+    the domain table changed; the rerun then merges just those rows via live_frame.
+    """
+    with st.sidebar:
+        enabled = st.toggle("Auto-refresh", key=f"{domain}_auto_refresh")
+        if not enabled:
+            return
+        interval = st.selectbox("Refresh every (s)", REFRESH_INTERVALS, index=1, key=f"{domain}_refresh_every")
+
+        @st.fragment(run_every=interval)
+        def poll():
+            if has_changes(conn, domain, st.session_state):
+                st.rerun(scope="app")
+            state = st.session_state.get(f"live_{domain}")
+            if state is not None:
+                st.caption(f"Live · change #{state['seq']} · {state['changes']} rows merged")
+
+        poll()
@@ -0,0 +1,157 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Opt-in: APP_PROFILING=1 records every rerun; admins can also switch it on per session.
+PROFILING_ENABLED = os.environ.get("APP_PROFILING", "0").lower() in ("1", "true", "yes")
+TRACE_PATH = Path(os.environ.get("APP_TRACE_FILE", Path("DATA") / "traces" / "dashboard_trace.json"))
+
+# Span categories shown in the overlay, in display order
+CATEGORIES = ("db", "transform", "chart", "render")
+
+_local = threading.local()
+_trace_lock = threading.Lock()
+
+class RerunProfile:
+    """Spans recorded during one script rerun on the current thread."""
+
+    def __init__(self, page):
+        self.page = page
+        self.spans = []
+        self._children = []  # time spent in child spans, one entry per open span
+        self.start = time.perf_counter()
+        self.wall_start_us = time.time() * 1_000_000
+        self.end = None
+
+    def add(self, name, category, start, end, child_seconds):
+        self.spans.append({
+            "name": name,
+            "category": category,
+            "start_ms": (start - self.start) * 1000,
+            "duration_ms": (end - start) * 1000,
+            "self_ms": (end - start - child_seconds) * 1000,
+            "depth": len(self._children),
+        })
+
+    @property
+    def total_ms(self):
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+    def category_totals(self):
+        """Self time per category (nested spans are not double counted), plus untracked script time."""
+        totals = dict.fromkeys(CATEGORIES, 0.0)
+        for span in self.spans:
+            totals[span["category"]] = totals.get(span["category"], 0.0) + span["self_ms"]
+        totals["other"] = max(self.total_ms - sum(totals.values()), 0.0)
+        return totals
+
+    def trace_events(self):
+        """Chrome trace-event 'complete' events (ph = X), timestamps in microseconds."""
+        pid, tid = os.getpid(), threading.get_ident()
+        events = [{
+            "name": self.page, "cat": "rerun", "ph": "X", "pid": pid, "tid": tid,
+            "ts": round(self.wall_start_us), "dur": round(self.total_ms * 1000),
+        }]
+        for span in self.spans:
+            events.append({
+                "name": span["name"], "cat": span["category"], "ph": "X", "pid": pid, "tid": tid,
+                "ts": round(self.wall_start_us + span["start_ms"] * 1000),
+                "dur": round(span["duration_ms"] * 1000),
+                "args": {"page": self.page},
+            })
+        return events
+
+def current_profile():
+    return getattr(_local, "profile", None)
+
+def begin_rerun(page, enabled=None):
+    """Start recording spans for this rerun; returns the profile or None when profiling is off."""
+    if enabled is None:
+        enabled = PROFILING_ENABLED
+    _local.profile = RerunProfile(page) if enabled else None
+    return _local.profile
+
+def end_rerun(trace_path=None):
+    """Stop recording, append the spans to the trace file and return the finished profile."""
+    profile = current_profile()
+    _local.profile = None
+    if profile is None:
+        return None
+    profile.end = time.perf_counter()
+    write_trace(profile.trace_events(), trace_path or TRACE_PATH)
+    return profile
+
+@contextmanager
+def span(name, category="render"):
+    """Time the enclosed block as a span of the current rerun (no-op when profiling is off)."""
+    profile = current_profile()
+    if profile is None:
+        yield
+        return
+    profile._children.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        child_seconds = profile._children.pop()
+        if profile._children:
+            profile._children[-1] += end - start
+        profile.add(name, category, start, end, child_seconds)
+
+def profiled(category="db", name=None):
+    """Decorator recording each call of the function as a span."""
+    def decorate(func):
+        label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_profile() is None:
+                return func(*args, **kwargs)
+            with span(label, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def write_trace(events, trace_path=TRACE_PATH):
+    """
+    Append events to a trace file in the Trace Event "JSON array" format: the file
+    opens with '[' and holds one event per line, each followed by a comma. Trace
+    viewers (Perfetto, chrome://tracing) accept the unterminated array, so the file
+    can be appended to while the app runs and loaded at any time.
+    """
+    trace_path = Path(trace_path)
+    with _trace_lock:
+        trace_path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not trace_path.exists() or trace_path.stat().st_size == 0
+        with open(trace_path, "a", encoding="utf-8") as f:
+            if is_new:
+                f.write("[\n")
+            for event in events:
+                f.write(json.dumps(event) + ",\n")
+
+def render_overlay(profile):
+    """Sidebar timing breakdown of the last rerun, with the per-session switch, for admins."""
+    import streamlit as st
+
+    if st.session_state.get("role") != "admin":
+        return
+    st.sidebar.toggle("Profile reruns", key="profiling", value=PROFILING_ENABLED,
+                      help=f"Record timed spans for each rerun and append them to {TRACE_PATH}")
+    if profile is None:
+        return
+    with st.sidebar.expander(f"⏱ Rerun timings ({profile.total_ms:.0f} ms)", expanded=False):
+        totals = profile.category_totals()
+        for cat, ms in totals.items():
+            st.progress(min(ms / max(profile.total_ms, 1e-9), 1.0), text=f"{cat}: {ms:.0f} ms")
+        rows = [{
+            "span": "\u2003" * s["depth"] + s["name"],  # em space indent per nesting level
+            "category": s["category"],
+            "start ms": round(s["start_ms"], 1),
+            "ms": round(s["duration_ms"], 1),
+        } for s in sorted(profile.spans, key=lambda s: s["start_ms"])]
+        st.dataframe(rows, use_container_width=True, hide_index=True)
@@ -0,0 +1,66 @@
+import atexit
+import threading
+import streamlit as st
+from data.db import DB_PATH
+from services.chat_gateway import CHAT_TIMEOUT_S, uses_stub
+
+# Everything handed out by the registry, closed when the process exits
+_open_resources = []
+_open_lock = threading.Lock()
+
+def _track(resource):
+    with _open_lock:
+        _open_resources.append(resource)
+    return resource
+
+def _release(resource):
+    with _open_lock:
+        if resource in _open_resources:
+            _open_resources.remove(resource)
+    try:
+        resource.close()
+    except Exception:
+        pass
+
+@atexit.register
+def close_all():
+    """Close every shared client and the scheduler (runs at interpreter shutdown)."""
+    with _open_lock:
+        resources = list(_open_resources)
+        _open_resources.clear()
+    for resource in resources:
+        try:
+            resource.close()
+        except Exception:
+            pass
+
+@st.cache_resource(show_spinner=False, on_release=_release)
+def get_openai_client(api_key):
+    """
+    Shared OpenAI client (and its keep-alive HTTP connection pool) for an API key.
+    Its own retries are off: services.chat_gateway retries with jittered backoff.
+    """
+    from openai import OpenAI
+    return _track(OpenAI(api_key=api_key, timeout=CHAT_TIMEOUT_S, max_retries=0))
+
+def get_chat_client(api_key):
+    """The client for services.chat_gateway: the shared OpenAI client, or None for the offline stub."""
+    return None if uses_stub() else get_openai_client(api_key)
+
+@st.cache_resource(show_spinner=False, on_release=_release)
+def get_scheduler(db_path=str(DB_PATH)):
+    """
+    The process's background job scheduler (services/scheduler.py), started on
+    first use unless SCHEDULER=off, so maintenance and AI triage never run on a
+    rerun. It uses its own connection; job leases keep it single-flight with any
+    other process's scheduler.
+    """
+    from services.scheduler import SCHEDULER_ENABLED, Scheduler
+    try:
+        api_key = st.secrets.get("OPENAI_API_KEY", None)
+    except FileNotFoundError:  # no secrets.toml: triage runs are skipped unless CHAT_PROVIDER=stub
+        api_key = None
+    scheduler = Scheduler(db_path, api_key=api_key)
+    if SCHEDULER_ENABLED:
+        scheduler.start()
+    return _track(scheduler)
@@ -0,0 +1,366 @@
+"""
+Background scheduler for the platform's maintenance and AI jobs.
+
+Rollup rebuilds, Parquet archival, change-feed and session pruning,
+ANALYZE/VACUUM and AI triage run here on cron-like schedules instead of on a
+user's rerun. The Streamlit process starts one scheduler thread
+(services.resources.get_scheduler); it can also run as a sidecar process. Each job is single-flight across every
+process sharing the database: a run first takes the job's lease in job_locks,
+and every run is recorded in job_runs with its duration and outcome. Runs asked
+for from the dashboard ("Run now") are queued in job_runs and picked up on the
+scheduler's next tick.
+
+Schedules are five cron fields (minute hour day-of-month month day-of-week, with
+*, lists, ranges and /steps) or @hourly/@daily/@weekly/@monthly. Override one
+with SCHEDULE_<JOB>="<cron>" or switch it off with SCHEDULE_<JOB>=off; set
+SCHEDULER=off to keep the Streamlit process from starting the thread.
+
+Run from the repository root:
+    PYTHONPATH=app python -m services.scheduler            # sidecar: run jobs as they fall due
+    PYTHONPATH=app python -m services.scheduler --list
+    PYTHONPATH=app python -m services.scheduler --job rollups
+"""
+import argparse
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from data.db import DB_PATH, connect_database
+from data.jobs import (
+    ensure_job_tables, acquire_job_lock, release_job_lock, queued_jobs, start_job_run, finish_job_run,
+    fail_abandoned_runs, last_job_starts
+)
+
+log = logging.getLogger("scheduler")
+
+# Off switch for the thread the Streamlit process starts
+SCHEDULER_ENABLED = os.environ.get("SCHEDULER", "on").lower() not in ("0", "off", "false", "no")
+# Seconds between checks for due and queued jobs
+SCHEDULER_TICK_S = float(os.environ.get("SCHEDULER_TICK_S", "30"))
+
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+# (lowest, highest) value of each cron field; day-of-week 0 (or 7) is Sunday
+CRON_FIELDS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+def _parse_field(text, lowest, highest):
+    values = set()
+    for part in text.split(","):
+        expr, _, step = part.partition("/")
+        if expr == "*":
+            start, end = lowest, highest
+        elif "-" in expr:
+            start, end = (int(v) for v in expr.split("-", 1))
+        else:
+            start = int(expr)
+            end = highest if step else start
+        step = int(step) if step else 1
+        if not (lowest <= start <= end <= highest) or step < 1:
+            raise ValueError(f"cron field {text!r} is outside {lowest}-{highest}")
+        values.update(range(start, end + 1, step))
+    return values
+
+def parse_cron(expr):
+    """(minutes, hours, days, months, weekdays, dom restricted, dow restricted) for a cron expression."""
+    fields = CRON_ALIASES.get(expr.strip(), expr).split()
+    if len(fields) != 5:
+        raise ValueError(f"cron expression {expr!r} needs 5 fields")
+    minutes, hours, days, months, weekdays = (
+        _parse_field(text, lowest, highest) for text, (lowest, highest) in zip(fields, CRON_FIELDS)
+    )
+    weekdays = {d % 7 for d in weekdays}
+    return minutes, hours, days, months, weekdays, fields[2] != "*", fields[4] != "*"
+
+def next_fire(expr, after):
+    """The first minute strictly after the datetime `after` that the cron expression matches."""
+    minutes, hours, days, months, weekdays, dom_set, dow_set = parse_cron(expr)
+    at = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = at + timedelta(days=5 * 366)
+    while at < limit:
+        if at.month not in months:
+            at = (at.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            continue
+        # cron's rule: when both day fields are restricted, either one matching is enough
+        dom_ok, dow_ok = at.day in days, (at.weekday() + 1) % 7 in weekdays
+        if not ((dom_ok or dow_ok) if dom_set and dow_set else (dom_ok and dow_ok)):
+            at = at.replace(hour=0, minute=0) + timedelta(days=1)
+            continue
+        if at.hour not in hours:
+            at = at.replace(minute=0) + timedelta(hours=1)
+            continue
+        if at.minute not in minutes:
+            at += timedelta(minutes=1)
+            continue
+        return at
+    raise ValueError(f"cron expression {expr!r} never fires")
+
+# --- Jobs ---
+# Each takes (conn, api_key) and returns a short result for the history, or
+# raises SkipJob when there is nothing it can do this time.
+
+class SkipJob(Exception):
+    pass
+
+def _rollups(conn, api_key):
+    from data.rollups import ensure_rollup_tables, rebuild_rollups
+    ensure_rollup_tables(conn)
+    rebuild_rollups(conn)
+    return "trend rollups rebuilt"
+
+def _archive(conn, api_key):
+    from data import archive
+    if archive.pq is None:
+        raise SkipJob("pyarrow is not installed")
+    return archive.archive_closed_records(conn)
+
+def _prune_change_feed(conn, api_key):
+    from data.change_feed import ensure_change_feed, prune_change_feed
+    ensure_change_feed(conn)
+    return f"{prune_change_feed(conn)} feed rows removed"
+
+def _purge_sessions(conn, api_key):
+    from data.sessions import purge_expired_sessions
+    return f"{purge_expired_sessions(conn)} sessions removed"
+
+def _analyze(conn, api_key):
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA optimize")
+    conn.commit()
+    return "statistics refreshed"
+
+def _vacuum(conn, api_key):
+    before = os.path.getsize(_db_file(conn))
+    conn.execute("VACUUM")
+    return f"{(before - os.path.getsize(_db_file(conn))) / 1e6:.1f} MB reclaimed"
+
+def _triage(conn, api_key):
+    from data.triage import pending_incidents
+    from services.chat_gateway import uses_stub
+    from services.triage import run_triage
+    if not api_key and not uses_stub():
+        raise SkipJob("no OpenAI API key configured")
+    if not pending_incidents(conn, limit=1):
+        raise SkipJob("no incidents waiting for triage")
+    counts = run_triage(conn, api_key)
+    return f"run {counts['run_id']}: {counts['done']} triaged, {counts['failed']} failed"
+
+def _db_file(conn):
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+# name: (default schedule, function, lease seconds, description)
+JOBS = {
+    "rollups": ("0 2 * * *", _rollups, 1800, "Rebuild the trend rollup table from the domain tables"),
+    "archive": ("30 2 * * *", _archive, 3600, "Move old closed records into the Parquet archive"),
+    "prune_change_feed": ("15 * * * *", _prune_change_feed, 600, "Trim the change feed to its retention"),
+    "purge_sessions": ("45 * * * *", _purge_sessions, 600, "Delete expired and revoked login sessions"),
+    "analyze": ("0 3 * * *", _analyze, 1800, "ANALYZE and PRAGMA optimize for the query planner"),
+    "vacuum": ("0 4 * * 0", _vacuum, 3600, "VACUUM the database file"),
+    "triage": ("*/30 * * * *", _triage, 3600, "AI triage of open incidents"),
+}
+
+def job_schedule(name):
+    """The job's cron expression after any SCHEDULE_<JOB> override, or None when switched off."""
+    expr = os.environ.get(f"SCHEDULE_{name.upper()}", JOBS[name][0]).strip()
+    if expr.lower() in ("", "off", "none", "never"):
+        return None
+    parse_cron(expr)
+    return expr
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+def _keep_lease(db_file, name, worker, lease_s, stop):
+    """Renew the job's lease every third of `lease_s` until `stop` is set, on its own connection."""
+    conn = connect_database(db_file)
+    try:
+        while not stop.wait(lease_s / 3):
+            if not acquire_job_lock(conn, name, worker, lease_s):
+                log.warning("job %s lost its lease to another worker", name)
+                return
+    except Exception:
+        log.exception("renewing the lease of job %s failed", name)
+    finally:
+        conn.close()
+
+def run_job(conn, name, api_key=None, run_id=None, due_after=None, trigger="manual"):
+    """
+    Run one job now if no other worker holds its lease; returns the final state,
+    or None when another worker had it. With `due_after` (an epoch time) the job
+    is also skipped unless it still has not started since then, so two
+    schedulers that both found it due do not run it back to back. A queued
+    `run_id` is skipped the same way once another worker has claimed it. The
+    lease is renewed from a heartbeat thread while the job runs, so a job that
+    outlasts its lease seconds is not taken over; only a stopped process lets
+    it expire.
+    """
+    _, fn, lease_s, _ = JOBS[name]
+    worker = worker_name()
+    if not acquire_job_lock(conn, name, worker, lease_s):
+        return None
+    stop = threading.Event()
+    heartbeat = None
+    try:
+        if due_after is not None and (last_job_starts(conn).get(name) or 0) >= due_after:
+            return None
+        fail_abandoned_runs(conn, name, worker)
+        run_id = start_job_run(conn, name, worker, run_id, trigger)
+        if run_id is None:
+            return None
+        heartbeat = threading.Thread(target=_keep_lease, args=(_db_file(conn), name, worker, lease_s, stop),
+                                     name=f"lease-{name}", daemon=True)
+        heartbeat.start()
+        try:
+            detail, state = fn(conn, api_key), "ok"
+        except SkipJob as exc:
+            detail, state = str(exc), "skipped"
+        except Exception as exc:
+            log.exception("job %s failed", name)
+            if conn.in_transaction:
+                conn.rollback()
+            detail, state = f"{type(exc).__name__}: {exc}", "failed"
+        finish_job_run(conn, run_id, state, detail)
+        log.info("job %s %s: %s", name, state, detail)
+        return state
+    finally:
+        # the heartbeat must not renew the lease after it is released
+        stop.set()
+        if heartbeat is not None:
+            heartbeat.join()
+        release_job_lock(conn, name, worker)
+
+def due_jobs(conn, now=None, since=None):
+    """
+    {job: time it fell due} for scheduled jobs whose next fire after their last
+    start has passed. A job that has never run is due at its first fire after
+    `since` (the scheduler thread's start), or at once when `since` is None.
+    """
+    now = now or time.time()
+    last = last_job_starts(conn)
+    due = {}
+    for name in JOBS:
+        schedule = job_schedule(name)
+        if schedule is None:
+            continue
+        started = last.get(name) or since
+        if started is None:
+            due[name] = now
+            continue
+        fire = next_fire(schedule, datetime.fromtimestamp(started)).timestamp()
+        if fire <= now:
+            due[name] = fire
+    return due
+
+def run_pending(conn, api_key=None, since=None):
+    """Run the queued ("Run now") jobs, then the due ones; returns {job: state} for what ran."""
+    ran = {}
+    for name, run_id in queued_jobs(conn).items():
+        if name in JOBS:
+            ran[name] = run_job(conn, name, api_key, run_id=run_id)
+    for name, fire in due_jobs(conn, since=since).items():
+        if name not in ran:
+            ran[name] = run_job(conn, name, api_key, due_after=fire, trigger="schedule")
+    return ran
+
+def next_runs(conn, now=None):
+    """{job: next scheduled datetime or None when switched off}."""
+    last = last_job_starts(conn)
+    now = now or time.time()
+    runs = {}
+    for name in JOBS:
+        schedule = job_schedule(name)
+        runs[name] = None if schedule is None else next_fire(schedule, datetime.fromtimestamp(last.get(name) or now))
+    return runs
+
+class Scheduler:
+    """A daemon thread that runs jobs as they fall due, with its own connection."""
+
+    def __init__(self, db_path=DB_PATH, api_key=None, tick_s=SCHEDULER_TICK_S):
+        self.db_path = str(db_path)
+        self.api_key = api_key
+        self.tick_s = tick_s
+        self.started_at = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def wake(self):
+        """Check for queued runs now instead of at the next tick."""
+        self._wake.set()
+
+    def _loop(self):
+        conn = connect_database(self.db_path)
+        try:
+            ensure_job_tables(conn)
+            while not self._stop.is_set():
+                try:
+                    run_pending(conn, self.api_key, since=self.started_at)
+                except Exception:
+                    log.exception("scheduler tick failed")
+                self._wake.wait(self.tick_s)
+                self._wake.clear()
+        finally:
+            conn.close()
+
+    def close(self):
+        """Stop after the job in progress, if any (it keeps its lease until then)."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=str(DB_PATH), help="SQLite database file")
+    parser.add_argument("--job", choices=sorted(JOBS), help="run this job once now and exit")
+    parser.add_argument("--once", action="store_true",
+                        help="run what is queued or due (and jobs that have never run) once and exit")
+    parser.add_argument("--list", action="store_true", help="show each job's schedule and next run")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    conn = connect_database(args.db)
+    api_key = os.environ.get("OPENAI_API_KEY")
+    try:
+        ensure_job_tables(conn)
+        if args.list:
+            for name, when in next_runs(conn).items():
+                print(f"{name:<18}{job_schedule(name) or 'off':<16}{when or '-'!s:<22}{JOBS[name][3]}")
+        elif args.job:
+            state = run_job(conn, args.job, api_key)
+            print(f"{args.job}: {state or 'already running elsewhere'}")
+        elif args.once:
+            for name, state in run_pending(conn, api_key).items():
+                print(f"{name}: {state or 'already running elsewhere'}")
+        else:
+            conn.close()
+            conn = None
+            scheduler = Scheduler(args.db, api_key).start()
+            try:
+                while scheduler.running:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                scheduler.close()
+    finally:
+        if conn is not None:
+            conn.close()
+
+if __name__ == "__main__":
+    main()
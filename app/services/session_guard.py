@@ -0,0 +1,69 @@
+import time
+import streamlit as st
+from data.sessions import (
+    SESSION_TTL_S, create_session, rotate_session, revoke_session, session_expires_at
+)
+
+# The session token travels in the page URL (?session=...), so a reload or a
+# new worker can restore the login without asking for the password again.
+# Because the URL ends up in browser history and copied links, the token is
+# short-lived (SESSION_TTL_S), renewed while the user is active, and replaced
+# on every restore: a link taken from the address bar logs in at most once.
+SESSION_PARAM = "session"
+SESSION_NOTICE = (
+    f"Your login is kept in this page's address for up to {SESSION_TTL_S // 60} minutes of "
+    "inactivity. Don't share or bookmark links to the app while logged in, and log out on shared computers."
+)
+
+def start_session(conn, username, role):
+    """Log the user in for this browser session and return the token for the URL."""
+    token = create_session(conn, username, role)
+    st.session_state.logged_in = True
+    st.session_state.username = username
+    st.session_state.role = role
+    st.session_state.session_token = token
+    return token
+
+def restore_session(conn):
+    """
+    Login guard helper, called before checking st.session_state.logged_in. A
+    valid token in the URL logs the session back in and is swapped for a new
+    one; the current token is kept in the URL as pages change, and renewed once
+    less than half its lifetime is left.
+    """
+    if st.session_state.get("logged_in"):
+        token = st.session_state.get("session_token")
+        if token and (session_expires_at(token) or 0) - time.time() < SESSION_TTL_S / 2:
+            rotated = rotate_session(conn, token)
+            if rotated is None:
+                # expired, logged out elsewhere, or restored from a copied link
+                end_session(conn)
+                return False
+            token = st.session_state.session_token = rotated[0]
+        if token and st.query_params.get(SESSION_PARAM) != token:
+            st.query_params[SESSION_PARAM] = token
+        return True
+    token = st.query_params.get(SESSION_PARAM)
+    rotated = rotate_session(conn, token) if token else None
+    if rotated is None:
+        if token:
+            del st.query_params[SESSION_PARAM]
+        return False
+    token, session = rotated
+    st.query_params[SESSION_PARAM] = token
+    st.session_state.logged_in = True
+    st.session_state.username = session["username"]
+    st.session_state.role = session["role"] or ""
+    st.session_state.session_token = token
+    return True
+
+def end_session(conn):
+    """Revoke the session token and forget the login."""
+    token = st.session_state.pop("session_token", None)
+    if token:
+        revoke_session(conn, token)
+    if SESSION_PARAM in st.query_params:
+        del st.query_params[SESSION_PARAM]
+    st.session_state.logged_in = False
+    st.session_state.username = ""
+    st.session_state.role = ""
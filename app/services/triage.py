@@ -0,0 +1,168 @@
+"""
+Batch AI triage of open incidents.
+
+Open/Investigating incidents without a triage are sent through the chat gateway
+concurrently (asyncio, at most TRIAGE_CONCURRENCY requests in flight). The
+suggested severity and a summary are written to incident_triage in batches of
+TRIAGE_BATCH_SIZE, one transaction each. A crashed or interrupted run resumes
+from the last committed batch the next time it is started.
+
+Run from the repository root:
+    PYTHONPATH=app python -m services.triage --limit 200
+    CHAT_PROVIDER=stub PYTHONPATH=app python -m services.triage
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from data.db import connect_database
+from data.triage import (
+    SEVERITIES, TRIAGE_STATUSES, pending_incidents, start_triage_run, save_triage_batch, finish_triage_run
+)
+from services.chat_gateway import acomplete_chat, new_async_client
+
+# Requests in flight at once
+TRIAGE_CONCURRENCY = int(os.environ.get("TRIAGE_CONCURRENCY", "8"))
+# Results per committed batch (the checkpoint granularity)
+TRIAGE_BATCH_SIZE = int(os.environ.get("TRIAGE_BATCH_SIZE", "25"))
+# Request starts per minute across all workers (0 = no limit)
+TRIAGE_RPM = int(os.environ.get("TRIAGE_RPM", "0"))
+TRIAGE_MODEL = "gpt-4o-mini"
+
+SYSTEM_PROMPT = (
+    "You are a cybersecurity triage analyst. For the incident given, reply with JSON only: "
+    '{"severity": one of "Critical", "High", "Medium", "Low", "summary": one or two sentences '
+    "on what happened and the next action}."
+)
+
+def triage_messages(incident):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": (
+            f"Incident #{incident['id']} on {incident['date']}: {incident['incident_type']}, "
+            f"reported severity {incident['severity']}, status {incident['status']}, "
+            f"reported by {incident['reported_by']}.\n{incident['description'] or ''}"
+        )},
+    ]
+
+def parse_triage(text):
+    """(severity or None, summary) from the model's reply; tolerates prose around the JSON."""
+    match = re.search(r"\{.*\}", text, re.S)
+    if match:
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            severity = str(data.get("severity", "")).title()
+            return (severity if severity in SEVERITIES else None), str(data.get("summary", "")).strip()
+    found = re.search(r"\b(critical|high|medium|low)\b", text, re.I)
+    return (found.group(1).title() if found else None), text.strip()[:500]
+
+class _RateGate:
+    """Spaces request starts to `rpm` per minute and pauses every worker after a 429."""
+    def __init__(self, rpm):
+        self.interval = 60.0 / rpm if rpm else 0.0
+        self.next_start = 0.0
+        self.paused_until = 0.0
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def wait(self):
+        while True:
+            now = time.monotonic()
+            start = max(now, self.next_start, self.paused_until)
+            if start <= now:
+                self.next_start = now + self.interval
+                return
+            await asyncio.sleep(start - now)
+
+async def triage_incidents(conn, aclient, model=TRIAGE_MODEL, concurrency=TRIAGE_CONCURRENCY,
+                           batch_size=TRIAGE_BATCH_SIZE, rpm=TRIAGE_RPM, statuses=TRIAGE_STATUSES,
+                           limit=None, progress=None):
+    """
+    Triage every pending incident and return the run's counts. `progress(done,
+    failed, total)` is called after each committed batch. SQLite is only
+    touched from this coroutine's thread, between requests, in batches.
+    """
+    incidents = pending_incidents(conn, statuses, limit)
+    run_id = start_triage_run(conn, model, len(incidents))
+    semaphore = asyncio.Semaphore(concurrency)
+    gate = _RateGate(rpm)
+    counts = {"run_id": run_id, "total": len(incidents), "done": 0, "failed": 0, "retries": 0}
+
+    async def triage_one(incident):
+        async with semaphore:
+            await gate.wait()
+            result = {"incident_id": incident["id"], "model": model}
+            try:
+                reply = await acomplete_chat(aclient, model, triage_messages(incident), temperature=0.2,
+                                             stats=counts, on_rate_limit=gate.pause)
+                result["suggested_severity"], result["summary"] = parse_triage(reply)
+                result["outcome"] = "done"
+            except Exception as exc:
+                result["outcome"], result["error"] = "failed", f"{type(exc).__name__}: {exc}"[:500]
+            return result
+
+    def flush(batch):
+        save_triage_batch(conn, run_id, batch)
+        counts["done"] += sum(r["outcome"] == "done" for r in batch)
+        counts["failed"] += sum(r["outcome"] == "failed" for r in batch)
+        if progress is not None:
+            progress(counts["done"], counts["failed"], counts["total"])
+
+    tasks = [asyncio.ensure_future(triage_one(i)) for i in incidents]
+    batch = []
+    try:
+        for finished in asyncio.as_completed(tasks):
+            batch.append(await finished)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    finish_triage_run(conn, run_id)
+    return counts
+
+def run_triage(conn, api_key=None, **kwargs):
+    """Synchronous entry point: one event loop and one async client for the whole run."""
+    async def main():
+        aclient = new_async_client(api_key)
+        try:
+            return await triage_incidents(conn, aclient, **kwargs)
+        finally:
+            if aclient is not None:
+                await aclient.close()
+    return asyncio.run(main())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, help="triage at most this many incidents")
+    parser.add_argument("--concurrency", type=int, default=TRIAGE_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=TRIAGE_BATCH_SIZE)
+    parser.add_argument("--rpm", type=int, default=TRIAGE_RPM, help="request starts per minute (0 = no limit)")
+    args = parser.parse_args()
+
+    conn = connect_database()
+    started = time.perf_counter()
+
+    def progress(done, failed, total):
+        print(f"  {done + failed}/{total} triaged ({failed} failed)", flush=True)
+
+    try:
+        counts = run_triage(conn, os.environ.get("OPENAI_API_KEY"), concurrency=args.concurrency,
+                            batch_size=args.batch_size, rpm=args.rpm, limit=args.limit, progress=progress)
+    finally:
+        conn.close()
+    print(f"Run {counts['run_id']}: {counts['done']} done, {counts['failed']} failed, "
+          f"{counts['retries']} retries in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ from pathlib import Path
 from data.db import connect_database
 from data.users import get_user_by_username, insert_user
 from data.schema import create_users_table
+from data.login_throttle import check_login, record_login_result, throttled_message
 import sqlite3
 DATA_DIR = Path("DATA")
 
@@ -32,27 +33,37 @@ def register_user(username, password, role="user"):
     
     return True, f"User '{username}' registered successfully!"
 
-def login_user(username, password):
+def login_user(username, password, client=None):
     conn = connect_database()
-    cursor = conn.cursor()
-    
-    # Find user
-    cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-    user = cursor.fetchone()
-    conn.close()
-    
-    if not user:
-        return False, "Username not found."
-    
-    # Verify password (user[2] is password_hash column)
-    stored_hash = user[2]
-    password_bytes = password.encode('utf-8')
-    hash_bytes = stored_hash.encode('utf-8')
-    
-    if bcrypt.checkpw(password_bytes, hash_bytes):
-        return True, f"Welcome, {username}!"
-    else:
-        return False, "Invalid password."
+    try:
+        # Throttled attempts are rejected before the password is hashed
+        wait = check_login(conn, username, client)
+        if wait:
+            return False, throttled_message(wait)
+
+        cursor = conn.cursor()
+
+        # Find user
+        cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
+        user = cursor.fetchone()
+
+        if not user:
+            record_login_result(conn, username, False)
+            return False, "Username not found."
+
+        # Verify password (user[2] is password_hash column)
+        stored_hash = user[2]
+        password_bytes = password.encode('utf-8')
+        hash_bytes = stored_hash.encode('utf-8')
+
+        success = bcrypt.checkpw(password_bytes, hash_bytes)
+        record_login_result(conn, username, success)
+        if success:
+            return True, f"Welcome, {username}!"
+        else:
+            return False, "Invalid password."
+    finally:
+        conn.close()
 
 def migrate_users_from_file(conn, filepath=DATA_DIR / "users.csv"):
     conn = connect_database()
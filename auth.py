@@ -1,10 +1,11 @@
 USER_DATA_FILE = "users.txt"
 # Importing bcrypt functions to hash plain text password
 from app.data.db import connect_database
+from app.data.sessions import create_session as store_session
+from app.data.login_throttle import check_login, record_login_result, throttled_message
 import bcrypt
 import os
 import string
-import secrets
 
 if not os.path.exists(USER_DATA_FILE):
     open(USER_DATA_FILE, "w").close()
@@ -54,27 +55,37 @@ def user_exists(username):
         return False
 
 # Function for user login, utilising verify_password() function
-def login_user(username, password):
+def login_user(username, password, client=None):
     conn = connect_database()
-    cursor = conn.cursor()
-    
-    # Find user
-    cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-    user = cursor.fetchone()
-    conn.close()
-    
-    if not user:
-        return False, "Username not found."
-    
-    # Verify password (user[2] is password_hash column)
-    stored_hash = user[2]
-    password_bytes = password.encode('utf-8')
-    hash_bytes = stored_hash.encode('utf-8')
-    
-    if bcrypt.checkpw(password_bytes, hash_bytes):
-        return True, f"Welcome, {username}!"
-    else:
-        return False, "Invalid password."
+    try:
+        # Throttled attempts are rejected before the password is hashed
+        wait = check_login(conn, username, client)
+        if wait:
+            return False, throttled_message(wait)
+
+        cursor = conn.cursor()
+
+        # Find user
+        cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
+        user = cursor.fetchone()
+
+        if not user:
+            record_login_result(conn, username, False)
+            return False, "Username not found."
+
+        # Verify password (user[2] is password_hash column)
+        stored_hash = user[2]
+        password_bytes = password.encode('utf-8')
+        hash_bytes = stored_hash.encode('utf-8')
+
+        success = bcrypt.checkpw(password_bytes, hash_bytes)
+        record_login_result(conn, username, success)
+        if success:
+            return True, f"Welcome, {username}!"
+        else:
+            return False, "Invalid password."
+    finally:
+        conn.close()
 
 # Function to validate username
 def validate_username(username):
@@ -130,9 +141,12 @@ def display_menu():
 
 # Function that creates session tokens
 def create_session(username):
-    token = secrets.token_hex(16)
-    # Store token with timestamp
-    return token
+    # Signed, expiring token, stored in the sessions table with its expiry
+    conn = connect_database()
+    try:
+        return store_session(conn, username)
+    finally:
+        conn.close()
 
 # Function that calls main menu function, and respectively runs to go through password program
 def main():
@@ -177,7 +191,9 @@ def main():
             password = input("Enter your password: ").strip()
 
             # Attempt login
-            if login_user(username, password):
+            success, message = login_user(username, password)
+            print(message)
+            if success:
                 print("\nYou are now logged in.")
                 print(create_session(username))
                 # Optional: Ask if they want to logout or exit
@@ -0,0 +1,168 @@
+"""
+Offline benchmark of the chat gateway: connection reuse, retries and the stub.
+
+Starts benchmarks/mock_openai_server.py in-process and measures:
+
+1. Latency and TCP connections for --requests sequential blocking requests,
+   with a new OpenAI client per request versus the long-lived pooled client
+   (app/services/chat_gateway.complete_chat with one shared client, and
+   multi_domain_platform's OpenAIProvider).
+2. Retries against a mock that answers every --fail-every-th request with a
+   503: how many requests still succeed, and how many retries it took.
+3. Latency of the offline StubProvider / stub client, which needs no server.
+
+Run from the repository root:
+    python benchmarks/bench_ai_gateway.py
+    python benchmarks/bench_ai_gateway.py --requests 100 --first-token-ms 50 --fail-every 4
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from bench_chat_stream import MESSAGES, _import_from
+from mock_openai_server import start_server
+
+MODEL = "gpt-4o-mini"
+
+
+def _summary(latencies, **extra):
+    latencies = sorted(latencies)
+    return {
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 2),
+        **extra,
+    }
+
+
+def _time_requests(server, count, send):
+    """Send `count` requests through `send()`; latency summary plus connections opened."""
+    connections = server.connections
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        send()
+        latencies.append(time.perf_counter() - start)
+    return _summary(latencies, connections=server.connections - connections)
+
+
+def bench_connection_reuse(server, count, gateway, ai_assistant):
+    from openai import OpenAI
+
+    def fresh_client():
+        with OpenAI(api_key="mock", base_url=server.base_url, max_retries=0) as client:
+            client.chat.completions.create(model=MODEL, messages=MESSAGES)
+
+    shared = OpenAI(api_key="mock", base_url=server.base_url, timeout=gateway.CHAT_TIMEOUT_S, max_retries=0)
+    provider = ai_assistant.OpenAIProvider("mock", base_url=server.base_url)
+    assistant = ai_assistant.AIAssistant(provider=provider)
+    try:
+        return {
+            "client_per_request": _time_requests(server, count, fresh_client),
+            "complete_chat_pooled": _time_requests(
+                server, count, lambda: gateway.complete_chat(shared, MODEL, MESSAGES)),
+            "AIAssistant_pooled": _time_requests(server, count, lambda: assistant.complete(MESSAGES)),
+        }
+    finally:
+        shared.close()
+        provider.close()
+
+
+def bench_retries(server, count, gateway, ai_assistant):
+    """Every `server.fail_every`-th request fails; counts successes, retries and wall time (backoff included)."""
+    from openai import OpenAI
+
+    def run(send):
+        ok, start = 0, time.perf_counter()
+        for _ in range(count):
+            try:
+                send()
+                ok += 1
+            except Exception:
+                pass
+        return {"succeeded": ok, "requests": count, "wall_s": round(time.perf_counter() - start, 2)}
+
+    shared = OpenAI(api_key="mock", base_url=server.base_url, max_retries=0)
+    provider = ai_assistant.OpenAIProvider("mock", base_url=server.base_url)
+    stats = {}
+    try:
+        results = {
+            "complete_chat": run(lambda: gateway.complete_chat(shared, MODEL, MESSAGES, stats=stats)),
+            "OpenAIProvider_stream": run(lambda: "".join(provider.stream(MESSAGES, MODEL))),
+        }
+    finally:
+        shared.close()
+        provider.close()
+    results["complete_chat"]["retries"] = stats.get("retries", 0)
+    results["OpenAIProvider_stream"]["retries"] = provider.retries
+    return results
+
+
+def bench_stub(count, gateway, ai_assistant):
+    stub = ai_assistant.AIAssistant(provider=ai_assistant.StubProvider())
+    replies = {stub.complete(MESSAGES) for _ in range(3)}
+    results = {}
+    for name, send in [("complete_chat_stub", lambda: gateway.complete_chat(None, MODEL, MESSAGES)),
+                       ("StubProvider", lambda: stub.complete(MESSAGES))]:
+        latencies = []
+        for _ in range(count):
+            start = time.perf_counter()
+            send()
+            latencies.append(time.perf_counter() - start)
+        results[name] = _summary(latencies)
+    results["deterministic"] = len(replies) == 1
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--tokens", type=int, default=60, help="words per mock reply")
+    parser.add_argument("--first-token-ms", type=float, default=20.0)
+    parser.add_argument("--token-ms", type=float, default=0.0)
+    parser.add_argument("--fail-every", type=int, default=3, help="inject a 503 on every Nth request")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    args = parser.parse_args()
+
+    gateway = _import_from("app", "services.chat_gateway")
+    ai_assistant = _import_from("multi_domain_platform", "services.ai_assistant")
+    report = {"requests": args.requests}
+
+    server = start_server(0, args.tokens, args.first_token_ms, args.token_ms)
+    try:
+        report["connection_reuse"] = bench_connection_reuse(server, args.requests, gateway, ai_assistant)
+    finally:
+        server.shutdown()
+    print(f"{'client':<22} {'p50_ms':>8} {'p95_ms':>8} {'connections':>12}")
+    for name, r in report["connection_reuse"].items():
+        print(f"{name:<22} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['connections']:>12}")
+
+    server = start_server(0, args.tokens, args.first_token_ms, args.token_ms, fail_every=args.fail_every)
+    try:
+        report["retries"] = bench_retries(server, args.requests, gateway, ai_assistant)
+    finally:
+        server.shutdown()
+    print(f"\nretries (mock fails every {args.fail_every}th request)")
+    for name, r in report["retries"].items():
+        print(f"{name:<22} {r['succeeded']}/{r['requests']} succeeded, {r['retries']} retries, {r['wall_s']} s")
+
+    report["stub"] = bench_stub(args.requests, gateway, ai_assistant)
+    print(f"\nstub: deterministic={report['stub']['deterministic']}")
+    for name in ("complete_chat_stub", "StubProvider"):
+        r = report["stub"][name]
+        print(f"{name:<22} {r['p50_ms']:>8} {r['p95_ms']:>8}")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.json}")
+    failed = any(r["succeeded"] < r["requests"] for r in report["retries"].values())
+    sys.exit(1 if failed or not report["stub"]["deterministic"] else 0)
+
+
+if __name__ == "__main__":
+    main()
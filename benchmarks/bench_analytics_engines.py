@@ -0,0 +1,91 @@
+"""
+Compare the SQLite and DuckDB analytics engines on the dashboard chart queries.
+
+Each query used by the Analytics sections (counts by severity/status/type,
+priority/category, and the day/week/month trends) is run on both engines
+with the default "everything selected" filters and with a narrowed filter.
+The first DuckDB query also pays for attaching or mirroring the database;
+that warm-up is reported separately.
+
+Run from the repository root:
+    python benchmarks/bench_analytics_engines.py
+    python benchmarks/bench_analytics_engines.py --db /tmp/bench_1m.db --repeat 5 --json engines.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from data.db import DB_PATH  # noqa: E402
+from data.analytics import count_by, trend_counts, close_engines  # noqa: E402
+
+ALL_STATUSES = ["Open", "Investigating", "Resolved", "Closed"]
+ALL_LEVELS = ["Critical", "High", "Medium", "Low"]
+
+FILTER_SETS = {
+    "all": {
+        "incidents": {"severity": ALL_LEVELS, "status": ALL_STATUSES},
+        "tickets": {"priority": ALL_LEVELS, "status": ALL_STATUSES},
+        "datasets": {},
+    },
+    "narrow": {
+        "incidents": {"severity": ["Critical", "High"], "status": ["Open", "Investigating"]},
+        "tickets": {"priority": ["High"], "status": ["Open"]},
+        "datasets": {"category": ["Finance"]},
+    },
+}
+
+CHART_QUERIES = [
+    ("incidents by severity", lambda f, e, db: count_by("incidents", "severity", f["incidents"], e, db)),
+    ("incidents by status", lambda f, e, db: count_by("incidents", "status", f["incidents"], e, db)),
+    ("incident types", lambda f, e, db: count_by("incidents", "incident_type", f["incidents"], e, db)),
+    ("incident trend (day)", lambda f, e, db: trend_counts("incidents", "day", f["incidents"], e, db)),
+    ("incident trend (month)", lambda f, e, db: trend_counts("incidents", "month", f["incidents"], e, db)),
+    ("tickets by priority", lambda f, e, db: count_by("tickets", "priority", f["tickets"], e, db)),
+    ("tickets by category", lambda f, e, db: count_by("tickets", "category", f["tickets"], e, db)),
+    ("ticket trend (week)", lambda f, e, db: trend_counts("tickets", "week", f["tickets"], e, db)),
+    ("datasets by category", lambda f, e, db: count_by("datasets", "category", f["datasets"], e, db)),
+]
+
+def time_call(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    args = parser.parse_args()
+
+    results = {"db": str(args.db), "warmup_seconds": {}, "queries": []}
+    for engine in ("sqlite", "duckdb"):
+        start = time.perf_counter()
+        CHART_QUERIES[0][1](FILTER_SETS["all"], engine, args.db)
+        results["warmup_seconds"][engine] = round(time.perf_counter() - start, 4)
+
+    print(f"{'query':<26} {'filters':<8} {'sqlite ms':>10} {'duckdb ms':>10} {'speed-up':>9}")
+    print("-" * 67)
+    for name, query in CHART_QUERIES:
+        for filter_name, filters in FILTER_SETS.items():
+            sqlite_s = time_call(lambda: query(filters, "sqlite", args.db), args.repeat)
+            duckdb_s = time_call(lambda: query(filters, "duckdb", args.db), args.repeat)
+            results["queries"].append({"query": name, "filters": filter_name,
+                                       "sqlite_seconds": round(sqlite_s, 5), "duckdb_seconds": round(duckdb_s, 5)})
+            print(f"{name:<26} {filter_name:<8} {sqlite_s * 1000:>10.2f} {duckdb_s * 1000:>10.2f} {sqlite_s / duckdb_s:>8.1f}x")
+    print(f"\nWarm-up (connect/attach/mirror): {results['warmup_seconds']}")
+    close_engines()
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
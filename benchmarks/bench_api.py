@@ -0,0 +1,187 @@
+"""
+Load test of the local JSON API (platform_api) against a copy of the database.
+
+Starts `python -m platform_api` on a copy of DATA/intelligence_platform.db,
+then runs --concurrency asyncio clients for --duration seconds. Each client
+keeps one HTTP/1.1 connection open and sends a mix of requests:
+
+- reads: a page of incidents, the page after it (by cursor), one ticket, a
+  search, and an aggregate revalidated with If-None-Match (a 304 while
+  nothing has changed);
+- writes, a --write-ratio share: a new incident, a status change, and a
+  bulk POST of --bulk tickets. These all go through the server's single
+  writer queue.
+
+It reports requests/sec, p50/p95/p99 latency per request kind and overall,
+the status codes seen, and the server's writer counters (how many writes
+shared each commit).
+
+Run from the repository root:
+    python benchmarks/bench_api.py
+    python benchmarks/bench_api.py --concurrency 64 --duration 20 --write-ratio 0.3
+"""
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SOURCE_DB = ROOT / "DATA" / "intelligence_platform.db"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Client:
+    """One keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, port):
+        self.port = port
+        self.reader = self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+
+    async def request(self, method, path, body=None, headers=None):
+        payload = b"" if body is None else json.dumps(body).encode()
+        head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(payload)}\r\n"
+        head += "".join(f"{k}: {v}\r\n" for k, v in (headers or {}).items())
+        self.writer.write(head.encode() + b"\r\n" + payload)
+        await self.writer.drain()
+        lines = (await self.reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ")[1])
+        response_headers = {k.strip().lower(): v.strip() for k, v in (l.split(":", 1) for l in lines[1:] if ":" in l)}
+        data = await self.reader.readexactly(int(response_headers.get("content-length", "0")))
+        return status, response_headers, json.loads(data) if data else None
+
+    async def close(self):
+        self.writer.close()
+
+
+def _incident(rng):
+    return {"date": "2024-06-01", "incident_type": rng.choice(["Phishing", "Malware", "DDoS"]),
+            "severity": rng.choice(["Critical", "High", "Medium", "Low"]), "status": "Open",
+            "description": "load test", "reported_by": f"siem{rng.randrange(10)}"}
+
+
+async def run_client(port, deadline, write_ratio, bulk, seed, latencies, statuses):
+    rng = random.Random(seed)
+    client = Client(port)
+    await client.connect()
+    etag = None
+    try:
+        while time.perf_counter() < deadline:
+            if rng.random() < write_ratio:
+                kind = rng.choice(["post incident", "patch status", "bulk tickets"])
+                if kind == "post incident":
+                    call = ("POST", "/incidents", _incident(rng), None)
+                elif kind == "patch status":
+                    call = ("PATCH", f"/incidents/{rng.randrange(1, 500)}",
+                            {"status": rng.choice(["Open", "Investigating", "Resolved", "Closed"])}, None)
+                else:
+                    call = ("POST", "/tickets/bulk", [{"priority": "Low", "status": "Open", "subject": "load test"}
+                                                      for _ in range(bulk)], None)
+            else:
+                kind = rng.choice(["list page", "next page", "get ticket", "search", "aggregate"])
+                if kind == "list page":
+                    call = ("GET", "/incidents?limit=50", None, None)
+                elif kind == "next page":
+                    _, _, first = await client.request("GET", "/incidents?limit=50")
+                    call = ("GET", f"/incidents?limit=50&cursor={first['next_cursor']}", None, None)
+                elif kind == "get ticket":
+                    call = ("GET", f"/tickets/TCK-{rng.randrange(1, 500):04d}", None, None)
+                elif kind == "search":
+                    call = ("GET", f"/incidents/search?q={rng.choice(['phish', 'malware', 'ddos', 'access'])}",
+                            None, None)
+                else:
+                    call = ("GET", "/incidents/aggregates?by=severity", None,
+                            {"If-None-Match": etag} if etag else None)
+            method, path, body, headers = call
+            start = time.perf_counter()
+            status, response_headers, _ = await client.request(method, path, body, headers)
+            latencies[kind].append(time.perf_counter() - start)
+            statuses[status] += 1
+            if kind == "aggregate" and status == 200:
+                etag = response_headers.get("etag")
+    finally:
+        await client.close()
+
+
+def _percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return pick(0.50), pick(0.95), pick(0.99)
+
+
+async def load(port, args):
+    latencies, statuses = defaultdict(list), Counter()
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(run_client(port, deadline, args.write_ratio, args.bulk, seed, latencies, statuses)
+                           for seed in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    stats_client = Client(port)
+    await stats_client.connect()
+    _, _, server_stats = await stats_client.request("GET", "/stats")
+    await stats_client.close()
+    return latencies, statuses, elapsed, server_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent client connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="share of requests that write")
+    parser.add_argument("--bulk", type=int, default=20, help="tickets per bulk POST")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "api.db"
+        shutil.copy(SOURCE_DB, db)
+        port = _free_port()
+        server = subprocess.Popen([sys.executable, "-m", "platform_api", "--db", str(db), "--port", str(port)],
+                                  cwd=ROOT, stderr=subprocess.DEVNULL)
+        try:
+            for _ in range(100):
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            else:
+                sys.exit("platform_api did not start")
+            latencies, statuses, elapsed, server_stats = asyncio.run(load(port, args))
+        finally:
+            server.terminate()
+            server.wait()
+
+    total = sum(len(samples) for samples in latencies.values())
+    print(f"{total} requests in {elapsed:.1f} s from {args.concurrency} connections: {total / elapsed:.0f} req/s")
+    print(f"{'request':<16}{'count':>8}{'p50_ms':>10}{'p95_ms':>10}{'p99_ms':>10}")
+    for kind in sorted(latencies):
+        p50, p95, p99 = _percentiles(latencies[kind])
+        print(f"{kind:<16}{len(latencies[kind]):>8}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+    p50, p95, p99 = _percentiles([s for samples in latencies.values() for s in samples])
+    print(f"{'all':<16}{total:>8}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+    print("statuses:", dict(sorted(statuses.items())))
+    writer = server_stats["writer"]
+    print(f"writer: {writer['writes']} writes in {writer['batches']} commits "
+          f"(largest {writer['largest_batch']}, {writer['failed']} failed, busy {writer['busy_s']} s); "
+          f"read cache hits {server_stats['database']['cache']['hits']}")
+    if any(status >= 500 for status in statuses):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
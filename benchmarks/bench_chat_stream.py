@@ -0,0 +1,214 @@
+"""
+Offline benchmark and check of the streaming chat mode.
+
+Starts benchmarks/mock_openai_server.py in-process and then:
+
+1. Times one chat request per mode through a real OpenAI client: blocking
+   `chat.completions.create`, app/services/chat_gateway.stream_chat, and
+   multi_domain_platform's AIAssistant.stream. For each it reports the time to
+   first token (ttft_ms) and the total time. A blocking call's first token
+   is its whole response.
+2. Drives the AI Chat Bot section of all four chat pages through AppTest,
+   with streaming on and off, against a copy of the database. It checks
+   that the request carried retrieved platform records and that the reply
+   from the mock ends up in the chat history. It also checks
+   that a reworded repeat is sent to the model while the conversation
+   goes on, and answered from the response cache without another request
+   once it opens a new conversation.
+
+Run from the repository root:
+    python benchmarks/bench_chat_stream.py
+    python benchmarks/bench_chat_stream.py --tokens 200 --first-token-ms 800 --repeat 5
+"""
+import argparse
+import importlib
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "benchmarks"))
+# the app copies below run from temp dirs, away from the shared platform_data package
+sys.path.append(str(ROOT))
+
+from mock_openai_server import start_server
+
+# (app directory, page, database copied into the work dir, stream toggle key)
+CHAT_PAGES = [
+    ("app", "pages/1_Incidents_Dashboard.py", "DATA/intelligence_platform.db", "incidents_stream_chat"),
+    ("app", "pages/2_IT_Dashboard.py", "DATA/intelligence_platform.db", "it_stream_chat"),
+    ("app", "pages/3_AI_Data_Science_Dashboard.py", "DATA/intelligence_platform.db", "ds_stream_chat"),
+    ("multi_domain_platform", "pages/2_🛡️_Cybersecurity.py", "database/platform.db", "cyber_stream_chat"),
+]
+MESSAGES = [
+    {"role": "system", "content": "You are a cybersecurity expert assistant."},
+    {"role": "user", "content": "How do I triage a phishing incident?"},
+]
+
+
+def _import_from(app_dir, name):
+    """Import `name` with `app_dir` as the import root, as that app's pages see it."""
+    path = list(sys.path)
+    sys.path.insert(0, str(ROOT / app_dir))
+    _clear_app_modules()
+    try:
+        return importlib.import_module(name)
+    finally:
+        sys.path[:] = path
+        _clear_app_modules()
+
+
+def time_client_modes(base_url, repeat):
+    """Median ttft/total per mode, in milliseconds."""
+    from openai import OpenAI
+    client = OpenAI(api_key="mock", base_url=base_url)
+    stream_chat = _import_from("app", "services.chat_gateway").stream_chat
+    ai_assistant = _import_from("multi_domain_platform", "services.ai_assistant")
+    assistant = ai_assistant.AIAssistant(provider=ai_assistant.OpenAIProvider("mock", base_url=base_url))
+
+    def blocking():
+        start = time.perf_counter()
+        client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES)
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed
+
+    def app_stream():
+        stats = {}
+        "".join(stream_chat(client, "gpt-4o-mini", MESSAGES, 1.0, stats))
+        return stats["first_token_s"], stats["total_s"]
+
+    def platform_stream():
+        stream = assistant.stream(MESSAGES)
+        "".join(stream)
+        return stream.first_token_s, stream.total_s
+
+    results = {}
+    for name, run in [("blocking", blocking), ("stream_chat", app_stream), ("AIAssistant", platform_stream)]:
+        samples = [run() for _ in range(repeat)]
+        results[name] = {
+            "ttft_ms": round(statistics.median(s[0] for s in samples) * 1000, 1),
+            "total_ms": round(statistics.median(s[1] for s in samples) * 1000, 1),
+        }
+    return results
+
+
+def _clear_app_modules():
+    """Both apps have top-level `services`/`data`/`models` packages; forget the other app's."""
+    for name in list(sys.modules):
+        if name.split(".")[0] in ("services", "data", "models"):
+            del sys.modules[name]
+
+
+def check_page(server, app_dir, page, db, toggle_key, stream):
+    """Send a message, a reworded repeat, then the repeat in a new conversation, through a page's chat section; returns (ok, detail)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        shutil.copytree(ROOT / app_dir, work, dirs_exist_ok=True)
+        source_db = ROOT / db if (ROOT / db).exists() else ROOT / app_dir / db
+        (work / db).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(source_db, work / db)
+        (work / ".streamlit").mkdir(exist_ok=True)
+        (work / ".streamlit" / "secrets.toml").write_text('OPENAI_API_KEY = "mock"\n')
+
+        cwd, path = os.getcwd(), list(sys.path)
+        os.chdir(work)
+        sys.path.insert(0, str(work))
+        _clear_app_modules()
+        st.cache_resource.clear()
+        try:
+            at = AppTest.from_file(str(work / page), default_timeout=60)
+            at.session_state["logged_in"] = True
+            at.session_state["username"] = "bench"
+            at.session_state["role"] = "manager"  # reads every row, so answers are grounded
+            at.run()
+            at.sidebar.selectbox[0].select("AI Chat Bot").run()
+            at.toggle(key=toggle_key).set_value(stream).run()
+            at.text_area[0].input("How do I triage a phishing incident?")
+            send = [b for b in at.button if b.label == "Send"][0]
+            send.click().run()
+            if at.exception:
+                return False, at.exception[0].value
+            history = at.session_state["ai_chat_history"]
+            reply = history[-1]["content"] if history else ""
+            if not reply.startswith("[mock reply to: How do I triage"):
+                return False, f"unexpected history: {history[-2:]}"
+            system = server.last_request["messages"][0]["content"]
+            if "Relevant records from the platform database" not in system:
+                return False, "request was not grounded in platform records"
+
+            # within a conversation the reply depends on the turns before it: no cache
+            requests = server.requests
+            at.text_area[0].input("how do i triage a phishing incident")
+            [b for b in at.button if b.label == "Send"][0].click().run()
+            if at.exception:
+                return False, at.exception[0].value
+            if server.requests == requests:
+                return False, "a follow-up turn was answered from the response cache"
+
+            # a reworded repeat opening a new conversation is answered by the cache, without a request
+            [b for b in at.button if b.label == "Clear Conversation"][0].click().run()
+            requests = server.requests
+            at.text_area[0].input("how do i triage a phishing incident")
+            [b for b in at.button if b.label == "Send"][0].click().run()
+            if at.exception:
+                return False, at.exception[0].value
+            cached = at.session_state["ai_chat_history"][-1]["content"]
+            if cached != reply or server.requests != requests:
+                return False, "repeated question was not served from the response cache"
+            return True, f"{len(reply.split())} words, grounded, follow-up not cached, repeat served from cache"
+        finally:
+            st.cache_resource.clear()
+            os.chdir(cwd)
+            sys.path[:] = path
+            _clear_app_modules()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=60, help="words per mock reply")
+    parser.add_argument("--first-token-ms", type=float, default=300.0)
+    parser.add_argument("--token-ms", type=float, default=20.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-pages", action="store_true", help="only time the client modes")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    args = parser.parse_args()
+
+    server = start_server(0, args.tokens, args.first_token_ms, args.token_ms)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    report = {"mock": {"tokens": args.tokens, "first_token_ms": args.first_token_ms, "token_ms": args.token_ms}}
+    try:
+        report["modes"] = time_client_modes(server.base_url, args.repeat)
+        print(f"{'mode':<14} {'ttft_ms':>9} {'total_ms':>9}")
+        for name, r in report["modes"].items():
+            print(f"{name:<14} {r['ttft_ms']:>9} {r['total_ms']:>9}")
+
+        failures = 0
+        if not args.skip_pages:
+            report["pages"] = []
+            print()
+            for app_dir, page, db, toggle_key in CHAT_PAGES:
+                for stream in (True, False):
+                    ok, detail = check_page(server, app_dir, page, db, toggle_key, stream)
+                    failures += not ok
+                    mode = "stream" if stream else "blocking"
+                    report["pages"].append({"page": f"{app_dir}/{page}", "mode": mode, "ok": ok, "detail": str(detail)})
+                    print(f"{'ok  ' if ok else 'FAIL'} {app_dir}/{page} [{mode}] {detail}")
+    finally:
+        server.shutdown()
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.json}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+What the shared data layer saves on the incident list read.
+
+Times repeated reads of the incident list through the shared, cached
+platform_data.Database against opening a connection per call, as the apps
+used to, on a scratch copy of the app database, and prints the Database's
+pool, cache and per-statement counters. That both front ends agree on what
+they read and write is checked by tests/test_data_parity.py.
+
+Run from the repository root:
+    python benchmarks/bench_data_layer.py
+    python benchmarks/bench_data_layer.py --reads 500
+"""
+import argparse
+import json
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SOURCE_DB = ROOT / "DATA" / "intelligence_platform.db"
+sys.path.append(str(ROOT))
+
+from platform_data import Database
+
+
+def time_reads(db_path, reads):
+    """Median microseconds per incident-list read: shared cached Database vs a connection per call."""
+    sql = "SELECT * FROM cyber_incidents ORDER BY id DESC"
+
+    def per_call():
+        conn = sqlite3.connect(db_path)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    database = Database(db_path)
+    try:
+        results = {}
+        for name, read in [("connect per call", per_call), ("shared Database", lambda: database.fetch_all(sql))]:
+            samples = []
+            for _ in range(reads):
+                start = time.perf_counter()
+                read()
+                samples.append(time.perf_counter() - start)
+            results[name] = round(statistics.median(samples) * 1e6, 1)
+        return results, database.stats()
+    finally:
+        database.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reads", type=int, default=200, help="reads per mode in the timing")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "intelligence_platform.db")
+        shutil.copy(SOURCE_DB, db_path)
+        results, stats = time_reads(db_path, args.reads)
+
+    print("incident list read, median us:")
+    for name, us in results.items():
+        print(f"  {name:<18}{us:>10}")
+    print("\nDatabase stats:")
+    print(json.dumps({k: stats[k] for k in ("pool", "cache")}, indent=2))
+    for name, entry in sorted(stats["queries"].items(), key=lambda kv: -kv[1]["total_ms"])[:5]:
+        print(f"  {name:<28} calls={entry['calls']:<3} total_ms={entry['total_ms']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
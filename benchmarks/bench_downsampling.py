@@ -0,0 +1,70 @@
+"""
+Benchmark the chart downsampling stage.
+
+For each input size an hourly time series is built and turned into the same
+Altair line chart the dashboards render, once with the raw data and once per
+downsampling method. Reports the serialised Vega-Lite spec size and the time
+to downsample + build + serialise the spec.
+
+Run from the repository root:
+    python benchmarks/bench_downsampling.py
+    python benchmarks/bench_downsampling.py --sizes 1000 100000 --width 600 --json results.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from services.downsampling import downsample_for_chart  # noqa: E402
+
+alt.data_transformers.disable_max_rows()
+
+def make_series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2015-01-01", periods=n, freq="h")
+    counts = rng.poisson(5, n) + (np.sin(np.arange(n) / 500) * 4).round().astype(int).clip(min=0)
+    return pd.DataFrame({"date": dates, "count": counts})
+
+def build_spec(df):
+    chart = alt.Chart(df).mark_line(color="#9BB7D4", point=True).encode(
+        x=alt.X("date:T"),
+        y=alt.Y("count:Q")
+    )
+    return chart.to_json()
+
+def run_case(df, method, width):
+    start = time.perf_counter()
+    data = df if method == "raw" else downsample_for_chart(df, "date", "count", width_px=width, method=method)
+    spec = build_spec(data)
+    elapsed = time.perf_counter() - start
+    return {"points": len(data), "spec_bytes": len(spec.encode("utf-8")), "seconds": round(elapsed, 4)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--width", type=int, default=800, help="chart width in pixels")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'rows':>10} {'method':>7} {'points':>8} {'spec KB':>10} {'seconds':>9}")
+    print("-" * 48)
+    for n in args.sizes:
+        df = make_series(n)
+        for method in ("raw", "lttb", "minmax"):
+            result = {"rows": n, "method": method, **run_case(df, method, args.width)}
+            results.append(result)
+            print(f"{n:>10} {method:>7} {result['points']:>8} {result['spec_bytes'] / 1024:>10.1f} {result['seconds']:>9.3f}")
+
+    if args.json:
+        args.json.write_text(json.dumps({"width_px": args.width, "results": results}, indent=2))
+        print(f"\nResults written to {args.json}")
+
+if __name__ == "__main__":
+    main()
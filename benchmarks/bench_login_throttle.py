@@ -0,0 +1,152 @@
+"""
+Load test of login throttling under a credential-stuffing burst.
+
+Runs app/services/user_service.login_user against a scratch database, with
+throttling off and then on. The attack runs --attackers threads, each posing as
+its own client address and trying wrong passwords for --targets real accounts
+at up to --rate attempts per second (as fast as the CPU allows when hashing).
+Meanwhile, every second a different legitimate user logs in with the right
+password from another address.
+
+For each mode it reports:
+- attempts made and how many were rejected before any hashing;
+- bcrypt verifies performed;
+- CPU used (process CPU seconds per wall second, i.e. busy cores);
+- the legitimate user's successful logins and latency.
+
+Run from the repository root:
+    python benchmarks/bench_login_throttle.py
+    python benchmarks/bench_login_throttle.py --attackers 16 --duration 20
+
+The default bcrypt cost is 10, not the 12 that auth.py uses, so a short run on
+a small machine still makes enough attempts to reach the limits.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import bcrypt
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from bench_chat_stream import _import_from
+
+
+def make_database(work, targets, legit, rounds):
+    (work / "DATA").mkdir()
+    conn = sqlite3.connect(work / "DATA" / "intelligence_platform.db")
+    conn.execute("""
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            password_hash TEXT NOT NULL,
+            role TEXT DEFAULT 'user',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""")
+    users = [f"user{i:03d}" for i in range(targets)] + [f"legit{i:03d}" for i in range(legit)]
+    conn.executemany("INSERT INTO users (username, password_hash) VALUES (?, ?)", [
+        (name, bcrypt.hashpw(f"pw-{name}".encode(), bcrypt.gensalt(rounds)).decode()) for name in users
+    ])
+    conn.commit()
+    conn.close()
+    return users[:targets], users[targets:]
+
+
+def run_attack(login_user, targets, legit_users, attackers, rate, duration):
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {"attempts": 0, "throttled": 0, "verifies": 0, "legit_ok": 0, "legit_tries": 0, "legit_ms": []}
+
+    def attacker(index):
+        client, i = f"10.0.0.{index}", index
+        while not stop.wait(1.0 / rate):
+            ok, message = login_user(targets[i % len(targets)], "wrong password", client)
+            i += attackers
+            with lock:
+                stats["attempts"] += 1
+                if message.startswith("Too many"):
+                    stats["throttled"] += 1
+                else:
+                    stats["verifies"] += 1
+
+    def legitimate():
+        i = 0
+        while not stop.wait(1.0):
+            name = legit_users[i % len(legit_users)]
+            i += 1
+            start = time.perf_counter()
+            ok, _ = login_user(name, f"pw-{name}", f"192.168.1.{i % 250}")
+            with lock:
+                stats["legit_tries"] += 1
+                stats["legit_ok"] += ok
+                stats["legit_ms"].append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=attacker, args=(i,)) for i in range(attackers)]
+    threads.append(threading.Thread(target=legitimate))
+    cpu, wall = time.process_time(), time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+
+    legit_ms = stats.pop("legit_ms")
+    stats.update({
+        "wall_s": round(wall, 1),
+        "cpu_cores": round(cpu / wall, 2),
+        "attempts_per_s": round(stats["attempts"] / wall, 1),
+        "legit_p50_ms": round(statistics.median(legit_ms), 1) if legit_ms else None,
+    })
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attackers", type=int, default=8, help="attacking clients (threads)")
+    parser.add_argument("--targets", type=int, default=5, help="real accounts under attack")
+    parser.add_argument("--rate", type=float, default=50.0, help="attempts per second per attacker")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per mode")
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost of the scratch accounts")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    args = parser.parse_args()
+
+    report = {"attackers": args.attackers, "targets": args.targets, "rate": args.rate, "bcrypt_rounds": args.rounds}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        targets, legit_users = make_database(work, args.targets, int(args.duration) + 1, args.rounds)
+        os.chdir(work)
+        try:
+            for mode, flag in (("unthrottled", "0"), ("throttled", "1")):
+                os.environ["LOGIN_THROTTLE"] = flag
+                login_user = _import_from("app", "services.user_service").login_user  # fresh counters
+                report[mode] = run_attack(login_user, targets, legit_users, args.attackers, args.rate, args.duration)
+        finally:
+            os.chdir(cwd)
+            os.environ.pop("LOGIN_THROTTLE", None)
+
+    columns = ("attempts", "throttled", "verifies", "attempts_per_s", "cpu_cores", "legit_ok", "legit_tries",
+               "legit_p50_ms")
+    print(f"{'mode':<12} " + " ".join(f"{c:>14}" for c in columns))
+    for mode in ("unthrottled", "throttled"):
+        print(f"{mode:<12} " + " ".join(f"{str(report[mode][c]):>14}" for c in columns))
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.json}")
+    throttled = report["throttled"]
+    sys.exit(0 if throttled["legit_ok"] == throttled["legit_tries"] else 1)
+
+
+if __name__ == "__main__":
+    main()
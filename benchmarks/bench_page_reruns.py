@@ -0,0 +1,288 @@
+"""
+Headless benchmark of Streamlit page reruns.
+
+Each dashboard page is driven through Streamlit's AppTest: the harness logs in
+by seeding session state, then walks every section. It visits each chart in
+the chart selector, each granularity, the sidebar filters, each manager form
+(filled in and submitted) and the chat section. For every rerun it records:
+
+    wall_ms   time spent in AppTest.run()
+    sql_ms    time spent inside sqlite3 execute/fetch calls made by the page
+              (every sqlite3.connect() is given a timed connection factory)
+    peak_kb   peak traced Python memory during the rerun (tracemalloc)
+
+The pages run against a copy of DATA/intelligence_platform.db in a temporary
+directory, so submitted forms never touch the real database. Each scenario
+runs --repeat times and the median per step is kept.
+
+--save-baseline stores the results. Later runs compare against the stored
+baseline and exit with status 1 when a step got slower or used more memory
+than --tolerance allows. Baselines are machine-specific; store one per machine.
+
+Run from the repository root:
+    python benchmarks/bench_page_reruns.py --save-baseline
+    python benchmarks/bench_page_reruns.py --repeat 5 --json reruns.json
+    python benchmarks/bench_page_reruns.py --pages 1_Incidents_Dashboard --tolerance 0.5
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "app"))
+sys.path.insert(0, str(ROOT))
+
+PAGES = ["1_Incidents_Dashboard", "2_IT_Dashboard", "3_AI_Data_Science_Dashboard"]
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baselines" / "page_reruns.json"
+CHART_SELECTORS = ("Select chart", "Choose visualization")
+
+# ---------------------------
+# Timed SQLite connections
+# ---------------------------
+_sql_seconds = 0.0
+_connect = sqlite3.connect
+
+def _timed(method):
+    def wrapper(self, *args, **kwargs):
+        global _sql_seconds
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            _sql_seconds += time.perf_counter() - start
+    return wrapper
+
+class TimedCursor(sqlite3.Cursor):
+    execute = _timed(sqlite3.Cursor.execute)
+    executemany = _timed(sqlite3.Cursor.executemany)
+    executescript = _timed(sqlite3.Cursor.executescript)
+    fetchone = _timed(sqlite3.Cursor.fetchone)
+    fetchmany = _timed(sqlite3.Cursor.fetchmany)
+    fetchall = _timed(sqlite3.Cursor.fetchall)
+
+class TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+    commit = _timed(sqlite3.Connection.commit)
+
+def timed_connect(*args, **kwargs):
+    kwargs.setdefault("factory", TimedConnection)
+    return _connect(*args, **kwargs)
+
+# ---------------------------
+# Scenario
+# ---------------------------
+def measure(at, results, page, step):
+    """Run one rerun of the page and record its cost under `step`."""
+    global _sql_seconds
+    _sql_seconds = 0.0
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    at.run()
+    wall = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    results.append({
+        "page": page,
+        "step": step,
+        "wall_ms": round(wall * 1000, 3),
+        "sql_ms": round(_sql_seconds * 1000, 3),
+        "peak_kb": round(peak / 1024, 1),
+        "exceptions": [e.value for e in at.exception],
+    })
+
+def _fill_form(at):
+    """Give every visible text field a plausible value so the form submits."""
+    for field in at.text_input:
+        label = field.label.lower()
+        if "yyyy-mm-dd" in label:
+            field.input("2025-01-01")
+        elif "id" in label.split() or "#" in label or "count" in label or "numeric" in label:
+            field.input("1")
+        else:
+            field.input("bench")
+    for area in at.text_area:
+        area.input("benchmark run")
+
+def drive_analytics(at, page, results):
+    charts = [s for s in at.selectbox if s.label in CHART_SELECTORS]
+    if charts:
+        for choice in charts[0].options:
+            chart = [s for s in at.selectbox if s.label in CHART_SELECTORS][0]
+            chart.select(choice)
+            measure(at, results, page, f"Analytics: chart {choice}")
+            for radio in list(at.radio):
+                for option in radio.options:
+                    radio.set_value(option)
+                    measure(at, results, page, f"Analytics: chart {choice} / {option}")
+    for i, multiselect in enumerate(at.sidebar.multiselect):
+        if multiselect.value:
+            at.sidebar.multiselect[i].unselect(multiselect.value[0])
+            measure(at, results, page, f"Analytics: filter {multiselect.label}")
+    for slider in at.sidebar.slider:
+        if not isinstance(slider.value, tuple):
+            continue
+        low, high = slider.value
+        slider.set_range(low + (high - low) / 4, high)
+        measure(at, results, page, f"Analytics: filter {slider.label}")
+
+def drive_manager(at, section, page, results):
+    labels = [b.label for b in at.button if b.label != "Log out"]
+    for label in labels:
+        next(b for b in at.button if b.label == label and not b.proto.form_id).click()
+        measure(at, results, page, f"{section}: open {label}")
+        submits = [b for b in at.button if b.proto.form_id]
+        if submits:
+            _fill_form(at)
+            submits[0].click()
+            measure(at, results, page, f"{section}: submit {label}")
+
+def run_page(page, results):
+    at = AppTest.from_file(str(ROOT / "app" / "pages" / f"{page}.py"), default_timeout=120)
+    at.session_state["logged_in"] = True
+    at.session_state["username"] = "bench"
+    at.session_state["role"] = "manager"  # reads every row; "bench" owns none, so charts would be skipped
+    measure(at, results, page, "initial load")
+    measure(at, results, page, "rerun (no change)")
+    drive_analytics(at, page, results)
+    for section in at.sidebar.selectbox[0].options[1:]:
+        at.sidebar.selectbox[0].select(section)
+        measure(at, results, page, f"{section}: open")
+        if "Chat" not in section:
+            drive_manager(at, section, page, results)
+
+def run_scenarios(pages, repeat, db_source):
+    """Run every page `repeat` times, each time on a fresh database copy."""
+    from data.analytics import close_engines
+    from data.db import close_databases
+
+    runs = []
+    cwd = os.getcwd()
+    sqlite3.connect = timed_connect
+    tracemalloc.start()
+    try:
+        for _ in range(repeat):
+            workdir = Path(tempfile.mkdtemp(prefix="bench_reruns_"))
+            (workdir / "DATA").mkdir()
+            shutil.copy(db_source, workdir / "DATA" / "intelligence_platform.db")
+            # the chat sections read st.secrets; keep them off the network with no API key
+            (workdir / ".streamlit").mkdir()
+            (workdir / ".streamlit" / "secrets.toml").write_text('OPENAI_API_KEY = ""\n')
+            os.chdir(workdir)
+            try:
+                results = []
+                for page in pages:
+                    run_page(page, results)
+                runs.append(results)
+            finally:
+                # shared connections point at this run's database copy; drop them with it
+                st.cache_resource.clear()
+                close_engines()
+                close_databases()
+                os.chdir(cwd)
+                shutil.rmtree(workdir, ignore_errors=True)
+    finally:
+        tracemalloc.stop()
+        sqlite3.connect = _connect
+    return runs
+
+def summarise(runs):
+    """Median of each metric per (page, step) across the repeated runs."""
+    steps = {}
+    for results in runs:
+        for r in results:
+            steps.setdefault((r["page"], r["step"]), []).append(r)
+    summary = []
+    for (page, step), samples in steps.items():
+        summary.append({
+            "page": page,
+            "step": step,
+            "wall_ms": round(statistics.median(s["wall_ms"] for s in samples), 3),
+            "sql_ms": round(statistics.median(s["sql_ms"] for s in samples), 3),
+            "peak_kb": round(statistics.median(s["peak_kb"] for s in samples), 1),
+            "exceptions": sorted({e for s in samples for e in s["exceptions"]}),
+        })
+    return summary
+
+def find_regressions(summary, baseline, tolerance, min_delta_ms, min_delta_kb):
+    """Steps whose time or memory grew beyond `tolerance` (and the absolute noise floor)."""
+    before = {(r["page"], r["step"]): r for r in baseline["results"]}
+    regressions = []
+    for r in summary:
+        old = before.get((r["page"], r["step"]))
+        if old is None:
+            continue
+        for metric, floor in (("wall_ms", min_delta_ms), ("sql_ms", min_delta_ms), ("peak_kb", min_delta_kb)):
+            if r[metric] > old[metric] * (1 + tolerance) and r[metric] - old[metric] > floor:
+                regressions.append({"page": r["page"], "step": r["step"], "metric": metric,
+                                    "baseline": old[metric], "current": r[metric]})
+    return regressions
+
+def print_summary(summary):
+    print(f"{'page':<28} {'step':<52} {'wall ms':>9} {'sql ms':>8} {'peak KB':>9}")
+    print("-" * 110)
+    for r in summary:
+        flag = "  EXC" if r["exceptions"] else ""
+        print(f"{r['page']:<28} {r['step'][:52]:<52} {r['wall_ms']:>9.1f} {r['sql_ms']:>8.1f} {r['peak_kb']:>9.0f}{flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", nargs="+", choices=PAGES, default=PAGES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--db", type=Path, default=ROOT / "DATA" / "intelligence_platform.db",
+                        help="database to copy for the run")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative growth (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=10.0, help="ignore time changes smaller than this")
+    parser.add_argument("--min-delta-kb", type=float, default=512.0, help="ignore memory changes smaller than this")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    args = parser.parse_args()
+
+    summary = summarise(run_scenarios(args.pages, args.repeat, args.db))
+    print_summary(summary)
+    report = {"repeat": args.repeat, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": summary}
+
+    status = 0
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"\nBaseline saved to {args.baseline}")
+    elif args.baseline.exists():
+        regressions = find_regressions(summary, json.loads(args.baseline.read_text()),
+                                       args.tolerance, args.min_delta_ms, args.min_delta_kb)
+        report["regressions"] = regressions
+        if regressions:
+            status = 1
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for r in regressions:
+                print(f"  {r['page']} / {r['step']}: {r['metric']} {r['baseline']} -> {r['current']}")
+        else:
+            print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    else:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to store one.")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.json}")
+    sys.exit(status)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Scale benchmark for ingestion, the app/data query functions, search and aggregation.
+
+For each scale a fresh working directory is created with synthetic CSVs in
+DATA/ (see synthetic_data.py), and `setup_database_complete()` ingests them
+exactly as it does the shipped data. The app/data functions use the relative
+DATA/intelligence_platform.db path, so the harness runs them from inside that
+directory. Each case is timed `--repeat` times and the median is kept. A case
+that raises is recorded with its error, not dropped.
+
+Results are written as JSON. Pass a previous results file to --compare to print
+the ratio of each case's time to the earlier run.
+
+Run from the repository root:
+    python benchmarks/bench_scale.py --scales 10k
+    python benchmarks/bench_scale.py --scales 10k 1m --repeat 5 --json scale.json
+    python benchmarks/bench_scale.py --scales 10k --compare scale.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent / "app"))
+sys.path.insert(0, str(HERE))
+from synthetic_data import SCALES, write_csvs  # noqa: E402
+from data.db import DB_PATH  # noqa: E402
+from data.schema import setup_database_complete  # noqa: E402
+from data import incidents, tickets, datasets, users  # noqa: E402
+from data.summaries import get_incident_kpis, get_ticket_kpis, get_dataset_kpis  # noqa: E402
+from data.rollups import get_trend  # noqa: E402
+from data.analytics import count_by, trend_counts, close_engines  # noqa: E402
+
+def query_cases(db):
+    """(group, name, callable) for every case run against an ingested database."""
+    conn = sqlite3.connect(db)
+    mid = conn.execute("SELECT MAX(id) / 2 FROM datasets_metadata").fetchone()[0] or 1
+    ticket = conn.execute("SELECT ticket_id FROM it_tickets WHERE id = ?", (mid,)).fetchone()
+    ticket = ticket[0] if ticket else "TCK-0000001"
+    user = conn.execute("SELECT username FROM users ORDER BY id DESC LIMIT 1").fetchone()[0]
+    return conn, [
+        ("query", "incidents.get_all_incidents", incidents.get_all_incidents),
+        ("query", "incidents.get_incidents_by_type_count", lambda: incidents.get_incidents_by_type_count(conn)),
+        ("query", "incidents.get_high_severity_by_status", lambda: incidents.get_high_severity_by_status(conn)),
+        ("query", "incidents.get_incident_types_with_many_cases", lambda: incidents.get_incident_types_with_many_cases(conn)),
+        ("query", "tickets.get_all_tickets", tickets.get_all_tickets),
+        ("query", "tickets.get_tickets_by_category_count", lambda: tickets.get_tickets_by_category_count(conn)),
+        ("query", "tickets.get_high_priority_by_status", lambda: tickets.get_high_priority_by_status(conn)),
+        ("query", "tickets.get_tickets_category_with_many_cases", lambda: tickets.get_tickets_category_with_many_cases(conn)),
+        ("query", "datasets.get_all_datasets", datasets.get_all_datasets),
+        ("query", "datasets.get_datasets_by_category", datasets.get_datasets_by_category),
+        ("query", "datasets.get_large_datasets", datasets.get_large_datasets),
+        ("search", "incidents.search_incident", lambda: incidents.search_incident(conn, "INC-0001")),
+        ("search", "tickets.search_ticket", lambda: tickets.search_ticket(conn, ticket)),
+        ("search", "datasets.get_dataset_by_name", lambda: datasets.get_dataset_by_name(mid)),
+        ("search", "users.get_user_by_username", lambda: users.get_user_by_username(user)),
+        ("aggregation", "summaries.get_incident_kpis", lambda: get_incident_kpis(conn)),
+        ("aggregation", "summaries.get_ticket_kpis", lambda: get_ticket_kpis(conn)),
+        ("aggregation", "summaries.get_dataset_kpis", lambda: get_dataset_kpis(conn)),
+        ("aggregation", "rollups.get_trend(incidents, week)", lambda: get_trend(conn, "incidents", "week")),
+        ("aggregation", "rollups.get_trend(tickets, month)", lambda: get_trend(conn, "tickets", "month")),
+        ("aggregation", "analytics.count_by(incidents, severity)", lambda: count_by("incidents", "severity", None, "sqlite", db)),
+        ("aggregation", "analytics.count_by(tickets, category)", lambda: count_by("tickets", "category", None, "sqlite", db)),
+        ("aggregation", "analytics.trend_counts(incidents, day)", lambda: trend_counts("incidents", "day", None, "sqlite", db)),
+    ]
+
+def time_case(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    rows = len(result) if hasattr(result, "__len__") else None
+    return {"seconds": round(statistics.median(samples), 6), "min_seconds": round(min(samples), 6), "rows_returned": rows}
+
+def run_scale(scale, rows, seed, repeat, workdir):
+    workdir.mkdir(parents=True, exist_ok=True)
+    # ingestion appends, so always start from an empty database
+    (workdir / DB_PATH).unlink(missing_ok=True)
+    results = []
+
+    start = time.perf_counter()
+    counts = write_csvs(workdir / "DATA", rows, seed)
+    results.append({"group": "generate", "name": "synthetic_data.write_csvs",
+                    "seconds": round(time.perf_counter() - start, 6), "rows_returned": sum(counts.values())})
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            setup_database_complete()
+        results.append({"group": "ingest", "name": "schema.setup_database_complete",
+                        "seconds": round(time.perf_counter() - start, 6), "rows_returned": sum(counts.values())})
+
+        db = str((workdir / DB_PATH).resolve())
+        conn, cases = query_cases(db)
+        for group, name, fn in cases:
+            try:
+                result = time_case(fn, repeat)
+            except Exception as e:  # a broken query is a finding, not a harness failure
+                result = {"seconds": None, "error": f"{type(e).__name__}: {e}"}
+            results.append({"group": group, "name": name, **result})
+            print(f"  {group:<12} {name:<48} "
+                  + (f"{result['seconds']:>10.4f}s" if result["seconds"] is not None else f"  ERROR {result['error'].splitlines()[-1]}"))
+        conn.close()
+        close_engines()
+    finally:
+        os.chdir(cwd)
+    return [{"scale": scale, "rows": rows, **r} for r in results]
+
+def compare(results, baseline_path):
+    baseline = {(r["scale"], r["name"]): r for r in json.loads(Path(baseline_path).read_text())["results"]}
+    print(f"\nCompared with {baseline_path} (ratio > 1 = slower now)")
+    print(f"{'scale':>6} {'case':<50} {'before':>10} {'now':>10} {'ratio':>7}")
+    for r in results:
+        old = baseline.get((r["scale"], r["name"]))
+        if not old or not old.get("seconds") or r.get("seconds") is None:
+            continue
+        print(f"{r['scale']:>6} {r['name']:<50} {old['seconds']:>10.4f} {r['seconds']:>10.4f} {r['seconds'] / old['seconds']:>7.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=SCALES, default=["10k"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workdir", type=Path, help="keep the generated data here instead of a temp dir")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--compare", type=Path, help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        rows = SCALES[scale]
+        print(f"\n== {scale}: {rows:,} rows per domain table ==")
+        if args.workdir:
+            results += run_scale(scale, rows, args.seed, args.repeat, args.workdir / scale)
+        else:
+            tmp = Path(tempfile.mkdtemp(prefix=f"bench_scale_{scale}_"))
+            try:
+                results += run_scale(scale, rows, args.seed, args.repeat, tmp)
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.json}")
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
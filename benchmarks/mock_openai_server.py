@@ -0,0 +1,162 @@
+"""
+Local mock of the OpenAI chat completions endpoint, for running the chat
+sections offline.
+
+POST /v1/chat/completions answers with a fixed reply of --tokens words. With
+"stream": true the reply is sent as server-sent events, one chunk per word:
+the first after --first-token-ms and the rest every --token-ms, followed by
+"data: [DONE]". Without streaming the complete response is sent once every
+token has been "generated", like the real API. The reply echoes the start of
+the last user message, so tests can check which request was answered.
+
+With --fail-every N every Nth request is answered with a 503 instead (or a
+429 with a Retry-After header, --fail-status 429), to exercise client retries. server.connections counts accepted TCP connections,
+so keep-alive reuse can be measured.
+
+Point the app at it through the environment (the OpenAI client reads it):
+    python benchmarks/mock_openai_server.py --port 8765
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 streamlit run app/Home.py
+The key in .streamlit/secrets.toml can be any non-empty string.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FILLER = ("Check the affected hosts, isolate what is compromised, collect logs "
+          "and escalate according to the runbook before closing the ticket").split()
+
+
+def reply_tokens(messages, count):
+    """The words of the mock reply: an echo of the prompt, then filler text."""
+    prompt = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+    words = [f"[mock reply to: {prompt[:40]}]"]
+    while len(words) < count:
+        words.append(FILLER[(len(words) - 1) % len(FILLER)])
+    return [w if i == 0 else " " + w for i, w in enumerate(words[:count])]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server_version = "MockOpenAI/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send_json(400, {"error": {"message": "invalid JSON body"}})
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+
+        with self.server.lock:
+            self.server.requests += 1
+            failing = self.server.fail_every and self.server.requests % self.server.fail_every == 0
+        if failing:
+            self.server.failures += 1
+            if self.server.fail_status == 429:
+                return self._send_json(429, {"error": {"message": "injected rate limit", "type": "rate_limit_exceeded"}},
+                                       {"Retry-After": str(self.server.retry_after_s)})
+            return self._send_json(503, {"error": {"message": "injected failure", "type": "server_error"}})
+        self.server.last_request = request
+        model = request.get("model", "mock")
+        tokens = reply_tokens(request.get("messages", []), self.server.tokens)
+        created = int(time.time())
+        ident = f"chatcmpl-mock-{self.server.requests}"
+
+        if not request.get("stream"):
+            time.sleep(self.server.first_token_s + self.server.token_s * (len(tokens) - 1))
+            return self._send_json(200, {
+                "id": ident, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "".join(tokens)}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+            })
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def event(delta, finish_reason=None):
+            chunk = {"id": ident, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+
+        time.sleep(self.server.first_token_s)
+        event({"role": "assistant", "content": tokens[0]})
+        for token in tokens[1:]:
+            time.sleep(self.server.token_s)
+            event({"content": token})
+        event({}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def start_server(port=0, tokens=60, first_token_ms=300.0, token_ms=20.0, verbose=False, fail_every=0,
+                 fail_status=503, retry_after_s=1):
+    """Start the mock in a daemon thread; returns the server (server.base_url, server.shutdown())."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockHandler)
+    server.daemon_threads = True
+    server.tokens = tokens
+    server.first_token_s = first_token_ms / 1000
+    server.token_s = token_ms / 1000
+    server.verbose = verbose
+    server.fail_every = fail_every
+    server.fail_status = fail_status
+    server.retry_after_s = retry_after_s
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.failures = 0
+    server.connections = 0
+    server.last_request = None
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tokens", type=int, default=60, help="words per reply")
+    parser.add_argument("--first-token-ms", type=float, default=300.0, help="delay before the first token")
+    parser.add_argument("--token-ms", type=float, default=20.0, help="delay between later tokens")
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every Nth request with an error")
+    parser.add_argument("--fail-status", type=int, choices=(429, 503), default=503)
+    parser.add_argument("--retry-after-s", type=int, default=1, help="Retry-After sent with injected 429s")
+    args = parser.parse_args()
+
+    server = start_server(args.port, args.tokens, args.first_token_ms, args.token_ms, verbose=True,
+                          fail_every=args.fail_every, fail_status=args.fail_status, retry_after_s=args.retry_after_s)
+    print(f"Mock OpenAI server on {server.base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Deterministic synthetic data for the platform tables.
+
+Writes cyber_incidents.csv, it_tickets.csv, datasets_metadata.csv and users.csv
+with the same columns and value vocabularies as the shipped DATA/*.csv files,
+so `setup_database_complete()` can ingest them unchanged. Rows are generated
+in chunks with a seeded NumPy generator: the same seed and scale always give
+byte-identical files, and memory stays bounded at 10M rows.
+
+Run from the repository root:
+    python benchmarks/synthetic_data.py --scale 10k --out /tmp/synthetic
+    python benchmarks/synthetic_data.py --rows 250000 --seed 7 --out /tmp/synthetic
+"""
+import argparse
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Rows per domain table; users are a twentieth of that
+SCALES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+CHUNK_ROWS = 500_000
+
+START_DATE = np.datetime64("2023-01-01")
+DATE_SPAN_DAYS = 3 * 365
+
+INCIDENT_TYPES = ["DDoS Attack", "Data Breach", "Malware Infection", "Phishing Attack", "Ransomware", "Unauthorized Access"]
+INCIDENT_DESCRIPTIONS = ["Data exfiltration suspected", "Detected unusual traffic", "Malware signature found", "Suspicious login attempt"]
+REPORTERS = ["Employee", "IT Admin", "SOC Analyst", "Security Engineer"]
+LEVELS = ["Critical", "High", "Medium", "Low"]
+LEVEL_WEIGHTS = [0.1, 0.25, 0.35, 0.3]
+STATUSES = ["Open", "Investigating", "Resolved", "Closed"]
+TICKET_CATEGORIES = ["Access", "Hardware", "Network", "Other", "Security", "Software"]
+TICKET_SUBJECTS = ["Email not working", "Login issue", "Printer error", "Slow performance", "System outage", "VPN failure"]
+ASSIGNEES = ["Alice", "Bob", "Charlie", "David", "Eve", "Frank"]
+DATASET_CATEGORIES = ["Cybersecurity", "Education", "Finance", "Healthcare", "Retail", "Transportation"]
+DATASET_SOURCES = ["API Feed", "Internal System", "Open Data Portal", "Third-Party Vendor", "User Upload"]
+ROLES = ["user", "manager", "admin"]
+ROLE_WEIGHTS = [0.8, 0.15, 0.05]
+
+def _dates(rng, n):
+    return START_DATE + rng.integers(0, DATE_SPAN_DAYS, n).astype("timedelta64[D]")
+
+def _timestamps(rng, days):
+    seconds = rng.integers(0, 86_400, len(days)).astype("timedelta64[s]")
+    return pd.Series(days.astype("datetime64[s]") + seconds).dt.strftime("%Y-%m-%d %H:%M:%S")
+
+def _choice(rng, values, n, p=None):
+    return np.asarray(values, dtype=object)[rng.choice(len(values), n, p=p)]
+
+def incidents_chunk(rng, start, n):
+    days = _dates(rng, n)
+    return pd.DataFrame({
+        "date": pd.Series(days).dt.strftime("%Y-%m-%d"),
+        "incident_type": _choice(rng, INCIDENT_TYPES, n),
+        "severity": _choice(rng, LEVELS, n, LEVEL_WEIGHTS),
+        "status": _choice(rng, STATUSES, n),
+        "description": _choice(rng, INCIDENT_DESCRIPTIONS, n),
+        "reported_by": _choice(rng, REPORTERS, n),
+        "created_at": _timestamps(rng, days),
+    })
+
+def tickets_chunk(rng, start, n):
+    days = _dates(rng, n)
+    status = _choice(rng, STATUSES, n)
+    subject = _choice(rng, TICKET_SUBJECTS, n)
+    resolved = pd.Series(days + rng.integers(0, 15, n).astype("timedelta64[D]")).dt.strftime("%Y-%m-%d")
+    resolved[~np.isin(status, ["Resolved", "Closed"])] = None
+    user_no = rng.integers(1, 1000, n).astype(str)
+    return pd.DataFrame({
+        "ticket_id": [f"TCK-{i:07d}" for i in range(start + 1, start + n + 1)],
+        "priority": _choice(rng, LEVELS, n, LEVEL_WEIGHTS),
+        "status": status,
+        "category": _choice(rng, TICKET_CATEGORIES, n),
+        "subject": subject,
+        "description": subject + " reported by user " + user_no.astype(object),
+        "created_date": pd.Series(days).dt.strftime("%Y-%m-%d"),
+        "resolved_date": resolved,
+        "assigned_to": _choice(rng, ASSIGNEES, n),
+        "created_at": _timestamps(rng, days),
+    })
+
+def datasets_chunk(rng, start, n):
+    days = _dates(rng, n)
+    return pd.DataFrame({
+        "dataset_name": [f"Dataset_{i:08d}" for i in range(start + 1, start + n + 1)],
+        "category": _choice(rng, DATASET_CATEGORIES, n),
+        "source": _choice(rng, DATASET_SOURCES, n),
+        "last_updated": pd.Series(days).dt.strftime("%Y-%m-%d"),
+        "record_count": rng.integers(1_000, 1_000_000, n),
+        "file_size_mb": rng.uniform(0.5, 500, n).round(2),
+        "created_at": _timestamps(rng, days),
+    })
+
+def users_chunk(rng, start, n):
+    names = [f"user_{i:08d}" for i in range(start + 1, start + n + 1)]
+    return pd.DataFrame({
+        "username": names,
+        "password_hash": [hashlib.sha256(f"password-{name}".encode()).hexdigest() for name in names],
+        "role": _choice(rng, ROLES, n, ROLE_WEIGHTS),
+        "created_at": _timestamps(rng, _dates(rng, n)),
+    })
+
+# CSV file stem (= table name) -> chunk builder
+GENERATORS = {
+    "cyber_incidents": incidents_chunk,
+    "it_tickets": tickets_chunk,
+    "datasets_metadata": datasets_chunk,
+    "users": users_chunk,
+}
+
+def table_rows(rows):
+    """Row counts per table for a given domain size."""
+    return {name: max(1, rows // 20) if name == "users" else rows for name in GENERATORS}
+
+def write_csvs(out_dir, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    """Write one CSV per table into `out_dir`; returns {table: rows written}."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    counts = table_rows(rows)
+    for offset, (name, build) in enumerate(GENERATORS.items()):
+        # one stream per table, so adding a table never shifts another's data
+        rng = np.random.default_rng([seed, offset])
+        path = out_dir / f"{name}.csv"
+        for start in range(0, counts[name], chunk_rows):
+            chunk = build(rng, start, min(chunk_rows, counts[name] - start))
+            chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--scale", choices=SCALES, default="10k")
+    size.add_argument("--rows", type=int, help="rows per domain table (overrides --scale)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, required=True, help="directory for the CSV files")
+    args = parser.parse_args()
+
+    counts = write_csvs(args.out, args.rows or SCALES[args.scale], args.seed)
+    for name, n in counts.items():
+        print(f"{name:<20} {n:>12,} rows -> {args.out / (name + '.csv')}")
+
+if __name__ == "__main__":
+    main()
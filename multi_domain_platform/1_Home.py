@@ -1,13 +1,16 @@
 import streamlit as st
-from services.database_manager import DatabaseManager
+from services.resources import get_database, get_login_throttle, get_session_store
 from services.auth_manager import AuthManager
+from services.login_throttle import LoginThrottled
+from services.session_store import SESSION_TTL_S
 
 # Configure page
 st.set_page_config(page_title="Login / Register", page_icon="🔑", layout="centered")
 
 # Initialize database and auth manager
-db = DatabaseManager("database/platform.db")
-auth = AuthManager(db)
+db = get_database("database/platform.db")
+auth = AuthManager(db, get_login_throttle("database/platform.db"))
+sessions = get_session_store("database/platform.db")
 
 # Session state defaults
 if "logged_in" not in st.session_state:
@@ -21,11 +24,28 @@ if "role" not in st.session_state:
 
 st.title("🔐 Welcome")
 
+# A signed session token in the URL (?session=...) restores the login after a
+# reload or restart without another password check; it is swapped for a new one,
+# so a copied link or a history entry logs in at most once
+SESSION_NOTICE = (f"Your login is kept in this page's address for up to {SESSION_TTL_S // 60} minutes. Don't share "
+                  "or bookmark links to the app while logged in, and log out on shared computers.")
+if not st.session_state.logged_in and "session" in st.query_params:
+    rotated = sessions.rotate(st.query_params["session"])
+    if rotated:
+        token, session = rotated
+        st.query_params["session"] = token
+        st.session_state.logged_in = True
+        st.session_state.username = session["username"]
+        st.session_state.role = session["role"] or ""
+    else:
+        del st.query_params["session"]
+
 # If already logged in, go straight to dashboard (optional)
 if st.session_state.logged_in:
     st.success(f"Already logged in as **{st.session_state.username}**.")
+    st.caption(SESSION_NOTICE)
     if st.button("Go to dashboard"):
-        st.switch_page("pages/2_🛡️_Cybersecurity.py")  # adjust path to your dashboard page
+        st.switch_page("pages/2_🛡️_Cybersecurity.py", query_params=st.query_params.to_dict())  # adjust path to your dashboard page
     st.stop()  # Don’t show login/register again
 
 
@@ -38,17 +58,23 @@ with tab_login:
 
     login_username = st.text_input("Username", key="login_username")
     login_password = st.text_input("Password", type="password", key="login_password")
+    st.caption(SESSION_NOTICE)
 
     if st.button("Log in", type="primary"):
-        user = auth.login_user(login_username, login_password)
-        if user:
-            st.session_state.logged_in = True
-            st.session_state.username = user.get_username()
-            st.session_state.role = user.get_role()
-            st.success(f"Welcome back, {user.get_username()}!")
-            st.switch_page("pages/2_🛡️_Cybersecurity.py")
+        try:
+            user = auth.login_user(login_username, login_password, st.context.ip_address)
+        except LoginThrottled as e:
+            st.error(str(e))
         else:
-            st.error("Invalid username or password.")
+            if user:
+                st.session_state.logged_in = True
+                st.session_state.username = user.get_username()
+                st.session_state.role = user.get_role()
+                token = sessions.create(user.get_username(), user.get_role())
+                st.success(f"Welcome back, {user.get_username()}!")
+                st.switch_page("pages/2_🛡️_Cybersecurity.py", query_params={"session": token})
+            else:
+                st.error("Invalid username or password.")
 
 
 # ----- REGISTER TAB -----
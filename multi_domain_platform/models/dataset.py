@@ -1,14 +1,28 @@
 class Dataset:
-    def __init__(self, dataset_id: int, name: str, size_bytes: int, rows: int, source: str):
+    def __init__(self, dataset_id: int, name: str, size_bytes: int, rows: int, source: str,
+                 category: str = "Other"):
         self.__id = dataset_id
         self.__name = name
         self.__size_bytes = size_bytes
         self.__rows = rows
         self.__source = source
+        self.__category = category
     def calculate_size_mb(self) -> float:
         return self.__size_bytes / (1024 * 1024)
+    def get_id(self) -> int:
+        return self.__id
+    def get_name(self) -> str:
+        return self.__name
+    def get_size_bytes(self) -> int:
+        return self.__size_bytes
+    def get_rows(self) -> int:
+        return self.__rows
     def get_source(self) -> str:
         return self.__source
+    def get_category(self) -> str:
+        return self.__category
+    def update_rows(self, rows: int) -> None:
+        self.__rows = rows
     def __str__(self) -> str:
         size_mb = self.calculate_size_mb()
         return f"Dataset {self.__id}: {self.__name} ({size_mb:.2f} MB, {self.__rows} rows, Source: {self.__source})"
\ No newline at end of file
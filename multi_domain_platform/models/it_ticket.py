@@ -9,8 +9,16 @@ class ITTicket:
         self.__assigned_to = staff
     def close_ticket(self) -> None:
         self.__status = "Closed"
+    def get_id(self) -> int:
+        return self.__id
+    def get_title(self) -> str:
+        return self.__title
+    def get_priority(self) -> str:
+        return self.__priority
     def get_status(self) -> str:
         return self.__status
+    def get_assigned_to(self) -> str:
+        return self.__assigned_to
     def __str__(self) -> str:
         return (
         f"Ticket {self.__id}: {self.__title} "
@@ -1,6 +1,6 @@
 from typing import List, Optional
 from services.database_manager import DatabaseManager
-from datetime import datetime
+from platform_data import incidents
 
 class SecurityIncident:
     def __init__(self, incident_id: int, date: str, incident_type: str,
@@ -44,49 +44,25 @@ class SecurityIncident:
 
     # --- Class methods for CRUD ---
     @classmethod
-    def load_all(cls, db: DatabaseManager) -> List["SecurityIncident"]:
-        rows = db.fetch_all(
-            "SELECT id, date, incident_type, severity, status, description, reported_by, created_at FROM cyber_incidents"
-        )
-        return [cls(*row) for row in rows] if rows else []
+    def load_all(cls, db: DatabaseManager, owner: Optional[str] = None) -> List["SecurityIncident"]:
+        """Every incident, or only ``owner``'s reports (see ``platform_data.schema.row_owner``)."""
+        return [cls(*row) for row in incidents.list_incidents(db, owner, descending=False)]
 
     @classmethod
-    def search(cls, db: DatabaseManager, query: str) -> List["SecurityIncident"]:
-        q = query.strip()
-        try:
-            iid = int(q)
-            rows = db.fetch_all(
-                "SELECT id, date, incident_type, severity, status, description, reported_by, created_at FROM cyber_incidents WHERE id = ?",
-                (iid,)
-            )
-        except ValueError:
-            q_like = f"%{q}%"
-            rows = db.fetch_all(
-                "SELECT id, date, incident_type, severity, status, description, reported_by, created_at FROM cyber_incidents WHERE incident_type LIKE ? OR reported_by LIKE ? OR description LIKE ?",
-                (q_like, q_like, q_like)
-            )
-        return [cls(*row) for row in rows] if rows else []
+    def search(cls, db: DatabaseManager, query: str, owner: Optional[str] = None) -> List["SecurityIncident"]:
+        return [cls(*row) for row in incidents.search_incidents(db, query, owner)]
 
     @classmethod
     def insert(cls, db: DatabaseManager, date: str, incident_type: str,
                severity: str, status: str, description: str, reported_by: str) -> Optional[int]:
-        db.execute_query(
-            "INSERT INTO cyber_incidents (date, incident_type, severity, status, description, reported_by, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (date, incident_type, severity, status, description, reported_by, datetime.utcnow().isoformat())
-        )
-        last = db.fetch_one("SELECT id FROM cyber_incidents ORDER BY id DESC LIMIT 1")
-        return last[0] if last else None
+        return incidents.insert_incident(db, date, incident_type, severity, status, description, reported_by)
 
     @classmethod
-    def update_status_in_db(cls, db: DatabaseManager, incident_id: int, new_status: str) -> bool:
-        db.execute_query("UPDATE cyber_incidents SET status = ? WHERE id = ?", (new_status, incident_id))
-        res = db.fetch_one("SELECT id FROM cyber_incidents WHERE id = ?", (incident_id,))
-        return bool(res)
+    def update_status_in_db(cls, db: DatabaseManager, incident_id: int, new_status: str,
+                            owner: Optional[str] = None) -> bool:
+        """False when no incident has that id or it is not one of ``owner``'s reports."""
+        return incidents.update_incident_status(db, incident_id, new_status, owner) > 0
 
     @classmethod
-    def delete(cls, db: DatabaseManager, incident_id: int) -> int:
-        pre = db.fetch_one("SELECT id FROM cyber_incidents WHERE id = ?", (incident_id,))
-        if not pre:
-            return 0
-        db.execute_query("DELETE FROM cyber_incidents WHERE id = ?", (incident_id,))
-        return 1
\ No newline at end of file
+    def delete(cls, db: DatabaseManager, incident_id: int, owner: Optional[str] = None) -> int:
+        return incidents.delete_incident(db, incident_id, owner)
@@ -8,6 +8,10 @@ class User:
         return self.__username 
     def get_role(self) -> str:
         return self.__role
+    def get_password_hash(self) -> str:
+        return self.__password_hash
+    def set_role(self, role: str) -> None:
+        self.__role = role
     def verify_password(self, plain_password: str, hasher) -> bool:
         return hasher.check_password(plain_password, self.__password_hash)  
     def __str__(self) -> str:
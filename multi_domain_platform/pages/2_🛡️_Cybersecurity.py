@@ -1,15 +1,19 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
-from services.database_manager import DatabaseManager
+from services.resources import get_database, get_chat_provider
+from services.unit_of_work import UnitOfWork
+from services.ai_assistant import CHAT_PROVIDER, AIAssistant
+from services.context_window import ContextWindow
+from services.response_cache import ResponseCache
+from services.retrieval import RecordIndex
 from models.security_incident import SecurityIncident
 from datetime import datetime
 
 DB_PATH = "database/platform.db"
 
-# DB helper
-db = DatabaseManager(DB_PATH)
-db.connect()  # fixed extra paren
+# DB helper (one shared, connected manager per process)
+db = get_database(DB_PATH)
 
 # --- Helpers to convert SecurityIncident objects to DataFrame ---
 def incidents_to_df(incidents):
@@ -153,8 +157,11 @@ elif selection == "Incidents Manager":
             except ValueError:
                 st.warning("Enter numeric ID")
             else:
-                ok = SecurityIncident.update_status_in_db(db, iid, new_status)
-                if ok:
+                with UnitOfWork(db) as uow:
+                    incident = uow.incidents.get(iid)
+                    if incident:
+                        incident.update_status(new_status)
+                if incident:
                     st.success(f"Incident {iid} updated")
                 else:
                     st.error("Incident not found")
@@ -200,10 +207,13 @@ elif selection == "AI Chat Bot":
     # session keys
     if "ai_chat_history" not in st.session_state:
         st.session_state.ai_chat_history = []
+    if "ai_chat_context" not in st.session_state:
+        st.session_state.ai_chat_context = ContextWindow()
+    context = st.session_state.ai_chat_context
 
     # API key from secrets
     api_key = st.secrets.get("OPENAI_API_KEY", None)
-    if not api_key:
+    if not api_key and CHAT_PROVIDER != "stub":
         st.warning("No API key found in .streamlit/secrets.toml — add OPENAI_API_KEY to enable chat.")
 
     # Fixed model for this app
@@ -214,6 +224,9 @@ elif selection == "AI Chat Bot":
         st.subheader("Chat Controls")
         message_count = len(st.session_state.ai_chat_history)
         st.metric("Messages", message_count)
+        if context.last_tokens:
+            st.caption(f"Last request: {context.last_tokens} / {context.budget} tokens, "
+                       f"{context.folded} earlier messages summarised")
 
         temperature = st.slider(
             "Temperature",
@@ -223,10 +236,18 @@ elif selection == "AI Chat Bot":
             step=0.1,
             help="Higher values make output more random"
         )
+        stream_replies = st.toggle("Stream responses", value=True, key="cyber_stream_chat")
+        use_records = st.toggle("Ground answers in platform records", value=True, key="cyber_rag")
+        use_cache = st.toggle("Use response cache", value=True, key="cyber_response_cache")
+        cache = ResponseCache(db)
+        cache_stats = cache.stats()
+        if cache_stats["lookups"]:
+            st.caption(f"Cache: {cache_stats['hit_rate']:.0%} hit rate over {cache_stats['lookups']} lookups "
+                       f"({cache_stats['entries']} entries)")
 
         if st.button("🗑 Clear Chat", use_container_width=True):
             st.session_state.ai_chat_history = []
-            st.experimental_rerun()
+            st.rerun()
 
     # Render chat history
     if st.session_state.ai_chat_history:
@@ -250,10 +271,10 @@ elif selection == "AI Chat Bot":
 
     if clear:
         st.session_state.ai_chat_history = []
-        st.experimental_rerun()
+        st.rerun()
 
     if send and user_input:
-        if not api_key:
+        if not api_key and CHAT_PROVIDER != "stub":
             st.error("No API key configured in secrets; cannot call OpenAI.")
         else:
             system_prompt = (
@@ -261,18 +282,35 @@ elif selection == "AI Chat Bot":
                 "actionable mitigation steps, triage guidance and investigation pointers. Be concise and safety-conscious."
             )
 
-            history_msgs = [{"role": m["role"], "content": m["content"]} for m in st.session_state.ai_chat_history]
-            messages = [{"role": "system", "content": system_prompt}] + history_msgs + [{"role": "user", "content": user_input}]
-
+            # ground the persona in the platform records most relevant to the question
+            request_prompt = cache_prompt = system_prompt
+            if use_records:
+                request_prompt = RecordIndex(db).ground(system_prompt, user_input, domains=("incidents", "tickets"))
+                # grounded and plain replies are cached apart
+                cache_prompt = f"{system_prompt}\n(grounded)"
+            # recent turns within the token budget; older ones are folded into a rolling summary
+            messages = context.build(request_prompt, st.session_state.ai_chat_history, user_input)
+
+            # a follow-up ("tell me more") depends on the conversation so far, so only a
+            # conversation's first question is answered from or stored in the cache
+            use_cache_now = use_cache and not st.session_state.ai_chat_history
             try:
-                from openai import OpenAI
-                client = OpenAI(api_key=api_key)
-                resp = client.chat.completions.create(
-                    model=model,
-                    messages=messages,
-                    temperature=temperature
-                )
-                assistant_text = resp.choices[0].message.content
+                # repeated questions to this persona are answered from the local cache
+                assistant_text = None
+                if use_cache_now:
+                    assistant_text = cache.lookup(cache_prompt, model, temperature, user_input)
+                if assistant_text is None:
+                    assistant = AIAssistant(system_prompt, provider=get_chat_provider(CHAT_PROVIDER, api_key),
+                                            context=context, model=model, temperature=temperature)
+                    if stream_replies:
+                        # show the exchange now and render tokens as they arrive
+                        st.chat_message("user").write(user_input)
+                        with st.chat_message("assistant"):
+                            assistant_text = st.write_stream(assistant.stream(messages))
+                    else:
+                        assistant_text = assistant.complete(messages)
+                    if use_cache_now and assistant_text:
+                        cache.store(cache_prompt, model, temperature, user_input, assistant_text)
             except Exception as e:
                 st.error(f"API request failed: {e}")
                 assistant_text = None
@@ -281,4 +319,4 @@ elif selection == "AI Chat Bot":
             st.session_state.ai_chat_history.append({"role": "user", "content": user_input})
             if assistant_text:
                 st.session_state.ai_chat_history.append({"role": "assistant", "content": assistant_text})
-            st.experimental_rerun()
\ No newline at end of file
+            st.rerun()
\ No newline at end of file
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Puts the repository root on sys.path for platform_data; see platform_data/__init__.py
+if str(Path(__file__).resolve().parents[2]) not in sys.path:
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
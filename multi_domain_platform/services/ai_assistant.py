@@ -1,17 +1,80 @@
-from typing import List, Dict
+import time
+from typing import List, Dict, Iterator, Optional
+from services.context_window import ContextWindow
+# Providers, retry policy and the offline stub, shared with the app front end (see platform_data.chat)
+from platform_data.chat import CHAT_PROVIDER, ChatProvider, OpenAIProvider, StubProvider, create_provider
+
+
+class ChatStream:
+    """Iterates over a provider's streamed reply (for ``st.write_stream``).
+
+    Records the time to first token and the total time.
+    """
+    def __init__(self, provider: ChatProvider, model: str, messages: List[Dict[str, str]], temperature: float = 1.0):
+        self._provider = provider
+        self._model = model
+        self._messages = messages
+        self._temperature = temperature
+        self.first_token_s: Optional[float] = None
+        self.total_s: Optional[float] = None
+        self.text = ""
+    def __iter__(self) -> Iterator[str]:
+        started = time.perf_counter()
+        for text in self._provider.stream(self._messages, self._model, self._temperature):
+            if self.first_token_s is None:
+                self.first_token_s = time.perf_counter() - started
+            self.text += text
+            yield text
+        self.total_s = time.perf_counter() - started
+
+
 class AIAssistant:
-    """Simple wrapper around an AI/chat model.
-    In your real project, connect this to OpenAI or another provider.
+    """Chat gateway: every page sends its requests through one of these.
+
+    Wraps a ``ChatProvider`` (OpenAI or the offline stub). ``complete``/``stream``
+    send a prepared message list, for pages that keep their own history;
+    ``send_message``/``stream_message`` keep the history here, within the token
+    budget of the context window (older turns are folded into its summary).
     """
-    def __init__(self, system_prompt: str = "You are a helpful assistant."):
+    def __init__(self, system_prompt: str = "You are a helpful assistant.",
+                 provider: Optional[ChatProvider] = None, context: Optional[ContextWindow] = None,
+                 model: str = "gpt-4o-mini", temperature: float = 1.0):
         self._system_prompt = system_prompt
+        self._provider = provider or StubProvider()
         self._history: List[Dict[str, str]] = []
+        self._context = context or ContextWindow()
+        self._model = model
+        self._temperature = temperature
+    @property
+    def provider(self) -> ChatProvider:
+        return self._provider
     def set_system_prompt(self, prompt: str) :
         self._system_prompt = prompt
-    def send_message(self, user_message: str) :
+    def build_messages(self, user_message: str) -> List[Dict[str, str]]:
+        """The messages a request for `user_message` would send (within the token budget)."""
+        return self._context.build(self._system_prompt, self._history, user_message)
+    # --- Stateless gateway ---
+    def complete(self, messages: List[Dict[str, str]], model: Optional[str] = None,
+                 temperature: Optional[float] = None) -> str:
+        return self._provider.complete(messages, model or self._model,
+                                       self._temperature if temperature is None else temperature)
+    def stream(self, messages: List[Dict[str, str]], model: Optional[str] = None,
+               temperature: Optional[float] = None) -> ChatStream:
+        return ChatStream(self._provider, model or self._model, messages,
+                          self._temperature if temperature is None else temperature)
+    # --- Conversation kept by the assistant ---
+    def _remember(self, user_message: str, response: str) -> None:
         self._history.append({"role": "user", "content": user_message})
-        response = f"[AI reply to]: {user_message[:50]}"
         self._history.append({"role": "assistant", "content": response})
+        self._history = self._context.compact(self._history)
+    def send_message(self, user_message: str) :
+        response = self.complete(self.build_messages(user_message))
+        self._remember(user_message, response)
         return response
+    def stream_message(self, user_message: str) -> Iterator[str]:
+        stream = self.stream(self.build_messages(user_message))
+        yield from stream
+        self._remember(user_message, stream.text)
     def clear_history(self):
-        self._history.clear()
\ No newline at end of file
+        self._history.clear()
+        self._context.reset()
@@ -1,6 +1,8 @@
 from typing import Optional
 from models.user import User
 from services.database_manager import DatabaseManager
+from services.login_throttle import LoginThrottle
+from platform_data import users
 from pathlib import Path
 import sqlite3
 import bcrypt
@@ -21,8 +23,9 @@ class BcryptHasher:
 class AuthManager:
     """Handles user registration, login, and migration."""
 
-    def __init__(self, db: DatabaseManager):
+    def __init__(self, db: DatabaseManager, throttle: Optional[LoginThrottle] = None):
         self._db = db
+        self._throttle = throttle
 
     # --- Registration ---
     def register_user(self, username: str, password: str, role: str = "user") -> tuple[bool, str]:
@@ -32,34 +35,32 @@ class AuthManager:
             return False, f"Username '{username}' is already taken."
 
         password_hash = BcryptHasher.hash_password(password)
-        self._db.execute_query(
-            "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-            (username, password_hash, role),
-        )
+        users.insert_user(self._db, username, password_hash, role)
         return True, f"User '{username}' registered successfully."
 
     # --- Login ---
-    def login_user(self, username: str, password: str) -> Optional[User]:
-        """Attempt to log in a user. Returns User object if successful, else None."""
-        row = self._db.fetch_one(
-            "SELECT username, password_hash, role FROM users WHERE username = ?",
-            (username,),
-        )
-        if row is None:
-            return None
-
-        username_db, password_hash_db, role_db = row
-        if BcryptHasher.check_password(password, password_hash_db):
-            return User(username_db, password_hash_db, role_db)
-        return None
+    def login_user(self, username: str, password: str, client: Optional[str] = None) -> Optional[User]:
+        """Attempt to log in a user. Returns User object if successful, else None.
+
+        With a throttle, an attempt over the per-username or per-client limit
+        raises ``LoginThrottled`` before the password is hashed.
+        """
+        if self._throttle is not None:
+            self._throttle.check(username, client)
+        row = users.get_user(self._db, username)
+        user = None
+        if row is not None:
+            username_db, password_hash_db, role_db = row
+            if BcryptHasher.check_password(password, password_hash_db):
+                user = User(username_db, password_hash_db, role_db)
+        if self._throttle is not None:
+            self._throttle.record(username, user is not None)
+        return user
 
     # --- Get user by username ---
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Look up a user by username and return a User object."""
-        row = self._db.fetch_one(
-            "SELECT username, password_hash, role FROM users WHERE username = ?",
-            (username,),
-        )
+        row = users.get_user(self._db, username)
         if row:
             return User(row[0], row[1], row[2])
         return None
@@ -67,10 +68,7 @@ class AuthManager:
     # --- Insert user with pre-hashed password ---
     def insert_user(self, username: str, password_hash: str, role: str = "user") -> None:
         """Insert a user when you already have a hashed password (e.g. migration)."""
-        self._db.execute_query(
-            "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-            (username, password_hash, role),
-        )
+        users.insert_user(self._db, username, password_hash, role)
 
     # --- Migrate users from file ---
     def migrate_users_from_file(self, filepath: Path = DATA_DIR / "users.txt") -> None:
@@ -80,33 +78,15 @@ class AuthManager:
             print("   No users to migrate.")
             return
 
-        conn = sqlite3.connect(self._db._db_path)  # direct sqlite3 for bulk ops
-        cursor = conn.cursor()
-        migrated_count = 0
-
         with open(filepath, "r") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-
-                parts = line.split(",")
-                if len(parts) >= 2:
-                    username = parts[0]
-                    password_hash = parts[1]
-
-                    try:
-                        cursor.execute(
-                            "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-                            (username, password_hash, "user"),
-                        )
-                        if cursor.rowcount > 0:
-                            migrated_count += 1
-                    except sqlite3.Error as e:
-                        print(f"Error migrating user {username}: {e}")
-
-        conn.commit()
-        conn.close()
+            rows = [parts[:2] for parts in (line.strip().split(",") for line in f) if len(parts) >= 2]
+
+        # one commit for the whole file; existing usernames are skipped
+        try:
+            migrated_count = users.insert_users(self._db, rows)
+        except sqlite3.Error as e:
+            print(f"Error migrating users: {e}")
+            return
         print(f"✅ Migrated {migrated_count} users from {filepath.name}")
 
     # --- Logout (for Streamlit apps) ---
@@ -0,0 +1,2 @@
+# Token budgeting for chat requests, shared with the app front end (see platform_data.context_window)
+from platform_data.context_window import CHAT_TOKEN_BUDGET, ContextWindow, TokenCounter
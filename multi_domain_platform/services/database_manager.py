@@ -1,33 +1,23 @@
 import sqlite3
 from typing import Any, Iterable
-class DatabaseManager:
-    """Handles SQLite database connections and queries."""
-    def __init__(self, db_path: str):
-        self._db_path = db_path
-        self._connection: sqlite3.Connection | None = None
+from platform_data import Database
+from platform_data.database import POOL_SIZE
+
+
+class DatabaseManager(Database):
+    """Handles SQLite database connections and queries.
+
+    Built on the shared ``platform_data.Database``: statements run on pooled
+    connections, reads are cached until the next commit, and ``transaction()``
+    groups writes into one commit. One manager per process and file (e.g. from
+    ``services.resources``) is safe to use from every session's thread.
+    ``shared=False`` keeps a single connection, for scripts.
+    """
+    def __init__(self, db_path: str, shared: bool = False, cached_statements: int = 128):
+        super().__init__(db_path, pool_size=POOL_SIZE if shared else 1, cached_statements=cached_statements)
+
     def connect(self) -> None:
-        if self._connection is None:
-            self._connection = sqlite3.connect(self._db_path)
-    def close(self) -> None:
-        if self._connection is not None:
-            self._connection.close()
-            self._connection = None
-    def execute_query(self, sql: str, params: Iterable[Any] = ()):
-        if self._connection is None:
-            self.connect()
-        cur = self._connection.cursor()
-        cur.execute(sql, tuple(params))
-        self._connection.commit()
-        return cur
-    def fetch_one(self, sql: str, params: Iterable[Any] = ()):
-        if self._connection is None:
-            self.connect()
-        cur = self._connection.cursor()
-        cur.execute(sql, tuple(params))
-        return cur.fetchone()
-    def fetch_all(self, sql: str, params: Iterable[Any] = ()):
-        if self._connection is None:
-            self.connect()
-        cur = self._connection.cursor()
-        cur.execute(sql, tuple(params))   # <-- missing line
-        return cur.fetchall()
\ No newline at end of file
+        """Kept for callers that open eagerly; connections are opened on first use."""
+
+    def execute_query(self, sql: str, params: Iterable[Any] = ()) -> sqlite3.Cursor:
+        return self.execute(sql, params)
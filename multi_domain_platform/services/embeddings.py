@@ -0,0 +1,2 @@
+# Local hashed text embeddings, shared with the app front end (see platform_data.embeddings)
+from platform_data.embeddings import HashingEmbedder
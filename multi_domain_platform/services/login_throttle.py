@@ -0,0 +1,37 @@
+from typing import Optional
+
+from platform_data import login_throttle
+from platform_data.login_throttle import PERSIST_INTERVAL_S, LoginThrottled
+from services.database_manager import DatabaseManager
+
+
+class LoginThrottle:
+    """Token buckets per username and per client, plus exponential lockout.
+
+    ``check`` runs before the password hash is verified and raises
+    ``LoginThrottled`` without any hashing when the attempt has to wait. The
+    buckets, lockout and their persistence in ``login_throttle`` are shared
+    with the app front end (``platform_data.login_throttle``). Share one
+    throttle per process.
+    """
+
+    def __init__(self, db: DatabaseManager, persist_interval_s: float = PERSIST_INTERVAL_S):
+        self._db = db
+        self._throttle = login_throttle.LoginThrottle(persist_interval_s)
+        self._throttle.load(db)
+
+    def check(self, username: str, client: Optional[str] = None) -> None:
+        """Take a token for this attempt, or raise ``LoginThrottled``."""
+        wait = self._throttle.check(self._db, username, client)
+        if wait > 0:
+            raise LoginThrottled(wait)
+
+    def record(self, username: str, success: bool) -> None:
+        self._throttle.record(self._db, username, success)
+
+    def persist(self, force: bool = False) -> int:
+        """Write changed counters; idle keys (full bucket, no failures) are dropped."""
+        return self._throttle.persist(self._db, force)
+
+    def close(self) -> None:
+        self.persist(force=True)
@@ -0,0 +1,148 @@
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+from models.security_incident import SecurityIncident
+from models.it_ticket import ITTicket
+from models.dataset import Dataset
+from models.user import User
+from platform_data import incidents, tickets
+
+
+class Repository:
+    """Maps one table to one model class and loads rows through the unit of work.
+
+    Subclasses describe the table (``table``, ``key_column``, ``columns``) and how to
+    turn a row into a model (``from_row``) and back (``to_row``). Every object handed
+    out is registered in the unit of work's identity map, so loading the same key
+    twice in one session returns the same instance.
+    """
+    table: str = ""
+    key_column: str = "id"
+    columns: Tuple[str, ...] = ()
+
+    def __init__(self, uow):
+        self._uow = uow
+
+    # --- Mapping hooks ---
+    def from_row(self, row: Tuple[Any, ...]):
+        raise NotImplementedError
+
+    def to_row(self, obj) -> Tuple[Any, ...]:
+        raise NotImplementedError
+
+    def key_of(self, obj) -> Any:
+        return self.to_row(obj)[self.columns.index(self.key_column)]
+
+    def insert_row(self, cursor, obj) -> Any:
+        """Insert a new object and return its key."""
+        cols = [c for c in self.columns if c != self.key_column or self.key_of(obj) is not None]
+        row = dict(zip(self.columns, self.to_row(obj)))
+        cursor.execute(
+            f"INSERT INTO {self.table} ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})",
+            tuple(row[c] for c in cols),
+        )
+        return self.key_of(obj) if self.key_of(obj) is not None else cursor.lastrowid
+
+    # --- Loading ---
+    def _select(self) -> str:
+        return f"SELECT {', '.join(self.columns)} FROM {self.table}"
+
+    def _load(self, row: Tuple[Any, ...]):
+        key = row[self.columns.index(self.key_column)]
+        existing = self._uow.identity_get(self.table, key)
+        if existing is not None:
+            return existing
+        obj = self.from_row(row)
+        self._uow.register_clean(self, key, obj)
+        return obj
+
+    def get(self, key: Any):
+        """Return the object for ``key``, hitting the database only on first access."""
+        existing = self._uow.identity_get(self.table, key)
+        if existing is not None:
+            return existing
+        row = self._uow.db.fetch_one(f"{self._select()} WHERE {self.key_column} = ?", (key,))
+        return self._load(row) if row else None
+
+    def find(self, where: str = "", params: Tuple[Any, ...] = ()) -> List[Any]:
+        sql = self._select() + (f" WHERE {where}" if where else "")
+        rows = self._uow.db.fetch_all(sql, params)
+        return [self._load(row) for row in rows] if rows else []
+
+    # --- Changes ---
+    def add(self, obj) -> None:
+        self._uow.register_new(self, obj)
+
+    def remove(self, obj) -> None:
+        self._uow.register_removed(self, obj)
+
+
+class IncidentRepository(Repository):
+    table = "cyber_incidents"
+    columns = ("id", "date", "incident_type", "severity", "status", "description", "reported_by", "created_at")
+
+    def from_row(self, row):
+        return SecurityIncident(*row)
+
+    def to_row(self, obj: SecurityIncident):
+        return (obj.get_id(), obj.get_date(), obj.get_incident_type(), obj.get_severity(),
+                obj.get_status(), obj.get_description(), obj.get_reported_by(), obj.get_created_at())
+
+    def insert_row(self, cursor, obj: SecurityIncident):
+        cursor.execute(incidents.INSERT_INCIDENT_SQL, incidents.incident_row(*self.to_row(obj)[1:-1]))
+        return cursor.lastrowid
+
+
+class TicketRepository(Repository):
+    table = "it_tickets"
+    columns = ("id", "subject", "priority", "status", "assigned_to")
+
+    def from_row(self, row):
+        return ITTicket(*row)
+
+    def to_row(self, obj: ITTicket):
+        return (obj.get_id(), obj.get_title(), obj.get_priority(), obj.get_status(), obj.get_assigned_to())
+
+    def insert_row(self, cursor, obj: ITTicket):
+        # it_tickets needs a ticket reference and creation date the model does not carry
+        ticket_ref = tickets.next_ticket_ref(cursor)
+        cursor.execute(
+            "INSERT INTO it_tickets (ticket_id, subject, priority, status, assigned_to, created_date) VALUES (?, ?, ?, ?, ?, ?)",
+            (ticket_ref, obj.get_title(), obj.get_priority(), obj.get_status(), obj.get_assigned_to(),
+             datetime.now().strftime("%Y-%m-%d")),
+        )
+        return cursor.lastrowid
+
+
+class DatasetRepository(Repository):
+    table = "datasets_metadata"
+    columns = ("id", "dataset_name", "file_size_mb", "record_count", "source", "category")
+
+    def __init__(self, uow):
+        super().__init__(uow)
+        # file_size_mb as loaded, by object: the model keeps whole bytes, so converting back
+        # would rewrite an unchanged size with a slightly different value on every flush
+        self._loaded_mb: Dict[int, Tuple[int, Any]] = {}
+
+    def from_row(self, row):
+        dataset_id, name, size_mb, rows, source, category = row
+        obj = Dataset(dataset_id, name, int(round((size_mb or 0) * 1024 * 1024)), rows, source, category)
+        self._loaded_mb[id(obj)] = (obj.get_size_bytes(), size_mb)
+        return obj
+
+    def to_row(self, obj: Dataset):
+        loaded = self._loaded_mb.get(id(obj))
+        size_mb = loaded[1] if loaded and loaded[0] == obj.get_size_bytes() else obj.calculate_size_mb()
+        return (obj.get_id(), obj.get_name(), size_mb, obj.get_rows(), obj.get_source(), obj.get_category())
+
+
+class UserRepository(Repository):
+    table = "users"
+    key_column = "username"
+    columns = ("username", "password_hash", "role")
+
+    def from_row(self, row):
+        return User(*row)
+
+    def to_row(self, obj: User):
+        return (obj.get_username(), obj.get_password_hash(), obj.get_role())
+
@@ -0,0 +1,78 @@
+import atexit
+import threading
+from pathlib import Path
+from typing import Any, List, Optional
+
+import streamlit as st
+
+from services.ai_assistant import ChatProvider, create_provider
+from services.database_manager import DatabaseManager
+from services.login_throttle import LoginThrottle
+from services.session_store import SessionStore
+
+
+class ResourceRegistry:
+    """Process-wide record of shared resources so they can be closed on shutdown.
+
+    Streamlit's ``st.cache_resource`` hands the same object to every session; the
+    registry tracks those objects and closes them when an entry is evicted or the
+    interpreter exits (``on_release`` alone is not guaranteed to run at shutdown).
+    """
+
+    def __init__(self):
+        self._resources: List[Any] = []
+        self._lock = threading.Lock()
+
+    def track(self, resource: Any) -> Any:
+        with self._lock:
+            self._resources.append(resource)
+        return resource
+
+    def release(self, resource: Any) -> None:
+        with self._lock:
+            if resource in self._resources:
+                self._resources.remove(resource)
+        self._close(resource)
+
+    def close_all(self) -> None:
+        with self._lock:
+            resources, self._resources = self._resources, []
+        for resource in resources:
+            self._close(resource)
+
+    @staticmethod
+    def _close(resource: Any) -> None:
+        try:
+            resource.close()
+        except Exception:
+            pass
+
+
+registry = ResourceRegistry()
+atexit.register(registry.close_all)
+
+
+@st.cache_resource(show_spinner=False, on_release=registry.release)
+def get_database(db_path: str) -> DatabaseManager:
+    """Shared, connected DatabaseManager for a database file (one per process)."""
+    db = DatabaseManager(db_path, shared=True, cached_statements=256)
+    db.connect()
+    return registry.track(db)
+
+
+@st.cache_resource(show_spinner=False, on_release=registry.release)
+def get_chat_provider(name: str, api_key: Optional[str] = None) -> ChatProvider:
+    """Shared chat provider (``CHAT_PROVIDER``), so its HTTP connection pool is reused across sessions."""
+    return registry.track(create_provider(name, api_key))
+
+
+@st.cache_resource(show_spinner=False, on_release=registry.release)
+def get_session_store(db_path: str) -> SessionStore:
+    """Shared session store (and its LRU cache of validated sessions) for a database file."""
+    return registry.track(SessionStore(get_database(db_path), Path(db_path).with_name("session.key")))
+
+
+@st.cache_resource(show_spinner=False, on_release=registry.release)
+def get_login_throttle(db_path: str) -> LoginThrottle:
+    """Shared login throttle, so every session counts against the same buckets."""
+    return registry.track(LoginThrottle(get_database(db_path)))
@@ -0,0 +1,48 @@
+from typing import Dict, Optional
+
+from platform_data import response_cache
+from platform_data.response_cache import CACHE_MAX_ENTRIES, CACHE_TTL_S, SIMILARITY_THRESHOLD
+from services.database_manager import DatabaseManager
+
+
+class ResponseCache:
+    """SQLite-backed cache of chat replies.
+
+    Entries are keyed on the persona's system prompt, the model, a temperature
+    bucket and the normalised prompt. A miss on the exact key can still be
+    served by the most similar prompt in the same scope (local hashed
+    embeddings). Entries expire after ``ttl_s`` and the least recently used are
+    evicted beyond ``max_entries``. The tables and lookups are shared with the
+    app front end (``platform_data.response_cache``).
+    """
+    EVENTS = response_cache.CACHE_EVENTS
+
+    def __init__(self, db: DatabaseManager, ttl_s: int = CACHE_TTL_S, max_entries: int = CACHE_MAX_ENTRIES,
+                 threshold: float = SIMILARITY_THRESHOLD):
+        self._db = db
+        self._ttl_s = ttl_s
+        self._max_entries = max_entries
+        self._threshold = threshold
+        response_cache.ensure_response_cache_tables(db)
+
+    @staticmethod
+    def normalise(prompt: str) -> str:
+        return response_cache.normalise_prompt(prompt)
+
+    def lookup(self, system_prompt: str, model: str, temperature: float, prompt: str,
+               semantic: bool = True) -> Optional[str]:
+        """Cached reply for this persona/model/temperature and prompt, or None."""
+        return response_cache.lookup_response(self._db, system_prompt, model, temperature, prompt, semantic,
+                                              self._threshold, self._ttl_s)
+
+    def store(self, system_prompt: str, model: str, temperature: float, prompt: str, response: str) -> None:
+        """Cache a reply, then evict expired and least recently used entries."""
+        response_cache.store_response(self._db, system_prompt, model, temperature, prompt, response,
+                                      self._max_entries, self._ttl_s)
+
+    def stats(self) -> Dict[str, float]:
+        """Event counts, entry count and hit rate over all lookups."""
+        return response_cache.cache_stats(self._db)
+
+    def clear(self) -> None:
+        response_cache.clear_response_cache(self._db)
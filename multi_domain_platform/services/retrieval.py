@@ -0,0 +1,41 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from platform_data import retrieval
+from platform_data.retrieval import RAG_MAX_CANDIDATES, RAG_TOKEN_BUDGET, RAG_TOP_K
+from services.database_manager import DatabaseManager
+
+
+class RecordIndex:
+    """On-disk nearest-neighbour index over incidents, tickets and datasets.
+
+    Each record is embedded locally and stored with an inverted file over its
+    non-zero dimensions. A query gathers candidates from its rarest dimensions
+    first (up to ``max_candidates``) and ranks only those by exact cosine
+    similarity. AFTER INSERT/UPDATE/DELETE triggers log changed row ids to
+    ``change_feed``, so ``sync()`` re-embeds just the rows changed since the
+    last sync. The index is shared with the app front end
+    (``platform_data.retrieval``).
+    """
+
+    def __init__(self, db: DatabaseManager, max_candidates: int = RAG_MAX_CANDIDATES):
+        self._db = db
+        self._max_candidates = max_candidates
+        retrieval.ensure_vector_index(db)
+
+    def rebuild(self, domain: str) -> int:
+        """Embed every row of a domain from scratch."""
+        return retrieval.rebuild_index(self._db, domain)
+
+    def sync(self, domains: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Re-embed rows changed since the last sync; rebuilds never-indexed or pruned domains."""
+        return retrieval.sync_index(self._db, domains)
+
+    def search(self, query: str, k: int = RAG_TOP_K, domains: Optional[Sequence[str]] = None,
+               sync: bool = True) -> List[Dict]:
+        """Up to ``k`` records most similar to ``query`` (domain, row_id, text, score), best first."""
+        return retrieval.retrieve(self._db, query, k, domains, sync, self._max_candidates)
+
+    def ground(self, system_prompt: str, question: str, domains: Optional[Sequence[str]] = None,
+               k: int = RAG_TOP_K, budget: int = RAG_TOKEN_BUDGET) -> str:
+        """``system_prompt`` followed by the most relevant records that fit in ``budget`` tokens."""
+        return retrieval.ground_prompt(self._db, system_prompt, question, domains, k, budget)
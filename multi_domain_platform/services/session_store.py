@@ -0,0 +1,65 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from platform_data import sessions
+from platform_data.sessions import SESSION_CACHE_SIZE, SESSION_CACHE_TTL_S, SESSION_TTL_S
+from services.database_manager import DatabaseManager
+
+# Expired and revoked sessions are deleted when the store opens and then at most
+# this often (seconds), from whichever login creates a session once it is due
+SESSION_PURGE_INTERVAL_S = int(os.environ.get("SESSION_PURGE_INTERVAL_S", "3600"))
+
+class SessionStore:
+    """Persistent login sessions with signed, expiring tokens, bound to one database.
+
+    Tokens, the signing key (``SESSION_SECRET`` or a key file next to the
+    database) and the LRU cache of validated sessions are shared with the app
+    front end (``platform_data.sessions.SessionStore``). Share one store per
+    process (``services.resources.get_session_store``). Every restore and
+    renewal adds a row, so dead sessions are purged every ``purge_interval_s``.
+    """
+
+    def __init__(self, db: DatabaseManager, key_path: Path, ttl_s: int = SESSION_TTL_S,
+                 cache_size: int = SESSION_CACHE_SIZE, cache_ttl_s: int = SESSION_CACHE_TTL_S,
+                 purge_interval_s: int = SESSION_PURGE_INTERVAL_S):
+        self._db = db
+        self._store = sessions.SessionStore(key_path, ttl_s, cache_size, cache_ttl_s)
+        self._purge_interval_s = purge_interval_s
+        self._purge_lock = threading.Lock()
+        self._purged_at = 0.0
+        sessions.ensure_sessions_table(db)
+        self.purge_expired()
+
+    def create(self, username: str, role: Optional[str]) -> str:
+        """Record a session and return its token."""
+        if time.monotonic() - self._purged_at >= self._purge_interval_s:
+            self.purge_expired()
+        return self._store.create(self._db, username, role)
+
+    def validate(self, token: Optional[str]) -> Optional[Dict[str, Optional[str]]]:
+        """``{"username", "role"}`` of a live session, or None."""
+        return self._store.validate(self._db, token)
+
+    def revoke(self, token: Optional[str]) -> bool:
+        """Log a session out; True only for the call that revoked it."""
+        return self._store.revoke(self._db, token)
+
+    def rotate(self, token: Optional[str]) -> Optional[Tuple[str, Dict[str, Optional[str]]]]:
+        """Swap a live token for a new one and revoke the old: ``(new token, session)``, or None.
+
+        Restoring a login from the URL rotates its token, so a link copied from
+        the address bar or the browser history logs in at most once.
+        """
+        return self._store.rotate(self._db, token)
+
+    def purge_expired(self) -> int:
+        """Delete expired and revoked sessions; returns the number removed."""
+        with self._purge_lock:
+            self._purged_at = time.monotonic()
+            return self._store.purge_expired(self._db)
+
+    def close(self) -> None:
+        self._store.clear_cache()
@@ -0,0 +1,132 @@
+from typing import Any, Dict, List, Tuple
+from services.database_manager import DatabaseManager
+from services.repositories import (
+    Repository,
+    IncidentRepository,
+    TicketRepository,
+    DatasetRepository,
+    UserRepository,
+)
+
+
+class UnitOfWork:
+    """Session-scoped identity map that batches model changes into one transaction.
+
+    Objects loaded through ``uow.incidents``, ``uow.tickets``, ``uow.datasets`` and
+    ``uow.users`` are cached by key and snapshotted. In-memory mutations such as
+    ``update_status``, ``assign_to`` or ``close_ticket`` are detected on ``commit``
+    by comparing each object against its snapshot, and every dirty, new and removed
+    object is written in a single transaction.
+
+    Usage::
+
+        with UnitOfWork(db) as uow:
+            uow.incidents.get(12).update_status("Closed")
+            uow.tickets.get(3).assign_to("Frank")
+        # committed here, rolled back if the block raised
+    """
+
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+        self._identity: Dict[Tuple[str, Any], Any] = {}
+        self._snapshots: Dict[Tuple[str, Any], Tuple[Any, ...]] = {}
+        self._repos: Dict[Tuple[str, Any], Repository] = {}
+        self._keys: Dict[int, Tuple[str, Any]] = {}
+        self._new: List[Tuple[Repository, Any]] = []
+        self._removed: List[Tuple[Repository, Any]] = []
+        self.incidents = IncidentRepository(self)
+        self.tickets = TicketRepository(self)
+        self.datasets = DatasetRepository(self)
+        self.users = UserRepository(self)
+
+    # --- Context manager ---
+    def __enter__(self) -> "UnitOfWork":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    # --- Identity map ---
+    def identity_get(self, table: str, key: Any):
+        return self._identity.get((table, key))
+
+    def register_clean(self, repo: Repository, key: Any, obj) -> None:
+        self._identity[(repo.table, key)] = obj
+        self._snapshots[(repo.table, key)] = repo.to_row(obj)
+        self._repos[(repo.table, key)] = repo
+        self._keys[id(obj)] = (repo.table, key)
+
+    def register_new(self, repo: Repository, obj) -> None:
+        self._new.append((repo, obj))
+
+    def register_removed(self, repo: Repository, obj) -> None:
+        self._removed.append((repo, obj))
+
+    # --- Change tracking ---
+    def dirty_objects(self) -> List[Tuple[Repository, Any]]:
+        """Loaded objects whose current state differs from their snapshot."""
+        removed_ids = {id(obj) for _, obj in self._removed}
+        dirty = []
+        for ident, obj in self._identity.items():
+            repo = self._repos[ident]
+            if id(obj) not in removed_ids and repo.to_row(obj) != self._snapshots[ident]:
+                dirty.append((repo, obj))
+        return dirty
+
+    def commit(self) -> Dict[str, int]:
+        """Flush inserts, updates and deletes in one transaction. Returns counts per kind."""
+        dirty = self.dirty_objects()
+        updates: Dict[Repository, List[Tuple[Any, ...]]] = {}
+        for repo, obj in dirty:
+            row = dict(zip(repo.columns, repo.to_row(obj)))
+            key = self._key_for(repo, obj)
+            values = [row[c] for c in repo.columns if c != repo.key_column]
+            updates.setdefault(repo, []).append(tuple(values) + (key,))
+
+        deletes: Dict[Repository, List[Tuple[Any]]] = {}
+        for repo, obj in self._removed:
+            deletes.setdefault(repo, []).append((self._key_for(repo, obj),))
+
+        with self.db.transaction() as cursor:
+            for repo, params in updates.items():
+                assignments = ", ".join(f"{c} = ?" for c in repo.columns if c != repo.key_column)
+                cursor.executemany(
+                    f"UPDATE {repo.table} SET {assignments} WHERE {repo.key_column} = ?", params
+                )
+            for repo, obj in self._new:
+                key = repo.insert_row(cursor, obj)
+                self.register_clean(repo, key, obj)
+            for repo, params in deletes.items():
+                cursor.executemany(f"DELETE FROM {repo.table} WHERE {repo.key_column} = ?", params)
+
+        # The database now matches memory: refresh snapshots and forget removed objects
+        for repo, obj in dirty:
+            ident = (repo.table, self._key_for(repo, obj))
+            self._snapshots[ident] = repo.to_row(obj)
+        for repo, obj in self._removed:
+            ident = (repo.table, self._key_for(repo, obj))
+            self._identity.pop(ident, None)
+            self._snapshots.pop(ident, None)
+            self._repos.pop(ident, None)
+            self._keys.pop(id(obj), None)
+        counts = {"updated": len(dirty), "inserted": len(self._new), "deleted": len(self._removed)}
+        self._new.clear()
+        self._removed.clear()
+        return counts
+
+    def rollback(self) -> None:
+        """Discard pending work and forget every loaded object."""
+        self._identity.clear()
+        self._snapshots.clear()
+        self._repos.clear()
+        self._keys.clear()
+        self._new.clear()
+        self._removed.clear()
+
+    def _key_for(self, repo: Repository, obj) -> Any:
+        # Keys come from the identity map so objects inserted this session (no id yet) still resolve
+        ident = self._keys.get(id(obj))
+        return ident[1] if ident else repo.key_of(obj)
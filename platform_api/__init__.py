@@ -0,0 +1,12 @@
+"""A local JSON/HTTP API over the shared data layer (platform_data), for integrations.
+
+Run from the repository root:
+    python -m platform_api
+    python -m platform_api --db DATA/intelligence_platform.db --port 8600
+
+See ``platform_api.server.ApiServer`` for the routes. Set PLATFORM_API_TOKEN
+to require a bearer token; the server binds to 127.0.0.1 unless told otherwise.
+"""
+from platform_api.server import ApiServer
+
+__all__ = ["ApiServer"]
@@ -0,0 +1,3 @@
+from platform_api.server import main
+
+main()
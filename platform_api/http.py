@@ -0,0 +1,125 @@
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+# Largest request body accepted (bulk POSTs included)
+MAX_BODY_BYTES = 8 * 1024 * 1024
+# Largest request line plus headers
+MAX_HEADER_BYTES = 64 * 1024
+
+
+class HTTPError(Exception):
+    """Turned into a JSON error response with ``status``."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes = b""
+    keep_alive: bool = True
+
+    def json(self) -> Any:
+        try:
+            return json.loads(self.body or b"null")
+        except ValueError:
+            raise HTTPError(400, "request body is not valid JSON") from None
+
+    def int_param(self, name: str, default: Optional[int] = None, minimum: int = 0,
+                  maximum: Optional[int] = None) -> Optional[int]:
+        raw = self.query.get(name)
+        if raw is None or raw == "":
+            return default
+        try:
+            value = int(raw)
+        except ValueError:
+            raise HTTPError(400, f"{name} must be an integer") from None
+        if value < minimum or (maximum is not None and value > maximum):
+            raise HTTPError(400, f"{name} must be between {minimum} and {maximum}")
+        return value
+
+
+@dataclass
+class Response:
+    status: int = 200
+    body: Any = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def encode(self) -> bytes:
+        return b"" if self.body is None else json.dumps(self.body, default=str, separators=(",", ":")).encode()
+
+
+def etag_for(payload: bytes) -> str:
+    """A strong ETag for an encoded response body."""
+    return '"' + hashlib.blake2b(payload, digest_size=12).hexdigest() + '"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """The next request on a connection, or None once the client has closed it."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as exc:
+        if exc.partial.strip():
+            raise HTTPError(400, "incomplete request") from None
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(431, "request headers too large") from None
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "malformed request line") from None
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(400, "invalid Content-Length") from None
+    if length < 0:
+        raise HTTPError(400, "invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, f"request body over {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    url = urlsplit(target)
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    return Request(method.upper(), url.path.rstrip("/") or "/", dict(parse_qsl(url.query)), headers, body, keep_alive)
+
+
+def write_response(writer: asyncio.StreamWriter, request: Optional[Request], response: Response) -> None:
+    """Encode ``response``; GETs get an ETag and become 304 Not Modified when ``If-None-Match`` matches it."""
+    payload = response.encode()
+    headers = dict(response.headers)
+    if request is not None and request.method in ("GET", "HEAD") and response.status == 200:
+        etag = etag_for(payload)
+        headers["ETag"] = etag
+        if _etag_matches(request.headers.get("if-none-match", ""), etag):
+            response, payload = Response(304), b""
+    if request is not None and request.method == "HEAD":
+        payload = b""
+    status = HTTPStatus(response.status)
+    headers.setdefault("Content-Type", "application/json")
+    headers["Content-Length"] = str(len(payload))
+    headers["Connection"] = "keep-alive" if request is not None and request.keep_alive else "close"
+    head = f"HTTP/1.1 {status.value} {status.phrase}\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+    writer.write(head.encode("latin-1") + b"\r\n" + payload)
+
@@ -0,0 +1,176 @@
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from platform_data import aggregates, datasets, incidents, tickets
+from platform_api.http import HTTPError
+
+# Rows per page when the client does not ask, and the most it may ask for
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Items accepted by one bulk POST
+MAX_BULK_ITEMS = 5000
+
+TYPE_NAMES = {str: "string", int: "integer", float: "number"}
+# A writable field: (name, type, required, allowed values or None)
+Field = Tuple[str, type, bool, Optional[Sequence[str]]]
+
+
+@dataclass
+class Resource:
+    """How the API maps one domain onto the shared data layer."""
+
+    name: str
+    columns: Sequence[str]
+    fields: Sequence[Field]
+    key_type: type
+    # (db, owner, after, limit) -> one page, newest first; owner is ignored unless ``owned``
+    list_rows: Callable[..., List[Tuple[Any, ...]]]
+    get_row: Callable[..., Optional[Tuple[Any, ...]]]
+    search_rows: Callable[..., List[Tuple[Any, ...]]]
+    insert: Callable[..., Any]
+    insert_many: Callable[..., Any]
+    update: Callable[..., int]
+    delete: Callable[..., int]
+    owned: bool = True
+    defaults: Optional[Callable[[], Dict[str, Any]]] = None
+
+    def to_dict(self, row: Tuple[Any, ...]) -> Dict[str, Any]:
+        return dict(zip(self.columns, row))
+
+    def parse_key(self, raw: str) -> Any:
+        if self.key_type is int:
+            try:
+                return int(raw)
+            except ValueError:
+                raise HTTPError(404, f"no {self.name} {raw!r}") from None
+        return raw.upper()
+
+    def values(self, payload: Any) -> Tuple[Any, ...]:
+        """The insert arguments for one JSON object, in ``fields`` order; 400 when it is invalid."""
+        if not isinstance(payload, dict):
+            raise HTTPError(400, f"a {self.name} must be a JSON object")
+        payload = {**(self.defaults() if self.defaults else {}), **payload}
+        unknown = set(payload) - {f[0] for f in self.fields}
+        if unknown:
+            raise HTTPError(400, f"unknown {self.name} field(s): {', '.join(sorted(unknown))}")
+        return tuple(_check(self.name, f, payload.get(f[0])) for f in self.fields)
+
+
+def _check(resource: str, spec: Field, value: Any) -> Any:
+    name, kind, required, choices = spec
+    if value is None or value == "":
+        if required:
+            raise HTTPError(400, f"{resource} field {name!r} is required")
+        return None
+    if kind is float and isinstance(value, int) and not isinstance(value, bool):
+        value = float(value)
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise HTTPError(400, f"{resource} field {name!r} must be a {TYPE_NAMES[kind]}")
+    if choices is not None and value not in choices:
+        raise HTTPError(400, f"{resource} field {name!r} must be one of {', '.join(choices)}")
+    return value
+
+
+def _today() -> Dict[str, Any]:
+    return {"created_date": date.today().isoformat()}
+
+
+def _update_status(update: Callable[..., int]) -> Callable[..., int]:
+    def run(db, key, changes):
+        return update(db, key, changes["status"])
+    return run
+
+
+RESOURCES = {
+    "incidents": Resource(
+        name="incident",
+        columns=incidents.INCIDENT_COLUMNS,
+        fields=[("date", str, True, None), ("incident_type", str, True, None),
+                ("severity", str, True, incidents.SEVERITIES), ("status", str, True, incidents.STATUSES),
+                ("description", str, False, None), ("reported_by", str, False, None)],
+        key_type=int,
+        list_rows=lambda db, owner, after, limit: incidents.list_incidents(db, owner, True, after, limit),
+        get_row=incidents.get_incident,
+        search_rows=incidents.search_incidents,
+        insert=incidents.insert_incident,
+        insert_many=incidents.insert_incidents,
+        update=_update_status(incidents.update_incident_status),
+        delete=incidents.delete_incident,
+    ),
+    "tickets": Resource(
+        name="ticket",
+        columns=tickets.TICKET_COLUMNS,
+        fields=[("priority", str, True, tickets.PRIORITIES), ("status", str, True, tickets.STATUSES),
+                ("category", str, False, None), ("subject", str, True, None), ("description", str, False, None),
+                ("created_date", str, True, None), ("resolved_date", str, False, None),
+                ("assigned_to", str, False, None)],
+        key_type=str,
+        list_rows=lambda db, owner, after, limit: tickets.list_tickets(db, owner, True, after, limit),
+        get_row=tickets.get_ticket,
+        search_rows=tickets.search_tickets,
+        insert=tickets.insert_ticket,
+        insert_many=tickets.insert_tickets,
+        update=_update_status(tickets.update_ticket_status),
+        delete=tickets.delete_ticket,
+        defaults=_today,
+    ),
+    "datasets": Resource(
+        name="dataset",
+        columns=datasets.DATASET_COLUMNS,
+        fields=[("dataset_name", str, True, None), ("category", str, True, None), ("source", str, True, None),
+                ("last_updated", str, False, None), ("record_count", int, False, None),
+                ("file_size_mb", float, False, None)],
+        key_type=int,
+        list_rows=lambda db, owner, after, limit: datasets.list_datasets(db, True, after, limit),
+        get_row=lambda db, key, owner: datasets.get_dataset(db, key),
+        search_rows=lambda db, query, owner: datasets.search_datasets(db, query),
+        insert=datasets.insert_dataset,
+        insert_many=datasets.insert_datasets,
+        update=lambda db, key, changes: datasets.update_dataset(db, key, **changes),
+        delete=datasets.delete_dataset,
+        owned=False,
+    ),
+}
+
+
+def encode_cursor(last_id: int) -> str:
+    """An opaque cursor for the page after the row with id ``last_id``."""
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    if not cursor:
+        return None
+    try:
+        kind, value = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split(":", 1)
+        if kind == "id":
+            return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        pass
+    raise HTTPError(400, "invalid cursor")
+
+
+def update_changes(resource: Resource, payload: Any) -> Dict[str, Any]:
+    """The validated fields a PATCH may change: status for incidents and tickets, any field for datasets."""
+    if not isinstance(payload, dict) or not payload:
+        raise HTTPError(400, f"PATCH needs a JSON object of {resource.name} fields to change")
+    allowed = {f[0]: f for f in resource.fields}
+    if resource.owned:
+        allowed = {"status": allowed["status"]}
+    unknown = set(payload) - set(allowed)
+    if unknown:
+        raise HTTPError(400, f"cannot change {resource.name} field(s): {', '.join(sorted(unknown))}")
+    return {name: _check(resource.name, allowed[name], value) for name, value in payload.items()}
+
+
+def count_rows(db, domain: str, column: Optional[str], owner: Optional[str]) -> List[Dict[str, Any]]:
+    if not column:
+        raise HTTPError(400, f"pass ?by= one of {', '.join(aggregates.GROUP_COLUMNS[domain][1])}")
+    try:
+        rows = aggregates.count_by(db, domain, column, owner)
+    except ValueError as exc:
+        raise HTTPError(400, str(exc)) from None
+    return [{"value": value, "count": count} for value, count in rows]
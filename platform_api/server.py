@@ -0,0 +1,240 @@
+import argparse
+import asyncio
+import hmac
+import logging
+import os
+import re
+import sqlite3
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from platform_data import Database
+from platform_data.schema import ensure_owner_indexes
+from platform_api.http import MAX_HEADER_BYTES, HTTPError, Request, Response, read_request, write_response
+from platform_api.routes import (
+    DEFAULT_PAGE_SIZE,
+    MAX_BULK_ITEMS,
+    MAX_PAGE_SIZE,
+    RESOURCES,
+    Resource,
+    count_rows,
+    decode_cursor,
+    encode_cursor,
+    update_changes,
+)
+from platform_api.writer import WriteQueue
+
+log = logging.getLogger("platform_api")
+
+DEFAULT_DB_PATH = Path("DATA") / "intelligence_platform.db"
+DEFAULT_HOST = os.environ.get("PLATFORM_API_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.environ.get("PLATFORM_API_PORT", "8600"))
+# When set, every request except /health must send "Authorization: Bearer <token>"
+API_TOKEN = os.environ.get("PLATFORM_API_TOKEN", "")
+
+ROUTE = re.compile(r"^/(?P<domain>incidents|tickets|datasets)(?:/(?P<item>[^/]+))?(?:/(?P<extra>[^/]+))?$")
+
+
+class ApiServer:
+    """JSON over HTTP/1.1 for the incident, ticket and dataset data, on asyncio streams.
+
+    Reads run on the default thread pool against the shared ``Database`` (pooled
+    connections, cached results); writes go through a ``WriteQueue``. Routes, for
+    each of ``/incidents``, ``/tickets`` and ``/datasets``:
+
+    - ``GET /{domain}?limit=&cursor=&owner=``: one page, newest first, with a
+      ``next_cursor`` for the page after it (null on the last page);
+    - ``GET /{domain}/search?q=``, ``GET /{domain}/aggregates?by=<column>``;
+    - ``GET /{domain}/{key}``, ``PATCH /{domain}/{key}``, ``DELETE /{domain}/{key}``;
+    - ``POST /{domain}`` with one object, ``POST /{domain}/bulk`` with a list,
+      inserted all-or-nothing.
+
+    Incidents and datasets are keyed by id, tickets by reference ("TCK-0001").
+    Every 200 GET carries an ETag, and a matching ``If-None-Match`` gets 304
+    with no body. ``GET /health`` and ``GET /stats`` report liveness and the
+    database and writer counters.
+    """
+
+    def __init__(self, db_path: str = str(DEFAULT_DB_PATH), host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 token: str = API_TOKEN):
+        self.db_path = db_path
+        self.host = host
+        self.port = port
+        self._token = token
+        self.db: Optional[Database] = None
+        self.writes: Optional[WriteQueue] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    # --- Lifecycle ---
+    async def start(self) -> None:
+        if not Path(self.db_path).exists():
+            raise FileNotFoundError(f"database not found: {self.db_path}")
+        self.db = Database(self.db_path)
+        await self._read(ensure_owner_indexes)
+        self.writes = WriteQueue(self.db)
+        self.writes.start()
+        self._server = await asyncio.start_server(self._serve, self.host, self.port, limit=MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        log.info("platform API on http://%s:%s (%s)", self.host, self.port, self.db_path)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self.writes is not None:
+            await self.writes.stop()
+            self.writes = None
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    # --- Connections ---
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = None
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    response = await self.handle(request)
+                except HTTPError as exc:
+                    response = Response(exc.status, {"error": exc.message})
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    break
+                except Exception:
+                    log.exception("unhandled error")
+                    response = Response(500, {"error": "internal error"})
+                write_response(writer, request, response)
+                await writer.drain()
+                if request is None or not request.keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(None, partial(fn, self.db, *args))
+
+    async def _write(self, fn: Callable[..., Any], *args: Any) -> Any:
+        try:
+            return await self.writes.submit(fn, *args)
+        except sqlite3.IntegrityError as exc:
+            raise HTTPError(409, f"rejected by the database: {exc}") from None
+        except ValueError as exc:
+            raise HTTPError(400, str(exc)) from None
+
+    # --- Routing ---
+    async def handle(self, request: Request) -> Response:
+        if request.path == "/health":
+            return Response(200, {"status": "ok"})
+        if self._token and not hmac.compare_digest(request.headers.get("authorization", ""),
+                                                   f"Bearer {self._token}"):
+            raise HTTPError(401, "missing or wrong API token")
+        if request.path == "/stats":
+            return Response(200, {"database": self.db.stats(), "writer": self.writes.stats()})
+        match = ROUTE.match(request.path)
+        if match is None:
+            raise HTTPError(404, f"no route for {request.path}")
+        domain, item, extra = match.group("domain", "item", "extra")
+        resource = RESOURCES[domain]
+        method = "GET" if request.method == "HEAD" else request.method
+        if item is None:
+            handler = {"GET": self._list, "POST": self._create}.get(method)
+        elif extra is None and item == "bulk":
+            handler = {"POST": self._create_bulk}.get(method)
+        elif extra is None and item in ("search", "aggregates"):
+            handler = {"GET": self._search if item == "search" else self._aggregate}.get(method)
+        elif extra is None:
+            handler = {"GET": self._get, "PATCH": self._update, "DELETE": self._delete}.get(method)
+        else:
+            raise HTTPError(404, f"no route for {request.path}")
+        if handler is None:
+            raise HTTPError(405, f"{request.method} not allowed on {request.path}")
+        return await handler(request, resource, domain, item)
+
+    # --- Reads ---
+    async def _list(self, request: Request, resource: Resource, domain: str, item: None) -> Response:
+        limit = request.int_param("limit", DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+        after = decode_cursor(request.query.get("cursor"))
+        # one extra row tells whether another page follows
+        rows = await self._read(resource.list_rows, request.query.get("owner"), after, limit + 1)
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return Response(200, {
+            "items": [resource.to_dict(row) for row in rows],
+            "next_cursor": encode_cursor(rows[-1][0]) if more else None,
+        })
+
+    async def _search(self, request: Request, resource: Resource, domain: str, item: str) -> Response:
+        query = request.query.get("q", "").strip()
+        if not query:
+            raise HTTPError(400, "pass ?q= to search")
+        rows = await self._read(resource.search_rows, query, request.query.get("owner"))
+        return Response(200, {"items": [resource.to_dict(row) for row in rows]})
+
+    async def _aggregate(self, request: Request, resource: Resource, domain: str, item: str) -> Response:
+        column = request.query.get("by")
+        counts = await self._read(count_rows, domain, column, request.query.get("owner"))
+        return Response(200, {"by": column, "counts": counts})
+
+    async def _get(self, request: Request, resource: Resource, domain: str, item: str) -> Response:
+        row = await self._read(resource.get_row, resource.parse_key(item), None)
+        if row is None:
+            raise HTTPError(404, f"no {resource.name} {item!r}")
+        return Response(200, resource.to_dict(row))
+
+    # --- Writes ---
+    async def _create(self, request: Request, resource: Resource, domain: str, item: None) -> Response:
+        key = await self._write(resource.insert, *resource.values(request.json()))
+        return Response(201, {"key": key}, {"Location": f"/{domain}/{key}"})
+
+    async def _create_bulk(self, request: Request, resource: Resource, domain: str, item: str) -> Response:
+        payload = request.json()
+        if not isinstance(payload, list) or not payload:
+            raise HTTPError(400, f"bulk POST needs a non-empty JSON list of {resource.name}s")
+        if len(payload) > MAX_BULK_ITEMS:
+            raise HTTPError(413, f"at most {MAX_BULK_ITEMS} {resource.name}s per bulk POST")
+        rows = []
+        for index, obj in enumerate(payload):
+            try:
+                rows.append(resource.values(obj))
+            except HTTPError as exc:
+                raise HTTPError(exc.status, f"item {index}: {exc.message}") from None
+        keys = await self._write(resource.insert_many, rows)
+        return Response(201, {"keys": keys, "count": len(keys)})
+
+    async def _update(self, request: Request, resource: Resource, domain: str, item: str) -> Response:
+        key = resource.parse_key(item)
+        changes = update_changes(resource, request.json())
+        if not await self._write(resource.update, key, changes):
+            raise HTTPError(404, f"no {resource.name} {item!r}")
+        return Response(200, {"key": key, "updated": changes})
+
+    async def _delete(self, request: Request, resource: Resource, domain: str, item: str) -> Response:
+        if not await self._write(resource.delete, resource.parse_key(item)):
+            raise HTTPError(404, f"no {resource.name} {item!r}")
+        return Response(204)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Serve the platform's incidents, tickets and datasets as JSON.")
+    parser.add_argument("--db", default=str(DEFAULT_DB_PATH), help="SQLite database file")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        asyncio.run(ApiServer(args.db, args.host, args.port).serve_forever())
+    except KeyboardInterrupt:
+        pass
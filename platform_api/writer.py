@@ -0,0 +1,106 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from platform_data import Database
+
+# Writes applied together in one transaction, at most
+MAX_BATCH = 64
+# Writes waiting before submitters are made to wait for room
+MAX_PENDING = 1000
+
+Write = Tuple[Callable[..., Any], Tuple[Any, ...], "asyncio.Future[Any]"]
+
+
+class WriteQueue:
+    """Serialises every write through one task and one thread.
+
+    SQLite allows one writer at a time; concurrent requests that each opened a
+    write transaction would queue on the file lock with a busy timeout instead.
+    Here writes wait in an asyncio queue, and the writer takes whatever is
+    waiting (up to ``MAX_BATCH``) and applies it in a single transaction. If
+    one write in a batch fails (a CHECK constraint, say) the batch is rolled
+    back and replayed one write per transaction, so the failure is reported to
+    its caller alone. Requests are validated before they are queued, so that
+    replay is rare; per-write savepoints would cost every write two more
+    statements instead.
+    """
+
+    def __init__(self, db: Database, max_batch: int = MAX_BATCH, max_pending: int = MAX_PENDING):
+        self._db = db
+        self._max_batch = max_batch
+        self._queue: "asyncio.Queue[Optional[Write]]" = asyncio.Queue(max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.batches = 0
+        self.writes = 0
+        self.failed = 0
+        self.largest_batch = 0
+        self.busy_s = 0.0
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Finish the writes already queued, then stop."""
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+        self._executor.shutdown(wait=True)
+
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Queue ``fn(*args)`` (a write through the shared Database) and return its result once committed."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((fn, args, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            batch: List[Write] = []
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self._max_batch or self._queue.empty():
+                    break
+                item = self._queue.get_nowait()
+            stopping = item is None
+            if not batch:
+                continue
+            start = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self._executor, partial(self._apply, batch))
+            except Exception as exc:  # the commit itself failed: nothing in the batch was written
+                results = [exc] * len(batch)
+            self.busy_s += time.perf_counter() - start
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for (_, _, future), result in zip(batch, results):
+                if future.cancelled():
+                    continue
+                if isinstance(result, Exception):
+                    self.failed += 1
+                    future.set_exception(result)
+                else:
+                    self.writes += 1
+                    future.set_result(result)
+
+    def _apply(self, batch: List[Write]) -> List[Any]:
+        try:
+            with self._db.transaction():
+                return [fn(self._db, *args) for fn, args, _ in batch]
+        except Exception as exc:
+            if len(batch) == 1:
+                return [exc]
+        results: List[Any] = []
+        for write in batch:
+            results += self._apply([write])
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pending": self._queue.qsize(), "batches": self.batches, "writes": self.writes,
+                "failed": self.failed, "largest_batch": self.largest_batch, "busy_s": round(self.busy_s, 3)}
@@ -0,0 +1,20 @@
+"""Data access shared by both front ends (app/ and multi_domain_platform/).
+
+``Database`` wraps one SQLite file with a connection pool, a read cache that
+is dropped on every commit, batched writes and per-statement timings. The
+domain modules (``incidents``, ``tickets``, ``datasets``, ``users``) hold the
+SQL both front ends run, and ``schema`` holds row ownership. Every domain
+function takes either a ``Database`` or a plain ``sqlite3.Connection``. The
+login, chat and search support both front ends share (``sessions``,
+``login_throttle``, ``chat``, ``response_cache``, ``context_window``,
+``embeddings``, ``change_feed`` and ``retrieval``) lives here too; each front end only adapts
+it to its own style.
+
+Each front end runs with its own directory as the import root, so the first
+package it imports (app: ``data``, multi_domain_platform: ``services``)
+appends the repository root to ``sys.path``. Appended, not inserted, so the
+apps' own ``data``/``services``/``models`` packages still win.
+"""
+from platform_data.database import ConnectionPool, Database, PoolTimeout, QueryStats
+
+__all__ = ["ConnectionPool", "Database", "PoolTimeout", "QueryStats"]
@@ -0,0 +1,23 @@
+from typing import Any, List, Optional, Tuple
+
+from platform_data.database import Target, fetch_all
+from platform_data.schema import owner_clause
+
+# Domain name -> (table, columns a count may be grouped by)
+GROUP_COLUMNS = {
+    "incidents": ("cyber_incidents", ("severity", "status", "incident_type", "reported_by", "date")),
+    "tickets": ("it_tickets", ("priority", "status", "category", "assigned_to", "created_date")),
+    "datasets": ("datasets_metadata", ("category", "source", "last_updated")),
+}
+
+
+def count_by(db: Target, domain: str, column: str, owner: Optional[str] = None) -> List[Tuple[Any, int]]:
+    """(value, count) pairs for ``column``, largest first, over ``owner``'s rows when given."""
+    table, columns = GROUP_COLUMNS[domain]
+    if column not in columns:
+        raise ValueError(f"{domain} cannot be counted by {column!r}; choose one of {', '.join(columns)}")
+    owner_sql, params = owner_clause(domain, owner)
+    where_sql = f" WHERE {owner_sql}" if owner_sql else ""
+    return fetch_all(db, f"SELECT {column}, COUNT(*) AS count FROM {table}{where_sql} "
+                         f"GROUP BY {column} ORDER BY count DESC, {column}",
+                     params, name=f"{domain}.count_by")
@@ -0,0 +1,78 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from platform_data.database import Target, connection, execute, fetch_all, fetch_one, transaction
+
+# Domain tables whose row changes are logged to change_feed
+FEED_SOURCES = {
+    "incidents": "cyber_incidents",
+    "tickets": "it_tickets",
+    "datasets": "datasets_metadata",
+}
+
+# Feed rows kept by prune_change_feed; readers further behind reload in full
+DEFAULT_FEED_RETENTION = 100_000
+
+
+def create_change_feed(db: Target) -> None:
+    """Create the change_feed table and the AFTER INSERT/UPDATE/DELETE triggers that append to it."""
+    with transaction(db) as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS change_feed (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                domain TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                op TEXT CHECK(op IN ('I', 'U', 'D')) NOT NULL,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )""")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_change_feed_domain_seq ON change_feed (domain, seq)")
+        for domain, table in FEED_SOURCES.items():
+            for event, op, ref in (("insert", "I", "NEW"), ("update", "U", "NEW"), ("delete", "D", "OLD")):
+                cur.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{domain}_feed_{event} AFTER {event.upper()} ON {table}
+                    BEGIN
+                        INSERT INTO change_feed (domain, row_id, op) VALUES ('{domain}', {ref}.id, '{op}');
+                    END""")
+
+
+def ensure_change_feed(db: Target) -> None:
+    if fetch_one(db, "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_feed'") is None:
+        create_change_feed(db)
+
+
+def latest_seq(db: Target, domain: Optional[str] = None) -> int:
+    """Highest change sequence number (for one domain, or overall); 0 when the feed is empty."""
+    if domain is None:
+        row = fetch_one(db, "SELECT MAX(seq) FROM change_feed")
+    else:
+        row = fetch_one(db, "SELECT MAX(seq) FROM change_feed WHERE domain = ?", (domain,))
+    return row[0] or 0
+
+
+def feed_reaches(db: Target, since_seq: int) -> bool:
+    """Whether the feed still holds every change after ``since_seq`` (False once pruned past it)."""
+    oldest = fetch_one(db, "SELECT MIN(seq) FROM change_feed")[0]
+    return oldest is None or oldest <= since_seq + 1
+
+
+def changed_row_ids(db: Target, domain: str, since_seq: int, until_seq: int) -> List[int]:
+    """Ids of the domain's rows changed after ``since_seq`` up to ``until_seq``."""
+    return [row[0] for row in fetch_all(
+        db, "SELECT DISTINCT row_id FROM change_feed WHERE domain = ? AND seq > ? AND seq <= ?",
+        (domain, since_seq, until_seq))]
+
+
+def fetch_records(db: Target, domain: str, where_sql: str = "",
+                  params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+    """Rows of a domain table as dicts, optionally filtered by ``where_sql``."""
+    sql = f"SELECT * FROM {FEED_SOURCES[domain]}" + (f" WHERE {where_sql}" if where_sql else "")
+    # inside transaction(), a Database hands out the transaction's own connection
+    with connection(db) as conn:
+        cur = conn.execute(sql, tuple(params))
+        columns = [c[0] for c in cur.description]
+        return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+def prune_change_feed(db: Target, keep: int = DEFAULT_FEED_RETENTION) -> int:
+    """Delete all but the newest ``keep`` feed rows; returns the number removed."""
+    return execute(db, "DELETE FROM change_feed WHERE seq <= (SELECT MAX(seq) FROM change_feed) - ?",
+                   (keep,)).rowcount
@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import itertools
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+Messages = List[Dict[str, str]]
+
+# "openai" sends requests to OpenAI (or any compatible OPENAI_BASE_URL); "stub"
+# answers offline with a deterministic reply, for demos and benchmarks without an API key
+CHAT_PROVIDER = os.environ.get("CHAT_PROVIDER", "openai").lower()
+# Seconds before a request (or a stalled stream) is abandoned
+CHAT_TIMEOUT_S = float(os.environ.get("CHAT_TIMEOUT_S", "30"))
+# Retries after a connection error, timeout, 429 or 5xx (the SDK's own retries are off)
+CHAT_MAX_RETRIES = int(os.environ.get("CHAT_MAX_RETRIES", "3"))
+BACKOFF_BASE_S = 0.5
+BACKOFF_CAP_S = 8.0
+
+STUB_PHRASES = [
+    "isolate the affected hosts", "preserve logs and memory images", "reset exposed credentials",
+    "check the change history", "escalate to the on-call engineer", "document the timeline",
+    "verify backups before restoring", "monitor for recurrence",
+]
+
+
+def stub_tokens(messages: Messages, words: int = 40) -> List[str]:
+    """The offline reply as text deltas: an echo of the question, then phrases chosen by its hash."""
+    question = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+    rng = random.Random(int.from_bytes(hashlib.sha256(question.encode()).digest()[:8], "little"))
+    reply = f"[stub reply to: {question[:40]}]".split()
+    while len(reply) < words:
+        reply += rng.choice(STUB_PHRASES).split()
+    return [w if i == 0 else " " + w for i, w in enumerate(reply[:words])]
+
+
+# --- Retry policy ---
+
+def backoff_delay(attempt: int, base_s: float = BACKOFF_BASE_S, cap_s: float = BACKOFF_CAP_S) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap_s, base_s * 2 ** attempt))
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Connection errors, timeouts, rate limits and server errors are worth another try."""
+    import openai
+    if isinstance(exc, (openai.APIConnectionError, openai.RateLimitError)):
+        return True  # includes APITimeoutError
+    return isinstance(exc, openai.APIStatusError) and exc.status_code >= 500
+
+
+def retry_after(exc: Exception, cap_s: float = BACKOFF_CAP_S * 4) -> Optional[float]:
+    """Seconds the server asked us to wait (Retry-After on a 429/503), at most ``cap_s``; else None."""
+    response = getattr(exc, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return min(float(value), cap_s) if value else None
+    except ValueError:
+        return None
+
+
+def retry_delay(exc: Exception, attempt: int, base_s: float = BACKOFF_BASE_S, cap_s: float = BACKOFF_CAP_S) -> float:
+    """The server's Retry-After when it sent one, otherwise the jittered backoff."""
+    return retry_after(exc, cap_s * 4) or backoff_delay(attempt, base_s, cap_s)
+
+
+def with_retries(call: Callable[[], T], max_retries: int = CHAT_MAX_RETRIES,
+                 sleep: Callable[[float], None] = time.sleep, on_retry: Optional[Callable[[], None]] = None,
+                 base_s: float = BACKOFF_BASE_S, cap_s: float = BACKOFF_CAP_S) -> T:
+    """Run ``call``, retrying retryable errors after ``retry_delay``; ``on_retry()`` runs before each retry."""
+    attempt = 0
+    while True:
+        try:
+            return call()
+        except Exception as exc:
+            if attempt >= max_retries or not is_retryable(exc):
+                raise
+            sleep(retry_delay(exc, attempt, base_s, cap_s))
+            attempt += 1
+            if on_retry is not None:
+                on_retry()
+
+
+async def with_retries_async(call: Callable[[], Awaitable[T]], max_retries: int = CHAT_MAX_RETRIES,
+                             on_retry: Optional[Callable[[], None]] = None,
+                             on_rate_limit: Optional[Callable[[float], None]] = None) -> T:
+    """``with_retries`` for coroutines.
+
+    When the server rate-limits a request, ``on_rate_limit(seconds)`` is called
+    before the retry so the caller can hold back its other requests as well.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except Exception as exc:
+            if attempt >= max_retries or not is_retryable(exc):
+                raise
+            delay = retry_delay(exc, attempt)
+            if on_rate_limit is not None and getattr(exc, "status_code", None) == 429:
+                on_rate_limit(delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+            if on_retry is not None:
+                on_retry()
+
+
+# --- Requests on an OpenAI client ---
+
+def openai_complete(client: Any, messages: Messages, model: str, temperature: float = 1.0,
+                    **retry: Any) -> str:
+    """The whole reply from an OpenAI client; ``retry`` goes to ``with_retries``."""
+    resp = with_retries(lambda: client.chat.completions.create(
+        model=model, messages=messages, temperature=temperature), **retry)
+    return resp.choices[0].message.content or ""
+
+
+def openai_stream(client: Any, messages: Messages, model: str, temperature: float = 1.0,
+                  **retry: Any) -> Iterator[str]:
+    """The reply from an OpenAI client as text deltas.
+
+    Opening the stream is retried until its first chunk arrives; a stream that
+    fails later is not resent.
+    """
+    def first_chunk():
+        chunks = iter(client.chat.completions.create(
+            model=model, messages=messages, temperature=temperature, stream=True))
+        return next(chunks, None), chunks
+
+    first, chunks = with_retries(first_chunk, **retry)
+    if first is None:
+        return
+    for chunk in itertools.chain([first], chunks):
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def openai_acomplete(aclient: Any, messages: Messages, model: str, temperature: float = 1.0,
+                           **retry: Any) -> str:
+    """``openai_complete`` on an AsyncOpenAI client; ``retry`` goes to ``with_retries_async``."""
+    resp = await with_retries_async(lambda: aclient.chat.completions.create(
+        model=model, messages=messages, temperature=temperature), **retry)
+    return resp.choices[0].message.content or ""
+
+
+# --- Providers ---
+
+class ChatProvider:
+    """A chat backend: one blocking completion, or the reply as a stream of text deltas."""
+    name = "base"
+
+    def complete(self, messages: Messages, model: str, temperature: float = 1.0) -> str:
+        raise NotImplementedError
+
+    def stream(self, messages: Messages, model: str, temperature: float = 1.0) -> Iterator[str]:
+        yield self.complete(messages, model, temperature)
+
+    def close(self) -> None:
+        pass
+
+
+class OpenAIProvider(ChatProvider):
+    """OpenAI (or any compatible endpoint) behind one long-lived client.
+
+    The SDK client keeps a keep-alive connection pool, so reuse one provider per
+    process. The SDK's own retries are disabled; requests that are worth
+    retrying (connection errors, timeouts, 429 and 5xx) are retried up to
+    ``max_retries`` times after the server's Retry-After or a full-jitter
+    exponential backoff. ``retries`` counts them.
+    """
+    name = "openai"
+
+    def __init__(self, api_key: str, timeout_s: float = CHAT_TIMEOUT_S, max_retries: int = CHAT_MAX_RETRIES,
+                 backoff_base_s: float = BACKOFF_BASE_S, backoff_cap_s: float = BACKOFF_CAP_S,
+                 base_url: Optional[str] = None, sleep: Callable[[float], None] = time.sleep):
+        from openai import OpenAI
+        self._client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout_s, max_retries=0)
+        self._retry = {"max_retries": max_retries, "sleep": sleep, "on_retry": self._count_retry,
+                       "base_s": backoff_base_s, "cap_s": backoff_cap_s}
+        self.retries = 0
+
+    def _count_retry(self) -> None:
+        self.retries += 1
+
+    def complete(self, messages: Messages, model: str, temperature: float = 1.0) -> str:
+        return openai_complete(self._client, messages, model, temperature, **self._retry)
+
+    def stream(self, messages: Messages, model: str, temperature: float = 1.0) -> Iterator[str]:
+        return openai_stream(self._client, messages, model, temperature, **self._retry)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class StubProvider(ChatProvider):
+    """Deterministic offline provider: the same messages always give the same reply.
+
+    ``first_token_s``/``token_s`` simulate model latency so pages and benchmarks
+    behave like they would against a real endpoint, without network access.
+    """
+    name = "stub"
+
+    def __init__(self, first_token_s: float = 0.0, token_s: float = 0.0, words: int = 40):
+        self._first_token_s = first_token_s
+        self._token_s = token_s
+        self._words = words
+
+    def complete(self, messages: Messages, model: str, temperature: float = 1.0) -> str:
+        tokens = stub_tokens(messages, self._words)
+        time.sleep(self._first_token_s + self._token_s * (len(tokens) - 1))
+        return "".join(tokens)
+
+    def stream(self, messages: Messages, model: str, temperature: float = 1.0) -> Iterator[str]:
+        for i, token in enumerate(stub_tokens(messages, self._words)):
+            time.sleep(self._first_token_s if i == 0 else self._token_s)
+            yield token
+
+
+def create_provider(name: str = CHAT_PROVIDER, api_key: Optional[str] = None) -> ChatProvider:
+    """Provider by name (``CHAT_PROVIDER``): "openai" (needs an API key) or "stub"."""
+    if name == "stub":
+        return StubProvider()
+    if name == "openai":
+        if not api_key:
+            raise ValueError("The openai chat provider needs an API key")
+        return OpenAIProvider(api_key)
+    raise ValueError(f"Unknown chat provider '{name}', expected 'openai' or 'stub'")
@@ -0,0 +1,134 @@
+import os
+import re
+from typing import Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # optional; without it token counts are estimated
+    tiktoken = None
+
+# Token budget for one request (system prompt + summary + recent turns + new message)
+CHAT_TOKEN_BUDGET = int(os.environ.get("CHAT_TOKEN_BUDGET", "3000"))
+# Share of the budget reserved for the rolling summary of older turns
+SUMMARY_SHARE = 0.25
+
+_WORDS = re.compile(r"\w+|[^\w\s]")
+
+
+class TokenCounter:
+    """Counts tokens locally: exactly with tiktoken, otherwise by a close estimate."""
+
+    def __init__(self, encoding: str = "o200k_base"):
+        self._encoding = tiktoken.get_encoding(encoding) if tiktoken is not None else None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        # BPE vocabularies average roughly 4 characters per token; punctuation is its own token
+        return max(len(_WORDS.findall(text)), len(text) // 4)
+
+
+_counter: Optional[TokenCounter] = None
+
+
+def count_tokens(text: str) -> int:
+    """Token count of ``text`` with a process-wide ``TokenCounter``."""
+    global _counter
+    if _counter is None:
+        _counter = TokenCounter()
+    return _counter.count(text)
+
+
+class ContextWindow:
+    """Keeps chat requests within a token budget.
+
+    The newest turns that fit are sent verbatim; turns that fall out of the
+    window are folded, once each, into a rolling summary that is cached on the
+    instance and capped at ``summary_share`` of the budget. Keep one window per
+    conversation; a cleared or replaced history resets it.
+    """
+    MESSAGE_OVERHEAD = 4
+    SUMMARY_WORDS_PER_TURN = 30
+
+    def __init__(self, budget: int = CHAT_TOKEN_BUDGET, summary_share: float = SUMMARY_SHARE,
+                 counter: Optional[TokenCounter] = None):
+        self._budget = budget
+        self._summary_budget = int(budget * summary_share)
+        self._counter = counter
+        self._lines: List[str] = []
+        self._folded = 0
+        self._head: Optional[str] = None
+        self.last_tokens = 0
+
+    @property
+    def budget(self) -> int:
+        return self._budget
+
+    @property
+    def folded(self) -> int:
+        """Number of history messages currently represented only by the summary."""
+        return self._folded
+
+    @property
+    def summary(self) -> str:
+        return "\n".join(self._lines)
+
+    def reset(self) -> None:
+        self._lines = []
+        self._folded = 0
+        self._head = None
+
+    def _count(self, text: str) -> int:
+        return self._counter.count(text) if self._counter is not None else count_tokens(text)
+
+    def message_tokens(self, message: Dict[str, str]) -> int:
+        return self._count(message["content"]) + self.MESSAGE_OVERHEAD
+
+    def _summarise(self, message: Dict[str, str]) -> str:
+        """One summary line per folded turn: its role and the opening words of its content."""
+        words = message["content"].split()
+        text = " ".join(words[:self.SUMMARY_WORDS_PER_TURN])
+        if len(words) > self.SUMMARY_WORDS_PER_TURN:
+            text += " …"
+        return f"{message['role'].capitalize()}: {text}"
+
+    def _window_start(self, history: List[Dict[str, str]], reserved: int) -> int:
+        """Index of the oldest turn sent verbatim; folds everything before it."""
+        # a cleared or replaced history no longer matches what was folded
+        if self._folded and (self._folded > len(history) or history[0]["content"] != self._head):
+            self.reset()
+
+        remaining = self._budget - reserved - self._summary_budget
+        start = len(history)
+        while start > self._folded and self.message_tokens(history[start - 1]) <= remaining:
+            remaining -= self.message_tokens(history[start - 1])
+            start -= 1
+
+        if start > self._folded:
+            self._lines += [self._summarise(m) for m in history[self._folded:start]]
+            while self._lines and self._count(self.summary) > self._summary_budget:
+                self._lines.pop(0)
+            self._folded = start
+            self._head = history[0]["content"]
+        return start
+
+    def build(self, system_prompt: str, history: List[Dict[str, str]], user_message: str) -> List[Dict[str, str]]:
+        """Messages for the next request: system prompt, summary, recent turns, new message."""
+        reserved = self._count(system_prompt) + self._count(user_message) + 3 * self.MESSAGE_OVERHEAD
+        start = self._window_start(history, reserved)
+        messages = [{"role": "system", "content": system_prompt}]
+        if self._lines:
+            messages.append({"role": "system", "content": "Summary of the earlier conversation:\n" + self.summary})
+        messages += [{"role": m["role"], "content": m["content"]} for m in history[start:]]
+        messages.append({"role": "user", "content": user_message})
+        self.last_tokens = sum(self.message_tokens(m) for m in messages)
+        return messages
+
+    def compact(self, history: List[Dict[str, str]], reserved: int = 0) -> List[Dict[str, str]]:
+        """Fold turns outside the window and return only the recent ones, for stores that can drop them."""
+        start = self._window_start(history, reserved)
+        self._folded = 0
+        self._head = None
+        return history[start:]
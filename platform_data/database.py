@@ -0,0 +1,351 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Connections kept open per database file
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "4"))
+# Seconds to wait for a free connection before giving up
+POOL_TIMEOUT_S = float(os.environ.get("DB_POOL_TIMEOUT_S", "10"))
+# Seconds a statement waits on another connection's write lock
+BUSY_TIMEOUT_S = float(os.environ.get("DB_BUSY_TIMEOUT_S", "5"))
+# Read results kept per database (0 disables the cache), and the largest result worth keeping
+QUERY_CACHE_SIZE = int(os.environ.get("DB_QUERY_CACHE_SIZE", "256"))
+QUERY_CACHE_MAX_ROWS = int(os.environ.get("DB_QUERY_CACHE_MAX_ROWS", "5000"))
+
+
+class PoolTimeout(TimeoutError):
+    """No pooled connection became free within ``POOL_TIMEOUT_S``."""
+
+
+class QueryStats:
+    """Per-statement counters: calls, cache hits, rows returned and time spent."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    @staticmethod
+    def name_for(sql: str) -> str:
+        return " ".join(sql.split())[:80]
+
+    def record(self, name: str, seconds: float, rows: int = 0, cached: bool = False) -> None:
+        with self._lock:
+            entry = self._stats.setdefault(name, {"calls": 0, "cache_hits": 0, "rows": 0, "total_ms": 0.0, "max_ms": 0.0})
+            entry["calls"] += 1
+            entry["cache_hits"] += cached
+            entry["rows"] += rows
+            entry["total_ms"] += seconds * 1000
+            entry["max_ms"] = max(entry["max_ms"], seconds * 1000)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._stats.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+class ConnectionPool:
+    """A fixed number of SQLite connections to one file, opened on first use and handed out one caller at a time."""
+
+    def __init__(self, db_path: str, size: int = POOL_SIZE, timeout_s: float = POOL_TIMEOUT_S,
+                 cached_statements: int = 256):
+        self._db_path = db_path
+        self._size = max(1, size)
+        self._timeout_s = timeout_s
+        self._cached_statements = cached_statements
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._all: List[sqlite3.Connection] = []
+        self.waits = 0
+
+    def _open(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path, timeout=BUSY_TIMEOUT_S, check_same_thread=False,
+                               cached_statements=self._cached_statements)
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self._size:
+                conn = self._open()
+                self._all.append(conn)
+                return conn
+            self.waits += 1
+        try:
+            return self._idle.get(timeout=self._timeout_s)
+        except queue.Empty:
+            raise PoolTimeout(f"no free connection to {self._db_path} after {self._timeout_s} s") from None
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": self._size, "open": len(self._all), "idle": self._idle.qsize(), "waits": self.waits}
+
+    def close(self) -> None:
+        with self._lock:
+            conns, self._all = self._all, []
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for conn in conns:
+            conn.close()
+
+
+class Database:
+    """Pooled, cached and instrumented access to one SQLite file.
+
+    Statements run on a connection borrowed from a ``ConnectionPool``; writes
+    commit before the connection goes back. Read results are kept in an LRU
+    cache keyed by statement and parameters, and the whole cache is dropped as
+    soon as ``PRAGMA data_version`` on a separate watch connection shows a
+    commit from any other connection, this pool's included, so a cached read is
+    never staler than the last commit. ``execute_many`` and ``transaction`` put
+    many writes in one commit. Every statement is timed into ``stats()``.
+
+    Inside ``transaction()`` the same thread's reads and writes use the
+    transaction's connection and skip the cache. Share one instance per file
+    and process.
+    """
+
+    def __init__(self, db_path: str, pool_size: int = POOL_SIZE, cache_size: int = QUERY_CACHE_SIZE,
+                 cached_statements: int = 256):
+        self._db_path = str(db_path)
+        in_memory = self._db_path in (":memory:", "")
+        # every connection to ":memory:" is its own database, so there is only one
+        self._pool = ConnectionPool(self._db_path, 1 if in_memory else pool_size, cached_statements=cached_statements)
+        self._cache_size = 0 if in_memory else cache_size
+        self._cache: "OrderedDict[Tuple[str, Tuple[Any, ...]], List[Tuple[Any, ...]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._watch: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self._local = threading.local()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.query_stats = QueryStats()
+
+    @property
+    def db_path(self) -> str:
+        return self._db_path
+
+    # --- Connections ---
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection (the open transaction's, inside ``transaction()``)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+        with self._pool.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """Yield a cursor whose statements commit together, or roll back on error.
+
+        The write lock is taken up front (``BEGIN IMMEDIATE``), so a transaction
+        that reads before it writes, like picking the next ticket reference,
+        never interleaves with another connection's.
+        """
+        if getattr(self._local, "conn", None) is not None:
+            # nested: part of the enclosing transaction
+            yield self._local.conn.cursor()
+            return
+        with self._pool.connection() as conn:
+            self._local.conn = conn
+            try:
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    yield conn.cursor()
+            finally:
+                self._local.conn = None
+
+    # --- Cache ---
+    def _lookup(self, key: Tuple[str, Tuple[Any, ...]]) -> Tuple[Optional[List[Tuple[Any, ...]]], int]:
+        """Cached rows for ``key`` (None on a miss) and the data version they belong to.
+
+        The cache is dropped first if another connection committed since it was filled.
+        """
+        with self._cache_lock:
+            if self._watch is None:
+                self._watch = sqlite3.connect(self._db_path, timeout=BUSY_TIMEOUT_S, check_same_thread=False)
+            version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._data_version:
+                self._cache.clear()
+                self._data_version = version
+            rows = self._cache.get(key)
+            if rows is None:
+                self.cache_misses += 1
+            else:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+            return rows, version
+
+    def _remember(self, key: Tuple[str, Tuple[Any, ...]], rows: List[Tuple[Any, ...]], version: int) -> None:
+        if len(rows) > QUERY_CACHE_MAX_ROWS:
+            return
+        with self._cache_lock:
+            # a commit seen since the lookup may have changed these rows
+            if version != self._data_version:
+                return
+            self._cache[key] = rows
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+    # --- Statements ---
+    def fetch_all(self, sql: str, params: Iterable[Any] = (), name: Optional[str] = None,
+                  cache: bool = True) -> List[Tuple[Any, ...]]:
+        params = tuple(params)
+        name = name or QueryStats.name_for(sql)
+        start = time.perf_counter()
+        use_cache = cache and self._cache_size > 0 and getattr(self._local, "conn", None) is None
+        key = (sql, params)
+        if use_cache:
+            rows, version = self._lookup(key)
+            if rows is not None:
+                self.query_stats.record(name, time.perf_counter() - start, len(rows), cached=True)
+                return list(rows)
+        with self.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        if use_cache:
+            self._remember(key, rows, version)
+        self.query_stats.record(name, time.perf_counter() - start, len(rows))
+        return list(rows)
+
+    def fetch_one(self, sql: str, params: Iterable[Any] = (), name: Optional[str] = None,
+                  cache: bool = True) -> Optional[Tuple[Any, ...]]:
+        rows = self.fetch_all(sql, params, name, cache)
+        return rows[0] if rows else None
+
+    def execute(self, sql: str, params: Iterable[Any] = (), name: Optional[str] = None) -> sqlite3.Cursor:
+        """Run one write and commit it (unless inside ``transaction()``); returns the cursor."""
+        start = time.perf_counter()
+        with self.transaction() as cur:
+            cur.execute(sql, tuple(params))
+        self.query_stats.record(name or QueryStats.name_for(sql), time.perf_counter() - start, max(cur.rowcount, 0))
+        return cur
+
+    def execute_many(self, sql: str, rows: Iterable[Sequence[Any]], name: Optional[str] = None) -> int:
+        """Run a write for every parameter row in a single commit; returns the rows affected."""
+        start = time.perf_counter()
+        with self.transaction() as cur:
+            cur.executemany(sql, [tuple(row) for row in rows])
+        count = max(cur.rowcount, 0)
+        self.query_stats.record(name or QueryStats.name_for(sql), time.perf_counter() - start, count)
+        return count
+
+    # --- Instrumentation ---
+    def stats(self) -> Dict[str, Any]:
+        """Pool, cache and per-statement counters."""
+        with self._cache_lock:
+            cache = {"entries": len(self._cache), "hits": self.cache_hits, "misses": self.cache_misses}
+        return {"pool": self._pool.stats(), "cache": cache, "queries": self.query_stats.snapshot()}
+
+    def close(self) -> None:
+        self._pool.close()
+        with self._cache_lock:
+            self._cache.clear()
+            if self._watch is not None:
+                self._watch.close()
+                self._watch = None
+
+
+# --- Helpers for code that holds either a Database or a plain sqlite3 connection ---
+Target = Union[Database, sqlite3.Connection]
+
+
+def fetch_all(db: Target, sql: str, params: Iterable[Any] = (), name: Optional[str] = None) -> List[Tuple[Any, ...]]:
+    if isinstance(db, Database):
+        return db.fetch_all(sql, params, name)
+    return db.execute(sql, tuple(params)).fetchall()
+
+
+def fetch_one(db: Target, sql: str, params: Iterable[Any] = (), name: Optional[str] = None) -> Optional[Tuple[Any, ...]]:
+    if isinstance(db, Database):
+        return db.fetch_one(sql, params, name)
+    return db.execute(sql, tuple(params)).fetchone()
+
+
+def execute(db: Target, sql: str, params: Iterable[Any] = (), name: Optional[str] = None) -> sqlite3.Cursor:
+    if isinstance(db, Database):
+        return db.execute(sql, params, name)
+    cur = db.execute(sql, tuple(params))
+    db.commit()
+    return cur
+
+
+def execute_many(db: Target, sql: str, rows: Iterable[Sequence[Any]], name: Optional[str] = None) -> int:
+    if isinstance(db, Database):
+        return db.execute_many(sql, rows, name)
+    cur = db.executemany(sql, [tuple(row) for row in rows])
+    db.commit()
+    return max(cur.rowcount, 0)
+
+
+@contextmanager
+def connection(db: Target) -> Iterator[sqlite3.Connection]:
+    """A connection for cursor-level work (pandas, Arrow, DDL scripts): borrowed from a Database's pool, or ``db``."""
+    if isinstance(db, Database):
+        with db.connection() as conn:
+            yield conn
+    else:
+        yield db
+
+
+@contextmanager
+def transaction(db: Target) -> Iterator[sqlite3.Cursor]:
+    if isinstance(db, Database):
+        with db.transaction() as cur:
+            yield cur
+    elif db.in_transaction:
+        # part of the caller's open transaction
+        yield db.cursor()
+    else:
+        with db:
+            db.execute("BEGIN IMMEDIATE")
+            yield db.cursor()
+
+
+def insert_many_ids(db: Target, table: str, sql: str, rows: Iterable[Sequence[Any]],
+                    name: Optional[str] = None) -> List[int]:
+    """Run an INSERT into ``table`` for every row in one commit and return the new ids in order.
+
+    The write lock is held from before the insert, so the new rows are exactly
+    those past the previous largest id.
+    """
+    start = time.perf_counter()
+    rows = [tuple(row) for row in rows]
+    with transaction(db) as cur:
+        last_id = cur.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+        cur.executemany(sql, rows)
+        ids = [row[0] for row in cur.execute(f"SELECT id FROM {table} WHERE id > ? ORDER BY id", (last_id,))]
+    if isinstance(db, Database):
+        db.query_stats.record(name or QueryStats.name_for(sql), time.perf_counter() - start, len(ids))
+    return ids
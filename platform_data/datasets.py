@@ -0,0 +1,80 @@
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from platform_data.database import Target, execute, fetch_all, fetch_one, insert_many_ids
+from platform_data.schema import paged_query
+
+DATASET_COLUMNS = ("id", "dataset_name", "category", "source", "last_updated", "record_count", "file_size_mb",
+                   "created_at")
+# Columns a dataset update may change
+UPDATABLE_COLUMNS = ("dataset_name", "category", "source", "last_updated", "record_count", "file_size_mb")
+
+INSERT_DATASET_SQL = """
+    INSERT INTO datasets_metadata (dataset_name, category, source, last_updated, record_count, file_size_mb)
+    VALUES (?, ?, ?, ?, ?, ?)"""
+
+
+def datasets_query(descending: bool = True, after: Optional[int] = None,
+                   limit: Optional[int] = None) -> Tuple[str, List[Any]]:
+    """SELECT of every dataset column, newest first."""
+    return paged_query("datasets_metadata", DATASET_COLUMNS, descending=descending, after=after, limit=limit)
+
+
+def list_datasets(db: Target, descending: bool = True, after: Optional[int] = None,
+                  limit: Optional[int] = None) -> List[Tuple[Any, ...]]:
+    """Rows in id order; ``after``/``limit`` page through them by id (see ``paged_query``)."""
+    sql, params = datasets_query(descending, after, limit)
+    return fetch_all(db, sql, params, name="datasets.list")
+
+
+def get_dataset(db: Target, dataset_id: int) -> Optional[Tuple[Any, ...]]:
+    return fetch_one(db, f"SELECT {', '.join(DATASET_COLUMNS)} FROM datasets_metadata WHERE id = ?",
+                     (dataset_id,), name="datasets.get")
+
+
+def search_datasets(db: Target, query: str) -> List[Tuple[Any, ...]]:
+    """Datasets matching a numeric id, or whose name, category or source contains ``query``."""
+    q = query.strip()
+    try:
+        where, params = "id = ?", [int(q)]
+    except ValueError:
+        where, params = "(dataset_name LIKE ? OR category LIKE ? OR source LIKE ?)", [f"%{q}%"] * 3
+    return fetch_all(db, f"SELECT {', '.join(DATASET_COLUMNS)} FROM datasets_metadata WHERE {where} ORDER BY id",
+                     params, name="datasets.search")
+
+
+def large_datasets(db: Target, min_size_mb: float = 100) -> List[Tuple[Any, ...]]:
+    """(dataset_name, file_size_mb) of datasets larger than ``min_size_mb``, largest first."""
+    return fetch_all(db, "SELECT dataset_name, file_size_mb FROM datasets_metadata WHERE file_size_mb > ? "
+                         "ORDER BY file_size_mb DESC", (min_size_mb,), name="datasets.large")
+
+
+def insert_dataset(db: Target, dataset_name: str, category: str, source: str, last_updated: Optional[str] = None,
+                   record_count: Optional[int] = None, file_size_mb: Optional[float] = None) -> int:
+    """Insert a dataset's metadata and return its id."""
+    cur = execute(db, INSERT_DATASET_SQL, (dataset_name, category, source, last_updated, record_count, file_size_mb),
+                  name="datasets.insert")
+    return cur.lastrowid
+
+
+def insert_datasets(db: Target, rows: Iterable[Sequence[Any]]) -> List[int]:
+    """Insert many (dataset_name, category, source, last_updated, record_count, file_size_mb) rows in one commit.
+
+    Returns their ids in order.
+    """
+    return insert_many_ids(db, "datasets_metadata", INSERT_DATASET_SQL, rows, name="datasets.insert_many")
+
+
+def update_dataset(db: Target, dataset_id: int, **changes: Any) -> int:
+    """Set the given ``UPDATABLE_COLUMNS``; returns the number of datasets updated."""
+    unknown = set(changes) - set(UPDATABLE_COLUMNS)
+    if unknown:
+        raise ValueError(f"cannot update {', '.join(sorted(unknown))}")
+    if not changes:
+        return 0
+    assignments = ", ".join(f"{column} = ?" for column in changes)
+    return execute(db, f"UPDATE datasets_metadata SET {assignments} WHERE id = ?",
+                   list(changes.values()) + [dataset_id], name="datasets.update").rowcount
+
+
+def delete_dataset(db: Target, dataset_id: int) -> int:
+    return execute(db, "DELETE FROM datasets_metadata WHERE id = ?", (dataset_id,), name="datasets.delete").rowcount
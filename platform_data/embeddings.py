@@ -0,0 +1,65 @@
+import hashlib
+import re
+from typing import List
+
+import numpy as np
+
+# Width of the hashed embedding vectors
+EMBEDDING_DIM = 256
+
+# Words too common to say anything about what a question is about
+STOPWORDS = frozenset("""
+a an and are as at be can could do does for from how i in is it me my of on or our
+please should the their there this to we what when where which who why will with you your
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def embed(text: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Local, dependency-free text embedding.
+
+    Word unigrams and bigrams are hashed (with a sign bit) into ``dim`` buckets
+    and the vector is L2-normalised, so the dot product of two embeddings is
+    their cosine similarity. blake2b, not Python's salted ``hash()``, keeps
+    vectors stable across processes.
+    """
+    tokens = tokenize(text)
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+        value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+        vector[value % dim] += 1.0 if value >> 63 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def to_blob(vector: np.ndarray) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def from_blob(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+class HashingEmbedder:
+    """``embed`` with a fixed width, for code that passes an embedder around."""
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self._dim = dim
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    def tokenize(self, text: str) -> List[str]:
+        return tokenize(text)
+
+    def embed(self, text: str) -> np.ndarray:
+        return embed(text, self._dim)
+
+    to_blob = staticmethod(to_blob)
+    from_blob = staticmethod(from_blob)
@@ -0,0 +1,100 @@
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from platform_data.database import Target, execute, execute_many, fetch_all, fetch_one, insert_many_ids
+from platform_data.schema import owner_clause, paged_query
+
+INCIDENT_COLUMNS = ("id", "date", "incident_type", "severity", "status", "description", "reported_by", "created_at")
+SEVERITIES = ("Critical", "High", "Medium", "Low")
+STATUSES = ("Open", "Investigating", "Resolved", "Closed")
+# reported_by is NOT NULL; reports filed without a name are recorded under this one
+ANONYMOUS_REPORTER = "anonymous"
+
+INSERT_INCIDENT_SQL = """
+    INSERT INTO cyber_incidents (date, incident_type, severity, status, description, reported_by)
+    VALUES (?, ?, ?, ?, ?, ?)"""
+
+
+def incident_row(date: str, incident_type: str, severity: str, status: str, description: Optional[str],
+                 reported_by: Optional[str] = None) -> Tuple[Any, ...]:
+    """Parameters for ``INSERT_INCIDENT_SQL``; created_at is left to the table default."""
+    return (date, incident_type, severity, status, description, reported_by or ANONYMOUS_REPORTER)
+
+
+def incidents_query(owner: Optional[str] = None, descending: bool = True, after: Optional[int] = None,
+                    limit: Optional[int] = None) -> Tuple[str, List[Any]]:
+    """SELECT of every incident column, newest first, limited to ``owner``'s reports when given."""
+    owner_sql, params = owner_clause("incidents", owner)
+    return paged_query("cyber_incidents", INCIDENT_COLUMNS, owner_sql, params, descending, after, limit)
+
+
+def list_incidents(db: Target, owner: Optional[str] = None, descending: bool = True, after: Optional[int] = None,
+                   limit: Optional[int] = None) -> List[Tuple[Any, ...]]:
+    """Rows in id order; ``after``/``limit`` page through them by id (see ``paged_query``)."""
+    sql, params = incidents_query(owner, descending, after, limit)
+    return fetch_all(db, sql, params, name="incidents.list")
+
+
+def _by_id(incident_id: int, owner: Optional[str]) -> Tuple[str, List[Any]]:
+    """WHERE clause for one incident, only matching when it is visible to ``owner``."""
+    owner_sql, params = owner_clause("incidents", owner)
+    return "id = ?" + (f" AND {owner_sql}" if owner_sql else ""), [incident_id] + params
+
+
+def get_incident(db: Target, incident_id: int, owner: Optional[str] = None) -> Optional[Tuple[Any, ...]]:
+    """The incident with id ``incident_id``, if visible to ``owner``."""
+    where, params = _by_id(incident_id, owner)
+    return fetch_one(db, f"SELECT {', '.join(INCIDENT_COLUMNS)} FROM cyber_incidents WHERE {where}",
+                     params, name="incidents.get")
+
+
+def search_incidents(db: Target, query: str, owner: Optional[str] = None) -> List[Tuple[Any, ...]]:
+    """Incidents matching a numeric id, or whose type, reporter or description contains ``query``."""
+    q = query.strip()
+    try:
+        where, params = "id = ?", [int(q)]
+    except ValueError:
+        where, params = "(incident_type LIKE ? OR reported_by LIKE ? OR description LIKE ?)", [f"%{q}%"] * 3
+    owner_sql, owner_params = owner_clause("incidents", owner)
+    if owner_sql:
+        where += f" AND {owner_sql}"
+    return fetch_all(db, f"SELECT {', '.join(INCIDENT_COLUMNS)} FROM cyber_incidents WHERE {where} ORDER BY id",
+                     params + owner_params, name="incidents.search")
+
+
+def insert_incident(db: Target, date: str, incident_type: str, severity: str, status: str,
+                    description: Optional[str], reported_by: Optional[str] = None) -> int:
+    """Insert an incident and return its id."""
+    cur = execute(db, INSERT_INCIDENT_SQL, incident_row(date, incident_type, severity, status, description, reported_by),
+                  name="incidents.insert")
+    return cur.lastrowid
+
+
+def insert_incidents(db: Target, rows: Iterable[Sequence[Any]]) -> List[int]:
+    """Insert many (date, incident_type, severity, status, description, reported_by) rows in one commit.
+
+    Returns their ids in order.
+    """
+    return insert_many_ids(db, "cyber_incidents", INSERT_INCIDENT_SQL, [incident_row(*row) for row in rows],
+                           name="incidents.insert_many")
+
+
+def update_incident_status(db: Target, incident_id: int, status: str, owner: Optional[str] = None) -> int:
+    """Returns the number of incidents updated (0 when the id does not exist or ``owner`` cannot see it)."""
+    where, params = _by_id(incident_id, owner)
+    return execute(db, f"UPDATE cyber_incidents SET status = ? WHERE {where}", [status] + params,
+                   name="incidents.update_status").rowcount
+
+
+def update_incident_statuses(db: Target, changes: Iterable[Tuple[int, str]], owner: Optional[str] = None) -> int:
+    """Apply many (incident_id, status) changes in one commit, skipping incidents ``owner`` cannot see."""
+    owner_sql, params = owner_clause("incidents", owner)
+    where = "id = ?" + (f" AND {owner_sql}" if owner_sql else "")
+    return execute_many(db, f"UPDATE cyber_incidents SET status = ? WHERE {where}",
+                        [[status, incident_id] + params for incident_id, status in changes],
+                        name="incidents.update_statuses")
+
+
+def delete_incident(db: Target, incident_id: int, owner: Optional[str] = None) -> int:
+    """Returns the number of incidents deleted (0 when the id does not exist or ``owner`` cannot see it)."""
+    where, params = _by_id(incident_id, owner)
+    return execute(db, f"DELETE FROM cyber_incidents WHERE {where}", params, name="incidents.delete").rowcount
@@ -0,0 +1,168 @@
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from platform_data.database import Target, execute, fetch_all, transaction
+
+# Attempts per username: a burst of USER_BURST, refilled at USER_PER_MINUTE
+USER_BURST = int(os.environ.get("LOGIN_USER_BURST", "5"))
+USER_PER_MINUTE = float(os.environ.get("LOGIN_USER_PER_MINUTE", "5"))
+# Attempts per client address
+CLIENT_BURST = int(os.environ.get("LOGIN_CLIENT_BURST", "20"))
+CLIENT_PER_MINUTE = float(os.environ.get("LOGIN_CLIENT_PER_MINUTE", "20"))
+# After LOCKOUT_AFTER consecutive failures a username is locked for
+# LOCKOUT_BASE_S, doubling with every further failure up to LOCKOUT_MAX_S
+LOCKOUT_AFTER = int(os.environ.get("LOGIN_LOCKOUT_AFTER", "5"))
+LOCKOUT_BASE_S = float(os.environ.get("LOGIN_LOCKOUT_BASE_S", "30"))
+LOCKOUT_MAX_S = float(os.environ.get("LOGIN_LOCKOUT_MAX_S", "900"))
+# Counters are written to the database at most this often (seconds)
+PERSIST_INTERVAL_S = float(os.environ.get("LOGIN_PERSIST_INTERVAL_S", "30"))
+
+
+def throttled_message(wait: float) -> str:
+    return f"Too many login attempts. Try again in {math.ceil(wait)} s."
+
+
+class LoginThrottled(Exception):
+    """A login attempt was rejected before its password was checked."""
+
+    def __init__(self, retry_after_s: float):
+        super().__init__(throttled_message(retry_after_s))
+        self.retry_after_s = retry_after_s
+
+
+def create_login_throttle_table(db: Target) -> None:
+    execute(db, """
+        CREATE TABLE IF NOT EXISTS login_throttle (
+            key TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            refilled_at REAL NOT NULL,
+            failures INTEGER NOT NULL DEFAULT 0,
+            locked_until REAL NOT NULL DEFAULT 0
+        )""")
+
+
+class LoginThrottle:
+    """Token buckets per username and per client, plus exponential lockout.
+
+    ``check`` runs before the password hash is verified and takes a token from
+    each bucket; an empty bucket or a locked username makes the caller wait
+    without any hashing, so a credential-stuffing burst costs a dictionary
+    lookup per request instead of a bcrypt verify. ``record`` counts
+    consecutive failures: after ``LOCKOUT_AFTER`` the username is locked for
+    ``LOCKOUT_BASE_S``, doubling per further failure up to ``LOCKOUT_MAX_S``.
+    Counters live in memory, are read from ``login_throttle`` on first use and
+    written back at most every ``persist_interval_s``, so lockouts survive a
+    restart. Methods that touch the table take the ``Database`` or connection
+    to use. Share one throttle per process.
+    """
+
+    def __init__(self, persist_interval_s: float = PERSIST_INTERVAL_S):
+        self._persist_interval_s = persist_interval_s
+        self._persisted_at = 0.0
+        self._loaded = False
+        self._lock = threading.Lock()
+        # key ("user:<name>" / "client:<address>") -> [tokens, refilled_at, failures, locked_until]
+        self._state: Dict[str, List[float]] = {}
+        self._dirty: Set[str] = set()
+
+    def load(self, db: Target) -> None:
+        """Read persisted counters once, so a restart does not reset lockouts."""
+        if self._loaded:
+            return
+        create_login_throttle_table(db)
+        rows = fetch_all(db, "SELECT key, tokens, refilled_at, failures, locked_until FROM login_throttle")
+        with self._lock:
+            for key, tokens, refilled_at, failures, locked_until in rows:
+                self._state.setdefault(key, [tokens, refilled_at, failures, locked_until])
+            self._loaded = True
+
+    @staticmethod
+    def _limits(key: str) -> Tuple[int, float]:
+        if key.startswith("user:"):
+            return USER_BURST, USER_PER_MINUTE / 60
+        return CLIENT_BURST, CLIENT_PER_MINUTE / 60
+
+    def _entry(self, key: str, now: float) -> List[float]:
+        """The key's counters with its bucket refilled up to ``now``."""
+        burst, rate = self._limits(key)
+        entry = self._state.get(key)
+        if entry is None:
+            entry = self._state[key] = [float(burst), now, 0, 0.0]
+        entry[0] = min(burst, entry[0] + (now - entry[1]) * rate)
+        entry[1] = now
+        return entry
+
+    def check(self, db: Target, username: str, client: Optional[str] = None) -> float:
+        """Call before verifying a password: 0 when the attempt may go ahead (a token
+        is taken from each bucket), otherwise the seconds to wait."""
+        self.load(db)
+        keys = [f"user:{username.strip().lower()}"] + ([f"client:{client}"] if client else [])
+        now = time.time()
+        with self._lock:
+            entries = [self._entry(key, now) for key in keys]
+            wait = max(entry[3] - now for entry in entries)
+            for key, entry in zip(keys, entries):
+                if entry[0] < 1:
+                    wait = max(wait, (1 - entry[0]) / self._limits(key)[1])
+            if wait <= 0:
+                for entry in entries:
+                    entry[0] -= 1
+            self._dirty.update(keys)
+        self.persist(db)
+        return max(0, wait)
+
+    def record(self, db: Target, username: str, success: bool) -> None:
+        """Call after the password check: failures build up to a lockout, success clears them."""
+        key = f"user:{username.strip().lower()}"
+        now = time.time()
+        with self._lock:
+            entry = self._entry(key, now)
+            if success:
+                entry[2], entry[3] = 0, 0.0
+            else:
+                entry[2] += 1
+                if entry[2] >= LOCKOUT_AFTER:
+                    entry[3] = now + min(LOCKOUT_MAX_S, LOCKOUT_BASE_S * 2 ** (entry[2] - LOCKOUT_AFTER))
+            self._dirty.add(key)
+        self.persist(db)
+
+    def persist(self, db: Target, force: bool = False) -> int:
+        """Write changed counters (at most every ``persist_interval_s`` unless ``force``).
+
+        Keys back to a full bucket with no failures are dropped from memory and
+        the table, which keeps both bounded under username spraying.
+        """
+        now = time.time()
+        with self._lock:
+            if not force and now - self._persisted_at < self._persist_interval_s:
+                return 0
+            self._persisted_at = now
+            upserts, idle = [], []
+            for key in list(self._state):
+                entry = self._entry(key, now)
+                if entry[0] >= self._limits(key)[0] and entry[2] == 0 and entry[3] <= now:
+                    del self._state[key]
+                    idle.append((key,))
+                elif key in self._dirty:
+                    upserts.append((key, *entry))
+            self._dirty.clear()
+        if not upserts and not idle:
+            return 0
+        with transaction(db) as cur:
+            cur.executemany("""
+                INSERT INTO login_throttle (key, tokens, refilled_at, failures, locked_until) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, refilled_at = excluded.refilled_at,
+                    failures = excluded.failures, locked_until = excluded.locked_until""", upserts)
+            cur.executemany("DELETE FROM login_throttle WHERE key = ?", idle)
+        return len(upserts)
+
+    def reset(self) -> None:
+        """Forget all in-memory counters (tests and benchmarks)."""
+        with self._lock:
+            self._state.clear()
+            self._dirty.clear()
+            self._loaded = False
+            self._persisted_at = 0.0
@@ -0,0 +1,158 @@
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from platform_data.database import Target, execute, fetch_all, fetch_one, transaction
+from platform_data.embeddings import embed, from_blob, to_blob
+
+# Entries older than this are never served (seconds)
+CACHE_TTL_S = int(os.environ.get("CHAT_CACHE_TTL_S", str(7 * 24 * 3600)))
+# Least recently used entries beyond this are evicted
+CACHE_MAX_ENTRIES = int(os.environ.get("CHAT_CACHE_MAX_ENTRIES", "2000"))
+# Cosine similarity needed to serve a cached reply to a differently worded prompt
+SIMILARITY_THRESHOLD = float(os.environ.get("CHAT_CACHE_SIMILARITY", "0.9"))
+# Temperatures are grouped into buckets of this width
+TEMPERATURE_STEP = 0.5
+
+CACHE_EVENTS = ("exact_hit", "semantic_hit", "miss", "store", "eviction")
+
+
+def create_response_cache_tables(db: Target) -> None:
+    """Create the chat response cache and its hit/miss counters."""
+    with transaction(db) as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                cache_key TEXT PRIMARY KEY,
+                scope TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                embedding BLOB,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )""")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_scope ON response_cache (scope, created_at)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_lru ON response_cache (last_used_at)")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache_metrics (
+                day TEXT NOT NULL,
+                event TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, event)
+            )""")
+
+
+def ensure_response_cache_tables(db: Target) -> None:
+    if fetch_one(db, "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'response_cache'") is None:
+        create_response_cache_tables(db)
+
+
+def normalise_prompt(prompt: str) -> str:
+    """Lower-case, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", prompt.lower()).strip().rstrip("?!. ")
+
+
+def temperature_bucket(temperature: float) -> float:
+    return round(round(float(temperature) / TEMPERATURE_STEP) * TEMPERATURE_STEP, 2)
+
+
+def _digest(*parts: Any) -> str:
+    return hashlib.sha256("\x1f".join(str(p) for p in parts).encode()).hexdigest()
+
+
+def _scope(system_prompt: str, model: str, temperature: float) -> str:
+    """Entries are only shared between requests with the same persona, model and temperature bucket."""
+    return _digest(system_prompt.strip(), model, temperature_bucket(temperature))
+
+
+def _record(cur: sqlite3.Cursor, event: str, count: int = 1) -> None:
+    cur.execute("""
+        INSERT INTO response_cache_metrics (day, event, count) VALUES (date('now'), ?, ?)
+        ON CONFLICT (day, event) DO UPDATE SET count = count + excluded.count
+    """, (event, count))
+
+
+def lookup_response(db: Target, system_prompt: str, model: str, temperature: float, prompt: str,
+                    semantic: bool = True, threshold: float = SIMILARITY_THRESHOLD,
+                    ttl: int = CACHE_TTL_S) -> Optional[str]:
+    """Cached reply for this persona/model/temperature and prompt, or None.
+
+    An exact match on the normalised prompt is tried first; with ``semantic``
+    the closest live entry in the same scope is served when its similarity
+    reaches ``threshold``.
+    """
+    ensure_response_cache_tables(db)
+    scope = _scope(system_prompt, model, temperature)
+    normalised = normalise_prompt(prompt)
+    now = time.time()
+    with transaction(db) as cur:
+        cur.execute("SELECT cache_key, response FROM response_cache WHERE cache_key = ? AND created_at >= ?",
+                    (_digest(scope, normalised), now - ttl))
+        row = cur.fetchone()
+        event = "exact_hit" if row else "miss"
+        if row is None and semantic:
+            cur.execute("SELECT cache_key, response, embedding FROM response_cache WHERE scope = ? AND created_at >= ?",
+                        (scope, now - ttl))
+            candidates = cur.fetchall()
+            if candidates:
+                scores = np.vstack([from_blob(c[2]) for c in candidates]) @ embed(normalised)
+                best = int(scores.argmax())
+                if scores[best] >= threshold:
+                    row, event = candidates[best][:2], "semantic_hit"
+        if row is not None:
+            cur.execute("UPDATE response_cache SET hits = hits + 1, last_used_at = ? WHERE cache_key = ?",
+                        (now, row[0]))
+        _record(cur, event)
+    return row[1] if row else None
+
+
+def store_response(db: Target, system_prompt: str, model: str, temperature: float, prompt: str, response: str,
+                   max_entries: int = CACHE_MAX_ENTRIES, ttl: int = CACHE_TTL_S) -> None:
+    """Cache a reply, then evict expired entries and the least recently used beyond ``max_entries``."""
+    ensure_response_cache_tables(db)
+    scope = _scope(system_prompt, model, temperature)
+    normalised = normalise_prompt(prompt)
+    now = time.time()
+    with transaction(db) as cur:
+        cur.execute("""
+            INSERT OR REPLACE INTO response_cache
+                (cache_key, scope, prompt, embedding, response, created_at, last_used_at, hits)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+        """, (_digest(scope, normalised), scope, normalised, to_blob(embed(normalised)), response, now, now))
+        _record(cur, "store")
+        cur.execute("DELETE FROM response_cache WHERE created_at < ?", (now - ttl,))
+        evicted = cur.rowcount
+        cur.execute("""
+            DELETE FROM response_cache WHERE cache_key IN (
+                SELECT cache_key FROM response_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+            )""", (max_entries,))
+        evicted += cur.rowcount
+        if evicted:
+            _record(cur, "eviction", evicted)
+
+
+def cache_stats(db: Target, days: Optional[int] = None) -> Dict[str, float]:
+    """Event counts, entry count and hit rate (over lookups), optionally for the last ``days`` days."""
+    ensure_response_cache_tables(db)
+    sql = "SELECT event, SUM(count) FROM response_cache_metrics"
+    params: tuple = ()
+    if days is not None:
+        sql += " WHERE day >= date('now', ?)"
+        params = (f"-{int(days)} days",)
+    counts: Dict[str, float] = dict.fromkeys(CACHE_EVENTS, 0)
+    counts.update(dict(fetch_all(db, sql + " GROUP BY event", params)))
+    lookups = counts["exact_hit"] + counts["semantic_hit"] + counts["miss"]
+    counts["lookups"] = lookups
+    counts["hit_rate"] = (counts["exact_hit"] + counts["semantic_hit"]) / lookups if lookups else 0.0
+    counts["entries"] = fetch_one(db, "SELECT COUNT(*) FROM response_cache")[0]
+    return counts
+
+
+def clear_response_cache(db: Target) -> None:
+    ensure_response_cache_tables(db)
+    execute(db, "DELETE FROM response_cache")
@@ -0,0 +1,224 @@
+import os
+import re
+import sqlite3
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from platform_data.change_feed import (FEED_SOURCES, changed_row_ids, ensure_change_feed, feed_reaches,
+                                       fetch_records, latest_seq)
+from platform_data.context_window import count_tokens
+from platform_data.database import Target, fetch_all, fetch_one, transaction
+from platform_data.embeddings import embed, from_blob, to_blob
+from platform_data.schema import OWNER_COLUMNS, owner_clause
+
+# Tokens of retrieved records injected into a chat request
+RAG_TOKEN_BUDGET = int(os.environ.get("RAG_TOKEN_BUDGET", "600"))
+# Records retrieved per question
+RAG_TOP_K = int(os.environ.get("RAG_TOP_K", "5"))
+
+# Approximate nearest-neighbour search uses an inverted file over the embedding's
+# hashed feature dimensions: each record is posted under its non-zero dimensions, a
+# query collects records from its rarest dimensions first until RAG_MAX_CANDIDATES
+# is reached, and only those candidates are scored by exact cosine similarity.
+RAG_MAX_CANDIDATES = int(os.environ.get("RAG_MAX_CANDIDATES", "2000"))
+
+
+def _incident_text(r: Dict[str, Any]) -> str:
+    return (f"Incident #{r['id']} on {r['date']}: {r['incident_type']}, severity {r['severity']}, "
+            f"status {r['status']}. {r['description'] or ''} (reported by {r['reported_by']})")
+
+
+def _ticket_text(r: Dict[str, Any]) -> str:
+    return (f"Ticket {r['ticket_id']} created {r['created_date']}: {r['subject']}. {r['description'] or ''} "
+            f"Priority {r['priority']}, status {r['status']}, category {r['category']}, "
+            f"assigned to {r['assigned_to'] or 'nobody'}")
+
+
+def _dataset_text(r: Dict[str, Any]) -> str:
+    return (f"Dataset {r['dataset_name']} ({r['category']}) from {r['source']}, "
+            f"{r['record_count']} records, {r['file_size_mb']} MB, last updated {r['last_updated']}")
+
+
+RECORD_TEXT: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "incidents": _incident_text,
+    "tickets": _ticket_text,
+    "datasets": _dataset_text,
+}
+
+_NUMBERS = re.compile(r"\b\d[\d.:-]*\b")
+
+
+def _searchable(text: str) -> str:
+    """Text that is embedded: ids, dates and sizes are left out, they only add hash noise."""
+    return _NUMBERS.sub(" ", text)
+
+
+def create_vector_index(db: Target) -> None:
+    """Create the embedding store, its inverted file and the per-domain sync position."""
+    with transaction(db) as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS vector_index (
+                domain TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                PRIMARY KEY (domain, row_id)
+            ) WITHOUT ROWID""")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS vector_postings (
+                dim INTEGER NOT NULL,
+                domain TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                PRIMARY KEY (dim, domain, row_id)
+            ) WITHOUT ROWID""")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_vector_postings_row ON vector_postings (domain, row_id)")
+        cur.execute("CREATE TABLE IF NOT EXISTS vector_index_state (domain TEXT PRIMARY KEY, seq INTEGER NOT NULL)")
+
+
+def ensure_vector_index(db: Target) -> None:
+    if fetch_one(db, "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vector_index_state'") is None:
+        create_vector_index(db)
+    ensure_change_feed(db)
+
+
+def _remove_rows(cur: sqlite3.Cursor, domain: str, row_ids: Iterable[int]) -> None:
+    pairs = [(domain, row_id) for row_id in row_ids]
+    cur.executemany("DELETE FROM vector_index WHERE domain = ? AND row_id = ?", pairs)
+    cur.executemany("DELETE FROM vector_postings WHERE domain = ? AND row_id = ?", pairs)
+
+
+def _index_rows(cur: sqlite3.Cursor, domain: str, records: List[Dict[str, Any]]) -> int:
+    text_of = RECORD_TEXT[domain]
+    index_rows, postings = [], []
+    for record in records:
+        text = text_of(record)
+        vector = embed(_searchable(text))
+        index_rows.append((domain, int(record["id"]), text, to_blob(vector)))
+        postings += [(int(dim), domain, int(record["id"])) for dim in np.flatnonzero(vector)]
+    _remove_rows(cur, domain, [row[1] for row in index_rows])
+    cur.executemany("INSERT INTO vector_index (domain, row_id, text, embedding) VALUES (?, ?, ?, ?)", index_rows)
+    cur.executemany("INSERT INTO vector_postings (dim, domain, row_id) VALUES (?, ?, ?)", postings)
+    return len(index_rows)
+
+
+def rebuild_index(db: Target, domain: str) -> int:
+    """Embed every row of a domain from scratch."""
+    ensure_vector_index(db)
+    with transaction(db) as cur:
+        # the write lock is held, so no change can land between the high-water mark and the read
+        seq = latest_seq(db, domain)
+        cur.execute("DELETE FROM vector_index WHERE domain = ?", (domain,))
+        cur.execute("DELETE FROM vector_postings WHERE domain = ?", (domain,))
+        count = _index_rows(cur, domain, fetch_records(db, domain))
+        cur.execute("INSERT OR REPLACE INTO vector_index_state (domain, seq) VALUES (?, ?)", (domain, seq))
+    return count
+
+
+def sync_index(db: Target, domains: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """Bring the index up to date with the domain tables; returns {domain: rows embedded}.
+
+    Only rows logged in the change feed since the last sync are re-embedded; a
+    domain that was never indexed (or whose feed was pruned past the sync
+    position) is rebuilt.
+    """
+    ensure_vector_index(db)
+    embedded: Dict[str, int] = {}
+    for domain in domains or list(RECORD_TEXT):
+        state = fetch_one(db, "SELECT seq FROM vector_index_state WHERE domain = ?", (domain,))
+        if state is None or not feed_reaches(db, state[0]):
+            embedded[domain] = rebuild_index(db, domain)
+            continue
+        if latest_seq(db, domain) <= state[0]:
+            continue
+        with transaction(db) as cur:
+            last = latest_seq(db, domain)
+            changed = changed_row_ids(db, domain, state[0], last)
+            marks = ", ".join("?" for _ in changed)
+            records = fetch_records(db, domain, f"id IN ({marks})", changed)
+            present = {record["id"] for record in records}
+            _remove_rows(cur, domain, [row_id for row_id in changed if row_id not in present])
+            embedded[domain] = _index_rows(cur, domain, records)
+            cur.execute("UPDATE vector_index_state SET seq = ? WHERE domain = ?", (last, domain))
+    return embedded
+
+
+def _candidate_dims(db: Target, dims: List[int], domain_sql: str, domain_params: List[Any],
+                    max_candidates: int) -> List[int]:
+    """The query's dimensions, rarest first, up to roughly ``max_candidates`` postings."""
+    sizes = fetch_all(db, f"""
+        SELECT dim, COUNT(*) FROM vector_postings
+        WHERE dim IN ({", ".join("?" for _ in dims)}){domain_sql}
+        GROUP BY dim ORDER BY 2
+    """, dims + domain_params, name="retrieval.postings")
+    chosen, total = [], 0
+    for dim, size in sizes:
+        if chosen and total + size > max_candidates:
+            break
+        chosen.append(dim)
+        total += size
+    return chosen
+
+
+def retrieve(db: Target, query: str, k: int = RAG_TOP_K, domains: Optional[Sequence[str]] = None,
+             sync: bool = True, max_candidates: int = RAG_MAX_CANDIDATES,
+             owner: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Up to ``k`` records most similar to ``query`` (domain, row_id, text, score), best first.
+
+    With ``owner`` (see ``schema.row_owner``), records of other users are left out.
+    """
+    if sync:
+        sync_index(db, domains)
+    vector = embed(_searchable(query))
+    dims = [int(d) for d in np.flatnonzero(vector)]
+    if not dims:
+        return []
+    domain_sql, domain_params = "", []
+    if domains:
+        domain_sql = f" AND domain IN ({', '.join('?' for _ in domains)})"
+        domain_params = list(domains)
+    chosen = _candidate_dims(db, dims, domain_sql, domain_params, max_candidates)
+    if not chosen:
+        return []
+    scope_sql, scope_params = "", []
+    for domain in OWNER_COLUMNS:
+        owner_sql, owner_params = owner_clause(domain, owner)
+        if owner_sql:
+            scope_sql += f" AND (v.domain != ? OR v.row_id IN (SELECT id FROM {FEED_SOURCES[domain]} WHERE {owner_sql}))"
+            scope_params += [domain] + owner_params
+    candidates = fetch_all(db, f"""
+        SELECT v.domain, v.row_id, v.text, v.embedding
+        FROM vector_index v
+        WHERE (v.domain, v.row_id) IN (
+            SELECT domain, row_id FROM vector_postings
+            WHERE dim IN ({", ".join("?" for _ in chosen)}){domain_sql}
+        ){scope_sql}
+    """, chosen + domain_params + scope_params, name="retrieval.candidates")
+    if not candidates:
+        return []
+    scores = np.vstack([from_blob(c[3]) for c in candidates]) @ vector
+    return [
+        {"domain": candidates[i][0], "row_id": candidates[i][1], "text": candidates[i][2], "score": float(scores[i])}
+        for i in np.argsort(-scores)[:k] if scores[i] > 0
+    ]
+
+
+def records_prompt(records: List[Dict[str, Any]], budget: int = RAG_TOKEN_BUDGET) -> str:
+    """Format retrieved records for the system prompt, best first, within ``budget`` tokens."""
+    header = "Relevant records from the platform database (cite them by ID when you use them):"
+    lines, used = [], count_tokens(header)
+    for record in records:
+        line = f"- {record['text']}"
+        tokens = count_tokens(line)
+        if used + tokens > budget:
+            break
+        lines.append(line)
+        used += tokens
+    return "\n".join([header] + lines) if lines else ""
+
+
+def ground_prompt(db: Target, system_prompt: str, question: str, domains: Optional[Sequence[str]] = None,
+                  k: int = RAG_TOP_K, budget: int = RAG_TOKEN_BUDGET, owner: Optional[str] = None) -> str:
+    """``system_prompt`` followed by the records most relevant to ``question`` (unchanged if none match)."""
+    block = records_prompt(retrieve(db, question, k, domains, owner=owner), budget)
+    return f"{system_prompt}\n\n{block}" if block else system_prompt
@@ -0,0 +1,69 @@
+from typing import Any, List, Optional, Sequence, Tuple
+
+from platform_data.database import Target, execute, fetch_one
+
+# Domain name -> column holding the username that owns a row. Restricted roles
+# only read their own rows; domains without an owner column are not scoped.
+OWNER_COLUMNS = {
+    "incidents": "reported_by",
+    "tickets": "assigned_to",
+}
+# Roles that read every row
+UNRESTRICTED_ROLES = ("admin", "manager")
+
+# One index per owner column, case-insensitive like the predicate below
+OWNER_INDEXES = {
+    "idx_cyber_incidents_reported_by": ("cyber_incidents", "reported_by"),
+    "idx_it_tickets_assigned_to": ("it_tickets", "assigned_to"),
+}
+
+
+def row_owner(username: Optional[str], role: Optional[str]) -> Optional[str]:
+    """The owner to scope reads to for a logged-in user, or None when the role sees every row."""
+    if (role or "").strip().lower() in UNRESTRICTED_ROLES:
+        return None
+    return username or ""
+
+
+def owner_clause(domain: str, owner: Optional[str]) -> Tuple[str, List[Any]]:
+    """("column COLLATE NOCASE = ?", [owner]) for a scoped read, or ("", []) when unscoped."""
+    if owner is None or domain not in OWNER_COLUMNS:
+        return "", []
+    return f"{OWNER_COLUMNS[domain]} COLLATE NOCASE = ?", [owner]
+
+
+def create_owner_indexes(db: Target) -> None:
+    for name, (table, column) in OWNER_INDEXES.items():
+        execute(db, f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column} COLLATE NOCASE)")
+
+
+def ensure_owner_indexes(db: Target) -> None:
+    """Create the owner indexes on databases that predate them."""
+    marks = ", ".join("?" for _ in OWNER_INDEXES)
+    row = fetch_one(db, f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND name IN ({marks})",
+                    list(OWNER_INDEXES))
+    if row[0] < len(OWNER_INDEXES):
+        create_owner_indexes(db)
+
+
+def paged_query(table: str, columns: Sequence[str], where_sql: str = "", params: Sequence[Any] = (),
+                descending: bool = True, after: Optional[int] = None,
+                limit: Optional[int] = None) -> Tuple[str, List[Any]]:
+    """SELECT of ``columns`` in id order, one keyset page at a time.
+
+    ``after`` is the last id of the previous page: the page continues past it in
+    the listed order, so it stays stable while rows are added or deleted (an
+    OFFSET would skip or repeat rows). ``limit=None`` returns every row.
+    """
+    clauses, params = ([where_sql] if where_sql else []), list(params)
+    if after is not None:
+        clauses.append("id < ?" if descending else "id > ?")
+        params.append(after)
+    sql = f"SELECT {', '.join(columns)} FROM {table}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += f" ORDER BY id {'DESC' if descending else 'ASC'}"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
@@ -0,0 +1,188 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from platform_data.database import Target, execute, fetch_one, transaction
+
+# A token expires this long after it was issued (seconds). It travels in the page
+# URL, where history and copied links keep it, so it is short-lived and renewed
+# while the user is active
+SESSION_TTL_S = int(os.environ.get("SESSION_TTL_S", str(30 * 60)))
+# Validated sessions kept in memory per process
+SESSION_CACHE_SIZE = int(os.environ.get("SESSION_CACHE_SIZE", "1024"))
+# A cached session is re-read from the database after this long, so a logout
+# in another worker takes effect here within the interval
+SESSION_CACHE_TTL_S = int(os.environ.get("SESSION_CACHE_TTL_S", "60"))
+
+
+def create_sessions_table(db: Target) -> None:
+    with transaction(db) as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                username TEXT NOT NULL,
+                role TEXT,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                revoked INTEGER NOT NULL DEFAULT 0
+            )""")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at)")
+
+
+def ensure_sessions_table(db: Target) -> None:
+    if fetch_one(db, "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sessions'") is None:
+        create_sessions_table(db)
+
+
+class SessionStore:
+    """Persistent login sessions with signed, expiring tokens.
+
+    A token is ``<session id>.<expiry>.<HMAC-SHA256>``; forged or expired tokens
+    are rejected without a query. Live sessions are stored in the ``sessions``
+    table, and validated ones are kept in an in-memory LRU cache, re-read from
+    the database after ``cache_ttl_s`` so a logout elsewhere takes effect.
+    The signing key comes from ``SESSION_SECRET`` or ``key_path``, created on
+    first use, so tokens survive restarts and are shared between workers.
+    Every method that reads or writes sessions takes the ``Database`` or
+    connection to use. Share one store per process and key.
+    """
+
+    def __init__(self, key_path: Union[str, Path], ttl_s: int = SESSION_TTL_S,
+                 cache_size: int = SESSION_CACHE_SIZE, cache_ttl_s: int = SESSION_CACHE_TTL_S):
+        self._key_path = Path(key_path)
+        self._ttl_s = ttl_s
+        self._cache_size = cache_size
+        self._cache_ttl_s = cache_ttl_s
+        # session_id -> (username, role, expires_at, checked_at), most recently used last
+        self._cache: "OrderedDict[str, Tuple[str, Optional[str], int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._secret: Optional[bytes] = None
+
+    @property
+    def ttl_s(self) -> int:
+        return self._ttl_s
+
+    # --- Tokens ---
+    def _signing_key(self) -> bytes:
+        with self._lock:
+            if self._secret is None:
+                if os.environ.get("SESSION_SECRET"):
+                    self._secret = os.environ["SESSION_SECRET"].encode()
+                else:
+                    if not self._key_path.exists():
+                        self._key_path.parent.mkdir(parents=True, exist_ok=True)
+                        fd = os.open(self._key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                        with os.fdopen(fd, "w") as f:
+                            f.write(secrets.token_hex(32))
+                    self._secret = self._key_path.read_text().strip().encode()
+            return self._secret
+
+    def _sign(self, payload: str) -> str:
+        digest = hmac.new(self._signing_key(), payload.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    def _parse(self, token: Optional[str]) -> Optional[Tuple[str, int]]:
+        """(session_id, expires_at) for a well-formed, correctly signed, unexpired token; else None."""
+        try:
+            session_id, expires, signature = token.split(".")
+            expires_at = int(expires)
+        except (AttributeError, ValueError):
+            return None
+        if not hmac.compare_digest(signature, self._sign(f"{session_id}.{expires}")):
+            return None
+        if expires_at <= time.time():
+            return None
+        return session_id, expires_at
+
+    def expires_at(self, token: Optional[str]) -> Optional[int]:
+        """Expiry (epoch seconds) of a well-formed, signed, unexpired token; else None."""
+        parsed = self._parse(token)
+        return parsed[1] if parsed else None
+
+    def _cache_put(self, session_id: str, entry: Tuple[str, Optional[str], int, float]) -> None:
+        self._cache[session_id] = entry
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    # --- Sessions ---
+    def create(self, db: Target, username: str, role: Optional[str], ttl_s: Optional[int] = None) -> str:
+        """Record a session and return its token."""
+        ensure_sessions_table(db)
+        session_id = secrets.token_urlsafe(16)
+        now = time.time()
+        expires_at = int(now + (self._ttl_s if ttl_s is None else ttl_s))
+        execute(db, "INSERT INTO sessions (session_id, username, role, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (session_id, username, role, now, expires_at), name="sessions.create")
+        with self._lock:
+            self._cache_put(session_id, (username, role, expires_at, now))
+        return f"{session_id}.{expires_at}.{self._sign(f'{session_id}.{expires_at}')}"
+
+    def validate(self, db: Target, token: Optional[str]) -> Optional[Dict[str, Optional[str]]]:
+        """``{"username", "role"}`` of a live session, or None.
+
+        A recently validated session is served from the LRU cache without a query.
+        """
+        parsed = self._parse(token)
+        if parsed is None:
+            return None
+        session_id, expires_at = parsed
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(session_id)
+            if entry is not None and now - entry[3] < self._cache_ttl_s:
+                self._cache.move_to_end(session_id)
+                return {"username": entry[0], "role": entry[1]}
+        ensure_sessions_table(db)
+        row = fetch_one(db, "SELECT username, role FROM sessions WHERE session_id = ? AND expires_at = ? AND revoked = 0",
+                        (session_id, expires_at), name="sessions.validate")
+        with self._lock:
+            if row is None:
+                self._cache.pop(session_id, None)
+                return None
+            self._cache_put(session_id, (row[0], row[1], expires_at, now))
+        return {"username": row[0], "role": row[1]}
+
+    def revoke(self, db: Target, token: Optional[str]) -> bool:
+        """Log a session out everywhere (other workers drop it within ``cache_ttl_s``).
+
+        True only for the call that revoked it, so a token can be rotated once.
+        """
+        parsed = self._parse(token)
+        if parsed is None:
+            return False
+        with self._lock:
+            self._cache.pop(parsed[0], None)
+        ensure_sessions_table(db)
+        return execute(db, "UPDATE sessions SET revoked = 1 WHERE session_id = ? AND revoked = 0", (parsed[0],),
+                       name="sessions.revoke").rowcount > 0
+
+    def rotate(self, db: Target, token: Optional[str],
+               ttl_s: Optional[int] = None) -> Optional[Tuple[str, Dict[str, Optional[str]]]]:
+        """Swap a live token for a new one and revoke the old: ``(new token, session)``, or None.
+
+        None when the token is not live or another request rotated it first.
+        Restoring a login from the URL rotates its token, so a link copied from
+        the address bar or the browser history logs in at most once.
+        """
+        session = self.validate(db, token)
+        if session is None or not self.revoke(db, token):
+            return None
+        return self.create(db, session["username"], session["role"], ttl_s), session
+
+    def purge_expired(self, db: Target) -> int:
+        """Delete expired and revoked sessions; returns the number removed."""
+        ensure_sessions_table(db)
+        return execute(db, "DELETE FROM sessions WHERE expires_at <= ? OR revoked = 1", (time.time(),),
+                       name="sessions.purge").rowcount
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,102 @@
+import sqlite3
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from platform_data.database import Target, execute, fetch_all, fetch_one, transaction
+from platform_data.schema import owner_clause, paged_query
+
+TICKET_COLUMNS = ("id", "ticket_id", "priority", "status", "category", "subject", "description",
+                  "created_date", "resolved_date", "assigned_to", "created_at")
+PRIORITIES = ("Critical", "High", "Medium", "Low")
+STATUSES = ("Open", "Investigating", "Resolved", "Closed")
+
+
+def ticket_ref(number: int) -> str:
+    return f"TCK-{number:04d}"
+
+
+def next_ticket_ref(cursor: sqlite3.Cursor) -> str:
+    """The reference after the highest existing one (a row count would repeat one after a delete)."""
+    cursor.execute("SELECT MAX(CAST(SUBSTR(ticket_id, 5) AS INTEGER)) FROM it_tickets WHERE ticket_id LIKE 'TCK-%'")
+    return ticket_ref((cursor.fetchone()[0] or 0) + 1)
+
+
+def tickets_query(owner: Optional[str] = None, descending: bool = True, after: Optional[int] = None,
+                  limit: Optional[int] = None) -> Tuple[str, List[Any]]:
+    """SELECT of every ticket column, newest first, limited to tickets assigned to ``owner`` when given."""
+    owner_sql, params = owner_clause("tickets", owner)
+    return paged_query("it_tickets", TICKET_COLUMNS, owner_sql, params, descending, after, limit)
+
+
+def list_tickets(db: Target, owner: Optional[str] = None, descending: bool = True, after: Optional[int] = None,
+                 limit: Optional[int] = None) -> List[Tuple[Any, ...]]:
+    """Rows in id order; ``after``/``limit`` page through them by id (see ``paged_query``)."""
+    sql, params = tickets_query(owner, descending, after, limit)
+    return fetch_all(db, sql, params, name="tickets.list")
+
+
+def _by_ref(ref: str, owner: Optional[str]) -> Tuple[str, List[Any]]:
+    """WHERE clause for one ticket, only matching when it is visible to ``owner``."""
+    owner_sql, params = owner_clause("tickets", owner)
+    return "ticket_id = ?" + (f" AND {owner_sql}" if owner_sql else ""), [ref] + params
+
+
+def get_ticket(db: Target, ref: str, owner: Optional[str] = None) -> Optional[Tuple[Any, ...]]:
+    """The ticket with reference ``ref`` (e.g. "TCK-0001"), if visible to ``owner``."""
+    where, params = _by_ref(ref, owner)
+    return fetch_one(db, f"SELECT {', '.join(TICKET_COLUMNS)} FROM it_tickets WHERE {where}",
+                     params, name="tickets.get")
+
+
+def search_tickets(db: Target, query: str, owner: Optional[str] = None) -> List[Tuple[Any, ...]]:
+    """Tickets with reference ``query``, or whose subject, description, category or assignee contains it."""
+    q = query.strip()
+    where = "(ticket_id = ? OR subject LIKE ? OR description LIKE ? OR category LIKE ? OR assigned_to LIKE ?)"
+    params = [q.upper()] + [f"%{q}%"] * 4
+    owner_sql, owner_params = owner_clause("tickets", owner)
+    if owner_sql:
+        where += f" AND {owner_sql}"
+    return fetch_all(db, f"SELECT {', '.join(TICKET_COLUMNS)} FROM it_tickets WHERE {where} ORDER BY id",
+                     params + owner_params, name="tickets.search")
+
+
+INSERT_TICKET_SQL = """
+    INSERT INTO it_tickets (ticket_id, priority, status, category, subject, description, created_date,
+                            resolved_date, assigned_to)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+
+def insert_ticket(db: Target, priority: str, status: str, category: Optional[str], subject: str,
+                  description: Optional[str], created_date: str, resolved_date: Optional[str] = None,
+                  assigned_to: Optional[str] = None) -> str:
+    """Insert a ticket under the next free reference and return the reference."""
+    return insert_tickets(db, [(priority, status, category, subject, description, created_date, resolved_date,
+                                assigned_to)])[0]
+
+
+def insert_tickets(db: Target, rows: Iterable[Sequence[Any]]) -> List[str]:
+    """Insert many (priority, status, category, subject, description, created_date, resolved_date, assigned_to)
+    rows in one commit, under consecutive free references; returns the references in order."""
+    rows = list(rows)
+    with transaction(db) as cur:
+        first = int(next_ticket_ref(cur)[4:])
+        refs = [ticket_ref(first + i) for i in range(len(rows))]
+        cur.executemany(INSERT_TICKET_SQL, [
+            (ref, priority, status, category, subject, description, created_date, resolved_date or None,
+             assigned_to or None)
+            for ref, (priority, status, category, subject, description, created_date, resolved_date, assigned_to)
+            in zip(refs, rows)
+        ])
+    return refs
+
+
+def update_ticket_status(db: Target, ref: str, status: str, owner: Optional[str] = None) -> int:
+    """Returns the number of tickets updated (0 when the reference does not exist or ``owner`` cannot see it)."""
+    where, params = _by_ref(ref, owner)
+    return execute(db, f"UPDATE it_tickets SET status = ? WHERE {where}", [status] + params,
+                   name="tickets.update_status").rowcount
+
+
+def delete_ticket(db: Target, ref: str, owner: Optional[str] = None) -> int:
+    """Returns the number of tickets deleted (0 when the reference does not exist or ``owner`` cannot see it)."""
+    where, params = _by_ref(ref, owner)
+    return execute(db, f"DELETE FROM it_tickets WHERE {where}", params, name="tickets.delete").rowcount
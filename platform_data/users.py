@@ -0,0 +1,25 @@
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+from platform_data.database import Target, execute, execute_many, fetch_one
+
+USER_COLUMNS = ("username", "password_hash", "role")
+
+
+def get_user(db: Target, username: str) -> Optional[Tuple[Any, ...]]:
+    """(username, password_hash, role), or None."""
+    return fetch_one(db, "SELECT username, password_hash, role FROM users WHERE username = ?", (username,),
+                     name="users.get")
+
+
+def insert_user(db: Target, username: str, password_hash: str, role: str = "user") -> None:
+    execute(db, "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+            (username, password_hash, role), name="users.insert")
+
+
+def insert_users(db: Target, rows: Iterable[Sequence[Any]], role: str = "user") -> int:
+    """Insert many (username, password_hash) rows in one commit, skipping existing usernames.
+
+    Returns the number of users added.
+    """
+    return execute_many(db, "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+                        [(row[0], row[1], role) for row in rows], name="users.insert_many")
@@ -0,0 +1,50 @@
+import shutil
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+APP_DB = ROOT / "DATA" / "intelligence_platform.db"
+PLATFORM_DB = ROOT / "multi_domain_platform" / "database" / "platform.db"
+
+
+def clear_app_modules():
+    """Both apps have top-level `services`/`data`/`models` packages; forget the other app's."""
+    for name in list(sys.modules):
+        if name.split(".")[0] in ("services", "data", "models"):
+            del sys.modules[name]
+
+
+@contextmanager
+def app_root(app_dir):
+    """Import with `app_dir` ("app" or "multi_domain_platform") as the import root, as its pages do."""
+    path = list(sys.path)
+    sys.path.insert(0, str(ROOT / app_dir))
+    clear_app_modules()
+    try:
+        yield
+    finally:
+        sys.path[:] = path
+        clear_app_modules()
+
+
+@pytest.fixture
+def platform_db(tmp_path):
+    """A scratch copy of the multi-domain platform's database."""
+    path = tmp_path / "platform.db"
+    shutil.copy(PLATFORM_DB, path)
+    return path
+
+
+@pytest.fixture
+def app_db(tmp_path):
+    """A scratch copy of the app's database, at DATA/intelligence_platform.db under tmp_path."""
+    path = tmp_path / "DATA" / "intelligence_platform.db"
+    path.parent.mkdir()
+    shutil.copy(APP_DB, path)
+    return path
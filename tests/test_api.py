@@ -0,0 +1,119 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+from platform_api.server import ApiServer
+from platform_data import incidents
+
+INCIDENT = {"date": "2024-06-01", "incident_type": "Phishing", "severity": "High", "status": "Open",
+            "description": "api test", "reported_by": "api"}
+
+
+async def _request(port, method, path, body=None, headers=None):
+    """(status, headers, decoded JSON body or None) for one request on its own connection."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        payload = b"" if body is None else json.dumps(body).encode()
+        head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\nContent-Length: {len(payload)}\r\n"
+        head += "".join(f"{k}: {v}\r\n" for k, v in (headers or {}).items())
+        writer.write(head.encode() + b"\r\n" + payload)
+        await writer.drain()
+        lines = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        response_headers = {k.strip().lower(): v.strip() for k, v in (l.split(":", 1) for l in lines[1:] if ":" in l)}
+        data = await reader.readexactly(int(response_headers.get("content-length", "0")))
+        return int(lines[0].split(" ")[1]), response_headers, json.loads(data) if data else None
+    finally:
+        writer.close()
+
+
+@pytest.fixture
+def serve(app_db):
+    """Runs ``scenario(server)`` against an ApiServer on a free port over a scratch database."""
+    def run(scenario):
+        async def main():
+            server = ApiServer(str(app_db), "127.0.0.1", 0, token="")
+            await server.start()
+            try:
+                return await scenario(server)
+            finally:
+                await server.stop()
+        return asyncio.run(main())
+    return run
+
+
+def _count(app_db, table="cyber_incidents"):
+    conn = sqlite3.connect(str(app_db))
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_cursor_pages_cover_every_row_once(serve, app_db):
+    async def scenario(server):
+        ids, path = [], "/incidents?limit=37"
+        while path:
+            status, _, page = await _request(server.port, "GET", path)
+            assert status == 200
+            ids += [item["id"] for item in page["items"]]
+            path = page["next_cursor"] and f"/incidents?limit=37&cursor={page['next_cursor']}"
+        return ids
+
+    ids = serve(scenario)
+    assert ids == sorted(ids, reverse=True)
+    assert len(set(ids)) == len(ids) == _count(app_db)
+
+
+def test_unchanged_resource_gets_304(serve):
+    async def scenario(server):
+        status, headers, body = await _request(server.port, "GET", "/incidents/1")
+        assert status == 200 and body["id"] == 1
+        etag, new_status = headers["etag"], "Open" if body["status"] == "Closed" else "Closed"
+        status, headers, body = await _request(server.port, "GET", "/incidents/1", headers={"If-None-Match": etag})
+        assert (status, headers["content-length"], body) == (304, "0", None)
+        assert (await _request(server.port, "PATCH", "/incidents/1", {"status": new_status}))[0] == 200
+        status, headers, body = await _request(server.port, "GET", "/incidents/1", headers={"If-None-Match": etag})
+        assert status == 200 and body["status"] == new_status and headers["etag"] != etag
+
+    serve(scenario)
+
+
+def test_bulk_insert_is_all_or_nothing(serve, app_db):
+    before = _count(app_db)
+
+    async def scenario(server):
+        status, _, body = await _request(server.port, "POST", "/incidents/bulk",
+                                         [INCIDENT, dict(INCIDENT, severity="Bogus"), INCIDENT])
+        assert status == 400 and body["error"].startswith("item 1:")
+        # a row the database rejects rolls back the rows written before it in the same call
+        with pytest.raises(sqlite3.IntegrityError):
+            await server.writes.submit(incidents.insert_incidents, [
+                tuple(INCIDENT.values()), tuple(dict(INCIDENT, severity="Bogus").values())])
+        assert _count(app_db) == before
+        status, _, body = await _request(server.port, "POST", "/incidents/bulk", [INCIDENT, INCIDENT])
+        assert status == 201 and body["count"] == 2
+        for key in body["keys"]:
+            assert (await _request(server.port, "GET", f"/incidents/{key}"))[0] == 200
+
+    serve(scenario)
+    assert _count(app_db) == before + 2
+
+
+def test_write_queue_replay_fails_only_the_bad_write(serve, app_db):
+    before = _count(app_db)
+    rows = [tuple(INCIDENT.values())] * 2 + [tuple(dict(INCIDENT, severity="Bogus").values())] \
+        + [tuple(INCIDENT.values())] * 2
+
+    async def scenario(server):
+        # submitted together, so the writer takes all five as one batch
+        results = await asyncio.gather(*(server.writes.submit(incidents.insert_incident, *row) for row in rows),
+                                       return_exceptions=True)
+        return results, server.writes.stats()
+
+    results, stats = serve(scenario)
+    assert isinstance(results[2], sqlite3.IntegrityError)
+    assert all(isinstance(key, int) for i, key in enumerate(results) if i != 2)
+    assert stats["largest_batch"] == 5 and stats["failed"] == 1 and stats["writes"] == 4
+    assert _count(app_db) == before + 4
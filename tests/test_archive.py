@@ -0,0 +1,81 @@
+import csv
+import importlib
+import io
+import sqlite3
+from datetime import date
+
+import pytest
+
+from conftest import APP_DB, app_root
+
+pytest.importorskip("pyarrow")
+
+EVERYTHING = {"date_range": (date(2000, 1, 1), date(2100, 1, 1))}
+
+
+@pytest.fixture
+def archived(app_db, monkeypatch):
+    """The app database with every closed incident and ticket moved to DATA/archive next to it."""
+    # the archive lives at DATA/archive relative to where the app runs
+    monkeypatch.chdir(app_db.parents[1])
+    with app_root("app"):
+        archive = importlib.import_module("data.archive")
+        rollups = importlib.import_module("data.rollups")
+        export = importlib.import_module("data.export")
+        conn = sqlite3.connect(str(app_db))
+        try:
+            rollups.ensure_rollup_tables(conn)
+            trends = {d: rollups.get_trend(conn, d, "month").values.tolist() for d in ("incidents", "tickets")}
+            before = {d: _csv_ids(export.iter_export(conn, d, EVERYTHING)) for d in ("incidents", "tickets")}
+            moved = archive.archive_closed_records(conn, today=date(2100, 1, 1))
+            yield conn, archive, rollups, export, moved, trends, before
+        finally:
+            conn.close()
+
+
+def _csv_ids(chunks):
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+    return sorted(int(row["id"]) for row in rows)
+
+
+def test_archiving_moves_closed_rows_out_of_the_hot_tables(archived):
+    conn, _, _, _, moved, _, _ = archived
+    assert moved["incidents"] > 0 and moved["tickets"] > 0
+    assert conn.execute("SELECT COUNT(*) FROM cyber_incidents WHERE status IN ('Closed', 'Resolved')").fetchone()[0] == 0
+
+
+def test_trends_keep_archived_rows_across_a_rebuild(archived):
+    conn, _, rollups, _, _, trends, _ = archived
+    for domain, before in trends.items():
+        assert rollups.get_trend(conn, domain, "month").values.tolist() == before
+    rollups.rebuild_rollups(conn)
+    for domain, before in trends.items():
+        assert rollups.get_trend(conn, domain, "month").values.tolist() == before
+
+
+def test_exports_include_archived_rows(archived):
+    conn, _, _, export, _, _, before = archived
+    for domain, ids in before.items():
+        assert _csv_ids(export.iter_export(conn, domain, EVERYTHING)) == ids
+    import pyarrow.parquet as pq
+    table = pq.read_table(io.BytesIO(b"".join(export.iter_export(conn, "incidents", EVERYTHING, "parquet"))))
+    assert sorted(table["id"].to_pylist()) == before["incidents"]
+
+
+def test_export_filters_apply_to_archived_rows(archived):
+    conn, _, _, export, _, _, _ = archived
+    closed = dict(EVERYTHING, status=["Closed"])
+    original = sqlite3.connect(f"file:{APP_DB}?mode=ro", uri=True)
+    try:
+        expected = [row[0] for row in original.execute("SELECT id FROM cyber_incidents WHERE status = 'Closed' ORDER BY id")]
+    finally:
+        original.close()
+    assert expected
+    assert _csv_ids(export.iter_export(conn, "incidents", closed)) == expected
+    assert _csv_ids(export.iter_export(conn, "incidents", dict(closed, owner="nobody at all"))) == []
+
+
+def test_read_with_archive_restores_the_range(archived):
+    conn, archive, _, _, _, _, before = archived
+    frame = archive.read_with_archive(conn, "incidents", EVERYTHING)
+    assert sorted(frame["id"].tolist()) == before["incidents"]
@@ -0,0 +1,255 @@
+"""Both front ends read and write through platform_data and must agree.
+
+Each test runs the same operations once through app/ (function style) and once
+through multi_domain_platform/ (classes), on scratch copies of the app database.
+"""
+import importlib
+import sqlite3
+
+import pytest
+
+from conftest import app_root
+from platform_data.login_throttle import LOCKOUT_AFTER
+
+TABLES = {
+    "cyber_incidents": "id, date, incident_type, severity, status, description, reported_by",
+    "it_tickets": "id, ticket_id, priority, status, subject, assigned_to",
+    "users": "username, password_hash, role",
+}
+
+
+def _frame_rows(df):
+    df = df.drop(columns=["created_at"]).astype(object)
+    return df.where(df.notna(), None).values.tolist()
+
+
+def _table_rows(path):
+    conn = sqlite3.connect(str(path))
+    try:
+        return {table: conn.execute(f"SELECT {cols} FROM {table} ORDER BY 1").fetchall()
+                for table, cols in TABLES.items()}
+    finally:
+        conn.close()
+
+
+def _run_app(db_path):
+    """The operation sequence through app/data; returns the reads it made."""
+    incidents = importlib.import_module("data.incidents")
+    tickets = importlib.import_module("data.tickets")
+    users = importlib.import_module("data.users")
+    db = importlib.import_module("data.db")
+    database = db.get_database(str(db_path))
+    conn = sqlite3.connect(str(db_path))
+    try:
+        reads = {}
+        new_id = incidents.insert_incident("2024-06-01", "Phishing", "High", "Open", "parity check", "parity")
+        incidents.update_incident_status(conn, new_id, "Investigating")
+        incidents.delete_incident(conn, new_id - 1)
+        ref = tickets.insert_it_ticket(conn, "High", "Open", None, "parity", None, "2024-06-01", None, "parity")
+        tickets.delete_ticket(conn, "TCK-0001")
+        reads["ticket_refs"] = [ref, tickets.insert_it_ticket(conn, "Low", "Open", None, "parity 2", None,
+                                                             "2024-06-01", None, "parity")]
+        users.insert_user("parity_user", "hash", "analyst")
+        reads["all"] = _frame_rows(incidents.get_all_incidents())
+        reads["scoped"] = _frame_rows(incidents.get_all_incidents(owner="parity"))
+        from platform_data import incidents as shared_incidents
+        reads["search"] = [row[:-1] for row in shared_incidents.search_incidents(database, "phish")]
+        reads["user"] = users.get_user_by_username("parity_user")
+        return reads
+    finally:
+        conn.close()
+        db.close_databases()
+
+
+def _run_platform(db_path):
+    """The same sequence through multi_domain_platform's models and services."""
+    database_manager = importlib.import_module("services.database_manager")
+    Incident = importlib.import_module("models.security_incident").SecurityIncident
+    auth_manager = importlib.import_module("services.auth_manager")
+    unit_of_work = importlib.import_module("services.unit_of_work")
+    ITTicket = importlib.import_module("models.it_ticket").ITTicket
+    db = database_manager.DatabaseManager(str(db_path), shared=True)
+    try:
+        reads = {}
+        new_id = Incident.insert(db, "2024-06-01", "Phishing", "High", "Open", "parity check", "parity")
+        with unit_of_work.UnitOfWork(db) as uow:
+            uow.incidents.get(new_id).update_status("Investigating")
+        Incident.delete(db, new_id - 1)
+        with unit_of_work.UnitOfWork(db) as uow:
+            uow.tickets.add(ITTicket(None, "parity", "High", "Open", "parity"))
+        ref = db.fetch_one("SELECT ticket_id FROM it_tickets ORDER BY id DESC LIMIT 1")[0]
+        db.execute_query("DELETE FROM it_tickets WHERE ticket_id = ?", ("TCK-0001",))
+        with unit_of_work.UnitOfWork(db) as uow:
+            uow.tickets.add(ITTicket(None, "parity 2", "Low", "Open", "parity"))
+        reads["ticket_refs"] = [ref, db.fetch_one("SELECT ticket_id FROM it_tickets ORDER BY id DESC LIMIT 1")[0]]
+        auth_manager.AuthManager(db).insert_user("parity_user", "hash", "analyst")
+
+        def as_rows(found):
+            return [[i.get_id(), i.get_date(), i.get_incident_type(), i.get_severity(), i.get_status(),
+                     i.get_description(), i.get_reported_by()] for i in found]
+
+        reads["all"] = as_rows(reversed(Incident.load_all(db)))
+        reads["scoped"] = as_rows(reversed(Incident.load_all(db, owner="parity")))
+        reads["search"] = [tuple(row) for row in as_rows(Incident.search(db, "phish"))]
+        user = auth_manager.AuthManager(db).get_user_by_username("parity_user")
+        reads["user"] = {"username": user.get_username(), "password_hash": user.get_password_hash(),
+                         "role": user.get_role()}
+        return reads
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def platform_copy(app_db, tmp_path):
+    """A second copy of the app database, for the multi-domain front end."""
+    path = tmp_path / "platform.db"
+    path.write_bytes(app_db.read_bytes())
+    return path
+
+
+@pytest.fixture
+def both_runs(app_db, platform_copy, monkeypatch):
+    # the app reads DATA/intelligence_platform.db relative to where it runs
+    monkeypatch.chdir(app_db.parents[1])
+    with app_root("app"):
+        app_reads = _run_app(app_db)
+    with app_root("multi_domain_platform"):
+        platform_reads = _run_platform(platform_copy)
+    return app_reads, platform_reads
+
+
+@pytest.mark.parametrize("key", ["all", "scoped", "search", "user", "ticket_refs"])
+def test_reads_agree(both_runs, key):
+    app_reads, platform_reads = both_runs
+    assert app_reads[key] == platform_reads[key]
+
+
+def test_ticket_added_after_a_delete_gets_a_fresh_reference(both_runs):
+    refs = both_runs[0]["ticket_refs"]
+    assert len(set(refs)) == len(refs)
+
+
+def test_tables_end_identical(both_runs, app_db, platform_copy):
+    assert _table_rows(app_db) == _table_rows(platform_copy)
+
+
+def test_session_token_is_valid_in_either_front_end(app_db, monkeypatch):
+    monkeypatch.chdir(app_db.parents[1])
+    monkeypatch.setenv("SESSION_SECRET", "parity")
+    conn = sqlite3.connect(str(app_db))
+    try:
+        with app_root("app"):
+            token = importlib.import_module("data.sessions").create_session(conn, "parity_user", "analyst")
+    finally:
+        conn.close()
+    with app_root("multi_domain_platform"):
+        db = importlib.import_module("services.database_manager").DatabaseManager(str(app_db))
+        store = importlib.import_module("services.session_store").SessionStore(db, app_db.with_name("unused.key"))
+        try:
+            assert store.validate(token) == {"username": "parity_user", "role": "analyst"}
+            rotated, _ = store.rotate(token)
+            assert store.validate(token) is None
+        finally:
+            db.close()
+    conn = sqlite3.connect(str(app_db))
+    try:
+        with app_root("app"):
+            sessions = importlib.import_module("data.sessions")
+            assert sessions.validate_session(conn, token) is None
+            assert sessions.validate_session(conn, rotated) == {"username": "parity_user", "role": "analyst"}
+    finally:
+        conn.close()
+
+
+def test_cached_reply_is_served_by_either_front_end(app_db):
+    conn = sqlite3.connect(str(app_db))
+    try:
+        with app_root("app"):
+            importlib.import_module("data.response_cache").store_response(
+                conn, "persona", "model", 0.7, "How do I reset a password?", "cached reply")
+    finally:
+        conn.close()
+    with app_root("multi_domain_platform"):
+        db = importlib.import_module("services.database_manager").DatabaseManager(str(app_db))
+        try:
+            cache = importlib.import_module("services.response_cache").ResponseCache(db)
+            assert cache.lookup("persona", "model", 0.7, "how do I reset a password") == "cached reply"
+            assert cache.lookup("other persona", "model", 0.7, "How do I reset a password?") is None
+            assert cache.stats()["exact_hit"] == 1
+        finally:
+            db.close()
+
+
+def test_retrieval_ranks_alike(app_db, platform_copy):
+    query = "phishing emails reported by staff"
+    conn = sqlite3.connect(str(app_db))
+    try:
+        with app_root("app"):
+            app_found = importlib.import_module("data.retrieval").retrieve(conn, query, k=5)
+    finally:
+        conn.close()
+    with app_root("multi_domain_platform"):
+        db = importlib.import_module("services.database_manager").DatabaseManager(str(platform_copy))
+        try:
+            platform_found = importlib.import_module("services.retrieval").RecordIndex(db).search(query, k=5)
+        finally:
+            db.close()
+    assert app_found
+    assert [(r["domain"], r["row_id"]) for r in app_found] == [(r["domain"], r["row_id"]) for r in platform_found]
+
+
+def test_context_window_builds_the_same_request():
+    history = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i} " + "word " * 120}
+               for i in range(20)]
+    with app_root("app"):
+        state = {}
+        app_messages = importlib.import_module("services.context_window").build_messages(
+            "system", history, "next question", budget=1000, state=state)
+    with app_root("multi_domain_platform"):
+        window = importlib.import_module("services.context_window").ContextWindow(budget=1000)
+        platform_messages = window.build("system", history, "next question")
+    assert app_messages == platform_messages
+    assert state["folded"] == window.folded > 0
+    assert state["tokens"] == window.last_tokens <= 1000
+
+
+def test_lockout_recorded_by_one_front_end_holds_in_the_other(app_db):
+    conn = sqlite3.connect(str(app_db))
+    try:
+        with app_root("app"):
+            throttle = importlib.import_module("data.login_throttle")
+            for _ in range(LOCKOUT_AFTER):
+                throttle.check_login(conn, "parity_user")
+                throttle.record_login_result(conn, "parity_user", False)
+            throttle.persist_throttle(conn, force=True)
+    finally:
+        conn.close()
+    with app_root("multi_domain_platform"):
+        db = importlib.import_module("services.database_manager").DatabaseManager(str(app_db))
+        login_throttle = importlib.import_module("services.login_throttle")
+        try:
+            with pytest.raises(login_throttle.LoginThrottled):
+                login_throttle.LoginThrottle(db).check("Parity_User")
+        finally:
+            db.close()
+
+
+def test_writes_are_limited_to_the_owners_rows(app_db):
+    from platform_data import incidents, tickets
+    conn = sqlite3.connect(str(app_db))
+    try:
+        incident_id, reporter = conn.execute("SELECT id, reported_by FROM cyber_incidents ORDER BY id LIMIT 1").fetchone()
+        ref, assignee = conn.execute(
+            "SELECT ticket_id, assigned_to FROM it_tickets WHERE assigned_to IS NOT NULL ORDER BY id LIMIT 1").fetchone()
+        assert incidents.update_incident_status(conn, incident_id, "Closed", owner="someone else") == 0
+        assert incidents.delete_incident(conn, incident_id, owner="someone else") == 0
+        assert tickets.update_ticket_status(conn, ref, "Closed", owner="someone else") == 0
+        assert tickets.delete_ticket(conn, ref, owner="someone else") == 0
+        with app_root("app"):
+            app_incidents = importlib.import_module("data.incidents")
+            assert app_incidents.search_incident(conn, f"INC-{incident_id:04d}", owner="someone else") is None
+            assert app_incidents.search_incident(conn, f"INC-{incident_id:04d}", owner=reporter)["id"] == [incident_id]
+        assert incidents.update_incident_status(conn, incident_id, "Closed", owner=reporter.upper()) == 1
+        assert tickets.delete_ticket(conn, ref, owner=assignee) == 1
+    finally:
+        conn.close()
@@ -0,0 +1,85 @@
+import importlib
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from conftest import app_root
+
+FRIDAY = datetime(2026, 10, 16)
+
+
+@pytest.fixture
+def scheduler():
+    with app_root("app"):
+        yield importlib.import_module("services.scheduler")
+
+
+@pytest.fixture
+def jobs(app_db):
+    """The app's data.jobs module and a connection to a scratch database with the job tables."""
+    with app_root("app"):
+        module = importlib.import_module("data.jobs")
+        conn = sqlite3.connect(str(app_db))
+        try:
+            module.ensure_job_tables(conn)
+            yield module, conn
+        finally:
+            conn.close()
+
+
+@pytest.mark.parametrize("expr, after, expected", [
+    # steps
+    ("*/15 * * * *", FRIDAY.replace(hour=10, minute=7), datetime(2026, 10, 16, 10, 15)),
+    ("5-20/5 * * * *", FRIDAY.replace(hour=10, minute=20), datetime(2026, 10, 16, 11, 5)),
+    # ranges: weekdays 9-17, so Friday evening rolls over to Monday morning
+    ("0 9-17 * * 1-5", FRIDAY.replace(hour=17, minute=30), datetime(2026, 10, 19, 9, 0)),
+    # both day fields restricted: the 1st of the month OR a Monday
+    ("0 0 1 * 1", FRIDAY, datetime(2026, 10, 19)),
+    ("0 0 1 * 1", datetime(2026, 10, 26), datetime(2026, 11, 1)),
+    # only one restricted: that one alone decides
+    ("0 0 1 * *", FRIDAY, datetime(2026, 11, 1)),
+    ("0 0 * * 1", datetime(2026, 10, 26), datetime(2026, 11, 2)),
+    # day-of-week 7 is Sunday, like 0
+    ("0 0 * * 7", FRIDAY, datetime(2026, 10, 18)),
+    ("@monthly", datetime(2026, 1, 31, 12), datetime(2026, 2, 1)),
+    ("@monthly", datetime(2026, 12, 5), datetime(2027, 1, 1)),
+])
+def test_next_fire(scheduler, expr, after, expected):
+    assert scheduler.next_fire(expr, after) == expected
+
+
+@pytest.mark.parametrize("expr", ["60 * * * *", "* * *", "*/0 * * * *", "10-5 * * * *", "0 0 31 2 *"])
+def test_bad_cron_expressions_are_rejected(scheduler, expr):
+    with pytest.raises(ValueError):
+        scheduler.next_fire(expr, FRIDAY)
+
+
+def test_a_queued_run_is_claimed_once(jobs):
+    module, conn = jobs
+    run_id = module.queue_job_run(conn, "rollups")
+    assert module.queue_job_run(conn, "rollups") == run_id
+    assert module.start_job_run(conn, "rollups", "worker-1", run_id, "manual") == run_id
+    assert module.start_job_run(conn, "rollups", "worker-2", run_id, "manual") is None
+    assert conn.execute("SELECT state, worker FROM job_runs WHERE run_id = ?", (run_id,)).fetchone() == \
+        ("running", "worker-1")
+    assert module.queued_jobs(conn) == {}
+
+
+def test_a_live_lease_refuses_a_second_worker(jobs):
+    module, conn = jobs
+    assert module.acquire_job_lock(conn, "rollups", "worker-1", 60, now=1000)
+    assert not module.acquire_job_lock(conn, "rollups", "worker-2", 60, now=1030)
+    # renewing extends the lease, so it is still live where the first one would have expired
+    assert module.acquire_job_lock(conn, "rollups", "worker-1", 60, now=1050)
+    assert not module.acquire_job_lock(conn, "rollups", "worker-2", 60, now=1100)
+    # only an expired lease is taken over
+    assert module.acquire_job_lock(conn, "rollups", "worker-2", 60, now=1111)
+    assert not module.acquire_job_lock(conn, "rollups", "worker-1", 60, now=1120)
+
+
+def test_run_job_skips_a_job_another_worker_holds(jobs, scheduler):
+    module, conn = jobs
+    assert module.acquire_job_lock(conn, "analyze", "another process", 600)
+    assert scheduler.run_job(conn, "analyze") is None
+    assert conn.execute("SELECT COUNT(*) FROM job_runs WHERE job = 'analyze'").fetchone()[0] == 0
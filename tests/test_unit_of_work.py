@@ -0,0 +1,83 @@
+import sqlite3
+
+import pytest
+
+from conftest import app_root
+
+
+@pytest.fixture
+def uow_factory(platform_db):
+    with app_root("multi_domain_platform"):
+        from services.database_manager import DatabaseManager
+        from services.unit_of_work import UnitOfWork
+        from models.it_ticket import ITTicket
+        db = DatabaseManager(str(platform_db))
+        yield (lambda: UnitOfWork(db)), ITTicket
+        db.close()
+
+
+def _rows(path, sql, params=()):
+    conn = sqlite3.connect(str(path))
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def test_same_key_returns_same_instance(uow_factory):
+    new_uow, _ = uow_factory
+    uow = new_uow()
+    first = uow.incidents.find()[0]
+    assert uow.incidents.get(first.get_id()) is first
+    assert uow.incidents.find()[0] is first
+
+
+def test_commit_writes_only_dirty_objects(uow_factory, platform_db):
+    new_uow, _ = uow_factory
+    incident_id, status = _rows(platform_db, "SELECT id, status FROM cyber_incidents ORDER BY id LIMIT 1")[0]
+    new_status = "Closed" if status != "Closed" else "Open"
+    with new_uow() as uow:
+        uow.incidents.find()
+        assert uow.dirty_objects() == []
+        uow.incidents.get(incident_id).update_status(new_status)
+        assert len(uow.dirty_objects()) == 1
+        counts = uow.commit()
+        assert counts == {"updated": 1, "inserted": 0, "deleted": 0}
+        # snapshots follow the commit: nothing is dirty until the next change
+        assert uow.dirty_objects() == []
+    assert _rows(platform_db, "SELECT status FROM cyber_incidents WHERE id = ?", (incident_id,)) == [(new_status,)]
+
+
+def test_rollback_discards_changes(uow_factory, platform_db):
+    new_uow, _ = uow_factory
+    before = _rows(platform_db, "SELECT id, status FROM it_tickets ORDER BY id")
+    with pytest.raises(RuntimeError):
+        with new_uow() as uow:
+            uow.tickets.get(before[0][0]).close_ticket()
+            raise RuntimeError("abandon the session")
+    assert _rows(platform_db, "SELECT id, status FROM it_tickets ORDER BY id") == before
+
+
+def test_new_ticket_after_delete_gets_unused_reference(uow_factory, platform_db):
+    new_uow, ITTicket = uow_factory
+    oldest = _rows(platform_db, "SELECT id FROM it_tickets ORDER BY id LIMIT 1")[0][0]
+    with new_uow() as uow:
+        uow.tickets.remove(uow.tickets.get(oldest))
+    with new_uow() as uow:
+        uow.tickets.add(ITTicket(None, "after a delete", "Low", "Open", "bench"))
+    refs = [ref for (ref,) in _rows(platform_db, "SELECT ticket_id FROM it_tickets")]
+    assert len(refs) == len(set(refs))
+
+
+def test_flushing_a_dataset_keeps_its_stored_size(uow_factory, platform_db):
+    new_uow, _ = uow_factory
+    conn = sqlite3.connect(str(platform_db))
+    with conn:
+        conn.execute("UPDATE datasets_metadata SET file_size_mb = 12.345678 WHERE id = (SELECT MIN(id) FROM datasets_metadata)")
+    dataset_id = conn.execute("SELECT MIN(id) FROM datasets_metadata").fetchone()[0]
+    conn.close()
+    with new_uow() as uow:
+        dataset = uow.datasets.get(dataset_id)
+        dataset.update_rows((dataset.get_rows() or 0) + 1)
+        assert uow.commit()["updated"] == 1
+    assert _rows(platform_db, "SELECT file_size_mb FROM datasets_metadata WHERE id = ?", (dataset_id,)) == [(12.345678,)]